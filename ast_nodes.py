@@ -0,0 +1,198 @@
+"""
+Árvore sintática abstrata (AST) produzida pelo parser.
+
+As ações da gramática apenas constroem estes nós; a análise semântica é
+feita depois, numa passada separada sobre a árvore (semantic.py). Todos os
+nós usam __slots__ e guardam a linha e a coluna em que começam no texto.
+
+O atributo de classe `campos` lista, em ordem, os atributos de cada nó
+(além de line/col); ele é usado pelas rotinas genéricas de percurso,
+comparação e representação.
+"""
+
+class No:
+    """Classe base dos nós da AST"""
+    __slots__ = ('line', 'col')
+    campos = ()
+
+    def filhos(self):
+        """Nós filhos diretos, na ordem dos campos"""
+        for campo in self.campos:
+            valor = getattr(self, campo)
+            if isinstance(valor, No):
+                yield valor
+            elif isinstance(valor, list):
+                for item in valor:
+                    if isinstance(item, No):
+                        yield item
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return all(getattr(self, c) == getattr(other, c) for c in self.campos)
+
+    def __ne__(self, other):
+        resultado = self.__eq__(other)
+        return resultado if resultado is NotImplemented else not resultado
+
+    __hash__ = None
+
+    def __repr__(self):
+        argumentos = ', '.join(f"{c}={getattr(self, c)!r}" for c in self.campos)
+        return f"{type(self).__name__}({argumentos})"
+
+class Program(No):
+    """Programa: `int main() { ... };`"""
+    __slots__ = ('corpo',)
+    campos = ('corpo',)
+
+    def __init__(self, corpo, line=0, col=0):
+        self.corpo = corpo
+        self.line = line
+        self.col = col
+
+class Block(No):
+    """Bloco `{ ... }` com a lista de comandos"""
+    __slots__ = ('comandos',)
+    campos = ('comandos',)
+
+    def __init__(self, comandos, line=0, col=0):
+        self.comandos = comandos
+        self.line = line
+        self.col = col
+
+class Decl(No):
+    """Declaração de uma variável, com valor inicial opcional"""
+    __slots__ = ('tipo', 'nome', 'valor')
+    campos = ('tipo', 'nome', 'valor')
+
+    def __init__(self, tipo, nome, valor=None, line=0, col=0):
+        self.tipo = tipo
+        self.nome = nome
+        self.valor = valor
+        self.line = line
+        self.col = col
+
+class Assign(No):
+    """Atribuição `nome = valor`"""
+    __slots__ = ('nome', 'valor')
+    campos = ('nome', 'valor')
+
+    def __init__(self, nome, valor, line=0, col=0):
+        self.nome = nome
+        self.valor = valor
+        self.line = line
+        self.col = col
+
+class BinOp(No):
+    """Operação aritmética binária"""
+    __slots__ = ('op', 'esquerda', 'direita')
+    campos = ('op', 'esquerda', 'direita')
+
+    def __init__(self, op, esquerda, direita, line=0, col=0):
+        self.op = op
+        self.esquerda = esquerda
+        self.direita = direita
+        self.line = line
+        self.col = col
+
+class Cond(No):
+    """Comparação usada como condição de while, if e for"""
+    __slots__ = ('op', 'esquerda', 'direita')
+    campos = ('op', 'esquerda', 'direita')
+
+    def __init__(self, op, esquerda, direita, line=0, col=0):
+        self.op = op
+        self.esquerda = esquerda
+        self.direita = direita
+        self.line = line
+        self.col = col
+
+class While(No):
+    __slots__ = ('condicao', 'corpo')
+    campos = ('condicao', 'corpo')
+
+    def __init__(self, condicao, corpo, line=0, col=0):
+        self.condicao = condicao
+        self.corpo = corpo
+        self.line = line
+        self.col = col
+
+class If(No):
+    """`if`; senao é um Block, outro If (else if) ou None"""
+    __slots__ = ('condicao', 'entao', 'senao')
+    campos = ('condicao', 'entao', 'senao')
+
+    def __init__(self, condicao, entao, senao=None, line=0, col=0):
+        self.condicao = condicao
+        self.entao = entao
+        self.senao = senao
+        self.line = line
+        self.col = col
+
+class For(No):
+    """`for(inicio; condicao; passo)`; inicio é um Decl ou Assign e passo um Assign"""
+    __slots__ = ('inicio', 'condicao', 'passo', 'corpo')
+    campos = ('inicio', 'condicao', 'passo', 'corpo')
+
+    def __init__(self, inicio, condicao, passo, corpo, line=0, col=0):
+        self.inicio = inicio
+        self.condicao = condicao
+        self.passo = passo
+        self.corpo = corpo
+        self.line = line
+        self.col = col
+
+class Print(No):
+    """Chamada `printf(formato, argumentos...)`"""
+    __slots__ = ('formato', 'argumentos')
+    campos = ('formato', 'argumentos')
+
+    def __init__(self, formato, argumentos, line=0, col=0):
+        self.formato = formato
+        self.argumentos = argumentos
+        self.line = line
+        self.col = col
+
+class Return(No):
+    """`return valor;`, que encerra o programa"""
+    __slots__ = ('valor',)
+    campos = ('valor',)
+
+    def __init__(self, valor, line=0, col=0):
+        self.valor = valor
+        self.line = line
+        self.col = col
+
+class Literal(No):
+    """
+    Literal inteiro, float ou string, com o tipo correspondente. `tamanho` é
+    o comprimento do texto do literal no fonte (0 se desconhecido).
+    """
+    __slots__ = ('valor', 'tipo', 'tamanho')
+    campos = ('valor', 'tipo')
+
+    def __init__(self, valor, tipo, line=0, col=0, tamanho=0):
+        self.valor = valor
+        self.tipo = tipo
+        self.line = line
+        self.col = col
+        self.tamanho = tamanho
+
+class Name(No):
+    """Uso de uma variável"""
+    __slots__ = ('nome',)
+    campos = ('nome',)
+
+    def __init__(self, nome, line=0, col=0):
+        self.nome = nome
+        self.line = line
+        self.col = col
+
+def percorrer(no):
+    """Percorre a árvore em pré-ordem"""
+    pilha = [no]
+    while pilha:
+        atual = pilha.pop()
+        yield atual
+        pilha.extend(reversed(list(atual.filhos())))
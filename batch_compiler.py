@@ -0,0 +1,250 @@
+"""
+Compilação em lote de vários arquivos fonte.
+
+Distribui os arquivos entre processos de um ProcessPoolExecutor. Cada
+processo constrói o Compiler uma única vez, ao iniciar, e o reutiliza para
+todos os arquivos que receber. Para cada arquivo é impressa uma linha JSON
+com o status, os diagnósticos e o tempo de compilação.
+
+Com --cache-dir, os resultados são guardados no cache de compilações
+(compile_cache.py) num diretório compartilhado pelos processos: um arquivo
+com o mesmo conteúdo de outro já compilado, nesta ou numa execução anterior,
+não é compilado de novo. A linha de cada arquivo informa então se o
+resultado veio do cache ('cache': 'hit' ou 'miss') e, ao final, o total de
+acertos e falhas é impresso em stderr.
+
+Com --executar, os programas compilados sem erro também são executados pelo
+interpretador, com orçamento de instruções e tempo limite, de modo que um
+laço infinito não prenda um processo trabalhador.
+
+Uso:
+    python batch_compiler.py 'input*.txt' outro.txt [-j N] [--executar] [--cache-dir DIR]
+"""
+import argparse
+import concurrent.futures
+import functools
+import glob
+import json
+import sys
+import time
+
+from diagnostics import Diagnostic, ENTRADA
+import gerador_python
+import interpreter
+import serializacao
+import vm
+from interpreter import MAX_INSTRUCOES, TEMPO_LIMITE
+from sintatic_analyser import Compiler, configurar_cache
+
+# Motores de execução: interpretador da AST, máquina virtual de bytecode ou
+# tradução para código Python
+MOTORES = {'ast': interpreter.executar, 'vm': vm.executar, 'python': gerador_python.executar}
+
+# Compiler e cache de compilações do processo trabalhador (criados em
+# iniciar_trabalhador)
+_compilador = None
+_cache = None
+
+def iniciar_trabalhador(cache_dir=None, cache_tamanho=0):
+    """
+    Inicializa um processo trabalhador construindo o Compiler uma única vez
+    e, se `cache_dir` for informado, o cache de compilações em disco.
+    """
+    global _compilador, _cache
+    _compilador = Compiler()
+    _cache = configurar_cache(cache_tamanho, cache_dir) if cache_dir is not None else None
+
+def compilar_arquivo(caminho, executar_programa=False, max_instrucoes=MAX_INSTRUCOES,
+                     tempo_limite=TEMPO_LIMITE, motor='vm'):
+    """
+    Compila um arquivo usando o Compiler do processo atual.
+
+    Args:
+        caminho: Arquivo fonte
+        executar_programa: Executa o programa se a compilação tiver sucesso;
+                           o resultado fica na chave 'execution'
+        max_instrucoes: Orçamento de instruções da execução
+        tempo_limite: Tempo máximo da execução em segundos
+        motor: 'vm' (bytecode), 'ast' (interpretador da árvore) ou 'python'
+               (código Python gerado)
+
+    Returns:
+        Dicionário serializável em JSON com o resultado da compilação
+    """
+    inicio = time.perf_counter()
+    try:
+        with open(caminho, 'r') as arquivo:
+            texto = arquivo.read()
+    except OSError as e:
+        erro = Diagnostic(0, 0, ENTRADA, str(e))
+        return {'file': caminho, 'status': 'error', 'diagnostics': [erro.to_dict()], 'time_ms': 0.0}
+    except UnicodeDecodeError as e:
+        # Um arquivo que não é texto não pode derrubar o lote inteiro
+        erro = Diagnostic(0, 0, ENTRADA, f"{caminho}: {e}")
+        return {'file': caminho, 'status': 'error', 'diagnostics': [erro.to_dict()], 'time_ms': 0.0}
+    return compilar_texto(texto, caminho, executar_programa, max_instrucoes, tempo_limite,
+                          motor, inicio)
+
+def _compilar(texto):
+    """
+    CompilationResult de `texto` pelo Compiler do processo atual, e se veio
+    do cache de compilações
+    """
+    global _compilador
+    if _compilador is None:
+        _compilador = Compiler()
+    if _cache is not None:
+        return _cache.compilar(_compilador, texto)
+    return _compilador.compile(texto), False
+
+def compilar_texto(texto, nome, executar_programa=False, max_instrucoes=MAX_INSTRUCOES,
+                   tempo_limite=TEMPO_LIMITE, motor='vm', inicio=None):
+    """
+    Compila um texto fonte usando o Compiler do processo atual.
+
+    Args:
+        texto: Código fonte
+        nome: Nome do fonte, devolvido na chave 'file'
+        inicio: Instante (time.perf_counter) a partir do qual 'time_ms' é
+                contado (padrão: o início desta chamada)
+        Os demais, como em compilar_arquivo
+
+    Returns:
+        Dicionário serializável em JSON com o resultado da compilação
+    """
+    if inicio is None:
+        inicio = time.perf_counter()
+    resultado, do_cache = _compilar(texto)
+    duracao = (time.perf_counter() - inicio) * 1000
+    saida = {
+        'file': nome,
+        'status': 'ok' if resultado.sucesso else 'error',
+        'diagnostics': [d.to_dict() for d in resultado.diagnosticos],
+        'time_ms': round(duracao, 3),
+    }
+    if _cache is not None:
+        saida['cache'] = 'hit' if do_cache else 'miss'
+    if executar_programa and resultado.sucesso:
+        execucao = MOTORES[motor](resultado.ast, max_instrucoes, tempo_limite)
+        saida['execution'] = execucao.to_dict()
+        if not execucao.sucesso:
+            saida['status'] = 'error'
+    return saida
+
+def expandir_entradas(padroes):
+    """
+    Expande os padrões glob recebidos na linha de comando, preservando a
+    ordem e removendo arquivos repetidos.
+    """
+    arquivos = []
+    vistos = set()
+    for padrao in padroes:
+        encontrados = sorted(glob.glob(padrao)) or [padrao]
+        for caminho in encontrados:
+            if caminho not in vistos:
+                vistos.add(caminho)
+                arquivos.append(caminho)
+    return arquivos
+
+def compilar_lote(arquivos, trabalhadores=None, chunksize=16, cache_dir=None,
+                  cache_tamanho=0, **opcoes):
+    """
+    Compila os arquivos em paralelo.
+
+    Args:
+        arquivos: Lista de caminhos
+        trabalhadores: Número de processos (padrão: número de CPUs)
+        chunksize: Quantidade de arquivos enviada a um processo por vez
+        cache_dir: Diretório do cache de compilações compartilhado pelos
+                   processos (padrão: sem cache)
+        cache_tamanho: Entradas do cache mantidas em memória por processo
+        opcoes: Repassadas a compilar_arquivo (executar_programa, ...)
+
+    Yields:
+        Um dicionário de resultado por arquivo, na ordem de entrada
+    """
+    tarefa = functools.partial(compilar_arquivo, **opcoes) if opcoes else compilar_arquivo
+    if trabalhadores == 1:
+        # Sem paralelismo: compila no próprio processo
+        iniciar_trabalhador(cache_dir, cache_tamanho)
+        for caminho in arquivos:
+            yield tarefa(caminho)
+        return
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=trabalhadores, initializer=iniciar_trabalhador,
+            initargs=(cache_dir, cache_tamanho)) as executor:
+        yield from executor.map(tarefa, arquivos, chunksize=chunksize)
+
+def compilar_serializado(texto):
+    """CompilationResult de `texto`, codificado no formato de serializacao.py"""
+    return serializacao.codificar(_compilar(texto)[0])
+
+def compilar_resultados(textos, trabalhadores=None, chunksize=16, cache_dir=None, cache_tamanho=0):
+    """
+    Compila os textos em paralelo e devolve os resultados completos, com
+    tabela de símbolos e AST, e não apenas os diagnósticos. Os processos
+    trabalhadores os devolvem no formato binário de serializacao.py, menor
+    e mais rápido de transmitir do que o pickle dos objetos.
+
+    Args:
+        textos: Iterável de códigos fonte
+        Os demais, como em compilar_lote
+
+    Yields:
+        Um CompilationResult por texto, na ordem de entrada
+    """
+    if trabalhadores == 1:
+        iniciar_trabalhador(cache_dir, cache_tamanho)
+        for texto in textos:
+            yield _compilar(texto)[0]
+        return
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=trabalhadores, initializer=iniciar_trabalhador,
+            initargs=(cache_dir, cache_tamanho)) as executor:
+        for dados in executor.map(compilar_serializado, textos, chunksize=chunksize):
+            yield serializacao.decodificar(dados)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila vários arquivos fonte em paralelo.")
+    parser.add_argument('entradas', nargs='+', help="arquivos ou padrões glob (ex.: 'input*.txt')")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="número de processos (padrão: número de CPUs)")
+    parser.add_argument('--chunksize', type=int, default=16,
+                        help="arquivos enviados a cada processo por vez")
+    parser.add_argument('--executar', action='store_true',
+                        help="executa os programas compilados sem erro")
+    parser.add_argument('--max-instrucoes', type=int, default=MAX_INSTRUCOES,
+                        help=f"orçamento de instruções de cada execução (padrão: {MAX_INSTRUCOES})")
+    parser.add_argument('--tempo-limite', type=float, default=TEMPO_LIMITE,
+                        help=f"tempo máximo de cada execução em segundos (padrão: {TEMPO_LIMITE})")
+    parser.add_argument('--motor', choices=sorted(MOTORES), default='vm',
+                        help="motor de execução: vm (bytecode, padrão), ast ou python")
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help="diretório do cache de compilações compartilhado pelos processos")
+    parser.add_argument('--cache-tamanho', type=int, default=0,
+                        help="entradas do cache mantidas em memória por processo (padrão: 0)")
+    args = parser.parse_args(argv)
+    opcoes = {}
+    if args.executar:
+        opcoes = {'executar_programa': True, 'max_instrucoes': args.max_instrucoes,
+                  'tempo_limite': args.tempo_limite, 'motor': args.motor}
+
+    arquivos = expandir_entradas(args.entradas)
+    saida = sys.stdout
+    falhas = 0
+    uso_cache = {'hit': 0, 'miss': 0}
+    for resultado in compilar_lote(arquivos, args.jobs, args.chunksize,
+                                   args.cache_dir, args.cache_tamanho, **opcoes):
+        if resultado['status'] != 'ok':
+            falhas += 1
+        if 'cache' in resultado:
+            uso_cache[resultado['cache']] += 1
+        saida.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+        saida.flush()
+    if args.cache_dir is not None:
+        print(json.dumps({'cache_hits': uso_cache['hit'], 'cache_misses': uso_cache['miss']}),
+              file=sys.stderr)
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
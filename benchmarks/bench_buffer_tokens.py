@@ -0,0 +1,139 @@
+"""
+Compara o lexer rápido (LexerRapido) com o seu modo buffer (LexerBuffer).
+
+O corpus é formado pelos arquivos input*.txt do repositório, concatenados,
+e por programas gerados (gerador_programas) com cada quantidade de
+declarações em `--declaracoes`. Para cada texto são reportados:
+
+    bytes_por_token_lista    pico de memória (tracemalloc) de guardar os
+                             tokens do LexerRapido numa lista de LexToken,
+                             por token
+    bytes_por_token_buffer   pico de memória do input() do LexerBuffer, que
+                             preenche as colunas, por token
+    bytes_por_token_colunas  tamanho das colunas do buffer, por token
+
+e os tokens por segundo (menor tempo de `--vezes` execuções, alternadas):
+
+    rapido         LexerRapido, todos os tokens (sem guardá-los)
+    buffer_input   LexerBuffer.input(), só o preenchimento das colunas
+    buffer         LexerBuffer.input() e todos os tokens lidos das colunas
+    compilar_*     Compiler.compile com cada lexer, de ponta a ponta
+
+Antes de medir, confere que os dois lexers produzem os mesmos tokens e que
+as compilações têm os mesmos diagnósticos e a mesma AST.
+
+Uso:
+    python benchmarks/bench_buffer_tokens.py [--declaracoes 1000 10000] [--vezes 5]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from diagnostics import Diagnosticos
+from gerador_programas import gerar_programa
+from sintatic_analyser import Compiler, em_compilacao
+
+def tokens(lexer, texto):
+    """Tokens de `texto` como tuplas comparáveis"""
+    with em_compilacao(Diagnosticos()):
+        lexer.input(texto)
+        lexer.lineno = 1
+        return [(t.type, t.value, t.lineno, t.lexpos, getattr(t, 'tamanho', None))
+                for t in iter(lexer.token, None)]
+
+def pico(funcao):
+    """Pico de memória alocada durante `funcao`, em bytes"""
+    tracemalloc.start()
+    try:
+        resultado = funcao()
+        return tracemalloc.get_traced_memory()[1], resultado
+    finally:
+        tracemalloc.stop()
+
+def medir(compiladores, texto, vezes):
+    rapido = compiladores['rapido'].novo_lexer()
+    buffer = compiladores['buffer'].novo_lexer()
+    quantidade = len(tokens(rapido, texto))
+    if tokens(buffer, texto) != tokens(rapido, texto):
+        raise SystemExit("os lexers produziram tokens diferentes")
+    esperado = compiladores['rapido'].compile(texto)
+    obtido = compiladores['buffer'].compile(texto)
+    if obtido.diagnosticos != esperado.diagnosticos or obtido.ast != esperado.ast:
+        raise SystemExit("as compilações com os dois lexers diferem")
+
+    def lexico(lexer, guardar):
+        def executar():
+            with em_compilacao(Diagnosticos()):
+                lexer.input(texto)
+                lexer.lineno = 1
+                if guardar:
+                    return list(iter(lexer.token, None))
+                for _ in iter(lexer.token, None):
+                    pass
+        return executar
+
+    def preencher():
+        with em_compilacao(Diagnosticos()):
+            buffer.input(texto)
+        return buffer.buffer
+
+    funcoes = {
+        'rapido': lexico(rapido, False),
+        'buffer_input': preencher,
+        'buffer': lexico(buffer, False),
+        'compilar_rapido': lambda: compiladores['rapido'].compile(texto),
+        'compilar_buffer': lambda: compiladores['buffer'].compile(texto),
+    }
+    tempos = {nome: [] for nome in funcoes}
+    for _ in range(vezes):
+        # As medidas se alternam a cada repetição, para que variações da
+        # máquina afetem todas igualmente
+        for nome, funcao in funcoes.items():
+            inicio = time.perf_counter()
+            funcao()
+            tempos[nome].append(time.perf_counter() - inicio)
+
+    memoria_lista, _ = pico(lexico(rapido, True))
+    memoria_buffer, colunas = pico(preencher)
+    resultado = {
+        'tokens': quantidade,
+        'bytes_por_token_lista': round(memoria_lista / quantidade, 1),
+        'bytes_por_token_buffer': round(memoria_buffer / quantidade, 1),
+        'bytes_por_token_colunas': round(colunas.memoria() / quantidade, 1),
+    }
+    for nome, lista in tempos.items():
+        resultado[f'{nome}_tokens_por_s'] = round(quantidade / min(lista))
+    return resultado
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--declaracoes', type=int, nargs='+', default=[1000, 10000])
+    argumentos.add_argument('--vezes', type=int, default=5)
+    args = argumentos.parse_args(argv)
+
+    compiladores = {nome: Compiler(lexer=nome) for nome in ('rapido', 'buffer')}
+    textos = {}
+    arquivos = sorted(glob.glob(os.path.join(RAIZ, 'input*.txt')))
+    corpus = []
+    for caminho in arquivos:
+        with open(caminho) as arquivo:
+            corpus.append(arquivo.read())
+    textos[f'input*.txt ({len(arquivos)} arquivos)'] = ''.join(corpus)
+    for declaracoes in args.declaracoes:
+        textos[f'gerado_{declaracoes}'] = gerar_programa(declaracoes)
+
+    for nome, texto in textos.items():
+        resultado = {'texto': nome}
+        resultado.update(medir(compiladores, texto, args.vezes))
+        print(json.dumps(resultado))
+
+if __name__ == "__main__":
+    main()
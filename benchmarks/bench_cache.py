@@ -0,0 +1,64 @@
+"""
+Mede o cache de compilações (compile_cache.py): o tempo de uma compilação
+completa comparado com o de um acerto no nível de memória e no de disco,
+para programas gerados de tamanhos diferentes.
+
+Uso:
+    python benchmarks/bench_cache.py [--comandos 100 1000 5000] [--vezes 5]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import compile_cache
+from bench_otimizacao import gerar_programa
+from sintatic_analyser import Compiler, assinatura_compilador
+
+def melhor(funcao, vezes):
+    """Menor tempo, em milissegundos, de `vezes` chamadas de funcao()"""
+    tempos = []
+    for _ in range(vezes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) * 1000
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--comandos', type=int, nargs='+', default=[100, 1000, 5000])
+    argumentos.add_argument('--vezes', type=int, default=5)
+    args = argumentos.parse_args(argv)
+
+    compilador = Compiler()
+    assinatura = assinatura_compilador()
+    with tempfile.TemporaryDirectory() as diretorio:
+        for comandos in args.comandos:
+            texto = gerar_programa(comandos)
+            memoria = compile_cache.CacheCompilacao(assinatura)
+            disco = compile_cache.CacheCompilacao(assinatura, tamanho=0, diretorio=diretorio)
+            memoria.compilar(compilador, texto)
+            disco.compilar(compilador, texto)
+
+            t_compilacao = melhor(lambda: compilador.compile(texto), args.vezes)
+            t_memoria = melhor(lambda: memoria.compilar(compilador, texto), args.vezes)
+            t_disco = melhor(lambda: disco.compilar(compilador, texto), args.vezes)
+            if disco.estatisticas.acertos_disco != args.vezes:
+                raise SystemExit(f"{comandos}: entrada não encontrada no disco")
+            print(json.dumps({
+                'comandos': comandos,
+                'bytes': len(texto),
+                'compilacao_ms': round(t_compilacao, 3),
+                'acerto_memoria_ms': round(t_memoria, 4),
+                'acerto_disco_ms': round(t_disco, 3),
+                'ganho_memoria': round(t_compilacao / t_memoria, 1),
+                'ganho_disco': round(t_compilacao / t_disco, 1),
+            }))
+
+if __name__ == "__main__":
+    main()
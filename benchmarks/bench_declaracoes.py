@@ -0,0 +1,50 @@
+"""
+Mede o tempo de compilação de programas com muitas declarações múltiplas
+(`int a0, a1, ..., a9;`), para verificar que o custo cresce linearmente com
+o número de variáveis declaradas.
+
+Uso:
+    python benchmarks/bench_declaracoes.py [--tamanhos 10000 20000 50000 100000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sintatic_analyser import Compiler
+
+def gerar_programa(variaveis, por_linha=10):
+    """Programa com `variaveis` declarações em listas de `por_linha` nomes"""
+    linhas = ["int main(){"]
+    for inicio in range(0, variaveis, por_linha):
+        nomes = ', '.join(f"v{i}" for i in range(inicio, min(inicio + por_linha, variaveis)))
+        linhas.append(f"    int {nomes};")
+    linhas.append("};")
+    return '\n'.join(linhas)
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--tamanhos', type=int, nargs='+', default=[10000, 20000, 50000, 100000])
+    argumentos.add_argument('--por-linha', type=int, default=10)
+    args = argumentos.parse_args(argv)
+
+    compilador = Compiler()
+    resultados = []
+    for tamanho in args.tamanhos:
+        texto = gerar_programa(tamanho, args.por_linha)
+        inicio = time.perf_counter()
+        resultado = compilador.compile(texto)
+        duracao = time.perf_counter() - inicio
+        assert resultado.sucesso, resultado.erros[:3]
+        resultados.append({
+            'declaracoes': tamanho,
+            'tempo_s': round(duracao, 4),
+            'us_por_declaracao': round(duracao / tamanho * 1e6, 3),
+        })
+        print(json.dumps(resultados[-1]))
+
+if __name__ == "__main__":
+    main()
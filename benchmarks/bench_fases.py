@@ -0,0 +1,213 @@
+"""
+Mede separadamente as fases da compilação em programas gerados e grava os
+resultados num arquivo JSON comparável entre commits.
+
+Os programas vêm de gerador_programas.gerar_programa, com semente, para
+cada quantidade de declarações em `--declaracoes`; a profundidade de
+aninhamento, a densidade das expressões e o tamanho das listas de
+declaração são configuráveis. Para cada programa são reportados o menor
+tempo de `--vezes` execuções de cada fase:
+
+    lexico      todos os tokens do texto (Compiler.novo_lexer)
+    sintatico   parse dos tokens já lidos, reproduzidos de uma lista, que
+                exclui o custo do lexer
+    semantico   análise semântica da AST (semantic.AnalisadorSemantico)
+    total       Compiler.compile, de ponta a ponta
+
+e o pico de memória alocada em cada fase (tracemalloc, numa execução à
+parte, para não afetar os tempos). O lexer não guarda os tokens, então o
+pico da fase léxica é pequeno; o da sintática inclui a AST.
+
+Com `--saida`, o documento completo (commit, versão do Python, parâmetros
+e resultados) é gravado em JSON. Com `--comparar`, os tempos e os picos de
+memória são comparados com os de um arquivo gravado antes, com os mesmos
+parâmetros do gerador; a saída é 1 se o tempo ou a memória de alguma fase
+cresceu mais do que `--tolerancia`. Os tempos só são comparáveis na mesma
+máquina; o pico de memória não depende dela.
+
+Uso:
+    python benchmarks/bench_fases.py [--declaracoes 1000 10000] [--profundidade 3]
+        [--densidade 3] [--por-declaracao 4] [--semente 0] [--vezes 5]
+        [--saida resultados.json] [--comparar anterior.json] [--tolerancia 0.1]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from diagnostics import Diagnosticos
+from gerador_programas import gerar_programa
+from posicoes import IndiceLinhas
+from semantic import AnalisadorSemantico
+from sintatic_analyser import Compiler, em_compilacao
+
+FASES = ('lexico', 'sintatico', 'semantico', 'total')
+
+# Versão do formato do arquivo de resultados
+VERSAO = 1
+
+class _Reproducao:
+    """Lexer que apenas devolve uma lista de tokens já lidos"""
+    __slots__ = ('token', 'linhas')
+
+    def __init__(self, tokens, linhas):
+        self.token = iter(tokens + [None]).__next__
+        self.linhas = linhas
+
+def _commit():
+    """Commit atual do repositório, ou None fora de um repositório git"""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def medir(compilador, texto, vezes):
+    """Tempos (menor de `vezes`) e pico de memória de cada fase sobre `texto`"""
+    parser = compilador.novo_parser()
+    linhas = IndiceLinhas(texto)
+    with em_compilacao(Diagnosticos()):
+        lexer = compilador.novo_lexer()
+        lexer.input(texto)
+        tokens = list(lexer)
+        programa = parser.parse(lexer=_Reproducao(tokens, linhas))
+
+    def lexico():
+        with em_compilacao(Diagnosticos()):
+            lexer = compilador.novo_lexer()
+            lexer.input(texto)
+            for _ in lexer:
+                pass
+
+    def sintatico():
+        with em_compilacao(Diagnosticos()):
+            parser.parse(lexer=_Reproducao(tokens, linhas))
+
+    def semantico():
+        AnalisadorSemantico(Diagnosticos()).analisar(programa)
+
+    def total():
+        return compilador.compile(texto)
+
+    if programa is None or not total().sucesso:
+        raise SystemExit(f"o programa gerado não compilou: {total().erros[:1]}")
+
+    funcoes = dict(zip(FASES, (lexico, sintatico, semantico, total)))
+    tempos = {fase: [] for fase in FASES}
+    for _ in range(vezes):
+        # As fases se alternam a cada repetição, para que variações da
+        # máquina afetem todas igualmente
+        for fase, funcao in funcoes.items():
+            inicio = time.perf_counter()
+            funcao()
+            tempos[fase].append(time.perf_counter() - inicio)
+
+    memoria = {}
+    for fase, funcao in funcoes.items():
+        tracemalloc.start()
+        funcao()
+        memoria[fase] = round(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+
+    melhores = {fase: min(lista) for fase, lista in tempos.items()}
+    return {
+        'tokens': len(tokens),
+        'tempos_s': {fase: round(tempo, 5) for fase, tempo in melhores.items()},
+        'tokens_por_s': round(len(tokens) / melhores['total']),
+        'memoria_pico_kb': memoria,
+    }
+
+def comparar(anterior, atual, tolerancia):
+    """
+    Variação do tempo e do pico de memória de cada fase entre dois
+    documentos de resultados.
+
+    Returns:
+        Lista de dicionários, um por programa e fase; `regressao` é True
+        quando o tempo ou a memória da fase cresceu mais do que a tolerância
+    """
+    if anterior['parametros'] != atual['parametros']:
+        raise SystemExit("os resultados comparados usaram parâmetros diferentes: "
+                         f"{anterior['parametros']} e {atual['parametros']}")
+    antes = {r['declaracoes']: r for r in anterior['resultados']}
+    linhas = []
+    for resultado in atual['resultados']:
+        base = antes.get(resultado['declaracoes'])
+        if base is None:
+            continue
+        for fase in FASES:
+            tempo_antes, tempo_depois = base['tempos_s'][fase], resultado['tempos_s'][fase]
+            memoria_antes = base['memoria_pico_kb'][fase]
+            memoria_depois = resultado['memoria_pico_kb'][fase]
+            variacao = tempo_depois / tempo_antes - 1
+            variacao_memoria = memoria_depois / max(memoria_antes, 1) - 1
+            linhas.append({'declaracoes': resultado['declaracoes'], 'fase': fase,
+                           'antes_s': tempo_antes, 'depois_s': tempo_depois,
+                           'variacao': f"{variacao:+.1%}",
+                           'memoria_antes_kb': memoria_antes, 'memoria_depois_kb': memoria_depois,
+                           'variacao_memoria': f"{variacao_memoria:+.1%}",
+                           'regressao': max(variacao, variacao_memoria) > tolerancia})
+    return linhas
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--declaracoes', type=int, nargs='+', default=[1000, 10000])
+    argumentos.add_argument('--profundidade', type=int, default=3)
+    argumentos.add_argument('--densidade', type=int, default=3)
+    argumentos.add_argument('--por-declaracao', type=int, default=4)
+    argumentos.add_argument('--semente', type=int, default=0)
+    argumentos.add_argument('--vezes', type=int, default=5)
+    argumentos.add_argument('--saida', help="arquivo JSON onde gravar os resultados")
+    argumentos.add_argument('--comparar', help="arquivo JSON gravado antes, com os mesmos parâmetros")
+    argumentos.add_argument('--tolerancia', type=float, default=0.1,
+                            help="aumento relativo de tempo ou de memória tolerado por fase (padrão: 0.1)")
+    args = argumentos.parse_args(argv)
+
+    parametros = {'profundidade': args.profundidade, 'densidade': args.densidade,
+                  'por_declaracao': args.por_declaracao, 'semente': args.semente}
+    compilador = Compiler()
+    resultados = []
+    for declaracoes in args.declaracoes:
+        texto = gerar_programa(declaracoes, args.profundidade, args.densidade,
+                               args.por_declaracao, args.semente)
+        resultado = {'declaracoes': declaracoes, 'linhas': texto.count('\n') + 1,
+                     'bytes': len(texto.encode())}
+        resultado.update(medir(compilador, texto, args.vezes))
+        print(json.dumps(resultado))
+        resultados.append(resultado)
+
+    documento = {
+        'versao': VERSAO,
+        'commit': _commit(),
+        'data': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': parametros,
+        'vezes': args.vezes,
+        'resultados': resultados,
+    }
+    if args.saida:
+        with open(args.saida, 'w') as arquivo:
+            json.dump(documento, arquivo, indent=2)
+            arquivo.write('\n')
+
+    if args.comparar:
+        with open(args.comparar) as arquivo:
+            anterior = json.load(arquivo)
+        linhas = comparar(anterior, documento, args.tolerancia)
+        for linha in linhas:
+            print(json.dumps(linha))
+        if any(linha['regressao'] for linha in linhas):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
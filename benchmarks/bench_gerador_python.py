@@ -0,0 +1,97 @@
+"""
+Compara a tradução para Python (gerador_python.py) com o interpretador da
+AST e a máquina virtual de bytecode.
+
+Os programas de exemplo input*.txt que compilam são ampliados: o corpo de
+main é repetido `--repeticoes` vezes dentro de um for. Também são medidos
+os laços de bench_interpretador.py com `--iteracoes` iterações. Para cada
+programa são reportados o tempo de tradução e compilação do código Python,
+o tempo de uma nova compilação servida pelo cache, o melhor tempo de
+execução de cada motor e o ganho sobre o interpretador. Os três motores
+precisam produzir a mesma saída, e o interpretador e o código Python o
+mesmo número de instruções.
+
+Uso:
+    python benchmarks/bench_gerador_python.py [--repeticoes 2000] [--iteracoes 100000] [--vezes 3]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bytecode
+import gerador_python
+import interpreter
+import vm
+from ast_nodes import Program, Block, Decl, Assign, BinOp, Cond, For, Return, Literal, Name
+from bench_interpretador import PROGRAMAS, medir
+from sintatic_analyser import Compiler
+
+def ampliar(programa, repeticoes):
+    """Repete o corpo de main (sem o return) dentro de um for"""
+    corpo = [comando for comando in programa.corpo.comandos if type(comando) is not Return]
+    contador = 'repeticao'
+    laco = For(Decl("int", contador, Literal(0, "int")),
+               Cond('<', Name(contador), Literal(repeticoes, "int")),
+               Assign(contador, BinOp('+', Name(contador), Literal(1, "int"))),
+               Block(corpo))
+    return Program(Block([laco]))
+
+def programas(args):
+    """Pares (nome, AST) dos programas medidos"""
+    compilador = Compiler()
+    for caminho in sorted(glob.glob(os.path.join(RAIZ, 'input*.txt'))):
+        with open(caminho) as arquivo:
+            compilacao = compilador.compile(arquivo.read())
+        if compilacao.sucesso:
+            yield os.path.basename(caminho), ampliar(compilacao.ast, args.repeticoes)
+    for nome, gerar in PROGRAMAS.items():
+        compilacao = compilador.compile(gerar(args.iteracoes))
+        if not compilacao.sucesso:
+            raise SystemExit(f"{nome}: {compilacao.erros}")
+        yield nome, compilacao.ast
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--repeticoes', type=int, default=2000)
+    argumentos.add_argument('--iteracoes', type=int, default=100000)
+    argumentos.add_argument('--vezes', type=int, default=3)
+    args = argumentos.parse_args(argv)
+
+    for nome, programa in programas(args):
+        inicio = time.perf_counter()
+        compilado = gerador_python.compilar(programa, chave=nome)
+        traducao = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        gerador_python.compilar(programa, chave=nome)
+        cache = time.perf_counter() - inicio
+        codigo = bytecode.compilar(programa)
+
+        t_ast, r_ast = medir(lambda p: interpreter.executar(p, None, None), programa, args.vezes)
+        t_vm, r_vm = medir(lambda c: vm.executar(c, None, None), codigo, args.vezes)
+        t_py, r_py = medir(lambda c: gerador_python.executar(c, None, None), compilado, args.vezes)
+        if not r_ast.saida == r_vm.saida == r_py.saida or r_ast.variaveis != r_py.variaveis:
+            raise SystemExit(f"{nome}: resultados diferentes entre os motores")
+        if r_ast.instrucoes != r_py.instrucoes:
+            raise SystemExit(f"{nome}: contagem de instruções diferente: {r_ast.instrucoes} != {r_py.instrucoes}")
+
+        print(json.dumps({
+            'programa': nome,
+            'instrucoes': r_ast.instrucoes,
+            'traducao_ms': round(traducao * 1000, 3),
+            'cache_ms': round(cache * 1000, 4),
+            'interpretador_s': round(t_ast, 4),
+            'vm_s': round(t_vm, 4),
+            'python_s': round(t_py, 4),
+            'ganho_sobre_interpretador': round(t_ast / t_py, 2),
+            'ganho_sobre_vm': round(t_vm / t_py, 2),
+        }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Mede o tamanho das tabelas LALR da gramática e a vazão do parser.
+
+São reportados o número de produções e de estados LALR, as entradas das
+tabelas de ação e de desvio (goto) e o tamanho delas serializadas com
+pickle, como no cache de tabelas (table_cache). A vazão é a da análise
+léxica e sintática (sem a semântica) de um programa gerado
+(bench_otimizacao), em tokens por segundo, no melhor de `--vezes`
+execuções.
+
+Uso:
+    python benchmarks/bench_gramatica.py [--comandos 20000] [--vezes 5]
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import table_cache
+from bench_otimizacao import gerar_programa
+from diagnostics import Diagnosticos
+from posicoes import IndiceLinhas
+from sintatic_analyser import Compiler, em_compilacao
+
+def tabelas(parser):
+    """Tamanho das tabelas LALR do parser"""
+    return {
+        'producoes': len(parser.productions) - 1,
+        'estados': len(parser.action),
+        'entradas_acao': sum(len(acoes) for acoes in parser.action.values()),
+        'entradas_goto': sum(len(desvios) for desvios in parser.goto.values()),
+        'bytes_tabelas': len(pickle.dumps((parser.action, parser.goto), table_cache.PROTOCOLO_PICKLE)),
+    }
+
+def vazao(compilador, texto, vezes):
+    """Tokens e menor tempo da análise léxica e sintática de `texto`"""
+    lexer = compilador.novo_lexer()
+    lexer.input(texto)
+    tokens = sum(1 for _ in iter(lexer.token, None))
+    parser = compilador.novo_parser()
+    tempos = []
+    for _ in range(vezes):
+        diagnosticos = Diagnosticos()
+        lexer = compilador.novo_lexer()
+        lexer.input(texto)
+        lexer.linhas = IndiceLinhas(texto)
+        with em_compilacao(diagnosticos):
+            inicio = time.perf_counter()
+            programa = parser.parse(lexer=lexer)
+            tempos.append(time.perf_counter() - inicio)
+        if programa is None or diagnosticos.itens:
+            raise SystemExit(f"o programa gerado não foi aceito: {diagnosticos.itens[:1]}")
+    return tokens, min(tempos)
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--comandos', type=int, default=20000)
+    argumentos.add_argument('--vezes', type=int, default=5)
+    args = argumentos.parse_args(argv)
+
+    compilador = Compiler()
+    resultado = tabelas(compilador.novo_parser())
+    tokens, tempo = vazao(compilador, gerar_programa(args.comandos), args.vezes)
+    resultado.update({'comandos': args.comandos, 'tokens': tokens,
+                      'tempo_s': round(tempo, 3), 'tokens_por_s': round(tokens / tempo)})
+    print(json.dumps(resultado))
+
+if __name__ == "__main__":
+    main()
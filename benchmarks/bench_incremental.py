@@ -0,0 +1,106 @@
+"""
+Mede a latência de edições num DocumentoIncremental (incremental.py) em
+programas gerados de tamanhos diferentes, comparada com a compilação
+completa do mesmo texto.
+
+Cada edição troca um dígito de um literal, insere uma declaração numa linha
+nova ou apaga uma linha inserida antes, em posições sorteadas. Para cada
+tamanho são reportadas a mediana e o p99 da latência das edições, o tempo da
+compilação completa e o total de comandos reanalisados. Ao final, o
+resultado incremental precisa ser igual ao de Compiler.compile.
+
+Uso:
+    python benchmarks/bench_incremental.py [--comandos 1000 5000 20000] [--edicoes 200] [--semente 0]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_otimizacao import gerar_programa
+from incremental import DocumentoIncremental
+from sintatic_analyser import Compiler
+
+def sortear_edicao(texto, aleatorio, inseridas):
+    """Edição (inicio, removidos, inseridos) sorteada sobre o texto atual"""
+    escolha = aleatorio.random()
+    if inseridas and escolha < 0.2:
+        inicio = inseridas.pop(aleatorio.randrange(len(inseridas)))
+        return inicio, texto.index('\n', inicio) + 1 - inicio, ''
+    if escolha < 0.4:
+        linha = aleatorio.randrange(1, texto.count('\n') - 1)
+        inicio = 0
+        for _ in range(linha):
+            inicio = texto.index('\n', inicio) + 1
+        declaracao = f"    int novo{aleatorio.randrange(10 ** 9)} = {aleatorio.randint(0, 9)};\n"
+        inseridas.append(inicio)
+        return inicio, 0, declaracao
+    while True:
+        inicio = aleatorio.randrange(len(texto))
+        if texto[inicio].isdigit():
+            return inicio, 1, str(aleatorio.randint(1, 9))
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--comandos', type=int, nargs='+', default=[1000, 5000, 20000])
+    argumentos.add_argument('--edicoes', type=int, default=200)
+    argumentos.add_argument('--semente', type=int, default=0)
+    args = argumentos.parse_args(argv)
+
+    compilador = Compiler()
+    for comandos in args.comandos:
+        aleatorio = random.Random(args.semente)
+        texto = gerar_programa(comandos, args.semente)
+        inicio = time.perf_counter()
+        completo = compilador.compile(texto)
+        t_completo = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        documento = DocumentoIncremental(texto, compilador)
+        t_construcao = time.perf_counter() - inicio
+
+        latencias = []
+        reanalises = analisados = completas = 0
+        inseridas = []
+        for _ in range(args.edicoes):
+            edicao = sortear_edicao(documento.texto, aleatorio, inseridas)
+            # Posições das linhas inseridas depois da edição se deslocam
+            delta = len(edicao[2]) - edicao[1]
+            inseridas = [p + delta if p > edicao[0] else p for p in inseridas]
+            inicio = time.perf_counter()
+            estatistica = documento.editar(*edicao)
+            documento.diagnosticos
+            latencias.append(time.perf_counter() - inicio)
+            reanalises += estatistica.reanalises_semanticas
+            analisados += estatistica.comandos_analisados
+            completas += estatistica.completa
+
+        resultado = documento.resultado()
+        esperado = compilador.compile(documento.texto)
+        if (resultado.diagnosticos != esperado.diagnosticos or resultado.ast != esperado.ast
+                or sorted((n, s.valor) for n, s in resultado.simbolos.items())
+                != sorted((n, s.valor) for n, s in esperado.simbolos.items())):
+            raise SystemExit(f"{comandos}: resultado incremental diferente da compilação completa")
+
+        latencias.sort()
+        print(json.dumps({
+            'comandos': comandos,
+            'bytes': len(texto),
+            'compilacao_completa_ms': round(t_completo * 1000, 3),
+            'construcao_documento_ms': round(t_construcao * 1000, 3),
+            'edicao_mediana_ms': round(statistics.median(latencias) * 1000, 3),
+            'edicao_p99_ms': round(latencias[int(len(latencias) * 0.99) - 1] * 1000, 3),
+            'ganho_mediano': round(t_completo / statistics.median(latencias), 1),
+            'comandos_reparseados': analisados,
+            'reanalises_semanticas': reanalises,
+            'reconstrucoes_completas': completas,
+            'sucesso': completo.sucesso,
+        }))
+
+if __name__ == "__main__":
+    main()
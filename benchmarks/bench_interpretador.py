@@ -0,0 +1,102 @@
+"""
+Mede a velocidade do interpretador em programas com muitos laços.
+
+Cada programa é compilado uma vez e executado `--repeticoes` vezes; é
+reportado o melhor tempo, as instruções executadas e instruções por segundo.
+
+Uso:
+    python benchmarks/bench_interpretador.py [--iteracoes 100000] [--repeticoes 3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import executar
+from sintatic_analyser import Compiler
+
+def laco_while(n):
+    """Laço contado com soma inteira"""
+    return f"""int main() {{
+    int i = 0;
+    int soma = 0;
+    while (i < {n}) {{
+        soma = soma + i;
+        i = i + 1;
+    }}
+}};"""
+
+def laco_for_float(n):
+    """for com acumulação em float e promoção int -> float"""
+    return f"""int main() {{
+    float total = 0.0;
+    int i;
+    for (i = 0; i < {n}; i++) {{
+        total = total + 0.5;
+    }}
+}};"""
+
+def lacos_aninhados(n):
+    """Dois for aninhados com if/else no corpo (n iterações no total)"""
+    externo = max(1, int(n ** 0.5))
+    interno = max(1, n // externo)
+    return f"""int main() {{
+    int pares = 0;
+    int impares = 0;
+    int resto;
+    for (int i = 0; i < {externo}; i++) {{
+        for (int j = 0; j < {interno}; j++) {{
+            resto = j / 2;
+            resto = resto * 2;
+            if (resto != j) {{
+                impares = impares + 1;
+            }} else {{
+                pares = pares + 1;
+            }}
+        }}
+    }}
+}};"""
+
+PROGRAMAS = {
+    'laco_while': laco_while,
+    'laco_for_float': laco_for_float,
+    'lacos_aninhados': lacos_aninhados,
+}
+
+def medir(executor, programa, repeticoes):
+    """Executa `repeticoes` vezes e retorna (melhor tempo, último resultado)"""
+    melhor = None
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = executor(programa)
+        duracao = time.perf_counter() - inicio
+        melhor = duracao if melhor is None else min(melhor, duracao)
+    return melhor, resultado
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--iteracoes', type=int, default=100000)
+    argumentos.add_argument('--repeticoes', type=int, default=3)
+    args = argumentos.parse_args(argv)
+
+    compilador = Compiler()
+    for nome, gerar in PROGRAMAS.items():
+        compilacao = compilador.compile(gerar(args.iteracoes))
+        if not compilacao.sucesso:
+            raise SystemExit(f"{nome}: {compilacao.erros}")
+        executor = lambda programa: executar(programa, max_instrucoes=None, tempo_limite=None)
+        tempo, resultado = medir(executor, compilacao.ast, args.repeticoes)
+        print(json.dumps({
+            'programa': nome,
+            'iteracoes': args.iteracoes,
+            'instrucoes': resultado.instrucoes,
+            'tempo_s': round(tempo, 4),
+            'instrucoes_por_s': round(resultado.instrucoes / tempo),
+        }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compara a vazão (tokens por segundo) do lexer do PLY, do lexer rápido
+(lexer_rapido.LexerRapido) e do seu modo buffer (lexer_rapido.LexerBuffer)
+e confere que produzem os mesmos tokens.
+
+Os textos medidos são os arquivos input*.txt do repositório e um programa
+gerado (bench_otimizacao). Antes de medir, a sequência de tokens dos
+lexers é comparada campo a campo (tipo, valor, linha, posição e `tamanho`
+dos literais), assim como os diagnósticos léxicos; qualquer diferença
+encerra o benchmark com erro.
+
+Uso:
+    python benchmarks/bench_lexer.py [--comandos 20000] [--vezes 5]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_otimizacao import gerar_programa
+from diagnostics import Diagnosticos
+from sintatic_analyser import Compiler, LEXERS, em_compilacao
+
+def tokens(lexer, texto):
+    """Tokens e diagnósticos léxicos de `texto`, como tuplas comparáveis"""
+    diagnosticos = Diagnosticos()
+    with em_compilacao(diagnosticos):
+        lexer.input(texto)
+        lexer.lineno = 1
+        lista = [(t.type, t.value, t.lineno, t.lexpos, getattr(t, 'tamanho', None))
+                 for t in iter(lexer.token, None)]
+    return lista, diagnosticos.itens
+
+def melhores(lexers, texto, vezes):
+    """
+    Menor tempo de `vezes` análises léxicas completas de `texto` por cada
+    lexer; os lexers se alternam a cada repetição, para que variações da
+    máquina afetem todos igualmente.
+    """
+    tempos = {nome: [] for nome in lexers}
+    for _ in range(vezes):
+        for nome, lexer in lexers.items():
+            lexer.lineno = 1
+            # input() entra na medida: o lexer em modo buffer analisa o
+            # texto todo nele
+            inicio = time.perf_counter()
+            lexer.input(texto)
+            for _ in iter(lexer.token, None):
+                pass
+            tempos[nome].append(time.perf_counter() - inicio)
+    return {nome: min(lista) for nome, lista in tempos.items()}
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--comandos', type=int, default=20000)
+    argumentos.add_argument('--vezes', type=int, default=5)
+    args = argumentos.parse_args(argv)
+
+    lexers = {nome: Compiler(lexer=nome).novo_lexer() for nome in LEXERS}
+    textos = {}
+    for caminho in sorted(glob.glob(os.path.join(RAIZ, 'input*.txt'))):
+        with open(caminho) as arquivo:
+            textos[os.path.basename(caminho)] = arquivo.read()
+    corpus = ''.join(textos.values())
+    textos[f'gerado_{args.comandos}'] = gerar_programa(args.comandos)
+
+    for nome, texto in textos.items():
+        referencia, *outros = (tokens(lexer, texto) for lexer in lexers.values())
+        if any(outro != referencia for outro in outros):
+            raise SystemExit(f"{nome}: os lexers produziram tokens diferentes")
+
+    for nome, texto in ((f'input*.txt ({len(textos) - 1} arquivos)', corpus),
+                        (f'gerado_{args.comandos}', textos[f'gerado_{args.comandos}'])):
+        quantidade = len(tokens(lexers['ply'], texto)[0])
+        resultado = {'texto': nome, 'tokens': quantidade}
+        tempos = melhores(lexers, texto, args.vezes)
+        for lexer, tempo in tempos.items():
+            resultado[f'{lexer}_tokens_por_s'] = round(quantidade / tempo)
+        resultado['aceleracao'] = round(tempos['ply'] / tempos['rapido'], 2)
+        print(json.dumps(resultado))
+
+if __name__ == "__main__":
+    main()
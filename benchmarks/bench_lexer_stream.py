@@ -0,0 +1,102 @@
+"""
+Mede a memória e a vazão da análise léxica de um arquivo grande lido
+inteiro (read() e lexer.input) e em blocos (FluxoLexico, com read() e com
+mmap).
+
+O arquivo é gerado repetindo o corpo de um programa de bench_otimizacao até
+atingir `--megabytes`. Cada modo roda num processo próprio, de modo que o
+pico de memória (ru_maxrss) de um não contamine o outro. Os três modos
+precisam produzir o mesmo número de tokens. No modo mmap, as páginas do
+arquivo já lidas contam no ru_maxrss, mas pertencem ao cache do sistema e
+podem ser descartadas a qualquer momento.
+
+Uso:
+    python benchmarks/bench_lexer_stream.py [--megabytes 20] [--tamanho-bloco 65536]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import lexer_stream
+from bench_otimizacao import gerar_programa
+from sintatic_analyser import Compiler
+
+MODOS = ('inteiro', 'blocos', 'mmap')
+
+def gerar_arquivo(caminho, megabytes):
+    """Grava um programa com aproximadamente `megabytes` MB"""
+    corpo = gerar_programa(2000).split('\n')[1:-2]
+    # Os nomes são renomeados a cada repetição para não serem redeclarados
+    trecho = '\n'.join(corpo) + '\n'
+    limite = megabytes * 1024 * 1024
+    with open(caminho, 'w') as arquivo:
+        arquivo.write("int main() {\n")
+        escrito = repeticao = 0
+        while escrito < limite:
+            parte = trecho.replace(' v', f' r{repeticao}v').replace('(v', f'(r{repeticao}v')
+            arquivo.write(parte)
+            escrito += len(parte)
+            repeticao += 1
+        arquivo.write("    return 0;\n};\n")
+
+def medir(modo, caminho, tamanho_bloco):
+    """Conta os tokens do arquivo no modo dado; roda no processo filho"""
+    compilador = Compiler()
+    inicio = time.perf_counter()
+    if modo == 'inteiro':
+        with open(caminho) as arquivo:
+            lexer = compilador.novo_lexer()
+            lexer.input(arquivo.read())
+            tokens = sum(1 for _ in iter(lexer.token, None))
+    else:
+        with open(caminho, 'rb' if modo == 'mmap' else 'r') as arquivo:
+            fonte = lexer_stream.abrir_mmap(arquivo) if modo == 'mmap' else arquivo
+            tokens = sum(1 for _ in compilador.tokens(fonte, tamanho_bloco))
+    tempo = time.perf_counter() - inicio
+    return {
+        'modo': modo,
+        'tokens': tokens,
+        'tempo_s': round(tempo, 3),
+        'tokens_por_s': round(tokens / tempo),
+        'pico_memoria_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--megabytes', type=int, default=20)
+    argumentos.add_argument('--tamanho-bloco', type=int, default=lexer_stream.TAMANHO_BLOCO)
+    argumentos.add_argument('--medir', nargs=2, metavar=('MODO', 'ARQUIVO'), help=argparse.SUPPRESS)
+    args = argumentos.parse_args(argv)
+
+    if args.medir:
+        modo, caminho = args.medir
+        print(json.dumps(medir(modo, caminho, args.tamanho_bloco)))
+        return
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'programa.txt')
+        gerar_arquivo(caminho, args.megabytes)
+        tamanho = os.path.getsize(caminho)
+        contagens = set()
+        for modo in MODOS:
+            saida = subprocess.run([sys.executable, os.path.abspath(__file__), '--medir', modo, caminho,
+                                    '--tamanho-bloco', str(args.tamanho_bloco)],
+                                   check=True, capture_output=True, text=True).stdout
+            resultado = json.loads(saida)
+            contagens.add(resultado['tokens'])
+            resultado['arquivo_mb'] = round(tamanho / 1024 / 1024, 1)
+            print(json.dumps(resultado))
+        if len(contagens) != 1:
+            raise SystemExit(f"contagens de tokens diferentes: {sorted(contagens)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Mede o custo de cada passo de otimização do código de três endereços em
+programas grandes gerados.
+
+O programa gerado mistura declarações com aritmética sobre constantes,
+atribuições sobrescritas antes de serem lidas, ifs com condição conhecida
+em tempo de compilação e laços curtos. Para cada tamanho são reportados o
+tempo de geração do TAC, o relatório dos passos e as instruções executadas
+antes e depois da otimização; o programa otimizado precisa produzir o mesmo
+estado final que o interpretador da AST.
+
+Uso:
+    python benchmarks/bench_otimizacao.py [--comandos 1000 5000 20000] [--semente 0]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import interpreter
+import ir
+from otimizacao import GerenciadorPassos
+from sintatic_analyser import Compiler
+
+def gerar_programa(comandos, semente=0):
+    """Programa com aproximadamente `comandos` comandos no corpo de main"""
+    aleatorio = random.Random(semente)
+    linhas = ["int main() {"]
+    variaveis = []
+    for i in range(comandos):
+        escolha = aleatorio.random()
+        if not variaveis or escolha < 0.4:
+            nome = f"v{i}"
+            if variaveis and aleatorio.random() < 0.5:
+                origem = aleatorio.choice(variaveis)
+                linhas.append(f"    int {nome} = {origem} + {aleatorio.randint(1, 9)};")
+            else:
+                linhas.append(f"    int {nome} = {aleatorio.randint(0, 50)} * {aleatorio.randint(1, 9)};")
+            variaveis.append(nome)
+        elif escolha < 0.65:
+            # Armazenamento morto: sobrescrito logo em seguida
+            nome = aleatorio.choice(variaveis)
+            linhas.append(f"    {nome} = {aleatorio.choice(variaveis)} * 2;")
+            linhas.append(f"    {nome} = {aleatorio.randint(0, 50)};")
+        elif escolha < 0.9:
+            nome = aleatorio.choice(variaveis)
+            linhas.append(f"    if ({nome} < {aleatorio.randint(0, 100)}) {{")
+            linhas.append(f"        {nome} = {nome} + 1;")
+            linhas.append("    } else {")
+            linhas.append(f"        {nome} = {nome} - 1;")
+            linhas.append("    }")
+        else:
+            nome = aleatorio.choice(variaveis)
+            linhas.append(f"    for (int k = 0; k < {aleatorio.randint(1, 5)}; k++) {{")
+            linhas.append(f"        {nome} = {nome} + k;")
+            linhas.append("    }")
+    linhas.append("};")
+    return "\n".join(linhas)
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--comandos', type=int, nargs='+', default=[1000, 5000, 20000])
+    argumentos.add_argument('--semente', type=int, default=0)
+    args = argumentos.parse_args(argv)
+
+    compilador = Compiler()
+    for comandos in args.comandos:
+        compilacao = compilador.compile(gerar_programa(comandos, args.semente))
+        if not compilacao.sucesso:
+            raise SystemExit(f"{comandos}: {compilacao.erros}")
+
+        inicio = time.perf_counter()
+        programa = ir.gerar(compilacao.ast)
+        geracao = time.perf_counter() - inicio
+        antes = ir.executar(programa)
+        relatorio = GerenciadorPassos().otimizar(programa)
+        depois = ir.executar(programa)
+
+        esperado = interpreter.executar(compilacao.ast, None, None)
+        if depois.variaveis != esperado.variaveis:
+            raise SystemExit(f"{comandos}: estado final diferente do interpretador")
+
+        print(json.dumps({
+            'comandos': comandos,
+            'geracao_tac_ms': round(geracao * 1000, 3),
+            'otimizacao': relatorio.to_dict(),
+            'executadas_antes': antes.instrucoes,
+            'executadas_depois': depois.instrucoes,
+        }))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Mede o custo por token do cálculo de linha e coluna (posicoes.IndiceLinhas)
+em comparação com a análise léxica e com texto.rfind.
+
+Para um programa gerado (bench_otimizacao), formatado uma vez com uma
+instrução por linha e outra vez com todo o corpo numa única linha, são
+reportados, em nanossegundos por token:
+
+    lexer      lexer.token(), que conta as linhas em t_newline
+    indice     construção do índice de linhas, dividida pelos tokens
+    coluna     IndiceLinhas.coluna(lineno, lexpos), usada pelo parser
+    bisect     IndiceLinhas.posicao(lexpos), linha e coluna por busca binária
+    rfind      lexpos - texto.rfind('\\n', 0, lexpos), o cálculo anterior
+
+e o acréscimo do índice (construção e consulta da coluna) sobre o lexer. O
+rfind percorre a linha a cada token e cresce com o comprimento dela; o
+bisect depende apenas do número de linhas e a coluna, de nenhum dos dois.
+
+Uso:
+    python benchmarks/bench_posicoes.py [--comandos 5000] [--vezes 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_otimizacao import gerar_programa
+from posicoes import IndiceLinhas
+from sintatic_analyser import Compiler
+
+def melhor(funcao, vezes):
+    """Menor tempo de `vezes` execuções de funcao()"""
+    tempos = []
+    for _ in range(vezes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+def medir(nome, texto, vezes):
+    lexer = Compiler().novo_lexer()
+    lexer.input(texto)
+    tokens = [(token.lineno, token.lexpos) for token in iter(lexer.token, None)]
+    posicoes = [lexpos for _, lexpos in tokens]
+    quantidade = len(tokens)
+
+    def lexar():
+        lexer.input(texto)
+        for _ in iter(lexer.token, None):
+            pass
+
+    indice = IndiceLinhas(texto)
+    posicao = indice.posicao
+    coluna = indice.coluna
+    rfind = texto.rfind
+
+    def colunas():
+        for linha, lexpos in tokens:
+            coluna(linha, lexpos)
+
+    def consultar():
+        for lexpos in posicoes:
+            posicao(lexpos)
+
+    def procurar():
+        for lexpos in posicoes:
+            lexpos - rfind('\n', 0, lexpos)
+
+    por_token = {
+        'lexer': melhor(lexar, vezes),
+        'indice': melhor(lambda: IndiceLinhas(texto), vezes),
+        'coluna': melhor(colunas, vezes),
+        'bisect': melhor(consultar, vezes),
+        'rfind': melhor(procurar, vezes),
+    }
+    resultado = {'texto': nome, 'tokens': quantidade, 'linhas': len(indice)}
+    for chave, tempo in por_token.items():
+        resultado[f'{chave}_ns_por_token'] = round(tempo / quantidade * 1e9, 1)
+    resultado['acrescimo_indice'] = f"{(por_token['indice'] + por_token['coluna']) / por_token['lexer']:.1%}"
+    return resultado
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--comandos', type=int, default=5000)
+    argumentos.add_argument('--vezes', type=int, default=5)
+    args = argumentos.parse_args(argv)
+
+    texto = gerar_programa(args.comandos)
+    linhas = texto.split('\n')
+    uma_linha = '\n'.join([linhas[0], ' '.join(linha.strip() for linha in linhas[1:-1]), linhas[-1]])
+    for nome, variante in (('uma_instrucao_por_linha', texto), ('corpo_em_uma_linha', uma_linha)):
+        print(json.dumps(medir(nome, variante, args.vezes)))
+
+if __name__ == "__main__":
+    main()
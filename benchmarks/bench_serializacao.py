@@ -0,0 +1,213 @@
+"""
+Compara o formato binário de serializacao.py com pickle e JSON.
+
+Antes das medidas, confere a ida e volta (codificar e decodificar) nos
+arquivos input*.txt do repositório, em programas gerados com erros e sem
+erros e em tabelas de símbolos montadas à mão (escopos abertos, sombreamento,
+sem histórico, inteiros grandes, floats especiais e textos não ASCII): o
+resultado decodificado deve ter os mesmos diagnósticos, a mesma tabela de
+símbolos (declarados, visíveis e pilha de escopos) e a mesma AST, incluindo
+linha, coluna e tamanho de cada nó. Documentos truncados devem ser
+rejeitados com FormatoInvalido.
+
+Depois, para cada quantidade de declarações em `--declaracoes`, o
+CompilationResult de um programa gerado é serializado nos três formatos:
+
+    binario   serializacao.codificar / decodificar
+    pickle    pickle.dumps / loads, no protocolo mais alto
+    json      um documento com as mesmas informações (símbolos, escopos,
+              diagnósticos e AST como listas e dicionários), json.dumps /
+              loads e a reconstrução dos objetos
+
+São reportados o tamanho em bytes e o menor tempo de `--vezes` execuções da
+codificação e da decodificação de cada formato.
+
+Uso:
+    python benchmarks/bench_serializacao.py [--declaracoes 1000 10000] [--vezes 5]
+"""
+import argparse
+import glob
+import json
+import os
+import pickle
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ast_nodes
+import serializacao
+from diagnostics import Diagnostic, AVISO
+from gerador_programas import gerar_programa
+from sintatic_analyser import CompilationResult, Compiler
+from symbol_table import Simbolo, SymbolTable
+
+_CLASSES = {classe.__name__: classe for classe in serializacao.NOS}
+
+def _despejo(valor):
+    """Valor com todos os atributos dos nós, para comparar ASTs por completo"""
+    if isinstance(valor, ast_nodes.No):
+        return (type(valor).__name__, valor.line, valor.col,
+                *(_despejo(getattr(valor, atributo)) for atributo in type(valor).__slots__))
+    if isinstance(valor, list):
+        return [_despejo(item) for item in valor]
+    return type(valor).__name__, valor
+
+def _tabela(tabela):
+    visiveis, escopos, declarados = tabela.estado()
+    return (repr(list(visiveis.items())), repr(escopos),
+            None if declarados is None else repr(declarados), tabela.profundidade)
+
+def verificar(resultado):
+    """Confere a ida e volta de `resultado` pelo formato binário"""
+    dados = serializacao.codificar(resultado)
+    copia = serializacao.decodificar(dados)
+    if (copia.diagnosticos != resultado.diagnosticos or copia.sucesso != resultado.sucesso
+            or _tabela(copia.simbolos) != _tabela(resultado.simbolos)
+            or _despejo(copia.ast) != _despejo(resultado.ast)
+            or serializacao.codificar(copia) != dados):
+        raise SystemExit(f"ida e volta diferente: {resultado!r}")
+    for corte in range(0, len(dados), max(1, len(dados) // 50)):
+        try:
+            serializacao.decodificar(dados[:corte])
+        except serializacao.FormatoInvalido:
+            continue
+        raise SystemExit(f"documento truncado em {corte} bytes foi aceito")
+
+def _tabelas_manuais():
+    for historico in (True, False):
+        tabela = SymbolTable(historico)
+        tabela.declarar('a', 'int', 2 ** 80, 1)
+        tabela.declarar('f', 'float', float('-inf'), 2)
+        tabela.abrir_escopo()
+        tabela.declarar('a', 'float', -0.0, 3)
+        tabela.declarar('c', 'char', 'ç', 4)
+        tabela.abrir_escopo()
+        tabela.declarar('b', 'int', True, 5)
+        tabela.declarar('n', 'int', -2 ** 63, 6)
+        yield CompilationResult(tabela, [Diagnostic(7, 1, AVISO, "aviso ☃", 7, 9)])
+
+def verificar_tudo(compilador):
+    """Confere a ida e volta em todos os casos; devolve quantos foram conferidos"""
+    textos = []
+    for caminho in sorted(glob.glob(os.path.join(RAIZ, 'input*.txt'))):
+        with open(caminho) as arquivo:
+            textos.append(arquivo.read())
+    textos += [gerar_programa(declaracoes, semente=semente)
+               for declaracoes in (1, 20, 300) for semente in range(4)]
+    # Erros sintáticos (sem AST) e semânticos
+    textos += ['', 'int main() { x = 1 };', gerar_programa(50).replace('int ', 'float ', 3)]
+    resultados = [compilador.compile(texto) for texto in textos]
+    resultados += list(_tabelas_manuais())
+    for resultado in resultados:
+        verificar(resultado)
+    return len(resultados)
+
+def _valor_json(valor):
+    if isinstance(valor, ast_nodes.No):
+        etiqueta = serializacao._ETIQUETAS_NOS[type(valor)]
+        return {'no': type(valor).__name__, 'l': valor.line, 'c': valor.col,
+                'a': [_valor_json(getattr(valor, atributo))
+                      for atributo in serializacao._ATRIBUTOS[etiqueta]]}
+    if isinstance(valor, list):
+        return [_valor_json(item) for item in valor]
+    return valor
+
+def _de_valor_json(valor):
+    if isinstance(valor, dict):
+        classe = _CLASSES[valor['no']]
+        no = classe.__new__(classe)
+        no.line = valor['l']
+        no.col = valor['c']
+        for atributo, item in zip(classe.__slots__, valor['a']):
+            setattr(no, atributo, _de_valor_json(item))
+        return no
+    if isinstance(valor, list):
+        return [_de_valor_json(item) for item in valor]
+    return valor
+
+def para_json(resultado):
+    """Documento JSON com as mesmas informações do formato binário"""
+    visiveis, escopos, declarados = resultado.simbolos.estado()
+    indices = {}
+    simbolos = []
+    def indice(simbolo):
+        if id(simbolo) not in indices:
+            indices[id(simbolo)] = len(simbolos)
+            simbolos.append([simbolo.nome, simbolo.tipo, simbolo.valor,
+                             simbolo.contexto, simbolo.linha])
+        return indices[id(simbolo)]
+    documento = {
+        'declarados': None if declarados is None else [indice(s) for s in declarados],
+        'visiveis': [indice(s) for s in visiveis.values()],
+        'escopos': [[[nome, None if s is None else indice(s)] for nome, s in escopo]
+                    for escopo in escopos],
+        'simbolos': simbolos,
+        'diagnosticos': [d.to_dict() for d in resultado.diagnosticos],
+        'ast': _valor_json(resultado.ast),
+    }
+    return json.dumps(documento, separators=(',', ':')).encode()
+
+def de_json(dados):
+    documento = json.loads(dados)
+    simbolos = [Simbolo(*campos) for campos in documento['simbolos']]
+    visiveis = {simbolos[n].nome: simbolos[n] for n in documento['visiveis']}
+    escopos = [[(nome, None if n is None else simbolos[n]) for nome, n in escopo]
+               for escopo in documento['escopos']]
+    declarados = documento['declarados']
+    tabela = SymbolTable.de_estado(visiveis, escopos,
+                                   None if declarados is None else [simbolos[n] for n in declarados])
+    diagnosticos = [Diagnostic(d['line'], d['col'], d['kind'], d['message'], d['end_line'], d['end_col'])
+                    for d in documento['diagnosticos']]
+    return CompilationResult(tabela, diagnosticos, _de_valor_json(documento['ast']))
+
+FORMATOS = {
+    'binario': (serializacao.codificar, serializacao.decodificar),
+    'pickle': (lambda r: pickle.dumps(r, pickle.HIGHEST_PROTOCOL), pickle.loads),
+    'json': (para_json, de_json),
+}
+
+def medir(resultado, vezes):
+    """Tamanho e menores tempos de codificação e decodificação por formato"""
+    codificados = {nome: codificar(resultado) for nome, (codificar, _) in FORMATOS.items()}
+    tempos = {nome: ([], []) for nome in FORMATOS}
+    for _ in range(vezes):
+        # Os formatos se alternam a cada repetição, para que variações da
+        # máquina afetem todos igualmente
+        for nome, (codificar, decodificar) in FORMATOS.items():
+            inicio = time.perf_counter()
+            codificar(resultado)
+            meio = time.perf_counter()
+            decodificar(codificados[nome])
+            tempos[nome][0].append(meio - inicio)
+            tempos[nome][1].append(time.perf_counter() - meio)
+    return {nome: {'bytes': len(codificados[nome]),
+                   'codificar_ms': round(min(tempos[nome][0]) * 1000, 3),
+                   'decodificar_ms': round(min(tempos[nome][1]) * 1000, 3)}
+            for nome in FORMATOS}
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--declaracoes', type=int, nargs='+', default=[1000, 10000])
+    argumentos.add_argument('--vezes', type=int, default=5)
+    args = argumentos.parse_args(argv)
+
+    compilador = Compiler()
+    print(json.dumps({'ida_e_volta': 'ok', 'casos': verificar_tudo(compilador)}))
+    for declaracoes in args.declaracoes:
+        resultado = compilador.compile(gerar_programa(declaracoes))
+        if de_json(para_json(resultado)).ast != resultado.ast:
+            raise SystemExit("a reconstrução do documento JSON difere do original")
+        medidas = medir(resultado, args.vezes)
+        base = medidas['binario']
+        for nome, medida in medidas.items():
+            linha = {'declaracoes': declaracoes, 'simbolos': len(resultado.simbolos.declarados()),
+                     'formato': nome}
+            linha.update(medida)
+            linha['tamanho_relativo'] = round(medida['bytes'] / base['bytes'], 2)
+            print(json.dumps(linha))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Teste de carga do servidor de compilação (servidor.py).
+
+`--conexoes` clientes simultâneos enviam, cada um pela sua conexão, um
+pedido por vez (o próximo só depois da resposta do anterior), até somar
+`--pedidos` pedidos. Os textos são `--programas` programas gerados
+(gerador_programas) com `--declaracoes` declarações cada. São reportadas a
+latência de cada pedido (do envio à resposta) nos percentis 50, 90 e 99, a
+máxima e a vazão em pedidos por segundo.
+
+Para comparação, os mesmos programas são compilados iniciando um processo
+Python por compilação (python sintatic_analyser.py ARQUIVO), como faria um
+editor ou um passo de CI sem o servidor, em `--processos` compilações
+sequenciais.
+
+Sem `--socket`, um servidor com `-j` trabalhadores é iniciado num diretório
+temporário e encerrado ao final.
+
+Uso:
+    python benchmarks/bench_servidor.py [--socket compilador.sock] [-j 2] [--conexoes 8]
+        [--pedidos 2000] [--declaracoes 50] [--programas 20] [--processos 20]
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gerador_programas import gerar_programa
+
+def percentis(latencias):
+    """Percentis 50, 90 e 99 e a máxima, em milissegundos"""
+    cortes = statistics.quantiles(latencias, n=100, method='inclusive')
+    return {'p50_ms': round(cortes[49] * 1000, 2), 'p90_ms': round(cortes[89] * 1000, 2),
+            'p99_ms': round(cortes[98] * 1000, 2), 'max_ms': round(max(latencias) * 1000, 2)}
+
+@contextlib.contextmanager
+def servidor_temporario(trabalhadores):
+    """Inicia servidor.py num socket temporário e o encerra ao sair"""
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'compilador.sock')
+        processo = subprocess.Popen([sys.executable, os.path.join(RAIZ, 'servidor.py'),
+                                     '--socket', caminho, '-j', str(trabalhadores)],
+                                    stderr=subprocess.DEVNULL)
+        try:
+            limite = time.monotonic() + 60
+            while True:
+                try:
+                    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexao:
+                        conexao.connect(caminho)
+                    break
+                except OSError:
+                    if processo.poll() is not None or time.monotonic() > limite:
+                        raise SystemExit("o servidor não iniciou")
+                    time.sleep(0.05)
+            yield caminho
+        finally:
+            processo.terminate()
+            processo.wait()
+
+async def carga(caminho, textos, conexoes, pedidos):
+    """Latências dos pedidos e duração total da carga"""
+    latencias = []
+    erros = 0
+    restantes = iter(range(pedidos))
+
+    async def cliente():
+        nonlocal erros
+        leitor, escritor = await asyncio.open_unix_connection(caminho, limit=64 * 1024 * 1024)
+        try:
+            for numero in restantes:
+                linha = json.dumps({'id': numero, 'source': textos[numero % len(textos)]}).encode()
+                inicio = time.perf_counter()
+                escritor.write(linha + b'\n')
+                await escritor.drain()
+                resposta = json.loads(await leitor.readline())
+                latencias.append(time.perf_counter() - inicio)
+                if resposta['status'] != 'ok':
+                    erros += 1
+        finally:
+            escritor.close()
+            await escritor.wait_closed()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(conexoes)))
+    return latencias, time.perf_counter() - inicio, erros
+
+def processo_por_compilacao(textos, compilacoes):
+    """Latências de compilar cada texto num processo Python novo"""
+    latencias = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminhos = []
+        for n, texto in enumerate(textos):
+            caminhos.append(os.path.join(diretorio, f'programa{n}.txt'))
+            with open(caminhos[-1], 'w') as arquivo:
+                arquivo.write(texto)
+        for n in range(compilacoes):
+            inicio = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(RAIZ, 'sintatic_analyser.py'),
+                            caminhos[n % len(caminhos)], '--diagnostics', 'silent'],
+                           cwd=RAIZ, check=True)
+            latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--socket', help="servidor já em execução (padrão: inicia um)")
+    argumentos.add_argument('-j', '--jobs', type=int, default=2)
+    argumentos.add_argument('--conexoes', type=int, default=8)
+    argumentos.add_argument('--pedidos', type=int, default=2000)
+    argumentos.add_argument('--declaracoes', type=int, default=50)
+    argumentos.add_argument('--programas', type=int, default=20)
+    argumentos.add_argument('--processos', type=int, default=20)
+    args = argumentos.parse_args(argv)
+
+    textos = [gerar_programa(args.declaracoes, semente=semente) for semente in range(args.programas)]
+    with contextlib.ExitStack() as pilha:
+        caminho = args.socket or pilha.enter_context(servidor_temporario(args.jobs))
+        latencias, duracao, erros = asyncio.run(carga(caminho, textos, args.conexoes, args.pedidos))
+    resultado = {'modo': 'servidor', 'conexoes': args.conexoes, 'pedidos': len(latencias),
+                 'erros': erros, 'declaracoes': args.declaracoes}
+    resultado.update(percentis(latencias))
+    resultado['pedidos_por_s'] = round(len(latencias) / duracao, 1)
+    print(json.dumps(resultado))
+
+    if args.processos:
+        latencias = processo_por_compilacao(textos, args.processos)
+        resultado = {'modo': 'processo_por_compilacao', 'pedidos': len(latencias),
+                     'declaracoes': args.declaracoes}
+        resultado.update(percentis(latencias))
+        resultado['pedidos_por_s'] = round(len(latencias) / sum(latencias), 1)
+        print(json.dumps(resultado))
+
+if __name__ == "__main__":
+    main()
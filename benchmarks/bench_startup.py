@@ -0,0 +1,60 @@
+"""
+Mede o tempo de inicialização: do import de sintatic_analyser até o fim da
+primeira compilação, em processos Python novos.
+
+Modos comparados:
+    sem_cache  tabelas do lexer e do parser reconstruídas a cada processo
+               (COMPILADOR_CACHE_DIR=off, comportamento de um container
+               somente leitura antes do cache de tabelas)
+    cache      tabelas carregadas de tabelas/ ou do diretório de cache
+
+Uso:
+    python benchmarks/bench_startup.py [-n REPETICOES]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMA = r'''
+import time
+inicio = time.perf_counter()
+import sintatic_analyser
+importado = time.perf_counter()
+sintatic_analyser.compile_source("int main(){ int x = 5 + 8; };")
+fim = time.perf_counter()
+print((importado - inicio) * 1000, (fim - importado) * 1000)
+'''
+
+def medir(ambiente, repeticoes):
+    importacao, primeira = [], []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', PROGRAMA], cwd=RAIZ, env=ambiente,
+                               capture_output=True, text=True, check=True).stdout
+        t_import, t_parse = map(float, saida.split())
+        importacao.append(t_import)
+        primeira.append(t_parse)
+    return {
+        'import_ms': round(statistics.median(importacao), 2),
+        'first_parse_ms': round(statistics.median(primeira), 2),
+        'total_ms': round(statistics.median(a + b for a, b in zip(importacao, primeira)), 2),
+    }
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('-n', '--repeticoes', type=int, default=15)
+    args = argumentos.parse_args(argv)
+
+    resultados = {}
+    base = dict(os.environ)
+    resultados['sem_cache'] = medir({**base, 'COMPILADOR_CACHE_DIR': 'off'}, args.repeticoes)
+    base.pop('COMPILADOR_CACHE_DIR', None)
+    resultados['cache'] = medir(base, args.repeticoes)
+    print(json.dumps(resultados, indent=2))
+
+if __name__ == "__main__":
+    main()
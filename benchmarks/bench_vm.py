@@ -0,0 +1,59 @@
+"""
+Compara o interpretador da AST com a máquina virtual de bytecode em laços
+contados com muitas iterações.
+
+Para cada programa de bench_interpretador.py são reportados o tempo de
+tradução para bytecode, o melhor tempo de execução de cada motor e o ganho
+da máquina virtual. Os dois motores precisam produzir o mesmo estado final.
+
+Uso:
+    python benchmarks/bench_vm.py [--iteracoes 1000000] [--repeticoes 3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bytecode
+import interpreter
+import vm
+from bench_interpretador import PROGRAMAS, medir
+from sintatic_analyser import Compiler
+
+def main(argv=None):
+    argumentos = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argumentos.add_argument('--iteracoes', type=int, default=1000000)
+    argumentos.add_argument('--repeticoes', type=int, default=3)
+    args = argumentos.parse_args(argv)
+
+    compilador = Compiler()
+    for nome, gerar in PROGRAMAS.items():
+        compilacao = compilador.compile(gerar(args.iteracoes))
+        if not compilacao.sucesso:
+            raise SystemExit(f"{nome}: {compilacao.erros}")
+
+        inicio = time.perf_counter()
+        codigo = bytecode.compilar(compilacao.ast)
+        traducao = time.perf_counter() - inicio
+
+        t_ast, r_ast = medir(lambda p: interpreter.executar(p, None, None), compilacao.ast, args.repeticoes)
+        t_vm, r_vm = medir(lambda c: vm.executar(c, None, None), codigo, args.repeticoes)
+        if r_ast.variaveis != r_vm.variaveis:
+            raise SystemExit(f"{nome}: estados finais diferentes: {r_ast.variaveis} != {r_vm.variaveis}")
+
+        print(json.dumps({
+            'programa': nome,
+            'iteracoes': args.iteracoes,
+            'instrucoes_bytecode': len(codigo.instrucoes) // 2,
+            'traducao_ms': round(traducao * 1000, 3),
+            'interpretador_s': round(t_ast, 4),
+            'vm_s': round(t_vm, 4),
+            'ganho': round(t_ast / t_vm, 2),
+        }))
+
+if __name__ == "__main__":
+    main()
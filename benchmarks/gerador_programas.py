@@ -0,0 +1,228 @@
+"""
+Gerador de programas válidos da linguagem, com semente, para benchmarks.
+
+O tamanho e a forma do programa são configuráveis:
+
+    declaracoes     quantidade de declarações de variáveis; os demais
+                    comandos (atribuições, blocos, printf) são intercalados
+                    entre elas, na proporção de cerca de dois para uma
+    profundidade    aninhamento máximo de while, if/else if/else e for
+                    (0 gera apenas comandos simples no corpo de main)
+    densidade       número médio de operandos por expressão
+    por_declaracao  máximo de nomes por lista de declaração (int a, b, c;);
+                    as variáveis de uma lista recebem valor antes do fim do
+                    bloco em que foram declaradas
+
+Os programas não têm erros léxicos, sintáticos nem semânticos e terminam
+quando executados: os laços contam até constantes pequenas e não alteram o
+contador no corpo. Para que os valores não cresçam sem limite ao longo de
+milhares de comandos, toda expressão com mais de um operando é uma soma
+dividida pela soma dos seus coeficientes mais um, e os divisores são
+sempre constantes diferentes de zero. Variáveis int só recebem expressões
+sem operandos float, sem avisos de conversão.
+
+A mesma chamada (mesmos argumentos e semente) gera sempre o mesmo texto.
+"""
+import random
+
+_COMPARACOES = ('<', '<=', '>', '>=', '!=', '==')
+
+class _Gerador:
+    __slots__ = ('aleatorio', 'linhas', 'inteiras', 'todas', 'atribuiveis', 'escopos',
+                 'declaradas', 'nomes', 'profundidade', 'densidade', 'por_declaracao')
+
+    def __init__(self, profundidade, densidade, por_declaracao, semente):
+        self.aleatorio = random.Random(semente)
+        self.linhas = ["int main() {"]
+        # Variáveis visíveis e com valor: as int, todas e as que podem
+        # receber atribuições, como (nome, tipo). Só o escopo mais interno
+        # recebe variáveis novas, então cada lista é uma pilha; cada escopo
+        # guarda o tamanho delas na abertura e as declaradas sem valor
+        self.inteiras = []
+        self.todas = []
+        self.atribuiveis = []
+        self.escopos = [((0, 0, 0), [])]
+        self.declaradas = 0
+        self.nomes = 0
+        self.profundidade = profundidade
+        self.densidade = densidade
+        self.por_declaracao = por_declaracao
+
+    def _nome(self, prefixo):
+        self.nomes += 1
+        return f"{prefixo}{self.nomes}"
+
+    def _emitir(self, nivel, texto):
+        self.linhas.append("    " * nivel + texto)
+
+    def _legivel(self, nome, tipo, atribuivel=True):
+        if tipo == "int":
+            self.inteiras.append(nome)
+        self.todas.append(nome)
+        if atribuivel:
+            self.atribuiveis.append((nome, tipo))
+
+    def _abrir_escopo(self):
+        self.escopos.append(((len(self.inteiras), len(self.todas), len(self.atribuiveis)), []))
+
+    def _fechar_escopo(self):
+        (inteiras, todas, atribuiveis), _ = self.escopos.pop()
+        del self.inteiras[inteiras:]
+        del self.todas[todas:]
+        del self.atribuiveis[atribuiveis:]
+
+    def _literal(self, tipo):
+        aleatorio = self.aleatorio
+        if tipo == "float" and aleatorio.random() < 0.5:
+            return f"{aleatorio.randint(0, 9)}.{aleatorio.randint(0, 9)}"
+        return str(aleatorio.randint(0, 9))
+
+    def _operando(self, tipo):
+        """Nome de uma variável legível (ou literal): int aceita só int"""
+        candidatas = self.inteiras if tipo == "int" else self.todas
+        if candidatas and self.aleatorio.random() < 0.7:
+            return self.aleatorio.choice(candidatas)
+        return self._literal(tipo)
+
+    def expressao(self, tipo):
+        """Expressão de `tipo` com valor limitado, em média `densidade` operandos"""
+        aleatorio = self.aleatorio
+        operandos = aleatorio.randint(1, max(1, 2 * self.densidade - 1))
+        if operandos == 1:
+            return self._operando(tipo)
+        termos = []
+        coeficientes = 0
+        while operandos > 0:
+            escolha = aleatorio.random()
+            if operandos >= 2 and escolha < 0.2:
+                termo = f"({self._operando(tipo)} - {self._operando(tipo)})"
+                coeficientes += 2
+                operandos -= 2
+            elif escolha < 0.4:
+                fator = aleatorio.randint(2, 3)
+                termo = f"{self._operando(tipo)} * {fator}"
+                coeficientes += fator
+                operandos -= 1
+            else:
+                termo = self._operando(tipo)
+                coeficientes += 1
+                operandos -= 1
+            if termos:
+                termos.append(aleatorio.choice(('+', '-')))
+            termos.append(termo)
+        return f"({' '.join(termos)}) / {coeficientes + 1}"
+
+    def condicao(self):
+        return (f"{self._operando('int')} {self.aleatorio.choice(_COMPARACOES)} "
+                f"{self.aleatorio.randint(0, 9)}")
+
+    def declaracao(self, nivel):
+        aleatorio = self.aleatorio
+        pendentes = self.escopos[-1][1]
+        tipo = "float" if aleatorio.random() < 0.25 else "int"
+        if self.por_declaracao > 1 and aleatorio.random() < 0.25:
+            nomes = [self._nome("v") for _ in range(aleatorio.randint(2, self.por_declaracao))]
+            self._emitir(nivel, f"{tipo} {', '.join(nomes)};")
+            pendentes.extend((nome, tipo) for nome in nomes)
+            self.declaradas += len(nomes)
+            return
+        nome = self._nome("v")
+        self._emitir(nivel, f"{tipo} {nome} = {self.expressao(tipo)};")
+        self._legivel(nome, tipo)
+        self.declaradas += 1
+
+    def _inicializar(self, nivel):
+        """Atribui valor à primeira variável declarada sem valor do escopo atual"""
+        nome, tipo = self.escopos[-1][1].pop(0)
+        self._emitir(nivel, f"{nome} = {self.expressao(tipo)};")
+        self._legivel(nome, tipo)
+
+    def atribuicao(self, nivel):
+        if not self.atribuiveis:
+            self.declaracao(nivel)
+            return
+        nome, tipo = self.aleatorio.choice(self.atribuiveis)
+        self._emitir(nivel, f"{nome} = {self.expressao(tipo)};")
+
+    def corpo(self, nivel, indice=None):
+        """
+        Comandos de um bloco, num escopo novo, no nível `nivel` + 1; o
+        `indice` de um for é legível no corpo, mas não recebe atribuições
+        """
+        self._abrir_escopo()
+        if indice is not None:
+            self._legivel(indice, "int", atribuivel=False)
+        for _ in range(self.aleatorio.randint(1, 4)):
+            self.comando(nivel + 1)
+        while self.escopos[-1][1]:
+            self._inicializar(nivel + 1)
+        self._fechar_escopo()
+
+    def estrutura(self, nivel):
+        aleatorio = self.aleatorio
+        escolha = aleatorio.random()
+        if escolha < 0.35:
+            # O contador só é legível depois do laço: o corpo não o altera
+            contador = self._nome("c")
+            self._emitir(nivel, f"int {contador} = 0;")
+            self.declaradas += 1
+            self._emitir(nivel, f"while ({contador} < {aleatorio.randint(1, 3)}) {{")
+            self.corpo(nivel)
+            self._emitir(nivel + 1, f"{contador} = {contador} + 1;")
+            self._legivel(contador, "int")
+        elif escolha < 0.7:
+            self._emitir(nivel, f"if ({self.condicao()}) {{")
+            self.corpo(nivel)
+            while aleatorio.random() < 0.4:
+                self._emitir(nivel, f"}} else if ({self.condicao()}) {{")
+                self.corpo(nivel)
+            if aleatorio.random() < 0.5:
+                self._emitir(nivel, "} else {")
+                self.corpo(nivel)
+        else:
+            indice = self._nome("i")
+            self._emitir(nivel, f"for (int {indice} = 0; {indice} < {aleatorio.randint(1, 3)}; {indice}++) {{")
+            self.corpo(nivel, indice)
+        self._emitir(nivel, "}")
+
+    def impressao(self, nivel):
+        self._emitir(nivel, f'printf("%d\\n", {self.expressao("int")});')
+
+    def comando(self, nivel):
+        escolha = self.aleatorio.random()
+        if self.escopos[-1][1] and escolha < 0.3:
+            self._inicializar(nivel)
+        elif escolha < 0.45:
+            self.declaracao(nivel)
+        elif escolha < 0.75:
+            self.atribuicao(nivel)
+        elif escolha < 0.95 and nivel <= self.profundidade:
+            self.estrutura(nivel)
+        elif escolha < 0.97:
+            self.impressao(nivel)
+        else:
+            self.declaracao(nivel)
+
+def gerar_programa(declaracoes, profundidade=3, densidade=3, por_declaracao=4, semente=0):
+    """
+    Programa válido com `declaracoes` declarações de variáveis (ou algumas a
+    mais, quando a última é uma lista) no corpo de main.
+
+    Args:
+        declaracoes: Quantidade de variáveis declaradas
+        profundidade: Aninhamento máximo de while, if e for
+        densidade: Número médio de operandos por expressão
+        por_declaracao: Máximo de nomes por lista de declaração
+        semente: Semente do gerador pseudoaleatório
+
+    Returns:
+        Texto do programa
+    """
+    gerador = _Gerador(profundidade, densidade, por_declaracao, semente)
+    while gerador.declaradas < declaracoes:
+        gerador.comando(1)
+    while gerador.escopos[-1][1]:
+        gerador._inicializar(1)
+    gerador._emitir(1, f"return {gerador.expressao('int')};")
+    gerador.linhas.append("};")
+    return "\n".join(gerador.linhas)
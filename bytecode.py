@@ -0,0 +1,398 @@
+"""
+Compilação da AST para bytecode.
+
+O programa é traduzido para uma sequência de instruções de largura fixa,
+guardada num array('i'): cada instrução ocupa duas posições, o código da
+operação e o seu argumento (0 quando não há). Os destinos de salto já são
+posições absolutas no array, resolvidas durante a tradução.
+
+Variáveis não são procuradas por nome durante a execução: cada declaração
+recebe um índice (slot) num vetor de variáveis, resolvido aqui com os mesmos
+escopos da análise semântica. A leitura só verifica se a variável foi
+inicializada (LOAD_CHECKED) quando não é possível provar, pelo fluxo do
+programa, que ela já recebeu um valor. Como o tipo de cada slot é conhecido, as
+promoções de int para float (tipo_resultado) e as conversões de atribuição
+(verificar_compatibilidade_tipos) viram instruções TO_FLOAT/TO_INT/TO_STR
+emitidas apenas onde são necessárias.
+
+Uso:
+    python bytecode.py input6.txt      # mostra o bytecode gerado
+"""
+from array import array
+
+from ast_nodes import Block, Decl, Assign, While, If, For, Print, Return, Literal, Name
+from semantic import ErroSemantico, tipo_resultado
+
+# Códigos das operações
+LOAD_CONST = 0       # empilha constantes[arg]
+LOAD = 1             # empilha slots[arg]
+LOAD_CHECKED = 2     # idem, com erro se a variável não foi inicializada
+STORE = 3            # desempilha para slots[arg]
+CLEAR = 4            # slots[arg] = None (declaração sem valor inicial)
+TO_FLOAT = 5
+TO_INT = 6
+TO_STR = 7
+ADD = 8
+SUB = 9
+MUL = 10
+DIV_INT = 11
+DIV_FLOAT = 12
+POW_INT = 13
+POW_FLOAT = 14
+JUMP = 15            # pc = arg
+JUMP_IF_NOT_LT = 16  # desempilha b, a; salta para arg se não (a < b)
+JUMP_IF_NOT_LE = 17
+JUMP_IF_NOT_GT = 18
+JUMP_IF_NOT_GE = 19
+JUMP_IF_NOT_NE = 20
+JUMP_IF_NOT_EQ = 21
+PRINT = 22           # constantes[arg] = (formato, quantidade de argumentos)
+RETURN = 23          # desempilha o valor de retorno e encerra
+HALT = 24
+# Superinstruções: operação com o operando direito constante ou variável,
+# sem empilhá-lo (x + 1 vira LOAD x; ADD_CONST 1)
+ADD_CONST = 25       # topo = topo + constantes[arg]
+SUB_CONST = 26
+MUL_CONST = 27
+ADD_LOAD = 28        # topo = topo + slots[arg]
+SUB_LOAD = 29
+MUL_LOAD = 30
+
+NOMES = {valor: nome for nome, valor in globals().items()
+         if nome.isupper() and isinstance(valor, int)}
+
+# Salto condicional de cada operador de comparação
+SALTOS_CONDICIONAIS = {
+    '<': JUMP_IF_NOT_LT,
+    '<=': JUMP_IF_NOT_LE,
+    '>': JUMP_IF_NOT_GT,
+    '>=': JUMP_IF_NOT_GE,
+    '!=': JUMP_IF_NOT_NE,
+    '==': JUMP_IF_NOT_EQ,
+}
+
+OPERACOES = {
+    ('+', 'int'): ADD, ('+', 'float'): ADD,
+    ('-', 'int'): SUB, ('-', 'float'): SUB,
+    ('*', 'int'): MUL, ('*', 'float'): MUL,
+    ('/', 'int'): DIV_INT, ('/', 'float'): DIV_FLOAT,
+    ('^', 'int'): POW_INT, ('^', 'float'): POW_FLOAT,
+}
+
+# Superinstrução de cada operação com o operando direito constante ou variável
+OPERACOES_CONST = {ADD: ADD_CONST, SUB: SUB_CONST, MUL: MUL_CONST}
+OPERACOES_LOAD = {ADD: ADD_LOAD, SUB: SUB_LOAD, MUL: MUL_LOAD}
+
+# Instrução de conversão (tipo de origem, tipo de destino)
+CONVERSOES = {
+    ('int', 'float'): TO_FLOAT,
+    ('float', 'int'): TO_INT,
+    ('int', 'char'): TO_STR,
+    ('float', 'char'): TO_STR,
+}
+
+class Codigo:
+    """
+    Programa compilado.
+
+    Attributes:
+        instrucoes: array('i') com pares (operação, argumento)
+        constantes: Valores referenciados por LOAD_CONST e PRINT
+        quantidade_slots: Tamanho do vetor de variáveis
+        tipos_slots: Tipo declarado de cada slot
+        variaveis: Pares (nome, slot) das variáveis do corpo de main, na
+                   ordem de declaração
+        linhas: array('i') com a linha e a coluna de origem de cada instrução
+    """
+    __slots__ = ('instrucoes', 'constantes', 'quantidade_slots', 'tipos_slots',
+                 'variaveis', 'linhas')
+
+    def __init__(self, instrucoes, constantes, tipos_slots, variaveis, linhas):
+        self.instrucoes = instrucoes
+        self.constantes = constantes
+        self.quantidade_slots = len(tipos_slots)
+        self.tipos_slots = tipos_slots
+        self.variaveis = variaveis
+        self.linhas = linhas
+
+    def posicao(self, pc):
+        """Linha e coluna de origem da instrução na posição pc"""
+        return self.linhas[pc], self.linhas[pc + 1]
+
+    def desmontar(self):
+        """Texto legível do bytecode, uma instrução por linha"""
+        saida = []
+        instrucoes = self.instrucoes
+        for pc in range(0, len(instrucoes), 2):
+            op, arg = instrucoes[pc], instrucoes[pc + 1]
+            texto = f"{pc:6d}  {NOMES[op]:<16}"
+            if op in (LOAD_CONST, PRINT) or op in OPERACOES_CONST.values():
+                texto += f"{arg} ({self.constantes[arg]!r})"
+            elif op in (LOAD, LOAD_CHECKED, STORE, CLEAR, JUMP) or op in SALTOS_CONDICIONAIS.values() \
+                    or op in OPERACOES_LOAD.values():
+                texto += str(arg)
+            saida.append(texto.rstrip())
+        return '\n'.join(saida)
+
+    def __repr__(self):
+        return (f"Codigo(instrucoes={len(self.instrucoes) // 2}, "
+                f"slots={self.quantidade_slots}, constantes={len(self.constantes)})")
+
+class CompiladorBytecode:
+    """Traduz a AST de um programa para Codigo"""
+    __slots__ = ('_instrucoes', '_linhas', '_constantes', '_indices_constantes',
+                 '_tipos_slots', '_atribuidos', '_escopos', '_variaveis', '_comandos')
+
+    def __init__(self):
+        self._instrucoes = array('i')
+        self._linhas = array('i')
+        self._constantes = []
+        self._indices_constantes = {}
+        self._tipos_slots = []
+        # Slots que certamente já receberam um valor no ponto atual do código
+        self._atribuidos = set()
+        # Pilha de escopos: cada um mapeia nome -> slot
+        self._escopos = [{}]
+        self._variaveis = []
+        self._comandos = {
+            Decl: self._declaracao,
+            Assign: self._atribuicao,
+            While: self._while,
+            If: self._if,
+            For: self._for,
+            Print: self._impressao,
+            Return: self._retorno,
+            Block: self._bloco,
+        }
+
+    def compilar(self, programa):
+        """
+        Returns:
+            Codigo do programa
+
+        Raises:
+            ErroSemantico: Se o programa não passou pela análise semântica
+                           e usa uma variável não declarada ou tipos incompatíveis
+        """
+        self._comandos_bloco(programa.corpo)
+        self._emitir(HALT, 0, programa)
+        return Codigo(self._instrucoes, self._constantes, self._tipos_slots,
+                      self._variaveis, self._linhas)
+
+    # Emissão
+
+    def _emitir(self, op, arg, no):
+        """Emite uma instrução e retorna a sua posição"""
+        pc = len(self._instrucoes)
+        self._instrucoes.append(op)
+        self._instrucoes.append(arg)
+        self._linhas.append(no.line)
+        self._linhas.append(no.col)
+        return pc
+
+    def _corrigir_salto(self, pc, destino):
+        self._instrucoes[pc + 1] = destino
+
+    def _constante(self, valor):
+        # A chave inclui o tipo para que 1 e 1.0 não compartilhem a constante
+        chave = (type(valor), valor)
+        indice = self._indices_constantes.get(chave)
+        if indice is None:
+            indice = len(self._constantes)
+            self._constantes.append(valor)
+            self._indices_constantes[chave] = indice
+        return indice
+
+    # Escopos e slots
+
+    def _buscar(self, nome, no):
+        for escopo in reversed(self._escopos):
+            slot = escopo.get(nome)
+            if slot is not None:
+                return slot
+        raise ErroSemantico(f"Erro semântico na linha {no.line}: variável '{nome}' usada mas não declarada",
+                            no.line, no.col)
+
+    def _novo_slot(self, nome, tipo):
+        slot = len(self._tipos_slots)
+        self._tipos_slots.append(tipo)
+        self._escopos[-1][nome] = slot
+        if len(self._escopos) == 1:
+            self._variaveis.append((nome, slot))
+        return slot
+
+    # Comandos
+
+    def _comandos_bloco(self, bloco):
+        comandos = self._comandos
+        for comando in bloco.comandos:
+            comandos[type(comando)](comando)
+
+    def _bloco(self, bloco):
+        self._escopos.append({})
+        self._comandos_bloco(bloco)
+        self._escopos.pop()
+
+    def _converter(self, tipo_origem, tipo_destino, no):
+        if tipo_origem == tipo_destino:
+            return
+        conversao = CONVERSOES.get((tipo_origem, tipo_destino))
+        if conversao is None:
+            raise ErroSemantico(
+                f"Erro semântico na linha {no.line}: não é possível converter '{tipo_origem}' para '{tipo_destino}'",
+                no.line, no.col)
+        self._emitir(conversao, 0, no)
+
+    def _declaracao(self, no):
+        if no.valor is None:
+            slot = self._novo_slot(no.nome, no.tipo)
+            self._emitir(CLEAR, slot, no)
+            return
+        # O valor inicial é avaliado antes de o nome entrar no escopo
+        tipo = self._expressao(no.valor)
+        self._converter(tipo, no.tipo, no)
+        slot = self._novo_slot(no.nome, no.tipo)
+        self._emitir(STORE, slot, no)
+        self._atribuidos.add(slot)
+
+    def _atribuicao(self, no):
+        slot = self._buscar(no.nome, no)
+        tipo = self._expressao(no.valor)
+        self._converter(tipo, self._tipos_slots[slot], no)
+        self._emitir(STORE, slot, no)
+        self._atribuidos.add(slot)
+
+    def _corpo_condicional(self, corpo):
+        """
+        Compila um corpo que pode não ser executado (laço ou ramo de if).
+
+        Returns:
+            Slots certamente atribuídos ao final do corpo
+        """
+        antes = self._atribuidos
+        self._atribuidos = set(antes)
+        self._comandos[type(corpo)](corpo)
+        depois = self._atribuidos
+        self._atribuidos = antes
+        return depois
+
+    def _condicao(self, cond):
+        """Emite a condição seguida do salto para quando ela for falsa"""
+        self._expressao(cond.esquerda)
+        self._expressao(cond.direita)
+        return self._emitir(SALTOS_CONDICIONAIS[cond.op], 0, cond)
+
+    def _while(self, no):
+        inicio = len(self._instrucoes)
+        saida = self._condicao(no.condicao)
+        self._corpo_condicional(no.corpo)
+        self._emitir(JUMP, inicio, no)
+        self._corrigir_salto(saida, len(self._instrucoes))
+
+    def _if(self, no):
+        senao = self._condicao(no.condicao)
+        atribuidos = self._corpo_condicional(no.entao)
+        if no.senao is None:
+            self._corrigir_salto(senao, len(self._instrucoes))
+            return
+        fim = self._emitir(JUMP, 0, no)
+        self._corrigir_salto(senao, len(self._instrucoes))
+        # Após o if/else, só o que foi atribuído nos dois ramos é garantido
+        self._atribuidos |= atribuidos & self._corpo_condicional(no.senao)
+        self._corrigir_salto(fim, len(self._instrucoes))
+
+    def _for(self, no):
+        self._escopos.append({})
+        self._comandos[type(no.inicio)](no.inicio)
+        inicio = len(self._instrucoes)
+        saida = self._condicao(no.condicao)
+        antes = self._atribuidos
+        # O passo executa depois do corpo e vê as suas atribuições
+        self._atribuidos = set(antes)
+        self._bloco(no.corpo)
+        self._atribuicao(no.passo)
+        self._atribuidos = antes
+        self._emitir(JUMP, inicio, no)
+        self._corrigir_salto(saida, len(self._instrucoes))
+        self._escopos.pop()
+
+    def _impressao(self, no):
+        for argumento in no.argumentos:
+            self._expressao(argumento)
+        self._emitir(PRINT, self._constante((no.formato, len(no.argumentos))), no)
+
+    def _retorno(self, no):
+        self._expressao(no.valor)
+        self._emitir(RETURN, 0, no)
+
+    # Expressões
+
+    def _expressao(self, expressao):
+        """Emite o código que empilha o valor da expressão e retorna o seu tipo"""
+        tipo_no = type(expressao)
+        if tipo_no is Literal:
+            self._emitir(LOAD_CONST, self._constante(expressao.valor), expressao)
+            return expressao.tipo
+        if tipo_no is Name:
+            slot = self._buscar(expressao.nome, expressao)
+            op = LOAD if slot in self._atribuidos else LOAD_CHECKED
+            self._emitir(op, slot, expressao)
+            return self._tipos_slots[slot]
+
+        # O operando esquerdo é convertido enquanto está no topo da pilha,
+        # então o tipo do direito precisa ser conhecido antes de emiti-lo
+        direita = expressao.direita
+        tipo_direita = self._tipo(direita)
+        tipo = tipo_resultado(self._tipo(expressao.esquerda), tipo_direita)
+        self._converter(self._expressao(expressao.esquerda), tipo, expressao)
+        op = OPERACOES[expressao.op, tipo]
+
+        # Operando direito que dispensa conversão: usa uma superinstrução
+        if tipo_direita == tipo and op in OPERACOES_CONST:
+            if type(direita) is Literal:
+                self._emitir(OPERACOES_CONST[op], self._constante(direita.valor), expressao)
+                return tipo
+            if type(direita) is Name:
+                slot = self._buscar(direita.nome, direita)
+                if slot in self._atribuidos:
+                    self._emitir(OPERACOES_LOAD[op], slot, expressao)
+                    return tipo
+
+        self._converter(self._expressao(direita), tipo, expressao)
+        self._emitir(op, 0, expressao)
+        return tipo
+
+    def _tipo(self, expressao):
+        """Tipo estático de uma expressão, sem emitir código"""
+        tipo_no = type(expressao)
+        if tipo_no is Literal:
+            return expressao.tipo
+        if tipo_no is Name:
+            return self._tipos_slots[self._buscar(expressao.nome, expressao)]
+        return tipo_resultado(self._tipo(expressao.esquerda), self._tipo(expressao.direita))
+
+def compilar(programa):
+    """Compila a AST de um programa para Codigo"""
+    return CompiladorBytecode().compilar(programa)
+
+def main(argv=None):
+    """Mostra o bytecode de um arquivo fonte"""
+    import argparse
+    from sintatic_analyser import Compiler
+    from diagnostics import ERRORS
+
+    argumentos = argparse.ArgumentParser(description="Mostra o bytecode gerado para um programa.")
+    argumentos.add_argument('arquivo', nargs='?', default="input.txt")
+    args = argumentos.parse_args(argv)
+    with open(args.arquivo, 'r') as arquivo:
+        resultado = Compiler(ERRORS).compile(arquivo.read())
+    if not resultado.sucesso:
+        return 1
+    codigo = compilar(resultado.ast)
+    print(codigo.desmontar())
+    print(f"\nslots: {list(zip(range(codigo.quantidade_slots), codigo.tipos_slots))}")
+    return 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
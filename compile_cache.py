@@ -0,0 +1,233 @@
+"""
+Cache de compilações endereçado pelo conteúdo.
+
+A chave de cada entrada é o SHA-256 do texto fonte junto com a assinatura do
+compilador (hash da gramática calculado por table_cache, mais o código dos
+módulos que produzem o resultado). Compilar de novo um texto já visto
+devolve o CompilationResult guardado, com diagnósticos, tabela de símbolos e
+AST, sem passar pelo lexer, pelo parser nem pela análise semântica. Qualquer
+alteração na gramática, nas ações do parser, nos lexers, na análise
+semântica ou no formato binário muda a assinatura e invalida todas as
+entradas antigas.
+
+Há dois níveis:
+
+    memória  dicionário LRU com no máximo `tamanho` entradas por processo
+    disco    opcional; um arquivo por entrada em `diretorio`, no formato
+             binário de serializacao.py, compartilhado entre processos
+
+Os arquivos em disco são gravados num nome temporário e depois renomeados
+(os.replace é atômico), de modo que processos trabalhadores concorrentes
+nunca leem uma entrada incompleta; dois processos que gravam a mesma chave
+produzem o mesmo conteúdo. Um arquivo ilegível é tratado como ausente.
+
+Os resultados devolvidos pelo nível de memória são compartilhados entre as
+chamadas e não devem ser modificados.
+"""
+import collections
+import hashlib
+import os
+import tempfile
+import threading
+
+import serializacao
+from diagnostics import ERRORS, TRACE, imprimir_diagnostico
+
+# Versão do formato das entradas em disco; faz parte da chave
+VERSAO_FORMATO = 3
+
+TAMANHO_PADRAO = 256
+
+class EstatisticasCache:
+    """
+    Contadores de uso de um CacheCompilacao.
+
+    Attributes:
+        acertos_memoria: Consultas atendidas pelo nível de memória
+        acertos_disco: Consultas atendidas pelo nível de disco
+        falhas: Consultas que não encontraram a entrada
+        remocoes: Entradas descartadas do nível de memória pelo LRU
+        gravacoes_disco: Entradas gravadas no nível de disco
+    """
+    __slots__ = ('acertos_memoria', 'acertos_disco', 'falhas', 'remocoes', 'gravacoes_disco')
+
+    def __init__(self):
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self.gravacoes_disco = 0
+
+    @property
+    def acertos(self):
+        return self.acertos_memoria + self.acertos_disco
+
+    @property
+    def taxa_acerto(self):
+        """Fração das consultas atendidas pelo cache (0.0 sem consultas)"""
+        consultas = self.acertos + self.falhas
+        return self.acertos / consultas if consultas else 0.0
+
+    def to_dict(self):
+        return {
+            'hits': self.acertos,
+            'memory_hits': self.acertos_memoria,
+            'disk_hits': self.acertos_disco,
+            'misses': self.falhas,
+            'evictions': self.remocoes,
+            'disk_writes': self.gravacoes_disco,
+            'hit_rate': round(self.taxa_acerto, 4),
+        }
+
+    def __repr__(self):
+        return (f"EstatisticasCache(acertos={self.acertos}, falhas={self.falhas}, "
+                f"remocoes={self.remocoes})")
+
+class CacheCompilacao:
+    """
+    Cache de CompilationResult com LRU em memória e nível opcional em disco.
+
+    Args:
+        assinatura: Texto que identifica o compilador (gramática e análise
+                    semântica); entradas de outra assinatura nunca coincidem
+        tamanho: Máximo de entradas no nível de memória (0 desliga o nível)
+        diretorio: Diretório do nível de disco (padrão: sem disco)
+    """
+    __slots__ = ('assinatura', 'tamanho', 'diretorio', 'estatisticas',
+                 '_prefixo', '_entradas', '_lock')
+
+    def __init__(self, assinatura, tamanho=TAMANHO_PADRAO, diretorio=None):
+        self.assinatura = assinatura
+        self.tamanho = tamanho
+        self.diretorio = diretorio
+        self.estatisticas = EstatisticasCache()
+        self._prefixo = f"{VERSAO_FORMATO}\0{assinatura}\0".encode('utf-8')
+        self._entradas = collections.OrderedDict()
+        self._lock = threading.Lock()
+        if diretorio is not None:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def chave(self, texto):
+        """Hash hexadecimal que identifica o texto compilado com esta assinatura"""
+        return hashlib.sha256(self._prefixo + texto.encode('utf-8')).hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave[:2], f"{chave}.cres")
+
+    def _lembrar(self, chave, resultado):
+        """Insere no nível de memória, descartando a entrada menos usada"""
+        if self.tamanho <= 0:
+            return
+        with self._lock:
+            self._entradas[chave] = resultado
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.tamanho:
+                self._entradas.popitem(last=False)
+                self.estatisticas.remocoes += 1
+
+    def _ler_disco(self, chave):
+        try:
+            with open(self._caminho(chave), 'rb') as arquivo:
+                dados = arquivo.read()
+        except OSError:
+            return None
+        try:
+            return serializacao.decodificar(dados)
+        except serializacao.FormatoInvalido:
+            # Entrada corrompida ou de outra versão do formato
+            return None
+
+    def _gravar_disco(self, chave, resultado):
+        try:
+            dados = serializacao.codificar(resultado)
+        except ValueError:
+            return
+        caminho = self._caminho(chave)
+        diretorio = os.path.dirname(caminho)
+        try:
+            os.makedirs(diretorio, exist_ok=True)
+            descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(descritor, 'wb') as arquivo:
+                arquivo.write(dados)
+            os.replace(temporario, caminho)
+            self.estatisticas.gravacoes_disco += 1
+        except OSError:
+            try:
+                os.remove(temporario)
+            except OSError:
+                pass
+
+    def obter(self, texto, chave=None):
+        """
+        Procura o resultado da compilação de `texto`.
+
+        Returns:
+            CompilationResult guardado, ou None se não houver entrada
+        """
+        if chave is None:
+            chave = self.chave(texto)
+        with self._lock:
+            resultado = self._entradas.get(chave)
+            if resultado is not None:
+                self._entradas.move_to_end(chave)
+                self.estatisticas.acertos_memoria += 1
+                return resultado
+        if self.diretorio is not None:
+            resultado = self._ler_disco(chave)
+            if resultado is not None:
+                self.estatisticas.acertos_disco += 1
+                self._lembrar(chave, resultado)
+                return resultado
+        self.estatisticas.falhas += 1
+        return None
+
+    def guardar(self, texto, resultado, chave=None):
+        """Guarda o resultado da compilação de `texto` nos dois níveis"""
+        if chave is None:
+            chave = self.chave(texto)
+        self._lembrar(chave, resultado)
+        if self.diretorio is not None:
+            self._gravar_disco(chave, resultado)
+
+    def compilar(self, compilador, texto):
+        """
+        Devolve o resultado guardado para `texto` ou o compila com
+        `compilador` (um Compiler) e guarda o resultado.
+
+        Num acerto, os diagnósticos guardados são reenviados ao sink do
+        compilador quando o nível dele é ERRORS, como numa compilação. Um
+        compilador no nível TRACE, com ParseTrace (trace) ou com perfil
+        sempre compila, pois o rastreamento e as medidas são produzidos
+        pela compilação e não são guardados; o resultado é guardado mesmo
+        assim.
+
+        Returns:
+            Tupla (CompilationResult, True se veio do cache)
+        """
+        chave = self.chave(texto)
+        if compilador.nivel < TRACE and compilador.trace is None and compilador.perfil is None:
+            resultado = self.obter(texto, chave)
+            if resultado is not None:
+                if compilador.nivel >= ERRORS:
+                    sink = compilador.sink if compilador.sink is not None else imprimir_diagnostico
+                    for diagnostico in resultado.diagnosticos:
+                        sink(diagnostico)
+                return resultado, True
+        resultado = compilador.compile(texto)
+        self.guardar(texto, resultado, chave)
+        return resultado, False
+
+    def limpar(self):
+        """Esvazia o nível de memória (o disco é mantido)"""
+        with self._lock:
+            self._entradas.clear()
+
+    def __repr__(self):
+        return (f"CacheCompilacao(entradas={len(self._entradas)}, tamanho={self.tamanho}, "
+                f"diretorio={self.diretorio!r})")
@@ -0,0 +1,128 @@
+"""
+Diagnósticos estruturados da compilação.
+
+Em vez de imprimir mensagens a cada redução da gramática, as ações coletam
+objetos Diagnostic. O nível de diagnóstico decide o que é repassado ao
+destino (sink) configurado:
+
+    SILENT: nada é emitido; erros e avisos apenas são coletados
+    ERRORS: erros e avisos são emitidos ao destino
+    TRACE:  além dos erros, mensagens de rastreamento das reduções
+
+Mensagens de rastreamento só são formatadas no nível TRACE. As ações da
+gramática consultam o atributo `rastreando` antes de chamar trace(), de modo
+que nos demais níveis nenhuma string é montada no caminho crítico.
+"""
+import sys
+
+SILENT = 0
+ERRORS = 1
+TRACE = 2
+
+NIVEIS = {'silent': SILENT, 'errors': ERRORS, 'trace': TRACE}
+
+# Categorias de diagnóstico
+LEXICO = 'lexico'
+SINTATICO = 'sintatico'
+SEMANTICO = 'semantico'
+ENTRADA = 'io'
+EXECUCAO = 'execucao'
+AVISO = 'aviso'
+RASTRO = 'trace'
+
+class Diagnostic:
+    """
+    Mensagem produzida durante a compilação.
+
+    O trecho apontado vai de (line, col) até (end_line, end_col), exclusive;
+    linhas e colunas começam em 1. Sem fim conhecido, o trecho é vazio (o
+    fim é igual ao início), e a posição 0 indica que ela é desconhecida.
+    """
+    __slots__ = ('line', 'col', 'kind', 'message', 'end_line', 'end_col')
+
+    def __init__(self, line, col, kind, message, end_line=None, end_col=None):
+        self.line = line
+        self.col = col
+        self.kind = kind
+        self.message = message
+        self.end_line = line if end_line is None else end_line
+        self.end_col = col if end_col is None else end_col
+
+    @property
+    def span(self):
+        """Tupla (line, col, end_line, end_col)"""
+        return self.line, self.col, self.end_line, self.end_col
+
+    def deslocado(self, linhas):
+        """Cópia com o trecho movido `linhas` linhas para baixo"""
+        return Diagnostic(self.line + linhas, self.col, self.kind, self.message,
+                          self.end_line + linhas, self.end_col)
+
+    @property
+    def is_error(self):
+        return self.kind in (LEXICO, SINTATICO, SEMANTICO, ENTRADA, EXECUCAO)
+
+    def to_dict(self):
+        return {'line': self.line, 'col': self.col, 'end_line': self.end_line, 'end_col': self.end_col,
+                'kind': self.kind, 'message': self.message}
+
+    def __eq__(self, other):
+        if not isinstance(other, Diagnostic):
+            return NotImplemented
+        return (self.line, self.col, self.end_line, self.end_col, self.kind, self.message) == \
+               (other.line, other.col, other.end_line, other.end_col, other.kind, other.message)
+
+    def __repr__(self):
+        return (f"Diagnostic({self.line}, {self.col}, {self.kind!r}, {self.message!r}, "
+                f"{self.end_line}, {self.end_col})")
+
+    def __str__(self):
+        return self.message
+
+def imprimir_diagnostico(diagnostico):
+    """Destino padrão: imprime a mensagem na saída padrão"""
+    print(diagnostico.message)
+
+def imprimir_diagnostico_stderr(diagnostico):
+    """Destino alternativo: imprime a mensagem na saída de erro"""
+    print(diagnostico.message, file=sys.stderr)
+
+class Diagnosticos:
+    """
+    Coletor de diagnósticos de uma compilação.
+
+    Args:
+        nivel: SILENT, ERRORS ou TRACE
+        sink: Função chamada com cada Diagnostic emitido (opcional)
+    """
+    __slots__ = ('nivel', 'sink', 'itens', 'rastreando')
+
+    def __init__(self, nivel=SILENT, sink=None):
+        self.nivel = nivel
+        self.sink = sink if sink is not None else imprimir_diagnostico
+        self.itens = []
+        self.rastreando = nivel >= TRACE
+
+    def _registrar(self, diagnostico):
+        self.itens.append(diagnostico)
+        if self.nivel >= ERRORS:
+            self.sink(diagnostico)
+
+    def erro(self, kind, mensagem, linha=0, coluna=0, fim_linha=None, fim_coluna=None):
+        """Registra um erro léxico, sintático ou semântico"""
+        self._registrar(Diagnostic(linha, coluna, kind, mensagem, fim_linha, fim_coluna))
+
+    def aviso(self, mensagem, linha=0, coluna=0, fim_linha=None, fim_coluna=None):
+        """Registra um aviso (não impede o sucesso da compilação)"""
+        self._registrar(Diagnostic(linha, coluna, AVISO, mensagem, fim_linha, fim_coluna))
+
+    def trace(self, formato, *args):
+        """
+        Emite uma mensagem de rastreamento. Deve ser chamada apenas quando
+        `rastreando` for True; as mensagens não são guardadas em `itens`.
+        """
+        self.sink(Diagnostic(0, 0, RASTRO, formato % args if args else formato))
+
+    @property
+    def erros(self):
+        return [d for d in self.itens if d.is_error]
@@ -0,0 +1,507 @@
+"""
+Tradução da AST para código Python, compilado com compile().
+
+O programa vira uma função Python (montada como ast.Module) em que cada
+variável declarada é uma variável local: laços while/for executam na
+velocidade do bytecode do CPython, sem despacho por nó ou por instrução.
+A função é compilada uma vez e guardada em ProgramaPython; compilar() pode
+ainda guardar o resultado num cache pela chave dada (ex.: o texto fonte).
+
+As regras de tipos são as da análise semântica: cada declaração tem tipo
+estático, então promoções de int para float e conversões de atribuição
+viram chamadas a float()/int()/str() apenas onde necessário; `/` entre ints
+é `//` e `^` chama calcular_potencia (entre ints, o resultado é truncado
+para int).
+
+Verificações sem custo no caminho normal: os nós gerados carregam a linha
+e a coluna do código fonte, e a divisão por zero (ZeroDivisionError do
+próprio Python) ou uma comparação entre tipos incompatíveis (TypeError) é
+convertida em ErroExecucao com a posição tirada do traceback. Só as
+leituras de variáveis que podem não ter sido inicializadas são verificadas
+explicitamente, como no bytecode.
+
+O orçamento de instruções conta como o interpretador: cada comando, cada
+avaliação de condição de laço e cada passo de for. A contagem é somada uma
+vez por entrada de bloco, e os limites são verificados a cada iteração de
+laço.
+
+Uso:
+    python gerador_python.py input6.txt [--fonte]
+"""
+import ast
+import sys
+import time
+from collections import OrderedDict
+
+from ast_nodes import Block, Decl, Assign, While, If, For, Print, Return, Literal, Name
+from diagnostics import Diagnostic, EXECUCAO
+from interpreter import (MAX_INSTRUCOES, TEMPO_LIMITE, INTERVALO_RELOGIO, ErroExecucao,
+                         ResultadoExecucao, formatar_printf)
+from semantic import ErroSemantico, ErroPotencia, calcular_potencia, tipo_resultado
+
+# Número de programas guardados no cache de compilar()
+TAMANHO_CACHE = 128
+
+# Conversões implícitas aceitas e a função Python que as faz
+CONVERSOES = {
+    ("int", "float"): float,
+    ("float", "int"): int,
+    ("int", "char"): str,
+    ("float", "char"): str,
+}
+
+_OPERADORES = {'+': ast.Add, '-': ast.Sub, '*': ast.Mult}
+_COMPARACOES = {'<': ast.Lt, '<=': ast.LtE, '>': ast.Gt, '>=': ast.GtE, '!=': ast.NotEq, '==': ast.Eq}
+
+# Funções auxiliares do código gerado (globais do módulo gerado)
+
+def _nao_inicializada(nome, linha, coluna):
+    raise ErroExecucao(f"Erro de execução na linha {linha}: variável '{nome}' usada antes de ser inicializada",
+                       linha, coluna)
+
+def _potencia_int(base, expoente):
+    return calcular_potencia(base, expoente, "int")
+
+def _potencia_float(base, expoente):
+    return calcular_potencia(base, expoente, "float")
+
+class ProgramaPython:
+    """
+    Programa traduzido e compilado.
+
+    Attributes:
+        modulo: ast.Module gerado
+        funcao: Função Python que executa o programa
+        variaveis: Pares (nome no programa, nome Python) das variáveis do
+                   corpo de main
+        comparacoes: Posições (linha, coluna) das comparações, para
+                     distinguir a mensagem de um TypeError
+    """
+    __slots__ = ('modulo', 'funcao', 'variaveis', 'comparacoes')
+
+    def __init__(self, modulo, funcao, variaveis, comparacoes):
+        self.modulo = modulo
+        self.funcao = funcao
+        self.variaveis = variaveis
+        self.comparacoes = comparacoes
+
+    def fonte(self):
+        """Código Python equivalente ao módulo gerado"""
+        return ast.unparse(self.modulo)
+
+class GeradorPython:
+    """Traduz a AST de um programa para um ast.Module com a função `_programa`"""
+    __slots__ = ('_escopos', '_tipos', '_sufixos', '_atribuidos', '_variaveis', '_comparacoes', '_comandos')
+
+    def __init__(self):
+        self._escopos = [{}]
+        # Tipo de cada variável Python
+        self._tipos = {}
+        self._sufixos = {}
+        # Variáveis certamente atribuídas no ponto atual da tradução
+        self._atribuidos = set()
+        self._variaveis = []
+        self._comparacoes = set()
+        self._comandos = {
+            Decl: self._declaracao,
+            Assign: self._atribuicao,
+            While: self._while,
+            If: self._if,
+            For: self._for,
+            Print: self._impressao,
+            Return: self._retorno,
+            Block: self._bloco,
+        }
+
+    def gerar(self, programa):
+        """
+        Returns:
+            Tupla (ast.Module, variáveis de main, posições das comparações)
+        """
+        corpo = self._comandos_bloco(programa.corpo)
+        if type(corpo[-1]) is not ast.Return:
+            corpo.append(_posicionar(ast.Return(ast.Constant(0)), programa))
+        # `finally` guarda as variáveis (e a contagem) mesmo se houver erro
+        guardar = ast.Expr(ast.Call(ast.Attribute(ast.Name('_estado', ast.Load()), 'update', ast.Load()),
+                                    [ast.Call(ast.Name('locals', ast.Load()), [], [])], []))
+        funcao = ast.FunctionDef(
+            name='_programa',
+            args=ast.arguments(posonlyargs=[], args=[ast.arg(nome) for nome in
+                                                     ('_imprimir', '_verificar', '_limite', '_estado')],
+                               kwonlyargs=[], kw_defaults=[], defaults=[]),
+            body=[ast.Assign([ast.Name('_n', ast.Store())], ast.Constant(0)),
+                  ast.Try(body=corpo, handlers=[], orelse=[], finalbody=[guardar])],
+            decorator_list=[], returns=None)
+        _posicionar(funcao, programa)
+        modulo = ast.fix_missing_locations(ast.Module(body=[funcao], type_ignores=[]))
+        return modulo, self._variaveis, frozenset(self._comparacoes)
+
+    # Nomes
+
+    def _declarar(self, nome, tipo):
+        sufixo = self._sufixos.get(nome, 0)
+        self._sufixos[nome] = sufixo + 1
+        # O sufixo evita palavras reservadas do Python e os nomes auxiliares
+        nome_python = f"{nome}_{sufixo}"
+        self._escopos[-1][nome] = nome_python
+        self._tipos[nome_python] = tipo
+        if len(self._escopos) == 1:
+            self._variaveis.append((nome, nome_python))
+        return nome_python
+
+    def _buscar(self, nome, no):
+        for escopo in reversed(self._escopos):
+            nome_python = escopo.get(nome)
+            if nome_python is not None:
+                return nome_python
+        raise ErroSemantico(f"Erro semântico na linha {no.line}: variável '{nome}' usada mas não declarada",
+                            no.line, no.col)
+
+    def _converter(self, expressao, tipo_origem, tipo_destino, no):
+        if tipo_origem == tipo_destino:
+            return expressao
+        conversao = CONVERSOES.get((tipo_origem, tipo_destino))
+        if conversao is None:
+            raise ErroSemantico(
+                f"Erro semântico na linha {no.line}: não é possível converter '{tipo_origem}' para '{tipo_destino}'",
+                no.line, no.col)
+        if type(expressao) is ast.Constant:
+            return _posicionar(ast.Constant(conversao(expressao.value)), no)
+        return _posicionar(ast.Call(ast.Name(conversao.__name__, ast.Load()), [expressao], []), no)
+
+    # Comandos
+
+    def _comandos_bloco(self, bloco, extras=0):
+        """
+        Traduz os comandos de um bloco, precedidos da contagem de instruções.
+
+        Args:
+            extras: Instruções contadas a cada entrada no bloco além dos
+                    comandos (condição e passo do laço que o contém)
+        """
+        comandos = self._comandos
+        corpo = []
+        contagem = extras
+        for comando in bloco.comandos:
+            contagem += 1
+            if type(comando) in (While, For):
+                # Primeira avaliação da condição
+                contagem += 1
+            corpo.extend(comandos[type(comando)](comando))
+            if type(comando) is Return:
+                break
+        if contagem:
+            corpo.insert(0, _posicionar(ast.AugAssign(ast.Name('_n', ast.Store()), ast.Add(),
+                                                      ast.Constant(contagem)), bloco))
+        return corpo or [_posicionar(ast.Pass(), bloco)]
+
+    def _bloco(self, bloco, extras=0):
+        self._escopos.append({})
+        corpo = self._comandos_bloco(bloco, extras)
+        self._escopos.pop()
+        return corpo
+
+    def _corpo_condicional(self, bloco, extras=0):
+        """
+        Traduz um corpo que pode não ser executado.
+
+        Returns:
+            Tupla (comandos, variáveis certamente atribuídas ao final do corpo)
+        """
+        antes = self._atribuidos
+        self._atribuidos = set(antes)
+        if type(bloco) is If:
+            corpo = self._if(bloco)
+        else:
+            corpo = self._bloco(bloco, extras)
+        depois = self._atribuidos
+        self._atribuidos = antes
+        return corpo, depois
+
+    def _armazenar(self, nome_python, valor, no):
+        expressao, tipo = self._expressao(valor)
+        expressao = self._converter(expressao, tipo, self._tipos[nome_python], no)
+        self._atribuidos.add(nome_python)
+        return [_posicionar(ast.Assign([ast.Name(nome_python, ast.Store())], expressao), no)]
+
+    def _declaracao(self, no):
+        if no.valor is None:
+            nome_python = self._declarar(no.nome, no.tipo)
+            self._atribuidos.discard(nome_python)
+            return [_posicionar(ast.Assign([ast.Name(nome_python, ast.Store())], ast.Constant(None)), no)]
+        # O valor inicial é avaliado antes de o nome entrar no escopo
+        expressao, tipo = self._expressao(no.valor)
+        expressao = self._converter(expressao, tipo, no.tipo, no)
+        nome_python = self._declarar(no.nome, no.tipo)
+        self._atribuidos.add(nome_python)
+        return [_posicionar(ast.Assign([ast.Name(nome_python, ast.Store())], expressao), no)]
+
+    def _atribuicao(self, no):
+        return self._armazenar(self._buscar(no.nome, no), no.valor, no)
+
+    def _verificacao(self, no):
+        """`if _n >= _limite: _limite = _verificar(_n, linha, coluna)`"""
+        chamada = ast.Call(ast.Name('_verificar', ast.Load()),
+                           [ast.Name('_n', ast.Load()), ast.Constant(no.line), ast.Constant(no.col)], [])
+        return _posicionar(ast.If(
+            ast.Compare(ast.Name('_n', ast.Load()), [ast.GtE()], [ast.Name('_limite', ast.Load())]),
+            [ast.Assign([ast.Name('_limite', ast.Store())], chamada)], []), no)
+
+    def _while(self, no):
+        condicao = self._condicao(no.condicao)
+        # Cada iteração conta o corpo e a próxima avaliação da condição
+        corpo, _ = self._corpo_condicional(no.corpo, extras=1)
+        return [_posicionar(ast.While(condicao, [self._verificacao(no)] + corpo, []), no)]
+
+    def _if(self, no):
+        condicao = self._condicao(no.condicao)
+        entao, atribuidos = self._corpo_condicional(no.entao)
+        senao = []
+        if no.senao is not None:
+            senao, atribuidos_senao = self._corpo_condicional(no.senao)
+            # Após o if/else, só o que foi atribuído nos dois ramos é garantido
+            self._atribuidos |= atribuidos & atribuidos_senao
+        return [_posicionar(ast.If(condicao, entao, senao), no)]
+
+    def _for(self, no):
+        self._escopos.append({})
+        inicio = self._comandos[type(no.inicio)](no.inicio)
+        condicao = self._condicao(no.condicao)
+        antes = self._atribuidos
+        self._atribuidos = set(antes)
+        # Cada iteração conta o corpo, o passo e a próxima avaliação da condição
+        corpo = self._bloco(no.corpo, extras=2)
+        passo = self._atribuicao(no.passo)
+        self._atribuidos = antes
+        self._escopos.pop()
+        laco = ast.While(condicao, [self._verificacao(no)] + corpo + passo, [])
+        return inicio + [_posicionar(laco, no)]
+
+    def _impressao(self, no):
+        argumentos = [self._expressao(argumento)[0] for argumento in no.argumentos]
+        chamada = ast.Call(ast.Name('_imprimir', ast.Load()),
+                           [ast.Constant(no.formato), _posicionar(ast.Tuple(argumentos, ast.Load()), no),
+                            ast.Constant(no.line), ast.Constant(no.col)], [])
+        return [_posicionar(ast.Expr(chamada), no)]
+
+    def _retorno(self, no):
+        return [_posicionar(ast.Return(self._expressao(no.valor)[0]), no)]
+
+    # Expressões
+
+    def _condicao(self, cond):
+        esquerda, _ = self._expressao(cond.esquerda)
+        direita, _ = self._expressao(cond.direita)
+        self._comparacoes.add((max(cond.line, 1), cond.col))
+        return _posicionar(ast.Compare(esquerda, [_COMPARACOES[cond.op]()], [direita]), cond)
+
+    def _expressao(self, expressao):
+        """
+        Returns:
+            Tupla (expressão Python, tipo)
+        """
+        tipo_no = type(expressao)
+        if tipo_no is Literal:
+            return _posicionar(ast.Constant(expressao.valor), expressao), expressao.tipo
+        if tipo_no is Name:
+            nome_python = self._buscar(expressao.nome, expressao)
+            leitura = _posicionar(ast.Name(nome_python, ast.Load()), expressao)
+            if nome_python not in self._atribuidos:
+                # `x if x is not None else _nao_inicializada(...)`
+                erro = ast.Call(ast.Name('_nao_inicializada', ast.Load()),
+                                [ast.Constant(expressao.nome), ast.Constant(expressao.line),
+                                 ast.Constant(expressao.col)], [])
+                teste = ast.Compare(ast.Name(nome_python, ast.Load()), [ast.IsNot()], [ast.Constant(None)])
+                leitura = _posicionar(ast.IfExp(teste, leitura, erro), expressao)
+            return leitura, self._tipos[nome_python]
+
+        esquerda, tipo_esquerda = self._expressao(expressao.esquerda)
+        direita, tipo_direita = self._expressao(expressao.direita)
+        tipo = tipo_resultado(tipo_esquerda, tipo_direita)
+        esquerda = self._converter(esquerda, tipo_esquerda, tipo, expressao)
+        direita = self._converter(direita, tipo_direita, tipo, expressao)
+        op = expressao.op
+        if op in _OPERADORES:
+            return _posicionar(ast.BinOp(esquerda, _OPERADORES[op](), direita), expressao), tipo
+        if op == '/':
+            # A posição da divisão é a do divisor, como no interpretador
+            operador = ast.FloorDiv() if tipo == "int" else ast.Div()
+            return _posicionar(ast.BinOp(esquerda, operador, direita), expressao.direita), tipo
+        # Potências passam por calcular_potencia, que limita o tamanho do
+        # resultado e rejeita resultados sem valor real
+        auxiliar = '_potencia_int' if tipo == "int" else '_potencia_float'
+        return _posicionar(ast.Call(ast.Name(auxiliar, ast.Load()), [esquerda, direita], []),
+                           expressao), tipo
+
+def _posicionar(no_python, no):
+    """Copia a posição do nó da AST do programa para o nó Python"""
+    no_python.lineno = no_python.end_lineno = max(no.line, 1)
+    no_python.col_offset = no_python.end_col_offset = no.col
+    return no_python
+
+_cache = OrderedDict()
+
+def compilar(programa, chave=None):
+    """
+    Traduz e compila a AST de um programa.
+
+    Args:
+        programa: AST (Program)
+        chave: Se dada (ex.: o texto fonte), o resultado é guardado num
+               cache LRU de TAMANHO_CACHE entradas e reaproveitado
+
+    Returns:
+        ProgramaPython
+
+    Raises:
+        ErroSemantico: Se o programa não passou pela análise semântica
+    """
+    if chave is not None:
+        compilado = _cache.get(chave)
+        if compilado is not None:
+            _cache.move_to_end(chave)
+            return compilado
+    modulo, variaveis, comparacoes = GeradorPython().gerar(programa)
+    globais = {
+        '__builtins__': __builtins__,
+        '_nao_inicializada': _nao_inicializada,
+        '_potencia_int': _potencia_int,
+        '_potencia_float': _potencia_float,
+    }
+    exec(compile(modulo, '<programa>', 'exec'), globais)
+    compilado = ProgramaPython(modulo, globais['_programa'], variaveis, comparacoes)
+    if chave is not None:
+        _cache[chave] = compilado
+        if len(_cache) > TAMANHO_CACHE:
+            _cache.popitem(last=False)
+    return compilado
+
+def _posicao_erro(compilado, traceback):
+    """Linha e coluna do código fonte onde a exceção ocorreu"""
+    codigo = compilado.funcao.__code__
+    posicao = (0, 0)
+    while traceback is not None:
+        if traceback.tb_frame.f_code is codigo:
+            linha, _, coluna, _ = list(codigo.co_positions())[traceback.tb_lasti // 2]
+            posicao = (linha or 0, coluna or 0)
+        traceback = traceback.tb_next
+    return posicao
+
+class ExecutorPython:
+    """
+    Executa um ProgramaPython.
+
+    Args:
+        max_instrucoes: Orçamento de instruções (None para ilimitado)
+        tempo_limite: Tempo máximo de execução em segundos (None para ilimitado)
+        eco: Função chamada com cada texto impresso por printf
+    """
+    __slots__ = ('max_instrucoes', 'tempo_limite', 'eco')
+
+    def __init__(self, max_instrucoes=MAX_INSTRUCOES, tempo_limite=TEMPO_LIMITE, eco=None):
+        self.max_instrucoes = max_instrucoes
+        self.tempo_limite = tempo_limite
+        self.eco = eco
+
+    def executar(self, compilado):
+        """
+        Returns:
+            ResultadoExecucao
+        """
+        saida = []
+        eco = self.eco
+        max_instrucoes = self.max_instrucoes
+        tempo_limite = self.tempo_limite
+        inicio = time.perf_counter()
+        prazo = inicio + tempo_limite if tempo_limite is not None else None
+
+        def imprimir(formato, valores, linha, coluna):
+            texto = formatar_printf(formato, valores, linha, coluna)
+            saida.append(texto)
+            if eco is not None:
+                eco(texto)
+
+        def limite(instrucoes):
+            proximo = instrucoes + INTERVALO_RELOGIO
+            return proximo if max_instrucoes is None else min(proximo, max_instrucoes + 1)
+
+        def verificar(instrucoes, linha, coluna):
+            if max_instrucoes is not None and instrucoes > max_instrucoes:
+                raise ErroExecucao(f"Erro de execução na linha {linha}: limite de {max_instrucoes} instruções excedido",
+                                   linha, coluna)
+            if prazo is not None and time.perf_counter() > prazo:
+                raise ErroExecucao(f"Erro de execução na linha {linha}: tempo limite de {tempo_limite} s excedido",
+                                   linha, coluna)
+            return limite(instrucoes)
+
+        estado = {}
+        retorno = 0
+        erro = None
+        try:
+            retorno = compilado.funcao(imprimir, verificar, limite(0), estado)
+        except ErroExecucao as e:
+            erro = Diagnostic(e.linha, e.coluna, EXECUCAO, e.mensagem)
+        except ZeroDivisionError as e:
+            linha, coluna = _posicao_erro(compilado, e.__traceback__)
+            erro = Diagnostic(linha, coluna, EXECUCAO, f"Erro de execução na linha {linha}: divisão por zero")
+        except TypeError as e:
+            linha, coluna = _posicao_erro(compilado, e.__traceback__)
+            operacao = "comparação" if (linha, coluna) in compilado.comparacoes else "operação"
+            erro = Diagnostic(linha, coluna, EXECUCAO,
+                              f"Erro de execução na linha {linha}: {operacao} entre tipos incompatíveis")
+        except OverflowError as e:
+            linha, coluna = _posicao_erro(compilado, e.__traceback__)
+            erro = Diagnostic(linha, coluna, EXECUCAO, f"Erro de execução na linha {linha}: resultado fora do intervalo")
+        except ErroPotencia as e:
+            linha, coluna = _posicao_erro(compilado, e.__traceback__)
+            erro = Diagnostic(linha, coluna, EXECUCAO, f"Erro de execução na linha {linha}: {e}")
+        tempo = time.perf_counter() - inicio
+
+        variaveis = {nome: estado.get(nome_python) for nome, nome_python in compilado.variaveis}
+        return ResultadoExecucao(variaveis, ''.join(saida), retorno, estado.get('_n', 0), tempo, erro)
+
+def executar(programa, max_instrucoes=MAX_INSTRUCOES, tempo_limite=TEMPO_LIMITE, eco=None):
+    """Executa um ProgramaPython (ou a AST de um programa, compilada antes)"""
+    if not isinstance(programa, ProgramaPython):
+        try:
+            programa = compilar(programa)
+        except ErroSemantico as e:
+            return ResultadoExecucao.nao_executado(e)
+    return ExecutorPython(max_instrucoes, tempo_limite, eco).executar(programa)
+
+def main(argv=None):
+    """Compila um arquivo fonte para Python e o executa"""
+    import argparse
+    from diagnostics import ERRORS
+    from sintatic_analyser import Compiler
+
+    argumentos = argparse.ArgumentParser(description="Executa um programa traduzido para código Python.")
+    argumentos.add_argument('arquivo', nargs='?', default="input.txt", help="arquivo fonte (padrão: input.txt)")
+    argumentos.add_argument('--fonte', action='store_true', help="mostra o código Python gerado em vez de executar")
+    argumentos.add_argument('--max-instrucoes', type=int, default=MAX_INSTRUCOES,
+                            help=f"orçamento de instruções (padrão: {MAX_INSTRUCOES})")
+    argumentos.add_argument('--tempo-limite', type=float, default=TEMPO_LIMITE,
+                            help=f"tempo máximo de execução em segundos (padrão: {TEMPO_LIMITE})")
+    args = argumentos.parse_args(argv)
+
+    with open(args.arquivo, 'r') as arquivo:
+        compilacao = Compiler(ERRORS).compile(arquivo.read())
+    if not compilacao.sucesso:
+        return 1
+    compilado = compilar(compilacao.ast)
+    if args.fonte:
+        print(compilado.fonte())
+        return 0
+    resultado = ExecutorPython(args.max_instrucoes, args.tempo_limite, sys.stdout.write).executar(compilado)
+    if resultado.erro is not None:
+        print(resultado.erro.message, file=sys.stderr)
+    print("\n=== Estado final ===")
+    for nome, valor in resultado.variaveis.items():
+        print(f"  {nome}: {valor!r}")
+    print(f"\n{resultado.instrucoes} instruções em {resultado.tempo * 1000:.3f} ms")
+    if not resultado.sucesso:
+        return 1
+    return resultado.retorno if isinstance(resultado.retorno, int) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,718 @@
+"""
+Análise incremental para editores.
+
+Um DocumentoIncremental mantém o texto de um programa dividido em comandos
+de primeiro nível (os filhos do corpo de main). Para cada comando guarda a
+posição no texto, a subárvore da AST e o resultado da análise semântica.
+editar(inicio, removidos, inseridos) aplica uma alteração do texto:
+
+    léxico     o texto é tokenizado de novo a partir do fim do último
+               comando anterior à alteração, até reencontrar, depois dela,
+               o início de um comando antigo (ressincronização); os comandos
+               seguintes são reaproveitados
+    sintático  cada comando tokenizado de novo é analisado isoladamente,
+               entre os tokens de `int main() {` e `};` do próprio documento
+    semântico  o resultado de um comando depende apenas do estado (tipo e
+               valor) das variáveis que ele menciona. Cada comando guarda o
+               estado que leu e o que deixou; depois da alteração só são
+               reanalisados os comandos que mencionam variáveis cujo estado
+               mudou, em ordem, até que nenhuma diferença reste
+
+As posições dos comandos funcionam como um gap buffer em torno de um cursor
+(o ponto da última edição): os comandos antes dele guardam posição, linhas e
+índice contados a partir do início; os depois dele, contados a partir do fim
+(do texto, da linha do `};` e da lista), que uma edição anterior a eles não
+altera. Mover o cursor custa apenas os comandos entre a edição anterior e a
+atual. Assim, o trabalho de cada edição cresce com o tamanho da alteração,
+com o número de comandos afetados por ela e com a distância até a edição
+anterior, não com o tamanho do arquivo. As linhas dos nós da AST e dos
+diagnósticos dos comandos deslocados são corrigidas sob demanda.
+
+O resultado é o mesmo de Compiler.compile sobre o texto completo, com duas
+exceções: um comando com erro de sintaxe informa apenas o seu primeiro erro
+(o parser completo se recupera no `;` ou `}` seguinte e pode informar
+outros, inclusive no mesmo comando), e alterações no
+cabeçalho `int main() {`, no `};` final ou que deixam as chaves
+desbalanceadas fazem o documento ser compilado por inteiro, como fallback.
+
+Uso:
+    documento = DocumentoIncremental(texto)
+    documento.editar(120, 1, "7")
+    documento.diagnosticos          # diagnósticos do texto atual
+    documento.resultado()           # CompilationResult completo
+"""
+import bisect
+
+from ply.lex import LexToken # type: ignore
+
+from ast_nodes import Program, Block
+from diagnostics import Diagnosticos
+from semantic import AnalisadorSemantico
+from sintatic_analyser import Compiler, CompilationResult, em_compilacao
+from symbol_table import SymbolTable
+
+_CABECALHO = ('INT', 'MAIN', 'LPAREN', 'RPAREN', 'LBRACES')
+
+class EstruturaInvalida(Exception):
+    """O texto não tem a forma `int main() { comandos };` esperada"""
+
+class Segmento:
+    """
+    Comando de primeiro nível do corpo de main.
+
+    Attributes:
+        inicio, fim: Posição do primeiro token e fim do último no texto
+        linha, linha_fim: Linhas do primeiro e do último token
+        indice: Posição do segmento na lista do documento
+        absoluto: Se False, os cinco campos acima são contados a partir do
+                  fim (do texto, da linha do `};` e da lista)
+        linha_ast: Linha do primeiro token quando a AST foi construída; a
+                   diferença para a linha atual ainda não foi aplicada aos nós
+        termina_em_chave: O último token é `}` (um `else` seguinte o estenderia)
+        comandos: Nós da AST do comando, ou None se houve erro de sintaxe
+        diag_sintaxe: Erros léxicos e sintáticos do trecho do comando
+        nomes: Variáveis mencionadas pelo comando
+        leituras: Estado (tipo, valor) ou None de cada nome antes da análise
+        efeitos: Estado de cada nome depois da análise (None antes dela)
+        declarados: Símbolos declarados pelo comando, na ordem
+        diag_semantica: Diagnósticos da análise semântica do comando
+    """
+    __slots__ = ('inicio', 'fim', 'linha', 'linha_fim', 'indice', 'absoluto', 'linha_ast',
+                 'termina_em_chave', 'comandos', 'diag_sintaxe', 'nomes', 'leituras',
+                 'efeitos', 'declarados', 'diag_semantica')
+
+    def __init__(self, inicio, fim, linha, linha_fim, termina_em_chave, comandos, diag_sintaxe):
+        self.inicio = inicio
+        self.fim = fim
+        self.linha = linha
+        self.linha_fim = linha_fim
+        self.indice = 0
+        self.absoluto = True
+        self.linha_ast = linha
+        self.termina_em_chave = termina_em_chave
+        self.comandos = comandos
+        self.diag_sintaxe = diag_sintaxe
+        self.nomes = _nomes_mencionados(comandos) if comandos is not None else ()
+        self.leituras = None
+        self.efeitos = None
+        self.declarados = ()
+        self.diag_semantica = ()
+
+    def __repr__(self):
+        return f"Segmento(nomes={self.nomes}, diagnosticos={len(self.diag_semantica)})"
+
+def _nomes_mencionados(comandos):
+    """Nomes de variáveis lidos, declarados ou atribuídos pelos comandos"""
+    nomes = set()
+    pilha = list(comandos)
+    while pilha:
+        no = pilha.pop()
+        nome = getattr(no, 'nome', None)
+        if nome is not None:
+            nomes.add(nome)
+        pilha.extend(no.filhos())
+    return tuple(sorted(nomes))
+
+def _deslocar_linhas(comandos, delta):
+    pilha = list(comandos)
+    while pilha:
+        no = pilha.pop()
+        no.line += delta
+        pilha.extend(no.filhos())
+
+def _estado(simbolo):
+    return None if simbolo is None else (simbolo.tipo, simbolo.valor)
+
+class _FluxoTokens:
+    """
+    Tokens do lexer com uma posição de antecipação. Cada token vem com o fim
+    do seu texto e os erros léxicos encontrados antes dele, e recebe a
+    coluna: um índice de linhas (posicoes.py) custaria uma passada pelo
+    texto inteiro a cada edição, então ela é medida a partir da última
+    quebra de linha.
+    """
+    __slots__ = ('lexer', 'itens', '_proximo', 'lidos')
+
+    def __init__(self, lexer, itens):
+        self.lexer = lexer
+        self.itens = itens
+        self._proximo = None
+        self.lidos = 0
+
+    def _ler(self):
+        antes = len(self.itens)
+        token = self.lexer.token()
+        erros = self.itens[antes:]
+        if erros:
+            del self.itens[antes:]
+        if token is not None:
+            self.lidos += 1
+            token.coluna = _coluna(self.lexer.lexdata, token.lexpos)
+        return token, self.lexer.lexpos, erros
+
+    def espiar(self):
+        if self._proximo is None:
+            self._proximo = self._ler()
+        return self._proximo[0]
+
+    def proximo(self):
+        if self._proximo is not None:
+            item, self._proximo = self._proximo, None
+            return item
+        return self._ler()
+
+class EstatisticaEdicao:
+    """
+    Trabalho feito numa edição.
+
+    Attributes:
+        completa: O documento foi reconstruído por inteiro
+        tokens: Tokens produzidos pelo lexer
+        comandos_analisados: Comandos tokenizados e analisados de novo
+        comandos_reutilizados: Comandos seguintes reaproveitados
+        reanalises_semanticas: Comandos cuja análise semântica foi refeita
+    """
+    __slots__ = ('completa', 'tokens', 'comandos_analisados', 'comandos_reutilizados',
+                 'reanalises_semanticas')
+
+    def __init__(self):
+        self.completa = False
+        self.tokens = 0
+        self.comandos_analisados = 0
+        self.comandos_reutilizados = 0
+        self.reanalises_semanticas = 0
+
+    def to_dict(self):
+        return {
+            'full': self.completa,
+            'tokens': self.tokens,
+            'statements_reparsed': self.comandos_analisados,
+            'statements_reused': self.comandos_reutilizados,
+            'semantic_reanalyses': self.reanalises_semanticas,
+        }
+
+def _fechamento(fim, linha):
+    """Tokens `};` que encerram o parse isolado de um comando"""
+    tokens = []
+    for tipo in ('RBRACES', 'SEMICOLON'):
+        token = LexToken()
+        token.type = tipo
+        token.value = '}' if tipo == 'RBRACES' else ';'
+        token.lineno = linha
+        token.lexpos = fim
+        token.coluna = 0
+        tokens.append(token)
+    return tokens
+
+def _coluna(texto, lexpos):
+    return lexpos - texto.rfind('\n', 0, lexpos)
+
+class DocumentoIncremental:
+    """
+    Texto de um programa mantido analisado entre edições.
+
+    Os nós da AST e os símbolos devolvidos por resultado() são
+    compartilhados com o documento e não devem ser modificados.
+
+    Args:
+        texto: Texto inicial
+        compilador: Compiler de onde vêm o lexer e o parser (padrão: um
+                    Compiler novo, que reaproveita as tabelas do processo)
+    """
+
+    def __init__(self, texto, compilador=None):
+        self._compilador = compilador if compilador is not None else Compiler()
+        self._lexer = self._compilador.novo_lexer()
+        self._parser = self._compilador.novo_parser()
+        self.texto = texto
+        self.ultima_edicao = EstatisticaEdicao()
+        self._reconstruir(self.ultima_edicao)
+
+    def editar(self, inicio, removidos, inseridos):
+        """
+        Substitui `removidos` caracteres a partir de `inicio` por `inseridos`
+        e atualiza a análise.
+
+        Returns:
+            EstatisticaEdicao com o trabalho feito
+        """
+        if inicio < 0 or removidos < 0 or inicio + removidos > len(self.texto):
+            raise ValueError(f"edição fora do texto: {inicio}+{removidos} de {len(self.texto)}")
+        self.texto = self.texto[:inicio] + inseridos + self.texto[inicio + removidos:]
+        estatistica = self.ultima_edicao = EstatisticaEdicao()
+        if (self._segmentos is None or inicio < self._fim_prefixo
+                or inicio + removidos > self._inicio_sufixo):
+            self._reconstruir(estatistica)
+            return estatistica
+        try:
+            self._reparar(inicio, removidos, len(inseridos), estatistica)
+        except EstruturaInvalida:
+            self._reconstruir(estatistica)
+        return estatistica
+
+    # ------------------------------------------------------------------
+    # Posições (gap buffer em torno do cursor)
+
+    def _indice(self, segmento):
+        return segmento.indice if segmento.absoluto else len(self._segmentos) - segmento.indice
+
+    def _linha(self, segmento):
+        return segmento.linha if segmento.absoluto else self._linha_sufixo - segmento.linha
+
+    def _mover_cursor(self, cursor, tamanho):
+        """
+        Deixa contados a partir do início exatamente os segmentos antes de
+        `cursor`; `tamanho` é o comprimento do texto em que as posições
+        relativas foram medidas.
+        """
+        segmentos = self._segmentos
+        linha_sufixo, total = self._linha_sufixo, len(segmentos)
+        if cursor > self._cursor:
+            trecho, absoluto = segmentos[self._cursor:cursor], True
+        else:
+            trecho, absoluto = segmentos[cursor:self._cursor], False
+        for segmento in trecho:
+            segmento.absoluto = absoluto
+            segmento.inicio = tamanho - segmento.inicio
+            segmento.fim = tamanho - segmento.fim
+            segmento.linha = linha_sufixo - segmento.linha
+            segmento.linha_fim = linha_sufixo - segmento.linha_fim
+            segmento.indice = total - segmento.indice
+        self._cursor = cursor
+
+    # ------------------------------------------------------------------
+    # Análise léxica e sintática
+
+    def _reconstruir(self, estatistica):
+        estatistica.completa = True
+        self._completo = None
+        try:
+            self._construir(estatistica)
+        except EstruturaInvalida:
+            # Sem a forma `int main() { comandos };`, o texto é compilado por inteiro
+            self._segmentos = None
+            self._completo = self._compilador.compile(self.texto)
+
+    def _construir(self, estatistica):
+        diagnosticos = Diagnosticos()
+        with em_compilacao(diagnosticos):
+            fluxo = self._iniciar_fluxo(0, 1, diagnosticos.itens)
+            self._prefixo = []
+            self._diag_prefixo = []
+            for tipo in _CABECALHO:
+                token, fim, erros = fluxo.proximo()
+                self._diag_prefixo.extend(erros)
+                if token is None or token.type != tipo:
+                    raise EstruturaInvalida()
+                self._prefixo.append(token)
+            self._fim_prefixo = fim
+            segmentos = []
+            while True:
+                token = fluxo.espiar()
+                if token is None:
+                    raise EstruturaInvalida()
+                if token.type == 'RBRACES':
+                    break
+                segmentos.append(self._ler_segmento(fluxo))
+            if not segmentos:
+                raise EstruturaInvalida()
+            self._ler_sufixo(fluxo)
+        estatistica.tokens = fluxo.lidos
+        estatistica.comandos_analisados = len(segmentos)
+
+        self._segmentos = segmentos
+        self._cursor = len(segmentos)
+        self._mencoes = {}
+        self._com_diagnosticos = set()
+        for indice, segmento in enumerate(segmentos):
+            segmento.indice = indice
+            for nome in segmento.nomes:
+                self._mencoes.setdefault(nome, []).append(segmento)
+            if segmento.diag_sintaxe:
+                self._com_diagnosticos.add(segmento)
+        self._erros_sintaticos = sum(1 for s in segmentos if s.comandos is None)
+        self._analisados = 0
+        if not self._erros_sintaticos:
+            self._validar_ate_o_fim(0, estatistica)
+
+    def _iniciar_fluxo(self, posicao, linha, itens):
+        lexer = self._lexer
+        lexer.input(self.texto)
+        lexer.lexpos = posicao
+        lexer.lineno = linha
+        lexer.linhas = None
+        return _FluxoTokens(lexer, itens)
+
+    def _ler_segmento(self, fluxo):
+        """Lê os tokens de um comando de primeiro nível e o analisa"""
+        tokens = []
+        diagnosticos = []
+        chaves = parenteses = 0
+        while True:
+            token, fim, erros = fluxo.proximo()
+            if token is None:
+                raise EstruturaInvalida()
+            diagnosticos.extend(erros)
+            tokens.append(token)
+            tipo = token.type
+            if tipo == 'LPAREN':
+                parenteses += 1
+            elif tipo == 'RPAREN':
+                parenteses -= 1
+            elif tipo == 'LBRACES':
+                chaves += 1
+            elif tipo == 'RBRACES':
+                chaves -= 1
+                if chaves < 0:
+                    raise EstruturaInvalida()
+                if chaves == 0:
+                    seguinte = fluxo.espiar()
+                    if seguinte is None or seguinte.type != 'ELSE':
+                        break
+            elif tipo == 'SEMICOLON' and chaves == 0 and parenteses <= 0:
+                break
+        primeiro = tokens[0]
+        comandos = self._analisar_sintaxe(tokens, fim, diagnosticos)
+        return Segmento(primeiro.lexpos, fim, primeiro.lineno, token.lineno,
+                        tipo == 'RBRACES', comandos, diagnosticos)
+
+    def _ler_sufixo(self, fluxo):
+        """Lê o `};` final, que precisa ser seguido pelo fim do texto"""
+        self._diag_sufixo = []
+        for tipo in ('RBRACES', 'SEMICOLON'):
+            token, _, erros = fluxo.proximo()
+            if token is None or token.type != tipo:
+                raise EstruturaInvalida()
+            if tipo == 'RBRACES':
+                self._inicio_sufixo = token.lexpos
+                self._linha_sufixo = token.lineno
+                self._diag_antes_sufixo = erros
+            else:
+                self._diag_sufixo.extend(erros)
+        token, _, erros = fluxo.proximo()
+        if token is not None:
+            raise EstruturaInvalida()
+        self._diag_sufixo.extend(erros)
+
+    def _analisar_sintaxe(self, tokens, fim, diagnosticos):
+        """
+        Analisa os tokens de um comando entre o cabeçalho do documento e um
+        `};`. Retorna os nós do comando ou None, acrescentando a
+        `diagnosticos` o primeiro erro de sintaxe. Os erros seguintes, depois
+        da recuperação do parser, podem vir do `};` artificial e não são
+        informados.
+        """
+        sequencia = iter(self._prefixo + tokens + _fechamento(fim, tokens[-1].lineno))
+        erros = Diagnosticos()
+        with em_compilacao(erros):
+            programa = self._parser.parse(lexer=self._lexer,
+                                          tokenfunc=lambda: next(sequencia, None))
+        if programa is None or erros.itens:
+            diagnosticos.extend(erros.itens[:1])
+            return None
+        return programa.corpo.comandos
+
+    def _reparar(self, inicio, removidos, inseridos, estatistica):
+        """Tokeniza e analisa de novo apenas os comandos alcançados pela edição"""
+        segmentos = self._segmentos
+        delta = inseridos - removidos
+        fim_edicao = inicio + inseridos
+        tamanho = len(self.texto)
+        anterior = tamanho - delta
+
+        # Primeiro comando danificado: o primeiro que termina na alteração ou
+        # depois dela; um comando terminado em `}` seria estendido por um
+        # `else` inserido logo depois, então também é refeito. A busca usa as
+        # posições do texto anterior à edição.
+        k = bisect.bisect_left(segmentos, inicio,
+                               key=lambda s: s.fim if s.absoluto else anterior - s.fim)
+        if k and segmentos[k - 1].termina_em_chave:
+            k -= 1
+        self._mover_cursor(k, anterior)
+        if k:
+            posicao, linha = segmentos[k - 1].fim, segmentos[k - 1].linha_fim
+        else:
+            posicao, linha = self._fim_prefixo, self._prefixo[-1].lineno
+
+        # Os segmentos a partir de k são contados a partir do fim, que a
+        # edição não altera
+        diagnosticos = Diagnosticos()
+        novos = []
+        j = k
+        with em_compilacao(diagnosticos):
+            fluxo = self._iniciar_fluxo(posicao, linha, diagnosticos.itens)
+            while True:
+                token = fluxo.espiar()
+                if token is None:
+                    raise EstruturaInvalida()
+                if token.type == 'RBRACES':
+                    # Chegou ao `};` final sem ressincronizar antes
+                    if token.lexpos - delta != self._inicio_sufixo:
+                        raise EstruturaInvalida()
+                    _, _, erros = fluxo.proximo()
+                    j = len(segmentos)
+                    break
+                if posicao > inicio and posicao >= fim_edicao:
+                    while j < len(segmentos) and tamanho - segmentos[j].inicio < token.lexpos:
+                        j += 1
+                    # O comando antigo j começa aqui; as colunas dele só se
+                    # mantêm se a edição terminou numa linha anterior
+                    if (j < len(segmentos) and tamanho - segmentos[j].inicio == token.lexpos
+                            and self.texto.find('\n', fim_edicao, token.lexpos) != -1):
+                        break
+                segmento = self._ler_segmento(fluxo)
+                novos.append(segmento)
+                posicao = segmento.fim
+
+        estatistica.tokens = fluxo.lidos
+        estatistica.comandos_analisados = len(novos)
+        if j == len(segmentos):
+            delta_linhas = token.lineno - self._linha_sufixo
+            self._diag_antes_sufixo = erros
+        else:
+            delta_linhas = token.lineno - self._linha(segmentos[j])
+
+        removidos_segmentos = segmentos[k:j]
+        antigo = self._analisados
+        mencoes = self._mencoes
+        for segmento in removidos_segmentos:
+            indice = self._indice(segmento)
+            for nome in segmento.nomes:
+                lista = mencoes[nome]
+                del lista[bisect.bisect_left(lista, indice, key=self._indice)]
+            self._com_diagnosticos.discard(segmento)
+
+        self._deslocar_sufixo(delta, delta_linhas)
+        segmentos[k:j] = novos
+        for indice, segmento in enumerate(novos, k):
+            segmento.indice = indice
+        self._cursor = k + len(novos)
+        estatistica.comandos_reutilizados = len(segmentos) - len(novos)
+        for segmento in novos:
+            for nome in segmento.nomes:
+                bisect.insort(mencoes.setdefault(nome, []), segmento, key=self._indice)
+            if segmento.diag_sintaxe:
+                self._com_diagnosticos.add(segmento)
+        self._erros_sintaticos += (sum(1 for s in novos if s.comandos is None)
+                                   - sum(1 for s in removidos_segmentos if s.comandos is None))
+
+        self._atualizar_semantica(k, removidos_segmentos, len(novos), antigo, estatistica)
+
+    def _deslocar_sufixo(self, delta, delta_linhas):
+        self._inicio_sufixo += delta
+        self._linha_sufixo += delta_linhas
+        if delta_linhas:
+            self._diag_antes_sufixo = [d.deslocado(delta_linhas) for d in self._diag_antes_sufixo]
+            self._diag_sufixo = [d.deslocado(delta_linhas) for d in self._diag_sufixo]
+
+    # ------------------------------------------------------------------
+    # Análise semântica
+
+    def _atualizar_semantica(self, k, removidos, novos, antigo, estatistica):
+        """
+        Refaz a análise semântica depois da troca dos comandos [k, k + novos).
+
+        Args:
+            removidos: Segmentos que ocupavam a região antes da edição
+            antigo: Quantos segmentos tinham análise válida antes da edição
+        """
+        if self._erros_sintaticos:
+            # Com erro de sintaxe não há análise semântica, como em compile()
+            self._analisados = min(antigo, k)
+            return
+        if antigo <= k:
+            self._validar_ate_o_fim(antigo, estatistica)
+            return
+        r = len(removidos)
+        if antigo < k + r:
+            # A análise antiga terminava dentro da região alterada
+            self._validar_ate_o_fim(k, estatistica)
+            return
+
+        self._analisados = k
+        self._validar(k, k + novos, estatistica)
+        # Variáveis cujo estado depois da região mudou com a edição
+        diferencas = {}
+        nomes = set()
+        for segmento in removidos:
+            nomes.update(segmento.nomes)
+        for segmento in self._segmentos[k:k + novos]:
+            nomes.update(segmento.nomes)
+        for nome in nomes:
+            anterior = self._estado_antes(k, nome)
+            for segmento in reversed(removidos):
+                if nome in segmento.efeitos:
+                    anterior = segmento.efeitos[nome]
+                    break
+            atual = self._estado_antes(k + novos, nome)
+            if atual != anterior:
+                diferencas[nome] = atual
+        self._propagar(diferencas, k + novos, antigo - r + novos, estatistica)
+
+    def _propagar(self, diferencas, inicio, limite, estatistica):
+        """
+        Reanalisa, em ordem, os comandos de [inicio, limite) que mencionam
+        variáveis de `diferencas` (nome -> estado atual, diferente do estado
+        que os comandos seguintes leram na análise anterior). Os demais
+        continuam válidos.
+        """
+        segmentos = self._segmentos
+        mencoes = self._mencoes
+        chave = self._indice
+        posicao = inicio
+        while diferencas:
+            proximo = limite
+            for nome in diferencas:
+                lista = mencoes[nome]
+                i = bisect.bisect_left(lista, posicao, key=chave)
+                if i < len(lista):
+                    proximo = min(proximo, chave(lista[i]))
+            if proximo >= limite:
+                break
+            segmento = segmentos[proximo]
+            leituras = segmento.leituras
+            entrada = {nome: diferencas[nome] if nome in diferencas else leituras[nome]
+                       for nome in segmento.nomes}
+            anteriores = segmento.efeitos
+            self._analisar(segmento, entrada, estatistica)
+            for nome, estado in segmento.efeitos.items():
+                if anteriores is not None and anteriores[nome] == estado:
+                    diferencas.pop(nome, None)
+                else:
+                    diferencas[nome] = estado
+            posicao = proximo + 1
+
+        self._analisados = limite
+        if limite < len(segmentos):
+            self._validar_ate_o_fim(limite, estatistica)
+
+    def _validar_ate_o_fim(self, inicio, estatistica):
+        self._validar(inicio, len(self._segmentos), estatistica)
+        self._analisados = len(self._segmentos)
+
+    def _validar(self, inicio, fim, estatistica):
+        """
+        Confere em ordem os comandos de [inicio, fim), supondo válidos os
+        anteriores: um comando cujo estado de entrada é o mesmo que ele leu
+        na última análise é reaproveitado, os demais são reanalisados.
+        """
+        segmentos = self._segmentos
+        for indice in range(inicio, fim):
+            segmento = segmentos[indice]
+            entrada = {nome: self._estado_antes(indice, nome) for nome in segmento.nomes}
+            if segmento.leituras != entrada:
+                self._analisar(segmento, entrada, estatistica)
+
+    def _estado_antes(self, indice, nome):
+        """Estado de `nome` antes do comando `indice` (None se não declarado)"""
+        lista = self._mencoes.get(nome)
+        if not lista:
+            return None
+        i = bisect.bisect_left(lista, indice, key=self._indice)
+        return lista[i - 1].efeitos[nome] if i else None
+
+    def _analisar(self, segmento, entrada, estatistica=None):
+        """Análise semântica de um comando a partir do estado `entrada`"""
+        self._deslocar(segmento)
+        tabela = SymbolTable()
+        for nome, estado in entrada.items():
+            if estado is not None:
+                tabela.declarar(nome, estado[0], estado[1])
+        base = len(tabela)
+        diagnosticos = Diagnosticos()
+        AnalisadorSemantico(diagnosticos, tabela).analisar_comandos(segmento.comandos)
+        segmento.leituras = entrada
+        segmento.diag_semantica = diagnosticos.itens
+        segmento.declarados = tabela.declarados()[base:]
+        segmento.efeitos = {nome: _estado(tabela.buscar(nome)) for nome in segmento.nomes}
+        if segmento.diag_sintaxe or segmento.diag_semantica:
+            self._com_diagnosticos.add(segmento)
+        else:
+            self._com_diagnosticos.discard(segmento)
+        if estatistica is not None:
+            estatistica.reanalises_semanticas += 1
+
+    def _deslocar(self, segmento):
+        """Aplica aos nós e aos erros de sintaxe o deslocamento de linhas pendente"""
+        delta = self._linha(segmento) - segmento.linha_ast
+        if delta:
+            segmento.linha_ast += delta
+            if segmento.comandos is not None:
+                _deslocar_linhas(segmento.comandos, delta)
+            segmento.diag_sintaxe = [d.deslocado(delta) for d in segmento.diag_sintaxe]
+        return delta
+
+    def _sincronizar(self, segmento):
+        """Corrige as linhas da AST, dos diagnósticos e dos símbolos do comando"""
+        delta = self._deslocar(segmento)
+        if not delta:
+            return
+        if segmento.diag_semantica and segmento.leituras is not None:
+            # As mensagens citam a linha: a análise é refeita com a mesma entrada
+            self._analisar(segmento, segmento.leituras)
+        else:
+            for simbolo in segmento.declarados:
+                simbolo.linha += delta
+
+    # ------------------------------------------------------------------
+    # Resultados
+
+    @property
+    def diagnosticos(self):
+        """Diagnósticos do texto atual, na ordem de Compiler.compile"""
+        if self._segmentos is None:
+            return list(self._completo.diagnosticos)
+        # Só os comandos com diagnósticos são visitados
+        com_diagnosticos = sorted(self._com_diagnosticos, key=self._indice)
+        itens = list(self._diag_prefixo)
+        for segmento in com_diagnosticos:
+            self._sincronizar(segmento)
+            itens.extend(segmento.diag_sintaxe)
+        itens.extend(self._diag_antes_sufixo)
+        itens.extend(self._diag_sufixo)
+        if not self._erros_sintaticos:
+            for segmento in com_diagnosticos:
+                if self._indice(segmento) < self._analisados:
+                    itens.extend(segmento.diag_semantica)
+        return itens
+
+    def resultado(self):
+        """
+        Monta o resultado da compilação do texto atual.
+
+        Returns:
+            CompilationResult equivalente ao de Compiler.compile(texto)
+        """
+        if self._segmentos is None:
+            return self._completo
+        diagnosticos = self.diagnosticos
+        if self._erros_sintaticos:
+            return CompilationResult(SymbolTable(), diagnosticos, None)
+        comandos = []
+        for segmento in self._segmentos:
+            self._sincronizar(segmento)
+            comandos.extend(segmento.comandos)
+        inteiro, chave = self._prefixo[0], self._prefixo[-1]
+        corpo = Block(comandos, chave.lineno, chave.coluna)
+        programa = Program(corpo, inteiro.lineno, inteiro.coluna)
+        return CompilationResult(self._tabela_final(), diagnosticos, programa)
+
+    def _tabela_final(self):
+        """Tabela de símbolos ao final da análise, como a de AnalisadorSemantico"""
+        tabela = SymbolTable()
+        topo = {}
+        for segmento in self._segmentos[:self._analisados]:
+            for simbolo in segmento.declarados:
+                if simbolo.contexto == 0:
+                    topo[simbolo.nome] = tabela.declarar(simbolo.nome, simbolo.tipo, None,
+                                                         simbolo.linha)
+                    continue
+                for _ in range(simbolo.contexto):
+                    tabela.abrir_escopo()
+                tabela.declarar(simbolo.nome, simbolo.tipo, simbolo.valor, simbolo.linha)
+                for _ in range(simbolo.contexto):
+                    tabela.fechar_escopo()
+            for nome, estado in segmento.efeitos.items():
+                if estado is not None:
+                    topo[nome].valor = estado[1]
+        return tabela
@@ -0,0 +1,392 @@
+"""
+Interpretador que executa a AST de um programa já analisado.
+
+Percorre a árvore produzida pelo parser executando declarações,
+atribuições, laços (while, for), if/else e chamadas a printf. As regras de
+tipos são as da análise semântica: operações entre int e float produzem
+float (tipo_resultado), e o valor atribuído a uma variável é convertido
+para o tipo dela com verificar_compatibilidade_tipos.
+
+Para que um laço infinito não prenda um processo trabalhador, a execução
+tem um orçamento de instruções (cada comando executado e cada condição de
+laço avaliada contam uma) e um tempo limite de relógio. O relógio é
+consultado apenas a cada INTERVALO_RELOGIO instruções.
+
+Uso:
+    python interpreter.py input6.txt [--max-instrucoes N] [--tempo-limite S]
+"""
+import operator
+import re
+import sys
+import time
+
+from ast_nodes import Block, Decl, Assign, While, If, For, Print, Return, Literal, Name
+from diagnostics import Diagnostic, EXECUCAO
+from semantic import (ErroSemantico, ErroPotencia, calcular_potencia,
+                      verificar_compatibilidade_tipos, tipo_resultado)
+from symbol_table import SymbolTable
+
+# Limites padrão de uma execução
+MAX_INSTRUCOES = 10_000_000
+TEMPO_LIMITE = 5.0
+
+# Quantidade de instruções entre duas consultas ao relógio
+INTERVALO_RELOGIO = 4096
+
+class ErroExecucao(Exception):
+    """Erro durante a execução do programa (ex.: divisão por zero)"""
+    def __init__(self, mensagem, linha=0, coluna=0):
+        self.mensagem = mensagem
+        self.linha = linha
+        self.coluna = coluna
+        super().__init__(self.mensagem)
+
+class LimiteExcedido(ErroExecucao):
+    """Orçamento de instruções ou tempo limite esgotado"""
+
+class _Retorno(Exception):
+    """Sinaliza um `return`, que encerra o programa"""
+    def __init__(self, valor):
+        self.valor = valor
+
+# Operadores de comparação das condições
+COMPARACOES = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '!=': operator.ne,
+    '==': operator.eq,
+}
+
+# Modificadores de tamanho do C (%ld, %lf) que o operador % do Python não aceita
+_MODIFICADOR_TAMANHO = re.compile(r'%([-+ #0]*\d*(?:\.\d+)?)[lhLqjzt]+([diouxXeEfgGcs])')
+
+def formatar_printf(formato, valores, linha=0, coluna=0):
+    """
+    Formata uma chamada a printf.
+
+    Raises:
+        ErroExecucao: Se o formato não corresponder aos argumentos
+    """
+    if '%' in formato:
+        formato = _MODIFICADOR_TAMANHO.sub(r'%\1\2', formato)
+    try:
+        return formato % tuple(valores)
+    except (TypeError, ValueError) as e:
+        raise ErroExecucao(f"Erro de execução na linha {linha}: formato inválido em printf ({e})",
+                           linha, coluna)
+
+def dividir(esquerda, direita, tipo, linha=0, coluna=0):
+    """Divisão com as regras da análise semântica: inteira entre ints"""
+    if direita == 0:
+        raise ErroExecucao(f"Erro de execução na linha {linha}: divisão por zero", linha, coluna)
+    return esquerda // direita if tipo == "int" else esquerda / direita
+
+def _nao_declarada(no):
+    """
+    Variável sem declaração visível: só ocorre ao executar uma AST que não
+    passou pela análise semântica sem erros
+    """
+    raise ErroExecucao(f"Erro de execução na linha {no.line}: variável '{no.nome}' não declarada",
+                       no.line, no.col)
+
+class ResultadoExecucao:
+    """
+    Resultado de uma execução.
+
+    Attributes:
+        sucesso: True se o programa terminou sem erro nem limite excedido
+        variaveis: Dicionário nome -> valor das variáveis visíveis ao final
+                   (ou no momento do erro)
+        saida: Texto produzido pelas chamadas a printf
+        retorno: Valor do `return` de main (0 se não houver)
+        instrucoes: Quantidade de instruções executadas
+        tempo: Duração da execução em segundos
+        erro: Diagnostic do erro de execução, ou None
+    """
+    __slots__ = ('sucesso', 'variaveis', 'saida', 'retorno', 'instrucoes', 'tempo', 'erro')
+
+    def __init__(self, variaveis, saida, retorno, instrucoes, tempo, erro=None):
+        self.variaveis = variaveis
+        self.saida = saida
+        self.retorno = retorno
+        self.instrucoes = instrucoes
+        self.tempo = tempo
+        self.erro = erro
+        self.sucesso = erro is None
+
+    @classmethod
+    def nao_executado(cls, erro):
+        """
+        Resultado de um programa que nem chegou a executar porque a tradução
+        para o motor falhou (ErroSemantico, ex.: AST com variável não declarada)
+        """
+        return cls({}, '', 0, 0, 0.0, Diagnostic(erro.linha, erro.coluna, EXECUCAO, erro.mensagem))
+
+    def to_dict(self):
+        return {
+            'status': 'ok' if self.sucesso else 'error',
+            'variables': self.variaveis,
+            'output': self.saida,
+            'return': self.retorno,
+            'instructions': self.instrucoes,
+            'time_ms': round(self.tempo * 1000, 3),
+            'error': self.erro.to_dict() if self.erro is not None else None,
+        }
+
+    def __repr__(self):
+        return (f"ResultadoExecucao(sucesso={self.sucesso}, retorno={self.retorno}, "
+                f"instrucoes={self.instrucoes})")
+
+class Interpretador:
+    """
+    Executa a AST percorrendo a árvore.
+
+    Args:
+        max_instrucoes: Orçamento de instruções (None para ilimitado)
+        tempo_limite: Tempo máximo de execução em segundos (None para ilimitado)
+        eco: Função chamada com cada texto impresso por printf, além de
+             guardá-lo no resultado (ex.: sys.stdout.write)
+    """
+    __slots__ = ('max_instrucoes', 'tempo_limite', 'eco', '_simbolos', '_saida',
+                 '_instrucoes', '_proxima_verificacao', '_prazo', '_comandos')
+
+    def __init__(self, max_instrucoes=MAX_INSTRUCOES, tempo_limite=TEMPO_LIMITE, eco=None):
+        self.max_instrucoes = max_instrucoes
+        self.tempo_limite = tempo_limite
+        self.eco = eco
+        self._comandos = {
+            Decl: self._declaracao,
+            Assign: self._atribuicao,
+            While: self._while,
+            If: self._if,
+            For: self._for,
+            Print: self._impressao,
+            Return: self._retorno,
+            Block: self._bloco,
+        }
+
+    def executar(self, programa):
+        """
+        Executa o programa.
+
+        Returns:
+            ResultadoExecucao
+        """
+        self._simbolos = SymbolTable(historico=False)
+        self._saida = []
+        self._instrucoes = 0
+        inicio = time.perf_counter()
+        self._prazo = inicio + self.tempo_limite if self.tempo_limite is not None else None
+        self._proxima_verificacao = self._limite_verificacao()
+
+        retorno = 0
+        erro = None
+        try:
+            self._comandos_bloco(programa.corpo)
+        except _Retorno as r:
+            retorno = r.valor
+        except (ErroExecucao, ErroSemantico) as e:
+            erro = Diagnostic(e.linha, getattr(e, 'coluna', 0), EXECUCAO, e.mensagem)
+        except RecursionError:
+            erro = Diagnostic(0, 0, EXECUCAO, "Erro de execução: aninhamento excessivo")
+        tempo = time.perf_counter() - inicio
+
+        variaveis = {nome: simbolo.valor for nome, simbolo in self._simbolos.items()}
+        return ResultadoExecucao(variaveis, ''.join(self._saida), retorno,
+                                 self._instrucoes, tempo, erro)
+
+    # Orçamento
+
+    def _limite_verificacao(self):
+        proxima = self._instrucoes + INTERVALO_RELOGIO
+        if self.max_instrucoes is not None:
+            proxima = min(proxima, self.max_instrucoes + 1)
+        return proxima
+
+    def _passo(self, no):
+        """Conta uma instrução e, periodicamente, verifica os limites"""
+        self._instrucoes += 1
+        if self._instrucoes >= self._proxima_verificacao:
+            self._verificar_limites(no)
+
+    def _verificar_limites(self, no):
+        if self.max_instrucoes is not None and self._instrucoes > self.max_instrucoes:
+            raise LimiteExcedido(
+                f"Erro de execução na linha {no.line}: limite de {self.max_instrucoes} instruções excedido",
+                no.line, no.col)
+        if self._prazo is not None and time.perf_counter() > self._prazo:
+            raise LimiteExcedido(
+                f"Erro de execução na linha {no.line}: tempo limite de {self.tempo_limite} s excedido",
+                no.line, no.col)
+        self._proxima_verificacao = self._limite_verificacao()
+
+    # Comandos
+
+    def _comandos_bloco(self, bloco):
+        comandos = self._comandos
+        passo = self._passo
+        for comando in bloco.comandos:
+            passo(comando)
+            try:
+                comandos[type(comando)](comando)
+            except OverflowError:
+                # Ex.: printf("%d") de um float infinito; aponta o comando mais interno
+                raise ErroExecucao(f"Erro de execução na linha {comando.line}: resultado fora do intervalo",
+                                   comando.line, comando.col) from None
+
+    def _bloco(self, bloco):
+        simbolos = self._simbolos
+        simbolos.abrir_escopo()
+        self._comandos_bloco(bloco)
+        simbolos.fechar_escopo()
+
+    def _declaracao(self, no):
+        valor = None
+        if no.valor is not None:
+            valor, tipo = self.avaliar(no.valor)
+            valor = verificar_compatibilidade_tipos(no.tipo, valor, tipo, no.line, "declaracao")
+        self._simbolos.declarar(no.nome, no.tipo, valor, no.line)
+
+    def _atribuicao(self, no):
+        destino = self._simbolos.buscar(no.nome)
+        if destino is None:
+            _nao_declarada(no)
+        valor, tipo = self.avaliar(no.valor)
+        destino.valor = verificar_compatibilidade_tipos(destino.tipo, valor, tipo, no.line)
+
+    def _while(self, no):
+        condicao = no.condicao
+        corpo = no.corpo
+        passo = self._passo
+        while True:
+            passo(condicao)
+            if not self.condicao(condicao):
+                break
+            self._bloco(corpo)
+
+    def _if(self, no):
+        if self.condicao(no.condicao):
+            self._bloco(no.entao)
+        elif no.senao is not None:
+            self._comandos[type(no.senao)](no.senao)
+
+    def _for(self, no):
+        simbolos = self._simbolos
+        simbolos.abrir_escopo()
+        self._comandos[type(no.inicio)](no.inicio)
+        condicao, corpo, incremento = no.condicao, no.corpo, no.passo
+        passo = self._passo
+        while True:
+            passo(condicao)
+            if not self.condicao(condicao):
+                break
+            self._bloco(corpo)
+            passo(incremento)
+            self._atribuicao(incremento)
+        simbolos.fechar_escopo()
+
+    def _impressao(self, no):
+        valores = [self.avaliar(argumento)[0] for argumento in no.argumentos]
+        texto = formatar_printf(no.formato, valores, no.line, no.col)
+        self._saida.append(texto)
+        if self.eco is not None:
+            self.eco(texto)
+
+    def _retorno(self, no):
+        raise _Retorno(self.avaliar(no.valor)[0])
+
+    # Expressões
+
+    def condicao(self, no):
+        """Avalia uma comparação, promovendo int para float se necessário"""
+        esquerda, _ = self.avaliar(no.esquerda)
+        direita, _ = self.avaliar(no.direita)
+        try:
+            return COMPARACOES[no.op](esquerda, direita)
+        except TypeError:
+            raise ErroExecucao(f"Erro de execução na linha {no.line}: comparação entre tipos incompatíveis",
+                               no.line, no.col)
+
+    def avaliar(self, expressao):
+        """
+        Avalia uma expressão.
+
+        Returns:
+            Tupla (valor, tipo)
+        """
+        tipo_no = type(expressao)
+        if tipo_no is Name:
+            simbolo = self._simbolos.buscar(expressao.nome)
+            if simbolo is None:
+                _nao_declarada(expressao)
+            if simbolo.valor is None:
+                raise ErroExecucao(
+                    f"Erro de execução na linha {expressao.line}: variável '{expressao.nome}' usada antes de ser inicializada",
+                    expressao.line, expressao.col)
+            return simbolo.valor, simbolo.tipo
+        if tipo_no is Literal:
+            return expressao.valor, expressao.tipo
+        return self._operacao(expressao)
+
+    def _operacao(self, no):
+        val1, tipo1 = self.avaliar(no.esquerda)
+        val2, tipo2 = self.avaliar(no.direita)
+        tipo = tipo_resultado(tipo1, tipo2)
+        if tipo1 != tipo:
+            val1 = verificar_compatibilidade_tipos(tipo, val1, tipo1, no.line, "operacao")
+        if tipo2 != tipo:
+            val2 = verificar_compatibilidade_tipos(tipo, val2, tipo2, no.line, "operacao")
+
+        op = no.op
+        if op == '+':
+            return val1 + val2, tipo
+        if op == '-':
+            return val1 - val2, tipo
+        if op == '*':
+            return val1 * val2, tipo
+        if op == '/':
+            return dividir(val1, val2, tipo, no.direita.line, no.direita.col), tipo
+        try:
+            return calcular_potencia(val1, val2, tipo), tipo
+        except ErroPotencia as e:
+            raise ErroExecucao(f"Erro de execução na linha {no.line}: {e}", no.line, no.col) from None
+
+def executar(programa, max_instrucoes=MAX_INSTRUCOES, tempo_limite=TEMPO_LIMITE, eco=None):
+    """Executa a AST de um programa e retorna o ResultadoExecucao"""
+    return Interpretador(max_instrucoes, tempo_limite, eco).executar(programa)
+
+def main(argv=None):
+    """Compila e executa um arquivo fonte, mostrando a saída e o estado final"""
+    import argparse
+    from diagnostics import ERRORS
+    from sintatic_analyser import Compiler
+
+    argumentos = argparse.ArgumentParser(description="Executa um programa da linguagem C-like.")
+    argumentos.add_argument('arquivo', nargs='?', default="input.txt", help="arquivo fonte (padrão: input.txt)")
+    argumentos.add_argument('--max-instrucoes', type=int, default=MAX_INSTRUCOES,
+                            help=f"orçamento de instruções (padrão: {MAX_INSTRUCOES})")
+    argumentos.add_argument('--tempo-limite', type=float, default=TEMPO_LIMITE,
+                            help=f"tempo máximo de execução em segundos (padrão: {TEMPO_LIMITE})")
+    args = argumentos.parse_args(argv)
+
+    with open(args.arquivo, 'r') as arquivo:
+        texto = arquivo.read()
+    compilacao = Compiler(ERRORS).compile(texto)
+    if not compilacao.sucesso:
+        return 1
+
+    resultado = executar(compilacao.ast, args.max_instrucoes, args.tempo_limite, sys.stdout.write)
+    if resultado.erro is not None:
+        print(resultado.erro.message, file=sys.stderr)
+    print("\n=== Estado final ===")
+    for nome, valor in resultado.variaveis.items():
+        print(f"  {nome}: {valor!r}")
+    print(f"\n{resultado.instrucoes} instruções em {resultado.tempo * 1000:.3f} ms")
+    if not resultado.sucesso:
+        return 1
+    return resultado.retorno if isinstance(resultado.retorno, int) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,522 @@
+"""
+Representação intermediária em código de três endereços (TAC).
+
+O programa é traduzido da AST para uma lista de instruções simples:
+
+    x = 5                 COPY
+    t1 = a + b            BINOP (o tipo de t1 decide int ou float)
+    t2 = (float) x        CONV
+    clear x               CLEAR (declaração sem valor inicial)
+    ifFalse a < b goto L1 IF_FALSE
+    goto L1               GOTO
+    L1:                   LABEL
+    print "fmt", a, b     PRINT
+    return a              RETURN
+
+É um "SSA simplificado": os temporários (t1, t2, ...) recebem valor uma
+única vez, enquanto as variáveis do programa podem ser atribuídas várias
+vezes. Cada declaração recebe um nome único no IR; uma variável que sombreia
+outra de um escopo externo vira `nome.1`, `nome.2`, ... Promoções de int
+para float e conversões de atribuição são instruções CONV explícitas, com
+as mesmas regras de tipos da análise semântica.
+
+As otimizações estão em otimizacao.py.
+
+Uso:
+    python ir.py input5.txt [--otimizar]
+"""
+from ast_nodes import Block, Decl, Assign, While, If, For, Print, Return, Literal, Name
+from diagnostics import Diagnostic, EXECUCAO
+from semantic import ErroSemantico, ErroPotencia, TIPOS_LITERAIS, calcular_potencia, tipo_resultado
+
+COPY = 'copy'
+BINOP = 'binop'
+CONV = 'conv'
+CLEAR = 'clear'
+IF_FALSE = 'iffalse'
+GOTO = 'goto'
+LABEL = 'label'
+PRINT = 'print'
+RETURN = 'return'
+
+# Instruções que terminam um bloco básico
+SALTOS = (GOTO, IF_FALSE, RETURN)
+
+# Conversões implícitas aceitas (as mesmas do bytecode)
+CONVERSOES_PERMITIDAS = {("int", "float"), ("float", "int"), ("int", "char"), ("float", "char")}
+
+class Const:
+    """Operando constante"""
+    __slots__ = ('valor', 'tipo')
+
+    def __init__(self, valor, tipo=None):
+        self.valor = valor
+        self.tipo = tipo if tipo is not None else TIPOS_LITERAIS[type(valor)]
+
+    def __eq__(self, other):
+        return (isinstance(other, Const) and self.tipo == other.tipo
+                and type(self.valor) is type(other.valor) and self.valor == other.valor)
+
+    def __hash__(self):
+        return hash((self.tipo, self.valor))
+
+    def __repr__(self):
+        return repr(self.valor) if self.tipo != "char" else f'"{self.valor}"'
+
+class Instrucao:
+    """
+    Instrução do TAC.
+
+    Attributes:
+        op: COPY, BINOP, CONV, CLEAR, IF_FALSE, GOTO, LABEL, PRINT ou RETURN
+        destino: Nome definido pela instrução (COPY, BINOP, CONV, CLEAR)
+        a, b: Operandos: nomes (str) ou Const; em PRINT, `a` é a tupla de argumentos
+        operador: Operador aritmético (BINOP), de comparação (IF_FALSE),
+                  tipo de destino (CONV) ou formato (PRINT)
+        alvo: Rótulo de LABEL, GOTO e IF_FALSE
+    """
+    __slots__ = ('op', 'destino', 'a', 'b', 'operador', 'alvo', 'linha', 'coluna')
+
+    def __init__(self, op, destino=None, a=None, b=None, operador=None, alvo=None, linha=0, coluna=0):
+        self.op = op
+        self.destino = destino
+        self.a = a
+        self.b = b
+        self.operador = operador
+        self.alvo = alvo
+        self.linha = linha
+        self.coluna = coluna
+
+    def usos(self):
+        """Nomes lidos pela instrução"""
+        if self.op == PRINT:
+            return [x for x in self.a if type(x) is str]
+        return [x for x in (self.a, self.b) if type(x) is str]
+
+    def substituir_usos(self, valores):
+        """Troca os nomes lidos que estão em `valores` pelo valor associado"""
+        if self.op == PRINT:
+            self.a = tuple(valores.get(x, x) if type(x) is str else x for x in self.a)
+            return
+        if type(self.a) is str and self.a in valores:
+            self.a = valores[self.a]
+        if type(self.b) is str and self.b in valores:
+            self.b = valores[self.b]
+
+    def __str__(self):
+        op = self.op
+        if op == COPY:
+            return f"{self.destino} = {self.a}"
+        if op == BINOP:
+            return f"{self.destino} = {self.a} {self.operador} {self.b}"
+        if op == CONV:
+            return f"{self.destino} = ({self.operador}) {self.a}"
+        if op == CLEAR:
+            return f"clear {self.destino}"
+        if op == IF_FALSE:
+            return f"ifFalse {self.a} {self.operador} {self.b} goto {self.alvo}"
+        if op == GOTO:
+            return f"goto {self.alvo}"
+        if op == LABEL:
+            return f"{self.alvo}:"
+        if op == PRINT:
+            argumentos = ''.join(f", {x}" for x in self.a)
+            return f"print {self.operador!r}{argumentos}"
+        return f"return {self.a}"
+
+    __repr__ = __str__
+
+class ProgramaTAC:
+    """
+    Programa em TAC.
+
+    Attributes:
+        instrucoes: Lista de Instrucao
+        tipos: Tipo de cada nome (variáveis e temporários)
+        observaveis: Pares (nome no programa, nome no IR) das variáveis do
+                     corpo de main, cujo valor final faz parte do resultado
+    """
+    __slots__ = ('instrucoes', 'tipos', 'observaveis')
+
+    def __init__(self, instrucoes, tipos, observaveis):
+        self.instrucoes = instrucoes
+        self.tipos = tipos
+        self.observaveis = observaveis
+
+    def __str__(self):
+        return '\n'.join(str(i) if i.op == LABEL else f"    {i}" for i in self.instrucoes)
+
+# Geração
+
+class GeradorTAC:
+    """Traduz a AST de um programa para ProgramaTAC"""
+    __slots__ = ('_instrucoes', '_tipos', '_escopos', '_observaveis', '_sufixos', '_temporarios',
+                 '_rotulos', '_comandos')
+
+    def __init__(self):
+        self._instrucoes = []
+        self._tipos = {}
+        self._escopos = [{}]
+        self._observaveis = []
+        # Próximo sufixo de cada nome declarado mais de uma vez
+        self._sufixos = {}
+        self._temporarios = 0
+        self._rotulos = 0
+        self._comandos = {
+            Decl: self._declaracao,
+            Assign: self._atribuicao,
+            While: self._while,
+            If: self._if,
+            For: self._for,
+            Print: self._impressao,
+            Return: self._retorno,
+            Block: self._bloco,
+        }
+
+    def gerar(self, programa):
+        self._comandos_bloco(programa.corpo)
+        return ProgramaTAC(self._instrucoes, self._tipos, self._observaveis)
+
+    def _emitir(self, op, no, **campos):
+        self._instrucoes.append(Instrucao(op, linha=no.line, coluna=no.col, **campos))
+
+    def _temporario(self, tipo):
+        self._temporarios += 1
+        nome = f"t{self._temporarios}"
+        while nome in self._tipos:
+            # Uma variável do programa já usa o nome
+            self._temporarios += 1
+            nome = f"t{self._temporarios}"
+        self._tipos[nome] = tipo
+        return nome
+
+    def _rotulo(self):
+        self._rotulos += 1
+        return f"L{self._rotulos}"
+
+    def _declarar(self, nome, tipo):
+        """Nome único no IR para uma declaração"""
+        sufixo = self._sufixos.get(nome, 0)
+        nome_ir = f"{nome}.{sufixo}" if sufixo else nome
+        while nome_ir in self._tipos:
+            sufixo += 1
+            nome_ir = f"{nome}.{sufixo}"
+        self._sufixos[nome] = sufixo + 1
+        self._tipos[nome_ir] = tipo
+        self._escopos[-1][nome] = nome_ir
+        if len(self._escopos) == 1:
+            self._observaveis.append((nome, nome_ir))
+        return nome_ir
+
+    def _buscar(self, nome, no):
+        for escopo in reversed(self._escopos):
+            nome_ir = escopo.get(nome)
+            if nome_ir is not None:
+                return nome_ir
+        raise ErroSemantico(f"Erro semântico na linha {no.line}: variável '{nome}' usada mas não declarada",
+                            no.line, no.col)
+
+    def _tipo(self, operando):
+        return operando.tipo if type(operando) is Const else self._tipos[operando]
+
+    def _converter(self, operando, tipo, no):
+        """Operando convertido para `tipo`, com uma instrução CONV se necessário"""
+        tipo_origem = self._tipo(operando)
+        if tipo_origem == tipo:
+            return operando
+        if (tipo_origem, tipo) not in CONVERSOES_PERMITIDAS:
+            raise ErroSemantico(
+                f"Erro semântico na linha {no.line}: não é possível converter '{tipo_origem}' para '{tipo}'",
+                no.line, no.col)
+        temporario = self._temporario(tipo)
+        self._emitir(CONV, no, destino=temporario, a=operando, operador=tipo)
+        return temporario
+
+    def _armazenar(self, destino, valor, no):
+        """destino = valor, convertendo para o tipo do destino"""
+        tipo = self._tipos[destino]
+        if self._tipo(valor) != tipo:
+            self._converter(valor, tipo, no)
+            # A conversão grava direto no destino, sem temporário
+            self._instrucoes[-1].destino = destino
+            return
+        self._emitir(COPY, no, destino=destino, a=valor)
+
+    # Comandos
+
+    def _comandos_bloco(self, bloco):
+        comandos = self._comandos
+        for comando in bloco.comandos:
+            comandos[type(comando)](comando)
+
+    def _bloco(self, bloco):
+        self._escopos.append({})
+        self._comandos_bloco(bloco)
+        self._escopos.pop()
+
+    def _declaracao(self, no):
+        if no.valor is None:
+            destino = self._declarar(no.nome, no.tipo)
+            self._emitir(CLEAR, no, destino=destino)
+            return
+        # O valor inicial é avaliado antes de o nome entrar no escopo
+        valor = self._expressao(no.valor)
+        self._armazenar(self._declarar(no.nome, no.tipo), valor, no)
+
+    def _atribuicao(self, no):
+        destino = self._buscar(no.nome, no)
+        self._armazenar(destino, self._expressao(no.valor), no)
+
+    def _condicao(self, cond, alvo):
+        a = self._expressao(cond.esquerda)
+        b = self._expressao(cond.direita)
+        self._emitir(IF_FALSE, cond, a=a, b=b, operador=cond.op, alvo=alvo)
+
+    def _while(self, no):
+        inicio, fim = self._rotulo(), self._rotulo()
+        self._emitir(LABEL, no, alvo=inicio)
+        self._condicao(no.condicao, fim)
+        self._bloco(no.corpo)
+        self._emitir(GOTO, no, alvo=inicio)
+        self._emitir(LABEL, no, alvo=fim)
+
+    def _if(self, no):
+        senao = self._rotulo()
+        self._condicao(no.condicao, senao)
+        self._bloco(no.entao)
+        if no.senao is None:
+            self._emitir(LABEL, no, alvo=senao)
+            return
+        fim = self._rotulo()
+        self._emitir(GOTO, no, alvo=fim)
+        self._emitir(LABEL, no, alvo=senao)
+        self._comandos[type(no.senao)](no.senao)
+        self._emitir(LABEL, no, alvo=fim)
+
+    def _for(self, no):
+        self._escopos.append({})
+        self._comandos[type(no.inicio)](no.inicio)
+        inicio, fim = self._rotulo(), self._rotulo()
+        self._emitir(LABEL, no, alvo=inicio)
+        self._condicao(no.condicao, fim)
+        self._bloco(no.corpo)
+        self._atribuicao(no.passo)
+        self._emitir(GOTO, no, alvo=inicio)
+        self._emitir(LABEL, no, alvo=fim)
+        self._escopos.pop()
+
+    def _impressao(self, no):
+        argumentos = tuple(self._expressao(argumento) for argumento in no.argumentos)
+        self._emitir(PRINT, no, a=argumentos, operador=no.formato)
+
+    def _retorno(self, no):
+        self._emitir(RETURN, no, a=self._expressao(no.valor))
+
+    # Expressões
+
+    def _expressao(self, expressao):
+        """Emite o código da expressão e retorna o operando com o seu valor"""
+        tipo_no = type(expressao)
+        if tipo_no is Literal:
+            return Const(expressao.valor, expressao.tipo)
+        if tipo_no is Name:
+            return self._buscar(expressao.nome, expressao)
+        a = self._expressao(expressao.esquerda)
+        b = self._expressao(expressao.direita)
+        tipo = tipo_resultado(self._tipo(a), self._tipo(b))
+        a = self._converter(a, tipo, expressao)
+        b = self._converter(b, tipo, expressao)
+        destino = self._temporario(tipo)
+        self._emitir(BINOP, expressao, destino=destino, a=a, b=b, operador=expressao.op)
+        return destino
+
+def gerar(programa):
+    """Traduz a AST de um programa para ProgramaTAC"""
+    return GeradorTAC().gerar(programa)
+
+# Grafo de fluxo de controle
+
+class BlocoBasico:
+    """Trecho de instruções sem desvios internos"""
+    __slots__ = ('indice', 'instrucoes', 'sucessores', 'predecessores')
+
+    def __init__(self, indice, instrucoes):
+        self.indice = indice
+        self.instrucoes = instrucoes
+        self.sucessores = []
+        self.predecessores = []
+
+    def __repr__(self):
+        return f"BlocoBasico({self.indice}, {len(self.instrucoes)} instruções)"
+
+def blocos_basicos(instrucoes):
+    """
+    Divide as instruções em blocos básicos e liga sucessores/predecessores.
+
+    Returns:
+        Lista de BlocoBasico na ordem do programa (o primeiro é a entrada)
+    """
+    blocos = []
+    atual = []
+    for instrucao in instrucoes:
+        if instrucao.op == LABEL and atual:
+            blocos.append(atual)
+            atual = []
+        atual.append(instrucao)
+        if instrucao.op in SALTOS:
+            blocos.append(atual)
+            atual = []
+    if atual or not blocos:
+        blocos.append(atual)
+
+    blocos = [BlocoBasico(i, trecho) for i, trecho in enumerate(blocos)]
+    por_rotulo = {b.instrucoes[0].alvo: b for b in blocos
+                  if b.instrucoes and b.instrucoes[0].op == LABEL}
+    for i, bloco in enumerate(blocos):
+        ultima = bloco.instrucoes[-1] if bloco.instrucoes else None
+        sucessores = []
+        if ultima is not None and ultima.op in (GOTO, IF_FALSE):
+            sucessores.append(por_rotulo[ultima.alvo])
+        if (ultima is None or ultima.op not in (GOTO, RETURN)) and i + 1 < len(blocos):
+            sucessores.append(blocos[i + 1])
+        for sucessor in sucessores:
+            if sucessor not in bloco.sucessores:
+                bloco.sucessores.append(sucessor)
+                sucessor.predecessores.append(bloco)
+    return blocos
+
+# Execução
+
+def aplicar_operacao(operador, a, b, tipo):
+    """
+    Operação aritmética com as regras da análise semântica.
+
+    Raises:
+        ZeroDivisionError: Na divisão por zero
+        ErroPotencia: Numa potência sem resultado ou grande demais
+                      (calcular_potencia)
+    """
+    if operador == '+':
+        return a + b
+    if operador == '-':
+        return a - b
+    if operador == '*':
+        return a * b
+    if operador == '/':
+        return a // b if tipo == "int" else a / b
+    return calcular_potencia(a, b, tipo)
+
+# Conversão de um valor para cada tipo (CONV)
+CONVERSOES = {"int": int, "float": float, "char": str}
+
+def executar(programa, max_instrucoes=None):
+    """
+    Executa um ProgramaTAC. Serve para validar que as otimizações preservam
+    o resultado do programa.
+
+    Returns:
+        ResultadoExecucao (do interpretador)
+    """
+    import time
+    from interpreter import COMPARACOES, ResultadoExecucao, formatar_printf, ErroExecucao
+
+    instrucoes = programa.instrucoes
+    rotulos = {i.alvo: pc for pc, i in enumerate(instrucoes) if i.op == LABEL}
+    valores = {}
+    saida = []
+    executadas = 0
+    retorno = 0
+    erro = None
+    inicio = time.perf_counter()
+
+    def ler(operando, instrucao):
+        if type(operando) is Const:
+            return operando.valor
+        valor = valores.get(operando)
+        if valor is None:
+            raise ErroExecucao(
+                f"Erro de execução na linha {instrucao.linha}: variável '{operando}' usada antes de ser inicializada",
+                instrucao.linha, instrucao.coluna)
+        return valor
+
+    pc = 0
+    try:
+        while pc < len(instrucoes):
+            instrucao = instrucoes[pc]
+            op = instrucao.op
+            executadas += 1
+            if max_instrucoes is not None and executadas > max_instrucoes:
+                raise ErroExecucao(f"Erro de execução: limite de {max_instrucoes} instruções excedido")
+            pc += 1
+            if op == COPY:
+                valores[instrucao.destino] = ler(instrucao.a, instrucao)
+            elif op == BINOP:
+                a, b = ler(instrucao.a, instrucao), ler(instrucao.b, instrucao)
+                if instrucao.operador == '/' and b == 0:
+                    raise ErroExecucao(f"Erro de execução na linha {instrucao.linha}: divisão por zero",
+                                       instrucao.linha, instrucao.coluna)
+                valores[instrucao.destino] = aplicar_operacao(instrucao.operador, a, b,
+                                                              programa.tipos[instrucao.destino])
+            elif op == CONV:
+                valores[instrucao.destino] = CONVERSOES[instrucao.operador](ler(instrucao.a, instrucao))
+            elif op == CLEAR:
+                valores[instrucao.destino] = None
+            elif op == IF_FALSE:
+                if not COMPARACOES[instrucao.operador](ler(instrucao.a, instrucao), ler(instrucao.b, instrucao)):
+                    pc = rotulos[instrucao.alvo]
+            elif op == GOTO:
+                pc = rotulos[instrucao.alvo]
+            elif op == PRINT:
+                argumentos = [ler(x, instrucao) for x in instrucao.a]
+                saida.append(formatar_printf(instrucao.operador, argumentos, instrucao.linha, instrucao.coluna))
+            elif op == RETURN:
+                retorno = ler(instrucao.a, instrucao)
+                break
+    except ErroExecucao as e:
+        erro = Diagnostic(e.linha, e.coluna, EXECUCAO, e.mensagem)
+    except TypeError:
+        # Ex.: comparação entre char e número
+        erro = Diagnostic(instrucao.linha, instrucao.coluna, EXECUCAO,
+                          f"Erro de execução na linha {instrucao.linha}: operação entre tipos incompatíveis")
+    except OverflowError:
+        # Ex.: inteiro grande demais para float, float infinito para int
+        erro = Diagnostic(instrucao.linha, instrucao.coluna, EXECUCAO,
+                          f"Erro de execução na linha {instrucao.linha}: resultado fora do intervalo")
+    except ErroPotencia as e:
+        erro = Diagnostic(instrucao.linha, instrucao.coluna, EXECUCAO,
+                          f"Erro de execução na linha {instrucao.linha}: {e}")
+    variaveis = {nome: valores.get(nome_ir) for nome, nome_ir in programa.observaveis}
+    return ResultadoExecucao(variaveis, ''.join(saida), retorno, executadas,
+                             time.perf_counter() - inicio, erro)
+
+def main(argv=None):
+    """Mostra o TAC de um arquivo fonte, opcionalmente otimizado"""
+    import argparse
+    from diagnostics import ERRORS
+    from sintatic_analyser import Compiler
+    # Importado pelo nome do módulo para compartilhar as classes com otimizacao.py
+    from ir import gerar
+    from otimizacao import GerenciadorPassos
+
+    argumentos = argparse.ArgumentParser(description="Mostra o código de três endereços de um programa.")
+    argumentos.add_argument('arquivo', nargs='?', default="input.txt")
+    argumentos.add_argument('--otimizar', action='store_true', help="aplica as otimizações e mostra o tempo de cada passo")
+    args = argumentos.parse_args(argv)
+
+    with open(args.arquivo, 'r') as arquivo:
+        resultado = Compiler(ERRORS).compile(arquivo.read())
+    if not resultado.sucesso:
+        return 1
+    programa = gerar(resultado.ast)
+    print(programa)
+    if args.otimizar:
+        relatorio = GerenciadorPassos().otimizar(programa)
+        print("\n=== Otimizado ===")
+        print(programa)
+        print()
+        print(relatorio)
+    return 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,489 @@
+"""
+Lexer rápido com a mesma interface e os mesmos tokens do lexer do PLY.
+
+O lexer do PLY, a cada token, pula os caracteres ignorados um a um, tenta a
+expressão mestra, chama a função da regra (t_ID consulta as palavras
+reservadas em toda chamada) e só então monta o LexToken. LexerRapido usa as
+tabelas do próprio lexer do PLY (as mesmas expressões, na mesma ordem, com
+as mesmas flags) reunidas numa única expressão compilada:
+
+    [ignorados]*(?: regras definidas por funções
+                  | (?P<simbolos> regras definidas por strings)
+                  | (?P<erro>[^ignorados]) )
+
+As regras definidas por strings (operadores e pontuação) ficam num único
+grupo, na mesma ordem em que o PLY as testa: o motor de expressões do re
+testa as alternativas uma a uma, e um grupo por operador custava mais do
+que a própria montagem do token. O tipo do símbolo casado vem de uma
+tabela texto -> tipo, preenchida na primeira vez em que cada texto aparece
+com a primeira regra que o aceita, que é a que o PLY escolheria.
+
+Cada match já pula os caracteres ignorados e identifica a regra por
+m.lastindex, que indexa uma tabela de ações:
+
+    simbolo      regra definida por string: o token é o texto casado
+    reservada    identificador: o tipo sai da tabela de palavras reservadas
+    linha        quebras de linha: apenas somam em lineno
+    conversao    literal convertido por uma função de uma só chamada
+                 (int, float), guardando o comprimento do texto em `tamanho`
+    funcao       qualquer outra regra: a própria função do PLY é chamada,
+                 como o PLY faria
+    erro         caractere que nenhuma regra aceita: a função t_error
+
+Os atalhos (reservada, linha, conversao) precisam equivaler às funções das
+regras correspondentes em sintatic_analyser.py; benchmarks/bench_lexer.py
+confere que os lexers produzem a mesma sequência de tokens.
+
+LexerBuffer é o modo buffer do LexerRapido: input() analisa o texto inteiro
+e guarda os tokens em colunas de inteiros (BufferTokens), sem um objeto por
+token, e token() monta cada LexToken a partir das colunas só quando o parser
+o pede.
+"""
+import bisect
+import copy
+import re
+from array import array
+
+from ply.lex import LexToken, LexError # type: ignore
+
+_SIMBOLO, _RESERVADA, _LINHA, _CONVERSAO, _FUNCAO, _ERRO = range(6)
+
+def _regras(lexer):
+    """
+    Regras do lexer do PLY, na ordem em que são testadas: tuplas (tipo,
+    função ou None, expressão). O PLY monta cada expressão mestra como
+    '(?P<t_A>a)|(?P<t_B>b)|...'; a expressão de cada regra é o trecho entre
+    o seu grupo e o grupo seguinte.
+    """
+    for regex, indices in lexer.lexre:
+        grupos = sorted((indice, nome) for nome, indice in regex.groupindex.items())
+        texto = regex.pattern
+        for n, (indice, nome) in enumerate(grupos):
+            inicio = texto.index(f'(?P<{nome}>') + len(nome) + 5
+            if n + 1 < len(grupos):
+                fim = texto.index(f')|(?P<{grupos[n + 1][1]}>', inicio)
+            else:
+                fim = len(texto) - 1
+            funcao, tipo = indices[indice]
+            yield tipo, funcao, texto[inicio:fim]
+
+class LexerRapido:
+    """
+    Lexer com a interface usada do lexer do PLY: input(), token(), skip(),
+    clone(), lineno, lexpos, lexdata e linhas.
+
+    Args:
+        lexer: Lexer do PLY já construído, de onde vêm as regras
+        reservadas: Tabela texto -> tipo das palavras reservadas
+        regra_id: Regra cujo tipo é consultado em `reservadas`
+        regra_linha: Regra de quebras de linha, que soma o tamanho do texto
+                     em lineno e não produz token
+        conversoes: Tabela regra -> função que converte o texto no valor
+    """
+
+    def __init__(self, lexer, reservadas, regra_id='ID', regra_linha='newline', conversoes=None):
+        if len(lexer.lexstatere) != 1 or lexer.lexliterals:
+            raise ValueError("LexerRapido não aceita estados nem literais do PLY")
+        conversoes = conversoes or {}
+        regras = list(_regras(lexer))
+        funcoes = [(tipo, funcao, f'(?P<r{n}>{padrao})')
+                   for n, (tipo, funcao, padrao) in enumerate(regras) if funcao is not None]
+        simbolos = [(tipo, padrao) for tipo, funcao, padrao in regras if funcao is None]
+        alternativas = [grupo for _, _, grupo in funcoes]
+        if simbolos:
+            alternativas.append('(?P<simbolos>%s)' % '|'.join(f'(?:{padrao})' for _, padrao in simbolos))
+        ignorados = ''.join(re.escape(c) for c in lexer.lexignore)
+        # O erro não pode aceitar um caractere ignorado: com o recuo de
+        # [ignorados]*, espaços no fim do texto virariam erros
+        erro = f"[^{ignorados}]" if ignorados else "(?s:.)"
+        prefixo = f"[{ignorados}]*" if ignorados else ""
+        alternativas.append(f'(?P<erro>{erro})')
+        padrao = re.compile(f"{prefixo}(?:{'|'.join(alternativas)})", lexer.lexreflags)
+
+        acoes = [None] * (padrao.groups + 1)
+        for (tipo, funcao, grupo), nome in zip(funcoes, (g[4:g.index('>')] for _, _, g in funcoes)):
+            if tipo == regra_id:
+                acao = (_RESERVADA, tipo, None)
+            elif tipo == regra_linha:
+                acao = (_LINHA, tipo, None)
+            elif tipo in conversoes:
+                acao = (_CONVERSAO, tipo, conversoes[tipo])
+            else:
+                acao = (_FUNCAO, tipo, funcao)
+            acoes[padrao.groupindex[nome]] = acao
+        if simbolos:
+            acoes[padrao.groupindex['simbolos']] = (_SIMBOLO, None, None)
+        acoes[padrao.groupindex['erro']] = (_ERRO, 'error', lexer.lexerrorf)
+
+        self._casar = padrao.match
+        self._acoes = acoes
+        self._reservadas = reservadas
+        self._simbolos = [(tipo, re.compile(padrao, lexer.lexreflags)) for tipo, padrao in simbolos]
+        self._tipos_simbolos = {}
+        self.lexdata = ''
+        self.lexpos = 0
+        self.lexlen = 0
+        self.lineno = 1
+        self.linhas = None
+
+    def clone(self):
+        return copy.copy(self)
+
+    def input(self, texto):
+        self.lexdata = texto
+        self.lexpos = 0
+        self.lexlen = len(texto)
+
+    def skip(self, n):
+        self.lexpos += n
+
+    def token(self):
+        """Próximo token, ou None no fim do texto"""
+        texto = self.lexdata
+        casar = self._casar
+        acoes = self._acoes
+        pos = self.lexpos
+        while True:
+            m = casar(texto, pos)
+            if m is None:
+                # Apenas caracteres ignorados até o fim do texto
+                self.lexpos = self.lexlen
+                return None
+            i = m.lastindex
+            acao, tipo, funcao = acoes[i]
+            pos = m.end()
+            if acao == _LINHA:
+                self.lineno += pos - m.start(i)
+                continue
+
+            token = LexToken()
+            token.lineno = self.lineno
+            token.lexpos = m.start(i)
+            valor = m.group(i)
+            if acao == _SIMBOLO:
+                token.type = self._tipos_simbolos.get(valor) or self._tipo_simbolo(valor)
+                token.value = valor
+            elif acao == _RESERVADA:
+                token.type = self._reservadas.get(valor, tipo)
+                token.value = valor
+            elif acao == _CONVERSAO:
+                token.type = tipo
+                token.tamanho = len(valor)
+                token.value = funcao(valor)
+            else:
+                if acao == _ERRO:
+                    if funcao is None:
+                        raise LexError(f"Caractere ilegal {valor!r} na posição {token.lexpos}",
+                                       texto[token.lexpos:])
+                    # Como no PLY: a função recebe o restante do texto e avança com skip()
+                    token.type = 'error'
+                    token.value = texto[token.lexpos:]
+                    pos = token.lexpos
+                else:
+                    token.type = tipo
+                    token.value = valor
+                token.lexer = self
+                self.lexpos = pos
+                token = funcao(token)
+                if acao == _ERRO:
+                    if self.lexpos == pos:
+                        raise LexError(f"Caractere ilegal {valor!r} na posição {pos}", texto[pos:])
+                pos = self.lexpos
+                if token is None:
+                    continue
+            self.lexpos = pos
+            return token
+
+    def _tipo_simbolo(self, valor):
+        """Tipo da primeira regra definida por string que aceita `valor`"""
+        tipo = next(tipo for tipo, regex in self._simbolos if regex.fullmatch(valor))
+        self._tipos_simbolos[valor] = tipo
+        return tipo
+
+    def __iter__(self):
+        return iter(self.token, None)
+
+def _nenhum():
+    return None
+
+class BufferTokens:
+    """
+    Tokens de um texto em colunas paralelas de inteiros (array('i')), sem um
+    objeto por token. O valor de cada token não é guardado: ele é recortado
+    do texto (e convertido, nos literais) apenas quando pedido.
+
+    Attributes:
+        texto: Texto analisado
+        tipos: Classe de cada token, índice em `classes`
+        inicios: Posição de cada token no texto
+        tamanhos: Comprimento do texto de cada token
+        quebras: Posição de cada sequência de quebras de linha
+        tamanhos_quebras: Quantidade de quebras de cada sequência
+        classes: Lista de (tipo, modo, função) compartilhada pelos buffers de
+                 um mesmo lexer; o modo diz como o valor é obtido (ver
+                 LexerBuffer)
+    """
+    __slots__ = ('texto', 'tipos', 'inicios', 'tamanhos', 'quebras', 'tamanhos_quebras', 'classes')
+
+    def __init__(self, texto, classes):
+        self.texto = texto
+        self.tipos = array('i')
+        self.inicios = array('i')
+        self.tamanhos = array('i')
+        self.quebras = array('i')
+        self.tamanhos_quebras = array('i')
+        self.classes = classes
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def tipo(self, i):
+        return self.classes[self.tipos[i]][0]
+
+    def texto_token(self, i):
+        """Texto original do token `i`"""
+        inicio = self.inicios[i]
+        return self.texto[inicio:inicio + self.tamanhos[i]]
+
+    def valor(self, i):
+        """
+        Valor do token `i`: o texto, convertido nos literais (int, float).
+        Os tokens de regras com função (e os erros) devolvem o texto, sem
+        chamar a função.
+        """
+        _, modo, funcao = self.classes[self.tipos[i]]
+        if modo == _CONVERSAO:
+            return funcao(self.texto_token(i))
+        return self.texto_token(i)
+
+    def memoria(self):
+        """Bytes ocupados pelas colunas (sem a folga de crescimento dos arrays)"""
+        return sum(len(coluna) * coluna.itemsize
+                   for coluna in (self.tipos, self.inicios, self.tamanhos,
+                                  self.quebras, self.tamanhos_quebras))
+
+    def __repr__(self):
+        return f"BufferTokens(tokens={len(self.tipos)}, bytes={self.memoria()})"
+
+class LexerBuffer(LexerRapido):
+    """
+    LexerRapido em modo buffer: input() analisa o texto inteiro de uma vez,
+    preenchendo um BufferTokens, e token() entrega os tokens lendo as
+    colunas, montando o LexToken só nesse momento.
+
+    O preenchimento usa a mesma expressão e as mesmas ações do LexerRapido.
+    Cada token recebe uma classe (tipo, modo, função) com um dos modos:
+
+        _SIMBOLO     o valor é o texto (operadores, identificadores e
+                     palavras reservadas)
+        _CONVERSAO   o valor é função(texto), e `tamanho` o comprimento
+        _FUNCAO      a função da regra é chamada por token(), como no
+                     LexerRapido
+        _ERRO        t_error é chamada por token(), como no LexerRapido
+
+    As funções das regras e t_error só são chamadas por token(), na ordem em
+    que o parser consome os tokens, de modo que os diagnósticos léxicos
+    saem na mesma ordem que com os outros lexers. O preenchimento supõe que
+    a função não avança lexpos (skip) além do texto casado, e t_error, um
+    caractere; se ela avança outra quantidade, o restante do buffer é
+    descartado e o texto é analisado de novo a partir da nova posição.
+
+    Args:
+        Os mesmos de LexerRapido
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._preparar()
+
+    @classmethod
+    def a_partir_de(cls, rapido):
+        """LexerBuffer com a expressão e as ações já montadas de um LexerRapido"""
+        lexer = copy.copy(rapido)
+        lexer.__class__ = cls
+        lexer._preparar()
+        return lexer
+
+    def _preparar(self):
+        # Classes de token (compartilhadas pelos clones) e, por ação, a
+        # classe dos tokens que ela produz
+        self._classes = []
+        self._indices_classes = {}
+        self._classes_acoes = [None] * len(self._acoes)
+        for i, acao in enumerate(self._acoes):
+            if acao is None or acao[0] in (_SIMBOLO, _LINHA):
+                continue
+            tipo_acao, tipo, funcao = acao
+            if tipo_acao == _RESERVADA:
+                self._classes_acoes[i] = self._classe(tipo, _SIMBOLO, None)
+            else:
+                self._classes_acoes[i] = self._classe(tipo, tipo_acao, funcao)
+        self._classes_reservadas = {palavra: self._classe(tipo, _SIMBOLO, None)
+                                    for palavra, tipo in self._reservadas.items()}
+        self._classes_simbolos = {}
+        self.buffer = None
+        self._proximo = 0
+        self._quebra = 0
+        self._seguinte = _nenhum
+
+    def _classe(self, tipo, modo, funcao):
+        chave = (tipo, modo, funcao)
+        indice = self._indices_classes.get(chave)
+        if indice is None:
+            indice = self._indices_classes[chave] = len(self._classes)
+            self._classes.append(chave)
+        return indice
+
+    def _classe_simbolo(self, valor):
+        classe = self._classes_simbolos[valor] = self._classe(self._tipo_simbolo(valor), _SIMBOLO, None)
+        return classe
+
+    def input(self, texto):
+        super().input(texto)
+        self.buffer = BufferTokens(texto, self._classes)
+        self._proximo = 0
+        self._quebra = 0
+        self._preencher(0)
+        self._seguinte = self._ler(0, 0).__next__
+
+    def _preencher(self, pos):
+        """Acrescenta ao buffer os tokens do texto a partir de `pos`"""
+        buffer = self.buffer
+        texto = buffer.texto
+        casar = self._casar
+        acoes = self._acoes
+        classes_acoes = self._classes_acoes
+        reservadas = self._classes_reservadas
+        simbolos = self._classes_simbolos
+        tipos = buffer.tipos.append
+        inicios = buffer.inicios.append
+        tamanhos = buffer.tamanhos.append
+        quebras = buffer.quebras.append
+        tamanhos_quebras = buffer.tamanhos_quebras.append
+        while True:
+            m = casar(texto, pos)
+            if m is None:
+                return
+            i = m.lastindex
+            acao = acoes[i][0]
+            inicio = m.start(i)
+            pos = m.end()
+            if acao == _LINHA:
+                quebras(inicio)
+                tamanhos_quebras(pos - inicio)
+                continue
+            if acao == _SIMBOLO:
+                valor = m.group(i)
+                classe = simbolos.get(valor)
+                if classe is None:
+                    classe = self._classe_simbolo(valor)
+            elif acao == _RESERVADA:
+                classe = reservadas.get(m.group(i), classes_acoes[i])
+            else:
+                classe = classes_acoes[i]
+            tipos(classe)
+            inicios(inicio)
+            tamanhos(pos - inicio)
+
+    def _reler(self, proximo, fim, pos):
+        """
+        Descarta os tokens a partir de `proximo` e as quebras de linha a partir
+        de `fim` (o fim do último token mantido), e analisa de novo a partir
+        de `pos`; as quebras entre os dois foram puladas e não contam
+        """
+        buffer = self.buffer
+        for coluna in (buffer.tipos, buffer.inicios, buffer.tamanhos):
+            del coluna[proximo:]
+        quebra = bisect.bisect_left(buffer.quebras, min(fim, pos))
+        del buffer.quebras[quebra:]
+        del buffer.tamanhos_quebras[quebra:]
+        self._preencher(pos)
+
+    def clone(self):
+        copia = copy.copy(self)
+        if self.buffer is not None:
+            # A cópia continua a leitura do ponto em que o original está
+            copia._seguinte = copia._ler(self._proximo, self._quebra).__next__
+        return copia
+
+    def token(self):
+        """Próximo token do buffer, ou None no fim do texto"""
+        return self._seguinte()
+
+    def _ler(self, i, q):
+        """
+        Gerador dos tokens do buffer a partir do token `i` e da quebra de
+        linha `q`; depois do último, gera None indefinidamente. As colunas
+        ficam em variáveis locais do gerador, e não são procuradas a cada
+        token.
+        """
+        buffer = self.buffer
+        texto = buffer.texto
+        classes = buffer.classes
+        tipos = buffer.tipos
+        inicios = buffer.inicios
+        tamanhos = buffer.tamanhos
+        quebras = buffer.quebras
+        tamanhos_quebras = buffer.tamanhos_quebras
+        n = len(inicios)
+        n_quebras = len(quebras)
+        while i < n:
+            inicio = inicios[i]
+            if q < n_quebras and quebras[q] < inicio:
+                # Quebras de linha antes do token
+                lineno = self.lineno
+                while q < n_quebras and quebras[q] < inicio:
+                    lineno += tamanhos_quebras[q]
+                    q += 1
+                self.lineno = lineno
+            tipo, modo, funcao = classes[tipos[i]]
+            fim = inicio + tamanhos[i]
+            i += 1
+            self._proximo = i
+            self._quebra = q
+            token = LexToken()
+            token.lineno = self.lineno
+            token.lexpos = inicio
+            if modo == _SIMBOLO:
+                token.type = tipo
+                token.value = texto[inicio:fim]
+            elif modo == _CONVERSAO:
+                token.type = tipo
+                token.tamanho = fim - inicio
+                token.value = funcao(texto[inicio:fim])
+            else:
+                if modo == _ERRO:
+                    if funcao is None:
+                        raise LexError(f"Caractere ilegal {texto[inicio]!r} na posição {inicio}",
+                                       texto[inicio:])
+                    token.type = 'error'
+                    token.value = texto[inicio:]
+                    self.lexpos = inicio
+                else:
+                    token.type = tipo
+                    token.value = texto[inicio:fim]
+                    self.lexpos = fim
+                token.lexer = self
+                token = funcao(token)
+                if modo == _ERRO and self.lexpos == inicio:
+                    raise LexError(f"Caractere ilegal {texto[inicio]!r} na posição {inicio}",
+                                   texto[inicio:])
+                if self.lexpos != fim:
+                    # A função avançou uma quantidade diferente da prevista
+                    self._reler(i, fim, self.lexpos)
+                    n = len(inicios)
+                    n_quebras = len(quebras)
+                if token is None:
+                    continue
+                yield token
+                continue
+            self.lexpos = fim
+            yield token
+        # Quebras de linha depois do último token
+        while q < n_quebras:
+            self.lineno += tamanhos_quebras[q]
+            q += 1
+        self._quebra = q
+        self.lexpos = self.lexlen
+        while True:
+            yield None
@@ -0,0 +1,127 @@
+"""
+Análise léxica de arquivos lidos em blocos.
+
+FluxoLexico lê o fonte de qualquer objeto com read(n) (arquivo aberto em
+modo texto ou binário, io.StringIO, mmap) em blocos de `tamanho_bloco`
+caracteres ou bytes e entrega os tokens por um gerador, sem nunca manter o
+arquivo inteiro em memória. Pode ser passado como lexer para o parser do
+PLY, que consome os tokens sob demanda:
+
+    with open("programa.txt") as arquivo:
+        for token in FluxoLexico(arquivo, lexer):
+            ...
+        parser.parse(lexer=FluxoLexico(arquivo, lexer))
+
+Nenhum token da linguagem contém '\\n' (nem strings, nem comentários REM,
+nem diretivas #), então cada bloco é cortado logo depois da sua última
+quebra de linha e o restante é juntado ao bloco seguinte: um token nunca é
+dividido entre dois trechos analisados. Uma linha maior que o bloco é
+acumulada até a próxima quebra de linha. A memória usada é limitada pelo
+tamanho do bloco e da linha mais longa, não pelo tamanho do arquivo.
+
+Os tokens têm `lexpos` contado desde o início do arquivo e, além dos
+atributos do PLY, `coluna` (a partir de 1). Como o texto anterior ao trecho
+não fica disponível, a coluna é calculada quando o token é produzido, com
+um índice de linhas (posicoes.IndiceLinhas) do trecho atual.
+"""
+import codecs
+import mmap
+
+from posicoes import IndiceLinhas
+
+TAMANHO_BLOCO = 1 << 16
+
+class FluxoLexico:
+    """
+    Tokens de um arquivo lido em blocos, analisado por um lexer do PLY.
+
+    Args:
+        fonte: Objeto com read(n) que devolve str ou bytes (arquivo, mmap)
+        lexer: Lexer do PLY usado nos trechos; passa a ser deste fluxo
+               (use Compiler.novo_lexer())
+        tamanho_bloco: Quantidade lida por chamada a read()
+        encoding: Codificação de fontes binárias (padrão: utf-8)
+
+    Attributes:
+        lexdata: Trecho do arquivo sendo analisado no momento
+        lineno: Linha atual do lexer
+    """
+
+    def __init__(self, fonte, lexer, tamanho_bloco=TAMANHO_BLOCO, encoding='utf-8'):
+        if tamanho_bloco <= 0:
+            raise ValueError(f"tamanho_bloco precisa ser positivo: {tamanho_bloco}")
+        self.fonte = fonte
+        self.lexer = lexer
+        self.tamanho_bloco = tamanho_bloco
+        self._decodificador = codecs.getincrementaldecoder(encoding)()
+        self._binario = None
+        self._tokens = self._gerar()
+
+    @property
+    def lexdata(self):
+        return self.lexer.lexdata
+
+    @property
+    def lineno(self):
+        return self.lexer.lineno
+
+    def _ler(self):
+        """Próximo bloco já decodificado; '' no fim do arquivo"""
+        while True:
+            bloco = self.fonte.read(self.tamanho_bloco)
+            if self._binario is None:
+                self._binario = not isinstance(bloco, str)
+            if not self._binario:
+                return bloco
+            if not bloco:
+                return self._decodificador.decode(b'', final=True)
+            texto = self._decodificador.decode(bloco)
+            if texto:
+                return texto
+            # O bloco só tinha parte de um caractere multibyte
+
+    def _gerar(self):
+        lexer = self.lexer
+        lexer.lineno = 1
+        base = 0
+        pendente = ''
+        fim = False
+        while not fim:
+            bloco = self._ler()
+            fim = not bloco
+            texto = pendente + bloco
+            corte = len(texto) if fim else texto.rfind('\n') + 1
+            if not corte:
+                pendente = texto
+                continue
+            trecho, pendente = texto[:corte], texto[corte:]
+            lexer.input(trecho)
+            # O trecho começa numa linha nova, na linha atual do lexer
+            lexer.linhas = IndiceLinhas(trecho, lexer.lineno)
+            coluna = lexer.linhas.coluna
+            for token in iter(lexer.token, None):
+                lexpos = token.lexpos
+                token.coluna = coluna(token.lineno, lexpos)
+                token.lexpos = lexpos + base
+                yield token
+            base += corte
+
+    def __iter__(self):
+        return self._tokens
+
+    def token(self):
+        """Próximo token, ou None no fim do arquivo (interface de lexer do PLY)"""
+        return next(self._tokens, None)
+
+    def input(self, texto):
+        raise TypeError("FluxoLexico lê da sua fonte; não recebe texto por input()")
+
+def abrir_mmap(arquivo):
+    """
+    Mapeia em memória, só para leitura, um arquivo aberto em modo binário.
+    Arquivos vazios não podem ser mapeados: o próprio arquivo é devolvido.
+    """
+    try:
+        return mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        return arquivo
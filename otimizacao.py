@@ -0,0 +1,614 @@
+"""
+Otimizações sobre o código de três endereços (ir.py).
+
+Passos disponíveis, todos sobre o grafo de blocos básicos:
+
+    propagacao_constantes: análise de fluxo de dados para frente que
+        descobre as variáveis com valor constante em cada ponto do programa
+        (em todos os caminhos que chegam lá) e troca os usos pelo valor
+    dobramento_constantes: avalia operações e conversões cujos operandos
+        são constantes; divisões por zero são mantidas para falhar em
+        tempo de execução
+    dobramento_desvios: resolve condições conhecidas em tempo de compilação
+        (`if (age < 18)` depois de `int age = 6;`) e remove o código que
+        ficou inalcançável
+    eliminacao_armazenamentos_mortos: análise de vivacidade para trás que
+        remove atribuições cujo valor nunca é lido; as variáveis do corpo
+        de main continuam vivas no fim do programa, pois o estado final é
+        parte do resultado
+
+O GerenciadorPassos repete a sequência até nenhum passo alterar o programa
+e mede o tempo de cada passo.
+"""
+import heapq
+import time
+
+from interpreter import COMPARACOES
+from ir import (COPY, BINOP, CONV, CLEAR, IF_FALSE, GOTO, LABEL, Const, CONVERSOES,
+                aplicar_operacao, blocos_basicos)
+
+# Os conjuntos das análises de fluxo de dados são inteiros usados como
+# vetores de bits: união, interseção e diferença custam uma operação sobre
+# o inteiro inteiro, em vez de uma por elemento. Só os nomes globais (vivos
+# entre blocos) entram nos vetores; os demais, como os temporários de uma
+# expressão, são definidos e lidos num único bloco e são tratados ali.
+
+def _nomes_globais(blocos, observaveis):
+    """
+    Índices dos nomes que precisam de análise entre blocos: os observáveis
+    no fim do programa, os que aparecem em mais de um bloco e os lidos num
+    bloco antes de serem definidos nele
+    """
+    globais = {nome_ir: i for i, (_, nome_ir) in enumerate(observaveis)}
+    bloco_de = {}
+    for bloco in blocos:
+        indice = bloco.indice
+        definidos = set()
+        for instrucao in bloco.instrucoes:
+            for nome in instrucao.usos():
+                if nome not in definidos or bloco_de[nome] != indice:
+                    globais.setdefault(nome, len(globais))
+            destino = instrucao.destino
+            if destino is not None:
+                if bloco_de.setdefault(destino, indice) != indice:
+                    globais.setdefault(destino, len(globais))
+                definidos.add(destino)
+    return globais
+
+def _calcular(op, operador, a, b, tipo):
+    """
+    Valor constante de uma instrução com operandos constantes, ou None se o
+    cálculo falhar (a falha fica para o tempo de execução)
+    """
+    if op == COPY:
+        return a
+    if op == BINOP:
+        if operador == '/' and b.valor == 0:
+            return None
+        try:
+            return Const(aplicar_operacao(operador, a.valor, b.valor, tipo), tipo)
+        except (ArithmeticError, TypeError):
+            return None
+    if op == CONV:
+        try:
+            return Const(CONVERSOES[operador](a.valor), operador)
+        except (ArithmeticError, ValueError):
+            return None
+    return None
+
+def _avaliar(instrucao, tipos):
+    """Valor constante calculado por uma instrução, ou None se não for conhecido"""
+    if type(instrucao.a) is not Const or (instrucao.op == BINOP and type(instrucao.b) is not Const):
+        return None
+    return _calcular(instrucao.op, instrucao.operador, instrucao.a, instrucao.b, tipos[instrucao.destino])
+
+def _comparar(operador, a, b):
+    """Resultado de uma condição constante, ou None se não for comparável"""
+    try:
+        return COMPARACOES[operador](a.valor, b.valor)
+    except TypeError:
+        return None
+
+# Propagação de constantes
+
+# Valor ainda não calculado de uma definição (o topo do reticulado); None
+# representa um valor não constante
+_DESCONHECIDO = object()
+
+def propagar_constantes(programa):
+    """
+    Troca usos de variáveis de valor conhecido pela constante.
+
+    Propagação condicional de constantes sobre definições alcançantes: um
+    uso é constante quando todas as definições da variável que o alcançam
+    produzem o mesmo valor constante. Cada nome global tem também uma pseudo
+    definição na entrada do programa, que conta como valor não constante.
+    Os valores das definições são calculados durante a análise, e só as
+    arestas executáveis levam definições adiante: o lado de um desvio cuja
+    condição é constante não contamina a junção, então cadeias de ifs e
+    cálculos que dependem uns dos outros se resolvem numa única execução.
+
+    Returns:
+        Número de operandos substituídos
+    """
+    instrucoes = programa.instrucoes
+    tipos = programa.tipos
+    blocos = blocos_basicos(instrucoes)
+    globais = _nomes_globais(blocos, programa.observaveis)
+    quantidade_globais = len(globais)
+
+    # Bits 0..quantidade_globais-1: pseudo definições de entrada; os
+    # seguintes, as definições de nomes globais, em ordem de programa
+    definicoes = {nome: 1 << i for nome, i in globais.items()}
+    posicoes_definicoes = []
+    posicoes = []
+    geradas = []
+    mortas = []
+    posicao = 0
+    for bloco in blocos:
+        posicoes.append(posicao)
+        # Cada bloco gera a última definição de cada nome e mata as demais
+        ultima = {}
+        for instrucao in bloco.instrucoes:
+            destino = instrucao.destino
+            if destino is not None and destino in globais:
+                bit = 1 << (quantidade_globais + len(posicoes_definicoes))
+                posicoes_definicoes.append(posicao)
+                definicoes[destino] |= bit
+                ultima[destino] = bit
+            posicao += 1
+        geradas.append(sum(ultima.values()))
+        mortas.append(ultima)
+    mortas = [sum(definicoes[nome] for nome in ultima) for ultima in mortas]
+
+    # Valor de cada definição, pela posição da instrução, e os blocos que o
+    # leram por definições alcançantes (reavaliados quando ele muda)
+    valores = {}
+    leitores = {}
+
+    def valor_alcancante(alcancantes, leitor):
+        """Constante comum às definições alcançantes, ou None"""
+        comum = None
+        while alcancantes:
+            bit = alcancantes & -alcancantes
+            alcancantes ^= bit
+            indice = bit.bit_length() - 1 - quantidade_globais
+            if indice < 0:
+                return None
+            posicao = posicoes_definicoes[indice]
+            if leitor is not None:
+                leitores.setdefault(posicao, set()).add(leitor)
+            valor = valores.get(posicao, _DESCONHECIDO)
+            if valor is _DESCONHECIDO:
+                continue
+            if valor is None or (comum is not None and valor != comum):
+                return None
+            comum = valor
+        return comum
+
+    def resolver(operando, locais, entrada, leitor=None):
+        if type(operando) is Const:
+            return operando
+        local = locais.get(operando)
+        if local is not None:
+            return valores.get(local)
+        return valor_alcancante(entrada & definicoes[operando], leitor)
+
+    entradas = [0] * len(blocos)
+    saidas = [0] * len(blocos)
+    # Blocos executáveis e, para cada um, os sucessores por arestas executáveis
+    arestas = {0: set()}
+    # Lista de trabalho em ordem de programa: laços convergem antes de o
+    # código seguinte ser visitado
+    fila = [0]
+    na_fila = {0}
+
+    def agendar(indice):
+        if indice not in na_fila:
+            na_fila.add(indice)
+            heapq.heappush(fila, indice)
+
+    while fila:
+        indice = heapq.heappop(fila)
+        na_fila.discard(indice)
+        bloco = blocos[indice]
+        seguintes = arestas[indice]
+        entrada = (1 << quantidade_globais) - 1 if indice == 0 else 0
+        for predecessor in bloco.predecessores:
+            if indice in arestas.get(predecessor.indice, ()):
+                entrada |= saidas[predecessor.indice]
+        entradas[indice] = entrada
+
+        locais = {}
+        posicao = posicoes[indice]
+        for instrucao in bloco.instrucoes:
+            destino = instrucao.destino
+            if destino is not None:
+                valor = None
+                if instrucao.op != CLEAR:
+                    a = resolver(instrucao.a, locais, entrada, indice)
+                    b = resolver(instrucao.b, locais, entrada, indice) if instrucao.op == BINOP else a
+                    if a is not None and b is not None:
+                        valor = _calcular(instrucao.op, instrucao.operador, a, b, tipos[destino])
+                anterior = valores.get(posicao, _DESCONHECIDO)
+                if anterior is _DESCONHECIDO or (anterior is not None and anterior != valor):
+                    # O valor só desce no reticulado: constante -> não constante
+                    valores[posicao] = valor if anterior is _DESCONHECIDO else None
+                    for leitor in leitores.get(posicao, ()):
+                        if leitor != indice:
+                            agendar(leitor)
+                locais[destino] = posicao
+            posicao += 1
+
+        sucessores = bloco.sucessores
+        ultima = bloco.instrucoes[-1] if bloco.instrucoes else None
+        if ultima is not None and ultima.op == IF_FALSE and len(sucessores) == 2:
+            a = resolver(ultima.a, locais, entrada, indice)
+            b = resolver(ultima.b, locais, entrada, indice)
+            condicao = _comparar(ultima.operador, a, b) if a is not None and b is not None else None
+            if condicao is not None:
+                # sucessores[0] é o alvo do salto, sucessores[1] a instrução seguinte
+                sucessores = sucessores[1:] if condicao else sucessores[:1]
+        for sucessor in sucessores:
+            if sucessor.indice not in seguintes:
+                seguintes.add(sucessor.indice)
+                arestas.setdefault(sucessor.indice, set())
+                agendar(sucessor.indice)
+
+        saida = geradas[indice] | (entrada & ~mortas[indice])
+        if saida != saidas[indice]:
+            saidas[indice] = saida
+            for sucessor in seguintes:
+                agendar(sucessor)
+
+    substituidos = 0
+    for bloco in blocos:
+        if bloco.indice not in arestas:
+            # Inalcançável: removido por dobramento_desvios
+            continue
+        entrada = entradas[bloco.indice]
+        locais = {}
+        posicao = posicoes[bloco.indice]
+        for instrucao in bloco.instrucoes:
+            usos = instrucao.usos()
+            if usos:
+                constantes = {}
+                for nome in usos:
+                    valor = resolver(nome, locais, entrada)
+                    if valor is not None:
+                        constantes[nome] = valor
+                if constantes:
+                    instrucao.substituir_usos(constantes)
+                    substituidos += len(usos) - len(instrucao.usos())
+            if instrucao.destino is not None:
+                locais[instrucao.destino] = posicao
+            posicao += 1
+    return substituidos
+
+# Dobramento de constantes
+
+def dobrar_constantes(programa):
+    """
+    Avalia operações e conversões de operandos constantes.
+
+    Returns:
+        Número de instruções trocadas por uma cópia de constante
+    """
+    dobradas = 0
+    for instrucao in programa.instrucoes:
+        if instrucao.op not in (BINOP, CONV):
+            continue
+        valor = _avaliar(instrucao, programa.tipos)
+        if valor is None:
+            continue
+        instrucao.op = COPY
+        instrucao.a = valor
+        instrucao.b = instrucao.operador = None
+        dobradas += 1
+    return dobradas
+
+# Dobramento de desvios
+
+def dobrar_desvios(programa):
+    """
+    Resolve desvios de condição constante e remove código inalcançável,
+    saltos para a instrução seguinte e rótulos sem uso.
+
+    Returns:
+        Número de instruções removidas ou simplificadas
+    """
+    alteracoes = 0
+    instrucoes = []
+    for instrucao in programa.instrucoes:
+        if instrucao.op == IF_FALSE and type(instrucao.a) is Const and type(instrucao.b) is Const:
+            verdadeira = _comparar(instrucao.operador, instrucao.a, instrucao.b)
+            if verdadeira is None:
+                instrucoes.append(instrucao)
+                continue
+            alteracoes += 1
+            if verdadeira:
+                continue
+            instrucao.op = GOTO
+            instrucao.a = instrucao.b = instrucao.operador = None
+        instrucoes.append(instrucao)
+
+    # Blocos inalcançáveis a partir da entrada
+    blocos = blocos_basicos(instrucoes)
+    alcancados = {0}
+    pendentes = [blocos[0]]
+    while pendentes:
+        for sucessor in pendentes.pop().sucessores:
+            if sucessor.indice not in alcancados:
+                alcancados.add(sucessor.indice)
+                pendentes.append(sucessor)
+    instrucoes = []
+    for bloco in blocos:
+        if bloco.indice in alcancados:
+            instrucoes.extend(bloco.instrucoes)
+        else:
+            alteracoes += len(bloco.instrucoes)
+
+    # Saltos para a instrução seguinte
+    simplificadas = []
+    for i, instrucao in enumerate(instrucoes):
+        if (instrucao.op == GOTO and i + 1 < len(instrucoes) and instrucoes[i + 1].op == LABEL
+                and instrucoes[i + 1].alvo == instrucao.alvo):
+            alteracoes += 1
+            continue
+        simplificadas.append(instrucao)
+
+    usados = {i.alvo for i in simplificadas if i.op in (GOTO, IF_FALSE)}
+    programa.instrucoes = []
+    for instrucao in simplificadas:
+        if instrucao.op == LABEL and instrucao.alvo not in usados:
+            alteracoes += 1
+            continue
+        programa.instrucoes.append(instrucao)
+    return alteracoes
+
+# Eliminação de armazenamentos mortos
+
+def _removivel(instrucao, usos_vazios, tipos):
+    """
+    Se a instrução pode ser removida quando o destino não é lido depois:
+    ela não pode falhar em tempo de execução (divisão por zero, potência,
+    conversão que estoura, leitura de variável não inicializada)
+    """
+    op = instrucao.op
+    if op == CLEAR:
+        return True
+    if usos_vazios:
+        return False
+    if op == COPY:
+        return True
+    if op == CONV:
+        # int -> float estoura com inteiros grandes, float -> int falha com
+        # infinito e int -> char com inteiros de milhares de dígitos; só
+        # float -> char nunca falha
+        origem = instrucao.a
+        tipo = origem.tipo if type(origem) is Const else tipos[origem]
+        return instrucao.operador == "char" and tipo == "float"
+    if op == BINOP:
+        if instrucao.operador in '+-*':
+            return True
+        return (instrucao.operador == '/' and type(instrucao.b) is Const and instrucao.b.valor != 0)
+    return False
+
+def _talvez_nao_inicializadas(blocos):
+    """
+    Para cada instrução, se ela lê um nome que pode estar sem valor (após
+    `clear`): análise para frente com união nas junções, restrita aos nomes
+    que têm algum `clear`
+
+    Returns:
+        Lista de listas de bool, paralela aos blocos e suas instruções
+    """
+    indices = {}
+    for bloco in blocos:
+        for instrucao in bloco.instrucoes:
+            if instrucao.op == CLEAR:
+                indices.setdefault(instrucao.destino, len(indices))
+
+    geradas = []
+    mortas = []
+    for bloco in blocos:
+        gera = mata = 0
+        for instrucao in bloco.instrucoes:
+            indice = indices.get(instrucao.destino)
+            if indice is None:
+                continue
+            bit = 1 << indice
+            if instrucao.op == CLEAR:
+                gera |= bit
+                mata &= ~bit
+            else:
+                mata |= bit
+                gera &= ~bit
+        geradas.append(gera)
+        mortas.append(mata)
+
+    entradas = [0] * len(blocos)
+    saidas = list(geradas)
+    alterou = bool(indices)
+    while alterou:
+        alterou = False
+        for bloco in blocos:
+            entrada = 0
+            for predecessor in bloco.predecessores:
+                entrada |= saidas[predecessor.indice]
+            entradas[bloco.indice] = entrada
+            saida = (entrada & ~mortas[bloco.indice]) | geradas[bloco.indice]
+            if saida != saidas[bloco.indice]:
+                saidas[bloco.indice] = saida
+                alterou = True
+
+    resultado = []
+    for bloco in blocos:
+        vazias = entradas[bloco.indice]
+        lidas = []
+        for instrucao in bloco.instrucoes:
+            lidas.append(bool(vazias) and any(
+                vazias >> indices[nome] & 1 for nome in instrucao.usos() if nome in indices))
+            indice = indices.get(instrucao.destino)
+            if indice is not None:
+                vazias = vazias | (1 << indice) if instrucao.op == CLEAR else vazias & ~(1 << indice)
+        resultado.append(lidas)
+    return resultado
+
+def eliminar_armazenamentos_mortos(programa):
+    """
+    Remove definições cujo valor nunca é lido.
+
+    Returns:
+        Número de instruções removidas
+    """
+    blocos = blocos_basicos(programa.instrucoes)
+    globais = _nomes_globais(blocos, programa.observaveis)
+    finais = (1 << len(programa.observaveis)) - 1
+
+    usos = []
+    definicoes = []
+    for bloco in blocos:
+        usa = define = 0
+        for instrucao in bloco.instrucoes:
+            for nome in instrucao.usos():
+                indice = globais.get(nome)
+                if indice is not None and not define >> indice & 1:
+                    usa |= 1 << indice
+            indice = globais.get(instrucao.destino)
+            if indice is not None:
+                define |= 1 << indice
+        usos.append(usa)
+        definicoes.append(define)
+
+    vivas_saida = [0] * len(blocos)
+    vivas_entrada = [0] * len(blocos)
+    alterou = True
+    while alterou:
+        alterou = False
+        for bloco in reversed(blocos):
+            if bloco.sucessores:
+                saida = 0
+                for sucessor in bloco.sucessores:
+                    saida |= vivas_entrada[sucessor.indice]
+            else:
+                saida = finais
+            entrada = usos[bloco.indice] | (saida & ~definicoes[bloco.indice])
+            vivas_saida[bloco.indice] = saida
+            if entrada != vivas_entrada[bloco.indice]:
+                vivas_entrada[bloco.indice] = entrada
+                alterou = True
+
+    talvez_vazias = _talvez_nao_inicializadas(blocos)
+    removidas = 0
+    instrucoes = []
+    for bloco, vazias_bloco in zip(blocos, talvez_vazias):
+        vivas = vivas_saida[bloco.indice]
+        vivas_locais = set()
+        mantidas = []
+        for instrucao, vazias in zip(reversed(bloco.instrucoes), reversed(vazias_bloco)):
+            destino = instrucao.destino
+            if destino is not None:
+                indice = globais.get(destino)
+                viva = vivas >> indice & 1 if indice is not None else destino in vivas_locais
+                if not viva and _removivel(instrucao, vazias, programa.tipos):
+                    removidas += 1
+                    continue
+                if indice is not None:
+                    vivas &= ~(1 << indice)
+                else:
+                    vivas_locais.discard(destino)
+            for nome in instrucao.usos():
+                indice = globais.get(nome)
+                if indice is not None:
+                    vivas |= 1 << indice
+                else:
+                    vivas_locais.add(nome)
+            mantidas.append(instrucao)
+        mantidas.reverse()
+        instrucoes.extend(mantidas)
+    programa.instrucoes = instrucoes
+    return removidas
+
+# Gerenciador de passos
+
+PASSOS = (
+    ('propagacao_constantes', propagar_constantes),
+    ('dobramento_constantes', dobrar_constantes),
+    ('dobramento_desvios', dobrar_desvios),
+    ('eliminacao_armazenamentos_mortos', eliminar_armazenamentos_mortos),
+)
+
+class EstatisticaPasso:
+    """Execuções, alterações e tempo acumulado de um passo"""
+    __slots__ = ('nome', 'execucoes', 'alteracoes', 'tempo')
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.execucoes = 0
+        self.alteracoes = 0
+        self.tempo = 0.0
+
+    def to_dict(self):
+        return {
+            'pass': self.nome,
+            'runs': self.execucoes,
+            'changes': self.alteracoes,
+            'time_ms': round(self.tempo * 1000, 3),
+        }
+
+class RelatorioPassos:
+    """Resultado de GerenciadorPassos.otimizar"""
+    __slots__ = ('passos', 'iteracoes', 'instrucoes_antes', 'instrucoes_depois')
+
+    def __init__(self, passos, iteracoes, instrucoes_antes, instrucoes_depois):
+        self.passos = passos
+        self.iteracoes = iteracoes
+        self.instrucoes_antes = instrucoes_antes
+        self.instrucoes_depois = instrucoes_depois
+
+    @property
+    def tempo(self):
+        return sum(passo.tempo for passo in self.passos)
+
+    def to_dict(self):
+        return {
+            'iterations': self.iteracoes,
+            'instructions_before': self.instrucoes_antes,
+            'instructions_after': self.instrucoes_depois,
+            'time_ms': round(self.tempo * 1000, 3),
+            'passes': [passo.to_dict() for passo in self.passos],
+        }
+
+    def __str__(self):
+        largura = max(len(passo.nome) for passo in self.passos)
+        linhas = [f"{'passo':<{largura}}  execuções  alterações  tempo (ms)"]
+        for passo in self.passos:
+            linhas.append(f"{passo.nome:<{largura}}  {passo.execucoes:>9}  {passo.alteracoes:>10}"
+                          f"  {passo.tempo * 1000:>10.3f}")
+        linhas.append(f"{self.iteracoes} iterações, {self.instrucoes_antes} -> {self.instrucoes_depois} instruções,"
+                      f" {self.tempo * 1000:.3f} ms")
+        return '\n'.join(linhas)
+
+class GerenciadorPassos:
+    """
+    Aplica uma sequência de passos até nenhum deles alterar o programa.
+
+    Args:
+        passos: Pares (nome, função); a função recebe o ProgramaTAC, altera-o
+                e retorna o número de alterações
+        max_iteracoes: Máximo de repetições da sequência
+    """
+    __slots__ = ('passos', 'max_iteracoes')
+
+    def __init__(self, passos=PASSOS, max_iteracoes=10):
+        self.passos = passos
+        self.max_iteracoes = max_iteracoes
+
+    def otimizar(self, programa):
+        """
+        Otimiza o programa no lugar.
+
+        Returns:
+            RelatorioPassos
+        """
+        estatisticas = [EstatisticaPasso(nome) for nome, _ in self.passos]
+        instrucoes_antes = len(programa.instrucoes)
+        iteracoes = 0
+        while iteracoes < self.max_iteracoes:
+            iteracoes += 1
+            alteracoes = 0
+            for (_, passo), estatistica in zip(self.passos, estatisticas):
+                inicio = time.perf_counter()
+                feitas = passo(programa)
+                estatistica.tempo += time.perf_counter() - inicio
+                estatistica.execucoes += 1
+                estatistica.alteracoes += feitas
+                alteracoes += feitas
+            if not alteracoes:
+                break
+        return RelatorioPassos(estatisticas, iteracoes, instrucoes_antes, len(programa.instrucoes))
+
+def otimizar(programa, passos=PASSOS):
+    """Otimiza um ProgramaTAC no lugar e retorna o RelatorioPassos"""
+    return GerenciadorPassos(passos).otimizar(programa)
@@ -0,0 +1,118 @@
+"""
+Rastreamento opcional do parser do PLY.
+
+Por padrão o Compiler chama o parser sem depuração, o que faz o PLY usar o
+caminho rápido (parseopt_notrack). Quando um ParseTrace é configurado, as
+compilações amostradas usam o modo de depuração do PLY, mas as mensagens
+ficam num buffer circular com apenas os últimos N passos de shift/reduce e
+não são formatadas durante o parse. Ao final, se houve erro (ou sempre, se
+somente_erros=False), os passos guardados são gravados como JSONL num
+arquivo com tamanho limitado e rotação.
+"""
+import collections
+import itertools
+import json
+import logging
+import logging.handlers
+import random
+
+class RastroParse:
+    """
+    Logger com a interface usada pelo PLY (debug, info, warning, error,
+    critical) que guarda apenas os últimos `capacidade` registros. No
+    primeiro erro, a janela com os passos que o antecederam é congelada.
+
+    Os argumentos de cada mensagem são guardados como recebidos; a
+    formatação só acontece em registros(), quando o rastro é gravado.
+    """
+    __slots__ = ('_passos', '_antes_do_erro')
+
+    def __init__(self, capacidade=200):
+        self._passos = collections.deque(maxlen=capacidade)
+        self._antes_do_erro = None
+
+    def debug(self, msg, *args, **kwargs):
+        self._passos.append(('debug', msg, args))
+
+    def info(self, msg, *args, **kwargs):
+        self._passos.append(('info', msg, args))
+
+    def warning(self, msg, *args, **kwargs):
+        self._passos.append(('warning', msg, args))
+
+    def error(self, msg, *args, **kwargs):
+        self._passos.append(('error', msg, args))
+        if self._antes_do_erro is None:
+            self._antes_do_erro = list(self._passos)
+
+    critical = error
+
+    def registros(self):
+        """
+        Retorna os passos guardados como dicionários já formatados: os
+        anteriores ao primeiro erro, ou os últimos do parse se não houve erro.
+        """
+        passos = self._antes_do_erro if self._antes_do_erro is not None else self._passos
+        resultado = []
+        for nivel, msg, args in passos:
+            try:
+                texto = msg % args if args else msg
+            except (TypeError, ValueError):
+                texto = ' '.join([str(msg)] + [str(a) for a in args])
+            resultado.append({'level': nivel, 'msg': texto})
+        return resultado
+
+class ParseTrace:
+    """
+    Configuração do rastreamento do parser.
+
+    Args:
+        caminho: Arquivo JSONL onde os rastros são gravados
+        ultimos: Quantidade de passos mantidos antes do fim (ou do erro)
+        amostragem: Fração das compilações rastreadas (0.0 a 1.0)
+        max_bytes: Tamanho máximo do arquivo antes da rotação
+        backups: Quantidade de arquivos rotacionados mantidos
+        somente_erros: Grava apenas compilações que terminaram com erro
+    """
+
+    def __init__(self, caminho='parselog.jsonl', ultimos=200, amostragem=1.0,
+                 max_bytes=1024 * 1024, backups=3, somente_erros=True):
+        self.caminho = caminho
+        self.ultimos = ultimos
+        self.amostragem = amostragem
+        self.somente_erros = somente_erros
+        self._sequencia = itertools.count(1)
+        self._aleatorio = random.Random()
+
+        self._logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        self._handler = logging.handlers.RotatingFileHandler(
+            caminho, maxBytes=max_bytes, backupCount=backups, delay=True, encoding='utf-8')
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+        self._logger.addHandler(self._handler)
+
+    def novo_rastro(self):
+        """
+        Decide se a próxima compilação será rastreada.
+
+        Returns:
+            Um RastroParse para repassar ao parser, ou None para usar o
+            caminho rápido do PLY
+        """
+        if self.amostragem < 1.0 and self._aleatorio.random() >= self.amostragem:
+            return None
+        return RastroParse(self.ultimos)
+
+    def gravar(self, rastro, resultado):
+        """Grava os passos do rastro se a compilação precisar ser registrada"""
+        if rastro is None or (self.somente_erros and resultado.sucesso):
+            return
+        compilacao = next(self._sequencia)
+        for passo, registro in enumerate(rastro.registros()):
+            registro = {'compilation': compilacao, 'step': passo, **registro}
+            self._logger.info(json.dumps(registro, ensure_ascii=False))
+
+    def fechar(self):
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
@@ -1,87 +0,0 @@
-
-# parsetab.py
-# This file is automatically generated. Do not edit.
-# pylint: disable=W,C,R
-_tabversion = '3.10'
-
-_lr_method = 'LALR'
-
-_lr_signature = 'CHAR COMMA DIVIDE ELSE EQUALS FLOAT FLOATN FOR GE GT ID IF INT INTEGER LBRACES LE LPAREN LT MAIN MINUS NE PLUS POWER RBRACES RETURN RPAREN SEMI SEMICOLON STRING TIMES WHILEinicial : INT MAIN LPAREN RPAREN bloco_principal SEMICOLONbloco_principal : LBRACES corpo RBRACEScorpo : comando\n             | corpo comandocomando : declaracoes\n               | bloco_while\n               | bloco_if\n               | bloco_for\n               | expressaoexpressao : atribuicaodeclaracoes : tipos ID SEMICOLON \n                | tipos declaracoes_linha SEMICOLON\n                | tipos ID EQUALS values SEMICOLON\n                | tipos ID EQUALS ID SEMICOLON\n                | tipos ID EQUALS operacao_aritmetica SEMICOLONdeclaracoes_linha : ID COMMA declaracoes_linha\n                        | IDbloco_while : WHILE LPAREN condicao RPAREN LBRACES corpo RBRACESbloco_if : IF LPAREN condicao RPAREN LBRACES corpo RBRACES\n                | IF LPAREN condicao RPAREN LBRACES corpo RBRACES ELSE LBRACES corpo RBRACES\n                | IF LPAREN condicao RPAREN LBRACES corpo RBRACES ELSE bloco_ifbloco_for : FOR LPAREN condicao_for RPAREN LBRACES corpo RBRACEScondicao_for : tipos ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID PLUS PLUS\n                    | tipos ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID PLUS PLUS\n                    | ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID PLUS PLUS\n                    | ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID PLUS PLUS\n                    | tipos ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID MINUS MINUS\n                    | tipos ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID MINUS MINUS\n                    | ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID MINUS MINUS\n                    | ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID MINUS MINUS atribuicao : ID EQUALS values SEMICOLON\n                | ID EQUALS ID SEMICOLON\n                | ID EQUALS operacao_aritmetica SEMICOLON operacao_aritmetica : ID operadores_aritmeticos ID\n                    | ID operadores_aritmeticos values\n                    | values operadores_aritmeticos ID\n                    | values operadores_aritmeticos valuescondicao : values operadores_comparativos values\n            | values operadores_comparativos ID\n            | ID operadores_comparativos values\n            | ID operadores_comparativos ID operadores_comparativos : LT\n                            | LE\n                            | GT\n                            | GE\n                            | NE operadores_aritmeticos : PLUS \n                            | MINUS\n                            | TIMES\n                            | DIVIDE\n                            | POWER tipos : INT \n            | CHAR \n            | FLOAT values : INTEGER\n            | STRING\n            | FLOATN'
-    
-_lr_action_items = {'INT':([0,7,9,10,11,12,13,14,15,21,26,32,33,36,55,62,64,77,78,79,84,89,90,93,94,95,98,99,100,106,107,111,116,],[2,22,22,-3,-5,-6,-7,-8,-9,-10,-4,22,-11,-12,-32,-31,-33,-14,-13,-15,22,22,22,22,22,22,-18,-19,-22,22,-21,22,-20,]),'$end':([1,8,],[0,-1,]),'MAIN':([2,],[3,]),'LPAREN':([3,18,19,20,],[4,30,31,32,]),'RPAREN':([4,40,41,42,43,46,47,85,86,87,88,131,132,133,134,135,136,137,138,],[5,-55,-56,-57,65,73,74,-38,-39,-41,-40,-26,-30,-25,-29,-24,-28,-23,-27,]),'LBRACES':([5,65,73,74,103,],[7,84,89,90,106,]),'SEMICOLON':([6,25,27,28,37,38,39,40,41,42,50,51,52,53,54,80,81,82,83,92,96,109,110,112,113,],[8,-2,33,36,55,62,64,-55,-56,-57,77,78,79,-17,-16,-34,-35,-37,-36,97,101,114,115,117,118,]),'WHILE':([7,9,10,11,12,13,14,15,21,26,33,36,55,62,64,77,78,79,84,89,90,93,94,95,98,99,100,106,107,111,116,],[18,18,-3,-5,-6,-7,-8,-9,-10,-4,-11,-12,-32,-31,-33,-14,-13,-15,18,18,18,18,18,18,-18,-19,-22,18,-21,18,-20,]),'IF':([7,9,10,11,12,13,14,15,21,26,33,36,55,62,64,77,78,79,84,89,90,93,94,95,98,99,100,103,106,107,111,116,],[19,19,-3,-5,-6,-7,-8,-9,-10,-4,-11,-12,-32,-31,-33,-14,-13,-15,19,19,19,19,19,19,-18,-19,-22,19,19,-21,19,-20,]),'FOR':([7,9,10,11,12,13,14,15,21,26,33,36,55,62,64,77,78,79,84,89,90,93,94,95,98,99,100,106,107,111,116,],[20,20,-3,-5,-6,-7,-8,-9,-10,-4,-11,-12,-32,-31,-33,-14,-13,-15,20,20,20,20,20,20,-18,-19,-22,20,-21,20,-20,]),'CHAR':([7,9,10,11,12,13,14,15,21,26,32,33,36,55,62,64,77,78,79,84,89,90,93,94,95,98,99,100,106,107,111,116,],[23,23,-3,-5,-6,-7,-8,-9,-10,-4,23,-11,-12,-32,-31,-33,-14,-13,-15,23,23,23,23,23,23,-18,-19,-22,23,-21,23,-20,]),'FLOAT':([7,9,10,11,12,13,14,15,21,26,32,33,36,55,62,64,77,78,79,84,89,90,93,94,95,98,99,100,106,107,111,116,],[24,24,-3,-5,-6,-7,-8,-9,-10,-4,24,-11,-12,-32,-31,-33,-14,-13,-15,24,24,24,24,24,24,-18,-19,-22,24,-21,24,-20,]),'ID':([7,9,10,11,12,13,14,15,16,21,22,23,24,26,29,30,31,32,33,34,35,36,48,55,56,57,58,59,60,61,62,63,64,66,67,68,69,70,71,72,77,78,79,84,89,90,93,94,95,97,98,99,100,101,105,106,107,108,111,114,115,116,117,118,],[17,17,-3,-5,-6,-7,-8,-9,27,-10,-52,-53,-54,-4,37,45,45,49,-11,50,53,-12,75,-32,80,-47,-48,-49,-50,-51,-31,83,-33,86,-42,-43,-44,-45,-46,87,-14,-13,-15,17,17,17,17,17,17,102,-18,-19,-22,104,109,17,-21,112,17,119,120,-20,121,122,]),'RBRACES':([9,10,11,12,13,14,15,21,26,33,36,55,62,64,77,78,79,93,94,95,98,99,100,107,111,116,],[25,-3,-5,-6,-7,-8,-9,-10,-4,-11,-12,-32,-31,-33,-14,-13,-15,98,99,100,-18,-19,-22,-21,116,-20,]),'EQUALS':([17,27,49,75,],[29,34,76,91,]),'COMMA':([27,53,],[35,35,]),'INTEGER':([29,30,31,34,56,57,58,59,60,61,63,66,67,68,69,70,71,72,76,91,105,108,],[40,40,40,40,40,-47,-48,-49,-50,-51,40,40,-42,-43,-44,-45,-46,40,40,40,40,40,]),'STRING':([29,30,31,34,56,57,58,59,60,61,63,66,67,68,69,70,71,72,76,91,105,108,],[41,41,41,41,41,-47,-48,-49,-50,-51,41,41,-42,-43,-44,-45,-46,41,41,41,41,41,]),'FLOATN':([29,30,31,34,56,57,58,59,60,61,63,66,67,68,69,70,71,72,76,91,105,108,],[42,42,42,42,42,-47,-48,-49,-50,-51,42,42,-42,-43,-44,-45,-46,42,42,42,42,42,]),'PLUS':([37,38,40,41,42,50,51,119,120,121,122,123,125,127,129,],[57,57,-55,-56,-57,57,57,123,125,127,129,131,133,135,137,]),'MINUS':([37,38,40,41,42,50,51,119,120,121,122,124,126,128,130,],[58,58,-55,-56,-57,58,58,124,126,128,130,132,134,136,138,]),'TIMES':([37,38,40,41,42,50,51,],[59,59,-55,-56,-57,59,59,]),'DIVIDE':([37,38,40,41,42,50,51,],[60,60,-55,-56,-57,60,60,]),'POWER':([37,38,40,41,42,50,51,],[61,61,-55,-56,-57,61,61,]),'LT':([40,41,42,44,45,102,104,],[-55,-56,-57,67,67,67,67,]),'LE':([40,41,42,44,45,102,104,],[-55,-56,-57,68,68,68,68,]),'GT':([40,41,42,44,45,102,104,],[-55,-56,-57,69,69,69,69,]),'GE':([40,41,42,44,45,102,104,],[-55,-56,-57,70,70,70,70,]),'NE':([40,41,42,44,45,102,104,],[-55,-56,-57,71,71,71,71,]),'ELSE':([99,],[103,]),}
-
-_lr_action = {}
-for _k, _v in _lr_action_items.items():
-   for _x,_y in zip(_v[0],_v[1]):
-      if not _x in _lr_action:  _lr_action[_x] = {}
-      _lr_action[_x][_k] = _y
-del _lr_action_items
-
-_lr_goto_items = {'inicial':([0,],[1,]),'bloco_principal':([5,],[6,]),'corpo':([7,84,89,90,106,],[9,93,94,95,111,]),'comando':([7,9,84,89,90,93,94,95,106,111,],[10,26,10,10,10,26,26,26,10,26,]),'declaracoes':([7,9,84,89,90,93,94,95,106,111,],[11,11,11,11,11,11,11,11,11,11,]),'bloco_while':([7,9,84,89,90,93,94,95,106,111,],[12,12,12,12,12,12,12,12,12,12,]),'bloco_if':([7,9,84,89,90,93,94,95,103,106,111,],[13,13,13,13,13,13,13,13,107,13,13,]),'bloco_for':([7,9,84,89,90,93,94,95,106,111,],[14,14,14,14,14,14,14,14,14,14,]),'expressao':([7,9,84,89,90,93,94,95,106,111,],[15,15,15,15,15,15,15,15,15,15,]),'tipos':([7,9,32,84,89,90,93,94,95,106,111,],[16,16,48,16,16,16,16,16,16,16,16,]),'atribuicao':([7,9,84,89,90,93,94,95,106,111,],[21,21,21,21,21,21,21,21,21,21,]),'declaracoes_linha':([16,35,],[28,54,]),'values':([29,30,31,34,56,63,66,72,76,91,105,108,],[38,44,44,51,81,82,85,88,92,96,110,113,]),'operacao_aritmetica':([29,34,],[39,52,]),'condicao':([30,31,],[43,46,]),'condicao_for':([32,],[47,]),'operadores_aritmeticos':([37,38,50,51,],[56,63,56,63,]),'operadores_comparativos':([44,45,102,104,],[66,72,105,108,]),}
-
-_lr_goto = {}
-for _k, _v in _lr_goto_items.items():
-   for _x, _y in zip(_v[0], _v[1]):
-       if not _x in _lr_goto: _lr_goto[_x] = {}
-       _lr_goto[_x][_k] = _y
-del _lr_goto_items
-_lr_productions = [
-  ("S' -> inicial","S'",1,None,None,None),
-  ('inicial -> INT MAIN LPAREN RPAREN bloco_principal SEMICOLON','inicial',6,'p_inicial','sintatic_analyser.py',110),
-  ('bloco_principal -> LBRACES corpo RBRACES','bloco_principal',3,'p_bloco_principal','sintatic_analyser.py',119),
-  ('corpo -> comando','corpo',1,'p_corpo','sintatic_analyser.py',123),
-  ('corpo -> corpo comando','corpo',2,'p_corpo','sintatic_analyser.py',124),
-  ('comando -> declaracoes','comando',1,'p_comando','sintatic_analyser.py',132),
-  ('comando -> bloco_while','comando',1,'p_comando','sintatic_analyser.py',133),
-  ('comando -> bloco_if','comando',1,'p_comando','sintatic_analyser.py',134),
-  ('comando -> bloco_for','comando',1,'p_comando','sintatic_analyser.py',135),
-  ('comando -> expressao','comando',1,'p_comando','sintatic_analyser.py',136),
-  ('expressao -> atribuicao','expressao',1,'p_expressao','sintatic_analyser.py',140),
-  ('declaracoes -> tipos ID SEMICOLON','declaracoes',3,'p_declaracoes','sintatic_analyser.py',144),
-  ('declaracoes -> tipos declaracoes_linha SEMICOLON','declaracoes',3,'p_declaracoes','sintatic_analyser.py',145),
-  ('declaracoes -> tipos ID EQUALS values SEMICOLON','declaracoes',5,'p_declaracoes','sintatic_analyser.py',146),
-  ('declaracoes -> tipos ID EQUALS ID SEMICOLON','declaracoes',5,'p_declaracoes','sintatic_analyser.py',147),
-  ('declaracoes -> tipos ID EQUALS operacao_aritmetica SEMICOLON','declaracoes',5,'p_declaracoes','sintatic_analyser.py',148),
-  ('declaracoes_linha -> ID COMMA declaracoes_linha','declaracoes_linha',3,'p_declaracao_linha','sintatic_analyser.py',234),
-  ('declaracoes_linha -> ID','declaracoes_linha',1,'p_declaracao_linha','sintatic_analyser.py',235),
-  ('bloco_while -> WHILE LPAREN condicao RPAREN LBRACES corpo RBRACES','bloco_while',7,'p_bloco_while','sintatic_analyser.py',264),
-  ('bloco_if -> IF LPAREN condicao RPAREN LBRACES corpo RBRACES','bloco_if',7,'p_bloco_if','sintatic_analyser.py',268),
-  ('bloco_if -> IF LPAREN condicao RPAREN LBRACES corpo RBRACES ELSE LBRACES corpo RBRACES','bloco_if',11,'p_bloco_if','sintatic_analyser.py',269),
-  ('bloco_if -> IF LPAREN condicao RPAREN LBRACES corpo RBRACES ELSE bloco_if','bloco_if',9,'p_bloco_if','sintatic_analyser.py',270),
-  ('bloco_for -> FOR LPAREN condicao_for RPAREN LBRACES corpo RBRACES','bloco_for',7,'p_bloco_for','sintatic_analyser.py',276),
-  ('condicao_for -> tipos ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID PLUS PLUS','condicao_for',12,'p_condicao_for','sintatic_analyser.py',280),
-  ('condicao_for -> tipos ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID PLUS PLUS','condicao_for',12,'p_condicao_for','sintatic_analyser.py',281),
-  ('condicao_for -> ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID PLUS PLUS','condicao_for',11,'p_condicao_for','sintatic_analyser.py',282),
-  ('condicao_for -> ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID PLUS PLUS','condicao_for',11,'p_condicao_for','sintatic_analyser.py',283),
-  ('condicao_for -> tipos ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID MINUS MINUS','condicao_for',12,'p_condicao_for','sintatic_analyser.py',284),
-  ('condicao_for -> tipos ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID MINUS MINUS','condicao_for',12,'p_condicao_for','sintatic_analyser.py',285),
-  ('condicao_for -> ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID MINUS MINUS','condicao_for',11,'p_condicao_for','sintatic_analyser.py',286),
-  ('condicao_for -> ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID MINUS MINUS','condicao_for',11,'p_condicao_for','sintatic_analyser.py',287),
-  ('atribuicao -> ID EQUALS values SEMICOLON','atribuicao',4,'p_atribuicao','sintatic_analyser.py',291),
-  ('atribuicao -> ID EQUALS ID SEMICOLON','atribuicao',4,'p_atribuicao','sintatic_analyser.py',292),
-  ('atribuicao -> ID EQUALS operacao_aritmetica SEMICOLON','atribuicao',4,'p_atribuicao','sintatic_analyser.py',293),
-  ('operacao_aritmetica -> ID operadores_aritmeticos ID','operacao_aritmetica',3,'p_operacao_aritmetica','sintatic_analyser.py',327),
-  ('operacao_aritmetica -> ID operadores_aritmeticos values','operacao_aritmetica',3,'p_operacao_aritmetica','sintatic_analyser.py',328),
-  ('operacao_aritmetica -> values operadores_aritmeticos ID','operacao_aritmetica',3,'p_operacao_aritmetica','sintatic_analyser.py',329),
-  ('operacao_aritmetica -> values operadores_aritmeticos values','operacao_aritmetica',3,'p_operacao_aritmetica','sintatic_analyser.py',330),
-  ('condicao -> values operadores_comparativos values','condicao',3,'p_condicao','sintatic_analyser.py',424),
-  ('condicao -> values operadores_comparativos ID','condicao',3,'p_condicao','sintatic_analyser.py',425),
-  ('condicao -> ID operadores_comparativos values','condicao',3,'p_condicao','sintatic_analyser.py',426),
-  ('condicao -> ID operadores_comparativos ID','condicao',3,'p_condicao','sintatic_analyser.py',427),
-  ('operadores_comparativos -> LT','operadores_comparativos',1,'p_operadores_comparativos','sintatic_analyser.py',431),
-  ('operadores_comparativos -> LE','operadores_comparativos',1,'p_operadores_comparativos','sintatic_analyser.py',432),
-  ('operadores_comparativos -> GT','operadores_comparativos',1,'p_operadores_comparativos','sintatic_analyser.py',433),
-  ('operadores_comparativos -> GE','operadores_comparativos',1,'p_operadores_comparativos','sintatic_analyser.py',434),
-  ('operadores_comparativos -> NE','operadores_comparativos',1,'p_operadores_comparativos','sintatic_analyser.py',435),
-  ('operadores_aritmeticos -> PLUS','operadores_aritmeticos',1,'p_operadores_aritmeticos','sintatic_analyser.py',440),
-  ('operadores_aritmeticos -> MINUS','operadores_aritmeticos',1,'p_operadores_aritmeticos','sintatic_analyser.py',441),
-  ('operadores_aritmeticos -> TIMES','operadores_aritmeticos',1,'p_operadores_aritmeticos','sintatic_analyser.py',442),
-  ('operadores_aritmeticos -> DIVIDE','operadores_aritmeticos',1,'p_operadores_aritmeticos','sintatic_analyser.py',443),
-  ('operadores_aritmeticos -> POWER','operadores_aritmeticos',1,'p_operadores_aritmeticos','sintatic_analyser.py',444),
-  ('tipos -> INT','tipos',1,'p_tipos','sintatic_analyser.py',449),
-  ('tipos -> CHAR','tipos',1,'p_tipos','sintatic_analyser.py',450),
-  ('tipos -> FLOAT','tipos',1,'p_tipos','sintatic_analyser.py',451),
-  ('values -> INTEGER','values',1,'p_values','sintatic_analyser.py',455),
-  ('values -> STRING','values',1,'p_values','sintatic_analyser.py',456),
-  ('values -> FLOATN','values',1,'p_values','sintatic_analyser.py',457),
-]
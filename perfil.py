@@ -0,0 +1,244 @@
+"""
+Perfil opcional da compilação por regra.
+
+Com um PerfilCompilacao passado ao Compiler (Compiler(perfil=...)), cada
+função de regra do lexer (t_ID, t_error, ...), cada ação da gramática
+(p_declaracoes, p_atribuicao, p_operacao_binaria, ..., p_error) e cada passo
+da análise semântica passa por um invólucro que mede o tempo da chamada.
+Sem perfil, nenhum invólucro é instalado: o Compiler usa o lexer, o parser
+e o analisador semântico de sempre, e o perfil não custa nada.
+
+Os invólucros são instalados em cópias: as funções das regras do lexer do
+PLY são trocadas num clone dele, as ações num clone do parser (a lista de
+produções é copiada) e os passos semânticos numa subclasse de
+AnalisadorSemantico cuja tabela de símbolos conta as buscas. Também são
+medidos, como quadros que contêm os demais, lexer.token (o motor do lexer),
+parser.parse (o motor LR, que contém o lexer e as ações) e
+AnalisadorSemantico.analisar.
+
+Para cada quadro são registrados:
+
+    chamadas    quantidade de chamadas
+    total       tempo acumulado, incluindo os quadros chamados a partir dele
+                (chamadas recursivas contam uma única vez)
+    proprio     tempo acumulado sem os quadros chamados a partir dele
+    buscas      buscas na tabela de símbolos (simbolos[nome], nome in
+                simbolos, buscar, declarado_no_escopo_atual) feitas
+                enquanto o quadro era o mais interno
+
+relatorio() ordena os quadros, e gravar_pilhas() grava as pilhas no formato
+"collapsed" (quadro;quadro;quadro microssegundos) lido por flamegraph.pl,
+speedscope e similares. Os tempos incluem o custo dos próprios invólucros,
+que é da ordem de um microssegundo por chamada: o perfil serve para comparar
+as regras entre si, não para medir a compilação sem perfil.
+"""
+import copy
+import time
+
+class _Quadro:
+    __slots__ = ('nome', 'inicio', 'filhos', 'caminho')
+
+    def __init__(self, nome, inicio, caminho):
+        self.nome = nome
+        self.inicio = inicio
+        self.filhos = 0.0
+        self.caminho = caminho
+
+class EstatisticaQuadro:
+    """Contadores de um quadro do perfil (ver o docstring do módulo)"""
+    __slots__ = ('nome', 'chamadas', 'total', 'proprio', 'buscas', '_ativas')
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.chamadas = 0
+        self.total = 0.0
+        self.proprio = 0.0
+        self.buscas = 0
+        self._ativas = 0
+
+    def __repr__(self):
+        return (f"EstatisticaQuadro({self.nome!r}, chamadas={self.chamadas}, "
+                f"total={self.total:.6f}, proprio={self.proprio:.6f}, buscas={self.buscas})")
+
+ORDENS = ('proprio', 'total', 'chamadas', 'buscas')
+
+class PerfilCompilacao:
+    """
+    Perfil por regra de uma ou mais compilações. Os contadores se acumulam
+    entre as compilações feitas pelo Compiler que recebeu o perfil, até
+    limpar().
+
+    Attributes:
+        estatisticas: Nome do quadro -> EstatisticaQuadro
+        pilhas: Pilha de quadros ("a;b;c") -> tempo próprio acumulado nela
+    """
+    __slots__ = ('estatisticas', 'pilhas', '_pilha', '_relogio')
+
+    def __init__(self, relogio=time.perf_counter):
+        self.estatisticas = {}
+        self.pilhas = {}
+        self._pilha = []
+        self._relogio = relogio
+
+    def limpar(self):
+        """Zera os contadores"""
+        self.estatisticas.clear()
+        self.pilhas.clear()
+
+    def _estatistica(self, nome):
+        estatistica = self.estatisticas.get(nome)
+        if estatistica is None:
+            estatistica = self.estatisticas[nome] = EstatisticaQuadro(nome)
+        return estatistica
+
+    def envolver(self, nome, funcao):
+        """Função que chama `funcao` medida como o quadro `nome`"""
+        pilha = self._pilha
+        pilhas = self.pilhas
+        relogio = self._relogio
+        estatisticas = self.estatisticas
+
+        def medida(*args, **kwargs):
+            estatistica = estatisticas.get(nome) or self._estatistica(nome)
+            caminho = f"{pilha[-1].caminho};{nome}" if pilha else nome
+            quadro = _Quadro(nome, relogio(), caminho)
+            pilha.append(quadro)
+            estatistica._ativas += 1
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                decorrido = relogio() - quadro.inicio
+                pilha.pop()
+                proprio = decorrido - quadro.filhos
+                estatistica.chamadas += 1
+                estatistica.proprio += proprio
+                estatistica._ativas -= 1
+                if not estatistica._ativas:
+                    estatistica.total += decorrido
+                if pilha:
+                    pilha[-1].filhos += decorrido
+                pilhas[caminho] = pilhas.get(caminho, 0.0) + proprio
+
+        medida.__name__ = getattr(funcao, '__name__', nome)
+        medida.__doc__ = getattr(funcao, '__doc__', None)
+        return medida
+
+    def contar_busca(self):
+        """Registra uma busca na tabela de símbolos no quadro mais interno"""
+        if self._pilha:
+            self._estatistica(self._pilha[-1].nome).buscas += 1
+
+    def _subclasse(self, classe, metodos):
+        """Subclasse de `classe` com os métodos (nome, quadro) medidos"""
+        atributos = {nome: self.envolver(quadro, getattr(classe, nome)) for nome, quadro in metodos}
+        return type(f"{classe.__name__}Perfilado", (classe,), atributos)
+
+    def instrumentar_regras(self, lexer):
+        """
+        Clone de um lexer do PLY em que cada função de regra (e a t_error) é
+        medida com o nome da função.
+        """
+        clone = lexer.clone()
+        clone.lexre = [(regex, [item if item is None or item[0] is None
+                                else (self.envolver(item[0].__name__, item[0]), item[1])
+                                for item in indices])
+                       for regex, indices in lexer.lexre]
+        clone.lexstatere = dict(lexer.lexstatere, INITIAL=clone.lexre)
+        if lexer.lexerrorf is not None:
+            clone.lexerrorf = self.envolver(lexer.lexerrorf.__name__, lexer.lexerrorf)
+        return clone
+
+    def instrumentar_lexer(self, lexer):
+        """Cópia do lexer (do PLY ou LexerRapido) com token() medido como lexer.token"""
+        copia = lexer.clone()
+        copia.__class__ = self._subclasse(type(lexer), [('token', 'lexer.token')])
+        return copia
+
+    def instrumentar_parser(self, parser):
+        """
+        Cópia do parser do PLY em que cada ação (e p_error) é medida com o
+        nome da função e parse() como parser.parse. Uma função com várias
+        produções (p_operacao_binaria) é um único quadro.
+        """
+        copia = copy.copy(parser)
+        envolvidas = {}
+        producoes = []
+        for producao in parser.productions:
+            funcao = producao.callable
+            if funcao is not None:
+                if funcao not in envolvidas:
+                    envolvidas[funcao] = self.envolver(funcao.__name__, funcao)
+                producao = copy.copy(producao)
+                producao.callable = envolvidas[funcao]
+            producoes.append(producao)
+        copia.productions = producoes
+        if parser.errorfunc is not None:
+            copia.errorfunc = self.envolver(parser.errorfunc.__name__, parser.errorfunc)
+        copia.__class__ = self._subclasse(type(parser), [('parse', 'parser.parse')])
+        return copia
+
+    def instrumentar_analisador(self, classe):
+        """
+        Subclasse do analisador semântico em que os passos por tipo de nó,
+        avaliar e _operacao são medidos, e cuja tabela de símbolos conta as
+        buscas.
+        """
+        from symbol_table import SymbolTable
+
+        contar = self.contar_busca
+        metodos = {}
+        for nome in ('buscar', '__getitem__', '__contains__', 'declarado_no_escopo_atual'):
+            metodos[nome] = _contando(contar, getattr(SymbolTable, nome))
+        tabela = type("SymbolTableContada", (SymbolTable,), dict(metodos, __slots__=()))
+
+        passos = [(nome, f"{classe.__name__}.{nome}")
+                  for nome in ('analisar', '_declaracao', '_atribuicao', '_while', '_if', '_for',
+                               '_impressao', '_retorno', '_bloco', 'avaliar', '_operacao')]
+        perfilada = self._subclasse(classe, passos)
+        inicializar = perfilada.__init__
+
+        def __init__(analisador, diagnosticos, simbolos=None):
+            inicializar(analisador, diagnosticos, simbolos if simbolos is not None else tabela())
+
+        perfilada.__init__ = __init__
+        return perfilada
+
+    def relatorio(self, ordem='proprio', limite=None):
+        """
+        Tabela de texto com os quadros ordenados por `ordem` (uma de
+        ORDENS), do maior para o menor, e a porcentagem do tempo próprio de
+        cada um sobre a soma dos tempos próprios.
+        """
+        if ordem not in ORDENS:
+            raise ValueError(f"ordem desconhecida: {ordem!r} (use uma de {', '.join(ORDENS)})")
+        itens = sorted(self.estatisticas.values(), key=lambda e: getattr(e, ordem), reverse=True)
+        if limite is not None:
+            itens = itens[:limite]
+        soma = sum(e.proprio for e in self.estatisticas.values()) or 1.0
+        largura = max([len(e.nome) for e in itens] + [6])
+        linhas = [f"{'quadro':<{largura}} {'chamadas':>10} {'total ms':>10} {'proprio ms':>10} "
+                  f"{'proprio %':>9} {'us/chamada':>10} {'buscas':>8}"]
+        for e in itens:
+            linhas.append(f"{e.nome:<{largura}} {e.chamadas:>10} {e.total * 1e3:>10.2f} "
+                          f"{e.proprio * 1e3:>10.2f} {e.proprio / soma:>9.1%} "
+                          f"{e.proprio / e.chamadas * 1e6 if e.chamadas else 0:>10.2f} {e.buscas:>8}")
+        return "\n".join(linhas)
+
+    def gravar_pilhas(self, caminho):
+        """
+        Grava as pilhas no formato "collapsed" de flamegraph.pl, uma por
+        linha: os quadros separados por ';' e o tempo próprio em
+        microssegundos.
+        """
+        with open(caminho, 'w') as arquivo:
+            for pilha, tempo in sorted(self.pilhas.items()):
+                microssegundos = round(tempo * 1e6)
+                if microssegundos:
+                    arquivo.write(f"{pilha} {microssegundos}\n")
+
+def _contando(contar, metodo):
+    def contado(*args):
+        contar()
+        return metodo(*args)
+    contado.__name__ = metodo.__name__
+    return contado
@@ -0,0 +1,52 @@
+"""
+Linha e coluna a partir da posição (lexpos) no texto.
+
+IndiceLinhas guarda, uma única vez por texto, o início de cada linha; a
+linha e a coluna de uma posição são obtidas por busca binária nessa lista,
+em tempo logarítmico no número de linhas. Quando a linha já é conhecida (o
+lexer a conta em t_newline, à medida que avança), a coluna sai de um único
+acesso à lista. Calcular a coluna com texto.rfind('\\n', 0, lexpos)
+percorreria o texto desde o início da linha a cada token, o que é
+quadrático em linhas longas.
+
+O lexer em streaming (lexer_stream.py) monta um índice por trecho lido, com
+a linha em que o trecho começa, de modo que o índice nunca cobre mais do que
+o trecho em memória.
+"""
+import bisect
+import re
+
+_QUEBRA = re.compile('\n')
+
+class IndiceLinhas:
+    """
+    Início de cada linha de um texto.
+
+    Args:
+        texto: Texto indexado
+        linha_base: Número da linha em que o texto começa
+    """
+    __slots__ = ('inicios', 'linha_base')
+
+    def __init__(self, texto, linha_base=1):
+        self.inicios = [0]
+        self.inicios.extend(m.end() for m in _QUEBRA.finditer(texto))
+        self.linha_base = linha_base
+
+    def posicao(self, lexpos):
+        """Tupla (linha, coluna), ambas a partir de 1, da posição `lexpos`"""
+        i = bisect.bisect_right(self.inicios, lexpos) - 1
+        return self.linha_base + i, lexpos - self.inicios[i] + 1
+
+    def coluna(self, linha, lexpos):
+        """
+        Coluna da posição `lexpos`, que está na linha `linha` (a contada pelo
+        lexer): acesso direto ao início da linha, sem busca.
+        """
+        return lexpos - self.inicios[linha - self.linha_base] + 1
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def __repr__(self):
+        return f"IndiceLinhas(linhas={len(self.inicios)}, linha_base={self.linha_base})"
@@ -0,0 +1,396 @@
+"""
+Análise semântica sobre a AST.
+
+Depois que o parser constrói a árvore (ast_nodes), esta passada a percorre
+em ordem de código fonte mantendo a tabela de símbolos com escopos:
+
+    - cada Block abre um escopo; o cabeçalho do for abre um escopo próprio,
+      visível apenas no cabeçalho e no corpo do laço
+    - declarações verificam redeclaração no escopo atual
+    - usos de variáveis, inclusive nas condições de while, if e for,
+      verificam declaração e inicialização
+    - valores são convertidos para o tipo de destino; operações aritméticas
+      sobre valores conhecidos são avaliadas (com verificação de divisão por
+      zero e de potências sem resultado ou grandes demais) e o valor
+      resultante fica registrado na tabela de símbolos
+
+Um erro semântico interrompe apenas o comando em que ocorre: ele é
+registrado nos diagnósticos e a análise continua no comando seguinte, de
+modo que uma compilação informa todos os erros semânticos do programa. Uma
+declaração cujo valor tem erro declara a variável mesmo assim, sem valor,
+para que os usos seguintes não sejam informados como variável não declarada.
+"""
+import math
+
+from ast_nodes import Block, Decl, Assign, BinOp, While, If, For, Print, Return, Literal, Name
+from diagnostics import SEMANTICO
+from symbol_table import SymbolTable
+
+# Maior potência inteira avaliada na análise, em bits (cerca de 1200 dígitos
+# decimais, abaixo do limite de conversão de int para str do Python)
+LIMITE_BITS_POTENCIA = 4096
+
+class ErroSemantico(Exception):
+    """
+    Exceção para erros semânticos durante a análise. O trecho apontado vai
+    de (linha, coluna) a (fim_linha, fim_coluna), como em Diagnostic.
+    """
+    def __init__(self, mensagem, linha=0, coluna=0, fim_linha=None, fim_coluna=None):
+        self.mensagem = mensagem
+        self.linha = linha
+        self.coluna = coluna
+        self.fim_linha = fim_linha
+        self.fim_coluna = fim_coluna
+        super().__init__(self.mensagem)
+
+def _trecho_nome(nome_var, linha, coluna):
+    """Argumentos de ErroSemantico para um erro que aponta o nome da variável"""
+    return linha, coluna, linha, (coluna + len(nome_var) if coluna else coluna)
+
+def _trecho(linha, no_valor):
+    return (linha,) if no_valor is None else intervalo(no_valor)
+
+def intervalo(no):
+    """
+    Trecho (linha, coluna, fim_linha, fim_coluna) do texto de uma expressão:
+    nomes e literais ocupam o seu texto; operações vão do início do operando
+    esquerdo ao fim do direito.
+    """
+    tipo_no = type(no)
+    if tipo_no is Name:
+        return _trecho_nome(no.nome, no.line, no.col)
+    if tipo_no is Literal:
+        return no.line, no.col, no.line, no.col + no.tamanho
+    if tipo_no is BinOp:
+        _, _, fim_linha, fim_coluna = intervalo(no.direita)
+        linha, coluna, _, _ = intervalo(no.esquerda)
+        return linha, coluna, fim_linha, fim_coluna
+    return no.line, no.col, no.line, no.col
+
+def verificar_variavel_redeclarada(simbolos, nome_var, linha=0, coluna=0):
+    """
+    Verifica se uma variável já foi declarada no escopo atual
+    (declarações em escopos externos podem ser sombreadas)
+    Retorna: True se a verificação passar (variável não declarada)
+             Lança ErroSemantico se a variável já estiver declarada
+    """
+    if simbolos.declarado_no_escopo_atual(nome_var):
+        raise ErroSemantico(f"Erro semântico na linha {linha}: variável '{nome_var}' já declarada",
+                            *_trecho_nome(nome_var, linha, coluna))
+    return True
+
+def verificar_variavel_usada(simbolos, nome_var, linha=0, coluna=0):
+    """
+    Verifica se uma variável foi declarada antes de ser usada
+    Retorna: True se a verificação passar (variável está declarada)
+             Lança ErroSemantico se a variável não estiver declarada
+    """
+    if nome_var not in simbolos:
+        raise ErroSemantico(f"Erro semântico na linha {linha}: variável '{nome_var}' usada mas não declarada",
+                            *_trecho_nome(nome_var, linha, coluna))
+    return True
+
+def verificar_variavel_inicializada(simbolos, nome_var, linha=0, coluna=0):
+    """
+    Verifica se uma variável foi inicializada antes de ser usada
+    Lança ErroSemantico se a variável não estiver inicializada
+    """
+    if simbolos[nome_var].valor is None:
+        raise ErroSemantico(f"Erro semântico na linha {linha}: variável '{nome_var}' usada antes de ser inicializada",
+                            *_trecho_nome(nome_var, linha, coluna))
+
+# Tipo de cada valor literal produzido pelo lexer (t_INTEGER, t_FLOATN, t_STRING)
+TIPOS_LITERAIS = {int: "int", float: "float", str: "char"}
+
+def tipo_literal(valor):
+    """Tipo de um valor literal ou de um resultado de operação aritmética"""
+    return TIPOS_LITERAIS[type(valor)]
+
+def verificar_compatibilidade_tipos(tipo_destino, valor, tipo_valor, linha=0, modo="atribuicao",
+                                    diagnosticos=None, no_valor=None):
+    """
+    Verifica a compatibilidade entre um tipo de destino e um valor,
+    realizando a conversão apropriada quando possível.
+
+    Args:
+        tipo_destino: Tipo da variável de destino ('int', 'float', 'char')
+        valor: Valor a ser verificado e convertido
+        tipo_valor: Tipo do valor ('int', 'float', 'char'): o tipo da
+                    variável de origem ou tipo_literal(valor)
+        linha: Número da linha para mensagens de erro
+        modo: Contexto da verificação ('atribuicao', 'declaracao' ou 'operacao')
+        diagnosticos: Onde registrar o aviso de conversão de float para int
+                      em atribuições (opcional)
+        no_valor: Nó da expressão do valor, cujo trecho do texto é apontado
+                  pelo erro ou aviso (padrão: apenas a linha)
+
+    Returns:
+        O valor convertido para o tipo apropriado
+
+    Raises:
+        ErroSemantico: Se a conversão não for possível
+    """
+    valor_convertido = None
+    valor_original = valor
+
+    # Tentar realizar a conversão
+    try:
+        if tipo_destino == "int":
+            if tipo_valor == "int":
+                valor_convertido = int(valor_original)
+            elif tipo_valor == "float":
+                # Conversão de float para int (com potencial perda de precisão)
+                valor_convertido = int(valor_original)
+                if modo == "atribuicao" and diagnosticos is not None:
+                    diagnosticos.aviso(
+                        f"Aviso: Conversão de float para int na linha {linha} (possível perda de precisão)", *_trecho(linha, no_valor))
+            else:
+                raise ErroSemantico(f"Erro semântico na linha {linha}: não é possível converter '{tipo_valor}' para 'int'", *_trecho(linha, no_valor))
+
+        elif tipo_destino == "float":
+            if tipo_valor in ["int", "float"]:
+                valor_convertido = float(valor_original)
+            else:
+                raise ErroSemantico(f"Erro semântico na linha {linha}: não é possível converter '{tipo_valor}' para 'float'", *_trecho(linha, no_valor))
+
+        elif tipo_destino == "char":
+            # Implementação simplificada para char
+            valor_convertido = str(valor_original)
+
+        return valor_convertido
+
+    except (ValueError, TypeError):
+        raise ErroSemantico(f"Erro semântico na linha {linha}: valor '{valor_original}' incompatível com o tipo '{tipo_destino}'", *_trecho(linha, no_valor))
+    except OverflowError:
+        # Inteiro grande demais para float, ou float infinito para int
+        raise ErroSemantico(f"Erro semântico na linha {linha}: valor fora do intervalo do tipo '{tipo_destino}'", *_trecho(linha, no_valor)) from None
+
+def tipo_resultado(tipo1, tipo2):
+    """Promoção aritmética: float se algum operando for float, senão int"""
+    return "float" if tipo1 == "float" or tipo2 == "float" else "int"
+
+class AnalisadorSemantico:
+    """
+    Percorre a AST verificando as regras semânticas.
+
+    Args:
+        diagnosticos: Diagnosticos da compilação, onde erros, avisos e
+                      mensagens de rastreamento são registrados
+        simbolos: Tabela de símbolos inicial (padrão: uma tabela vazia); a
+                  análise incremental (incremental.py) a preenche com o
+                  estado das variáveis antes de um comando
+    """
+    __slots__ = ('simbolos', 'diagnosticos', '_rastro', '_comandos')
+
+    def __init__(self, diagnosticos, simbolos=None):
+        self.simbolos = simbolos if simbolos is not None else SymbolTable()
+        self.diagnosticos = diagnosticos
+        self._rastro = diagnosticos.trace if diagnosticos.rastreando else None
+        # Despacho por tipo de nó, sem cadeia de isinstance
+        self._comandos = {
+            Decl: self._declaracao,
+            Assign: self._atribuicao,
+            While: self._while,
+            If: self._if,
+            For: self._for,
+            Print: self._impressao,
+            Return: self._retorno,
+            Block: self._bloco,
+        }
+
+    def analisar(self, programa):
+        """
+        Analisa o programa.
+
+        Returns:
+            A SymbolTable ao final da análise
+        """
+        # O corpo de main é o escopo 0
+        self.analisar_comandos(programa.corpo.comandos)
+        return self.simbolos
+
+    def analisar_comandos(self, comandos):
+        """
+        Analisa uma sequência de comandos no escopo atual. O erro semântico
+        de um comando é registrado e a análise segue no próximo.
+        """
+        despacho = self._comandos
+        for comando in comandos:
+            try:
+                despacho[type(comando)](comando)
+            except ErroSemantico as e:
+                self._registrar(e)
+
+    def _registrar(self, erro):
+        self.diagnosticos.erro(SEMANTICO, erro.mensagem, erro.linha, erro.coluna,
+                               erro.fim_linha, erro.fim_coluna)
+
+    def _condicao(self, condicao):
+        """
+        Verifica os operandos da condição de while, if ou for; um erro nela
+        é registrado sem impedir a análise do corpo
+        """
+        try:
+            self.avaliar(condicao.esquerda)
+            self.avaliar(condicao.direita)
+        except ErroSemantico as e:
+            self._registrar(e)
+
+    def _bloco(self, bloco):
+        self.simbolos.abrir_escopo()
+        self.analisar_comandos(bloco.comandos)
+        self.simbolos.fechar_escopo()
+
+    def _declaracao(self, no):
+        simbolos = self.simbolos
+        rastro = self._rastro
+        verificar_variavel_redeclarada(simbolos, no.nome, no.line, no.col)
+        valor = None
+        if no.valor is not None:
+            try:
+                if type(no.valor) is Name:
+                    # Como na gramática original, o valor de origem não precisa
+                    # estar inicializado numa declaração
+                    verificar_variavel_usada(simbolos, no.valor.nome, no.valor.line, no.valor.col)
+                    origem = simbolos[no.valor.nome]
+                    valor_origem, tipo_origem = origem.valor, origem.tipo
+                else:
+                    valor_origem, tipo_origem = self.avaliar(no.valor)
+                valor = verificar_compatibilidade_tipos(no.tipo, valor_origem, tipo_origem,
+                                                        no.valor.line, "declaracao",
+                                                        no_valor=no.valor)
+            except ErroSemantico:
+                simbolos.declarar(no.nome, no.tipo, None, no.line)
+                raise
+        simbolos.declarar(no.nome, no.tipo, valor, no.line)
+        if rastro:
+            rastro("Declarada variável '%s' do tipo '%s' com valor '%s'", no.nome, no.tipo, valor)
+
+    def _atribuicao(self, no):
+        simbolos = self.simbolos
+        verificar_variavel_usada(simbolos, no.nome, no.line, no.col)
+        destino = simbolos[no.nome]
+        valor, tipo = self.avaliar(no.valor)
+        destino.valor = verificar_compatibilidade_tipos(destino.tipo, valor, tipo, no.line,
+                                                        "atribuicao", self.diagnosticos,
+                                                        no.valor)
+        if self._rastro:
+            self._rastro("Atribuído valor '%s' à variável '%s'", destino.valor, no.nome)
+
+    def _while(self, no):
+        self._condicao(no.condicao)
+        self._bloco(no.corpo)
+
+    def _if(self, no):
+        self._condicao(no.condicao)
+        self._bloco(no.entao)
+        if no.senao is not None:
+            self._comandos[type(no.senao)](no.senao)
+
+    def _for(self, no):
+        # Variáveis declaradas no cabeçalho (for(int i = ...)) pertencem a um
+        # escopo próprio, visível apenas no cabeçalho e no corpo do for
+        simbolos = self.simbolos
+        simbolos.abrir_escopo()
+        self.analisar_comandos((no.inicio,))
+        self._condicao(no.condicao)
+        self.analisar_comandos((no.passo,))
+        self._bloco(no.corpo)
+        simbolos.fechar_escopo()
+
+    def _impressao(self, no):
+        for argumento in no.argumentos:
+            self.avaliar(argumento)
+
+    def _retorno(self, no):
+        self.avaliar(no.valor)
+
+    def avaliar(self, expressao):
+        """
+        Avalia uma expressão com os valores conhecidos na tabela de símbolos.
+
+        Returns:
+            Tupla (valor, tipo)
+        """
+        tipo_no = type(expressao)
+        if tipo_no is Literal:
+            return expressao.valor, expressao.tipo
+        if tipo_no is Name:
+            simbolos = self.simbolos
+            verificar_variavel_usada(simbolos, expressao.nome, expressao.line, expressao.col)
+            verificar_variavel_inicializada(simbolos, expressao.nome, expressao.line, expressao.col)
+            simbolo = simbolos[expressao.nome]
+            return simbolo.valor, simbolo.tipo
+        return self._operacao(expressao)
+
+    def _operacao(self, no):
+        val1, tipo1 = self.avaliar(no.esquerda)
+        val2, tipo2 = self.avaliar(no.direita)
+        tipo = tipo_resultado(tipo1, tipo2)
+
+        # Converter os valores para o tipo apropriado
+        val1 = verificar_compatibilidade_tipos(tipo, val1, tipo1, no.esquerda.line, "operacao",
+                                               no_valor=no.esquerda)
+        val2 = verificar_compatibilidade_tipos(tipo, val2, tipo2, no.direita.line, "operacao",
+                                               no_valor=no.direita)
+
+        match no.op:
+            case '+':
+                resultado = val1 + val2
+            case '-':
+                resultado = val1 - val2
+            case '*':
+                resultado = val1 * val2
+            case '/':
+                if val2 == 0:
+                    linha = no.direita.line
+                    raise ErroSemantico(f"Erro semântico na linha {linha}: divisão por zero",
+                                        *intervalo(no.direita))
+                resultado = val1 // val2 if tipo == "int" else val1 / val2
+            case '^':
+                resultado = potencia(val1, val2, tipo, no)
+        if self._rastro:
+            self._rastro("Operação %s %s %s = %s", val1, no.op, val2, resultado)
+        return resultado, tipo
+
+class ErroPotencia(ArithmeticError):
+    """Potência sem resultado representável; a mensagem é o motivo"""
+
+def calcular_potencia(base, expoente, tipo):
+    """
+    base ^ expoente com as regras da linguagem, compartilhada pela análise
+    e pelos motores de execução: entre ints o resultado é truncado para
+    int. O tamanho do resultado inteiro é verificado antes do cálculo, pois
+    um único ** com inteiros enormes não pode ser interrompido.
+
+    Raises:
+        ErroPotencia: 0 elevado a expoente negativo, float fora do
+                      intervalo, base negativa com expoente fracionário ou
+                      inteiro com mais de LIMITE_BITS_POTENCIA bits
+    """
+    if (tipo == "int" and expoente > 0 and abs(base) > 1
+            and expoente * math.log2(abs(base)) > LIMITE_BITS_POTENCIA):
+        raise ErroPotencia("resultado da potência muito grande")
+    try:
+        resultado = base ** expoente
+    except ZeroDivisionError:
+        raise ErroPotencia("divisão por zero") from None
+    except OverflowError:
+        raise ErroPotencia("resultado fora do intervalo") from None
+    if type(resultado) is complex:
+        raise ErroPotencia("potência sem resultado real")
+    if tipo == "int" and type(resultado) is not int:
+        # Expoente negativo: mantém o tipo inteiro da operação
+        resultado = int(resultado)
+    return resultado
+
+def potencia(base, expoente, tipo, no):
+    """base ^ expoente avaliada na análise; ErroPotencia vira erro semântico na operação"""
+    try:
+        return calcular_potencia(base, expoente, tipo)
+    except ErroPotencia as e:
+        raise ErroSemantico(f"Erro semântico na linha {no.line}: {e}", *intervalo(no)) from None
+
+def analisar(programa, diagnosticos):
+    """Executa a análise semântica do programa e retorna a SymbolTable"""
+    return AnalisadorSemantico(diagnosticos).analisar(programa)
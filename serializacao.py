@@ -0,0 +1,478 @@
+"""
+Formato binário compacto de CompilationResult.
+
+Os processos trabalhadores, o nível de disco do cache de compilações e
+quem mais precise guardar ou transmitir um resultado completo (tabela de
+símbolos, diagnósticos e AST) usam este formato em vez de pickle, que
+guarda o nome da classe e dos atributos de cada objeto e repete cada
+identificador a cada ocorrência.
+
+Todos os inteiros são little-endian. O documento começa com um cabeçalho
+de tamanho fixo (CABECALHO) e segue com as seções abaixo, cada uma
+alinhada a 8 bytes:
+
+    textos        tabela de strings: n + 1 deslocamentos u32, em
+                  caracteres, e (em seção própria) o texto UTF-8 de todas
+                  as strings concatenadas. Nomes, tipos de diagnóstico, mensagens,
+                  operadores e literais de texto são guardados uma única
+                  vez e referenciados pelo índice.
+    simbolos      um registro SIMBOLO por Simbolo: nome (índice), contexto
+                  (profundidade do escopo), linha, tipo (TIPOS), etiqueta
+                  do valor (VALOR_*) e o valor em 8 bytes (inteiro, bits do
+                  float ou índice de texto)
+    declarados    índices u32 dos símbolos, na ordem de declaração (vazia
+                  numa tabela sem histórico)
+    visiveis      índices u32 dos símbolos visíveis, na ordem da tabela
+    escopos       palavras u32: para cada escopo aberto, a quantidade de
+                  entradas e os pares (nome, símbolo sombreado + 1, ou 0)
+    diagnosticos  um registro DIAGNOSTICO por Diagnostic: line, col,
+                  end_line, end_col, kind e message (índices)
+    ast           palavras i32 com a AST em pré-ordem (ver _codificar_ast);
+                  vazia quando não há AST
+
+A decodificação lê as seções diretamente do buffer recebido por
+memoryview, sem copiá-lo: os registros saem de struct.iter_unpack sobre
+fatias da memoryview e, em máquinas little-endian, os vetores u32 e i32
+são a própria memória do buffer (memoryview.cast). A versão do formato
+(VERSAO) e o CRC-32 do documento ficam no cabeçalho; um
+documento de outra versão, truncado, corrompido ou inconsistente levanta
+FormatoInvalido.
+"""
+import array
+import operator
+import struct
+import sys
+import zlib
+
+import ast_nodes
+from diagnostics import Diagnostic
+from symbol_table import Simbolo, SymbolTable
+
+MAGICO = b'CRES'
+VERSAO = 2
+
+# magico, versão, opções, as quantidades (strings, bytes do texto,
+# símbolos, declarados, visíveis, palavras de escopos, diagnósticos,
+# palavras da AST) e o CRC-32 do documento, sem este último campo
+CABECALHO = struct.Struct('<4sHHIIIIIIIII')
+# nome, contexto, linha, tipo, etiqueta do valor, valor
+SIMBOLO = struct.Struct('<IIIBBq')
+# line, col, end_line, end_col, kind, message
+DIAGNOSTICO = struct.Struct('<IIIIII')
+
+# Opções do cabeçalho
+COM_HISTORICO = 1
+COM_AST = 2
+
+TIPOS = ('int', 'float', 'char')
+
+# Etiquetas dos valores dos símbolos
+VALOR_NENHUM = 0
+VALOR_INT = 1
+VALOR_FLOAT = 2
+VALOR_TEXTO = 3
+VALOR_BOOL = 4
+VALOR_INT_GRANDE = 5    # fora de 64 bits: o texto decimal, na tabela de strings
+
+# Etiquetas das palavras da AST; a de um nó é _NO + a posição da classe em NOS
+_NENHUM, _LISTA, _TEXTO, _INT, _FLOAT, _BOOL, _INT_GRANDE = range(7)
+_NO = 8
+
+NOS = (ast_nodes.Program, ast_nodes.Block, ast_nodes.Decl, ast_nodes.Assign, ast_nodes.BinOp,
+       ast_nodes.Cond, ast_nodes.While, ast_nodes.If, ast_nodes.For, ast_nodes.Print,
+       ast_nodes.Return, ast_nodes.Literal, ast_nodes.Name)
+# Atributos gravados de cada nó, além de line/col (inclui os que não estão
+# em `campos`, como Literal.tamanho)
+_ATRIBUTOS = tuple(classe.__slots__ for classe in NOS)
+_ETIQUETAS_NOS = {classe: etiqueta for etiqueta, classe in enumerate(NOS)}
+# Por nó: função que devolve os atributos em ordem inversa (o valor, quando
+# há um só) e se há um só
+_OBTER_INVERTIDO = tuple((operator.attrgetter(*reversed(atributos)), len(atributos) == 1)
+                         for atributos in _ATRIBUTOS)
+
+_MIN_I64 = -2 ** 63
+_MAX_I64 = 2 ** 63 - 1
+_MIN_I32 = -2 ** 31
+_MAX_I32 = 2 ** 31 - 1
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_NATIVO = sys.byteorder == 'little'
+
+class FormatoInvalido(ValueError):
+    """Documento que não está no formato, é de outra versão ou está truncado"""
+
+def _alinhar(tamanho):
+    return -tamanho % 8
+
+def _bits(valor):
+    """Bits de um float como inteiro de 64 bits com sinal"""
+    return _I64.unpack(_F64.pack(valor))[0]
+
+def _float(bits):
+    return _F64.unpack(_I64.pack(bits))[0]
+
+class _Textos:
+    """Tabela de strings em construção"""
+    __slots__ = ('indices', 'textos')
+
+    def __init__(self):
+        self.indices = {}
+        self.textos = []
+
+    def __call__(self, texto):
+        indice = self.indices.get(texto)
+        if indice is None:
+            if type(texto) is not str:
+                raise ValueError(f"string esperada, não {type(texto).__name__}: {texto!r}")
+            indice = self.indices[texto] = len(self.textos)
+            self.textos.append(texto)
+        return indice
+
+def _codificar_valor(valor, textos):
+    """Etiqueta e conteúdo de 64 bits do valor de um símbolo"""
+    tipo = type(valor)
+    if valor is None:
+        return VALOR_NENHUM, 0
+    if tipo is bool:
+        return VALOR_BOOL, int(valor)
+    if tipo is int:
+        if _MIN_I64 <= valor <= _MAX_I64:
+            return VALOR_INT, valor
+        return VALOR_INT_GRANDE, textos(str(valor))
+    if tipo is float:
+        return VALOR_FLOAT, _bits(valor)
+    if tipo is str:
+        return VALOR_TEXTO, textos(valor)
+    raise ValueError(f"valor de símbolo não serializável: {valor!r}")
+
+def _codificar_ast(raiz, textos):
+    """
+    Palavras i32 da AST em pré-ordem. Cada valor começa por uma etiqueta:
+
+        _NENHUM                       None
+        _NO + n, line, col, ...       nó da classe NOS[n], seguido dos seus
+                                      atributos
+        _LISTA n ...                  lista, seguida dos n itens
+        _TEXTO índice                 string da tabela
+        _INT v, _BOOL v               inteiro de 32 bits, booleano
+        _FLOAT índice                 float, como repr na tabela de strings
+        _INT_GRANDE índice            inteiro fora de 32 bits, como texto
+                                      decimal na tabela de strings
+
+    Literais float e inteiros grandes são raros nos programas; guardá-los
+    como texto mantém as palavras com 32 bits. O percurso usa uma pilha
+    explícita: listas longas de comandos e cadeias de else if não esbarram
+    no limite de recursão.
+    """
+    palavras = []
+    gravar = palavras.extend
+    pendentes = [raiz]
+    empilhar = pendentes.append
+    empilhar_varios = pendentes.extend
+    indices = textos.indices
+    while pendentes:
+        valor = pendentes.pop()
+        tipo = type(valor)
+        etiqueta = _ETIQUETAS_NOS.get(tipo)
+        if etiqueta is not None:
+            gravar((_NO + etiqueta, valor.line, valor.col))
+            obter, unico = _OBTER_INVERTIDO[etiqueta]
+            if unico:
+                empilhar(obter(valor))
+            else:
+                empilhar_varios(obter(valor))
+        elif tipo is str:
+            indice = indices.get(valor)
+            gravar((_TEXTO, indice if indice is not None else textos(valor)))
+        elif valor is None:
+            palavras.append(_NENHUM)
+        elif tipo is list:
+            gravar((_LISTA, len(valor)))
+            empilhar_varios(reversed(valor))
+        elif tipo is bool:
+            gravar((_BOOL, valor))
+        elif tipo is int:
+            if _MIN_I32 <= valor <= _MAX_I32:
+                gravar((_INT, valor))
+            else:
+                gravar((_INT_GRANDE, textos(str(valor))))
+        elif tipo is float:
+            gravar((_FLOAT, textos(repr(valor))))
+        else:
+            raise ValueError(f"valor não serializável na AST: {valor!r}")
+    try:
+        return array.array('i', palavras)
+    except OverflowError:
+        raise ValueError("linha ou coluna de nó fora de 32 bits") from None
+
+def _u32(valores):
+    vetor = array.array('I', valores)
+    if not _NATIVO:
+        vetor.byteswap()
+    return vetor.tobytes()
+
+def codificar(resultado):
+    """
+    Codifica um CompilationResult.
+
+    Returns:
+        bytes no formato descrito no docstring do módulo
+
+    Raises:
+        ValueError: Se o resultado tem um valor que o formato não representa
+    """
+    try:
+        return _codificar(resultado)
+    except struct.error as erro:
+        raise ValueError(f"campo fora do intervalo do formato: {erro}") from None
+
+def _codificar(resultado):
+    textos = _Textos()
+    visiveis, escopos, declarados = resultado.simbolos.estado()
+
+    indices = {}
+    simbolos = []
+    def indice(simbolo):
+        numero = indices.get(id(simbolo))
+        if numero is None:
+            numero = indices[id(simbolo)] = len(simbolos)
+            simbolos.append(simbolo)
+        return numero
+
+    lista_declarados = [indice(s) for s in declarados] if declarados is not None else []
+    lista_visiveis = [indice(s) for s in visiveis.values()]
+    palavras_escopos = []
+    for escopo in escopos:
+        palavras_escopos.append(len(escopo))
+        for nome, sombreado in escopo:
+            palavras_escopos.append(textos(nome))
+            palavras_escopos.append(0 if sombreado is None else indice(sombreado) + 1)
+
+    registros = bytearray()
+    for simbolo in simbolos:
+        try:
+            tipo = TIPOS.index(simbolo.tipo)
+        except ValueError:
+            raise ValueError(f"tipo de símbolo desconhecido: {simbolo.tipo!r}") from None
+        etiqueta, valor = _codificar_valor(simbolo.valor, textos)
+        registros += SIMBOLO.pack(textos(simbolo.nome), simbolo.contexto, simbolo.linha,
+                                  tipo, etiqueta, valor)
+
+    diagnosticos = bytearray()
+    for d in resultado.diagnosticos:
+        diagnosticos += DIAGNOSTICO.pack(d.line, d.col, d.end_line, d.end_col,
+                                         textos(d.kind), textos(d.message))
+
+    opcoes = COM_HISTORICO if declarados is not None else 0
+    ast = b''
+    palavras_ast = 0
+    if resultado.ast is not None:
+        opcoes |= COM_AST
+        vetor = _codificar_ast(resultado.ast, textos)
+        palavras_ast = len(vetor)
+        if not _NATIVO:
+            vetor.byteswap()
+        ast = vetor.tobytes()
+
+    texto = ''.join(textos.textos)
+    codificado = texto.encode('utf-8')
+    deslocamentos = [0]
+    for item in textos.textos:
+        deslocamentos.append(deslocamentos[-1] + len(item))
+
+    partes = [None, bytes(_alinhar(CABECALHO.size))]
+    for secao in (_u32(deslocamentos), codificado, registros, _u32(lista_declarados),
+                  _u32(lista_visiveis), _u32(palavras_escopos), diagnosticos, ast):
+        partes.append(secao)
+        partes.append(bytes(_alinhar(len(secao))))
+    campos = [MAGICO, VERSAO, opcoes, len(textos.textos), len(codificado), len(simbolos),
+              len(lista_declarados), len(lista_visiveis), len(palavras_escopos),
+              len(resultado.diagnosticos), palavras_ast, 0]
+    # A soma cobre o cabeçalho (sem o próprio campo) e todas as seções
+    soma = zlib.crc32(CABECALHO.pack(*campos)[:-4])
+    for parte in partes[1:]:
+        soma = zlib.crc32(parte, soma)
+    campos[-1] = soma
+    partes[0] = CABECALHO.pack(*campos)
+    return b''.join(partes)
+
+class _Leitor:
+    """Cursor sobre a memoryview do documento"""
+    __slots__ = ('memoria', 'posicao')
+
+    def __init__(self, memoria, posicao):
+        self.memoria = memoria
+        self.posicao = posicao
+
+    def secao(self, tamanho):
+        """Fatia de `tamanho` bytes (sem cópia), avançando até o alinhamento"""
+        inicio = self.posicao
+        fim = inicio + tamanho
+        if fim > len(self.memoria):
+            raise FormatoInvalido("documento truncado")
+        self.posicao = fim + _alinhar(tamanho)
+        return self.memoria[inicio:fim]
+
+    def vetor(self, codigo, quantidade):
+        """Vetor de inteiros de 32 bits little-endian; sem cópia em máquinas little-endian"""
+        fatia = self.secao(quantidade * 4)
+        if _NATIVO:
+            return fatia.cast(codigo)
+        return struct.unpack_from(f"<{quantidade}{codigo}", fatia)
+
+def _decodificar_valor(etiqueta, valor, textos):
+    if etiqueta == VALOR_INT:
+        return valor
+    if etiqueta == VALOR_NENHUM:
+        return None
+    if etiqueta == VALOR_TEXTO:
+        return textos[valor]
+    if etiqueta == VALOR_FLOAT:
+        return _float(valor)
+    if etiqueta == VALOR_BOOL:
+        return bool(valor)
+    if etiqueta == VALOR_INT_GRANDE:
+        return int(textos[valor])
+    raise FormatoInvalido(f"etiqueta de valor desconhecida: {etiqueta}")
+
+def _decodificar_ast(palavras, textos):
+    """AST a partir das palavras de _codificar_ast, também com pilha explícita"""
+    raiz = []
+    # Cada quadro: [destino, atributos (None numa lista), valores restantes]
+    quadros = [[raiz, None, 1]]
+    i = 0
+    while quadros:
+        quadro = quadros[-1]
+        restantes = quadro[2]
+        if not restantes:
+            quadros.pop()
+            continue
+        etiqueta = palavras[i]
+        novo = None
+        if etiqueta < 0:
+            raise FormatoInvalido(f"etiqueta desconhecida na AST: {etiqueta}")
+        if etiqueta >= _NO:
+            if etiqueta - _NO >= len(NOS):
+                raise FormatoInvalido(f"nó desconhecido: {etiqueta}")
+            classe = NOS[etiqueta - _NO]
+            valor = classe.__new__(classe)
+            valor.line = palavras[i + 1]
+            valor.col = palavras[i + 2]
+            atributos = _ATRIBUTOS[etiqueta - _NO]
+            novo = [valor, atributos, len(atributos)]
+            i += 3
+        elif etiqueta == _TEXTO:
+            valor = textos[palavras[i + 1]]
+            i += 2
+        elif etiqueta == _LISTA:
+            valor = []
+            novo = [valor, None, palavras[i + 1]]
+            i += 2
+        elif etiqueta == _NENHUM:
+            valor = None
+            i += 1
+        elif etiqueta == _INT:
+            valor = palavras[i + 1]
+            i += 2
+        elif etiqueta == _FLOAT:
+            valor = float(textos[palavras[i + 1]])
+            i += 2
+        elif etiqueta == _BOOL:
+            valor = bool(palavras[i + 1])
+            i += 2
+        elif etiqueta == _INT_GRANDE:
+            valor = int(textos[palavras[i + 1]])
+            i += 2
+        else:
+            raise FormatoInvalido(f"etiqueta desconhecida na AST: {etiqueta}")
+        destino, atributos, _ = quadro
+        if atributos is None:
+            destino.append(valor)
+        else:
+            setattr(destino, atributos[len(atributos) - restantes], valor)
+        quadro[2] = restantes - 1
+        if novo is not None:
+            quadros.append(novo)
+    if i != len(palavras):
+        raise FormatoInvalido("palavras sobrando ao final da AST")
+    return raiz[0]
+
+def decodificar(dados):
+    """
+    Decodifica um documento produzido por codificar().
+
+    Args:
+        dados: bytes, bytearray, memoryview ou outro objeto com o protocolo
+               de buffer (um mmap do arquivo, por exemplo)
+
+    Returns:
+        CompilationResult
+
+    Raises:
+        FormatoInvalido: Se o documento não está no formato, é de outra
+                         versão, está truncado ou corrompido
+    """
+    from sintatic_analyser import CompilationResult
+
+    memoria = memoryview(dados).cast('B')
+    if len(memoria) < CABECALHO.size:
+        raise FormatoInvalido("documento truncado")
+    (magico, versao, opcoes, n_textos, n_bytes_texto, n_simbolos, n_declarados, n_visiveis,
+     n_escopos, n_diagnosticos, n_ast, soma) = CABECALHO.unpack_from(memoria)
+    if magico != MAGICO:
+        raise FormatoInvalido("não é um resultado de compilação serializado")
+    if versao != VERSAO:
+        raise FormatoInvalido(f"versão {versao} do formato (esperada {VERSAO})")
+    if zlib.crc32(memoria[CABECALHO.size:], zlib.crc32(memoria[:CABECALHO.size - 4])) != soma:
+        raise FormatoInvalido("soma de verificação não confere (documento truncado ou corrompido)")
+    try:
+        return _decodificar(CompilationResult, memoria, opcoes, n_textos, n_bytes_texto,
+                            n_simbolos, n_declarados, n_visiveis, n_escopos, n_diagnosticos, n_ast)
+    except FormatoInvalido:
+        raise
+    except (IndexError, KeyError, TypeError, ValueError, struct.error) as erro:
+        raise FormatoInvalido(f"documento inconsistente: {erro}") from erro
+
+def _decodificar(CompilationResult, memoria, opcoes, n_textos, n_bytes_texto, n_simbolos,
+                 n_declarados, n_visiveis, n_escopos, n_diagnosticos, n_ast):
+    leitor = _Leitor(memoria, CABECALHO.size + _alinhar(CABECALHO.size))
+    deslocamentos = leitor.vetor('I', n_textos + 1)
+    texto = str(leitor.secao(n_bytes_texto), 'utf-8')
+    textos = [texto[deslocamentos[n]:deslocamentos[n + 1]] for n in range(n_textos)]
+
+    simbolos = [Simbolo(textos[nome], TIPOS[tipo], _decodificar_valor(etiqueta, valor, textos),
+                        contexto, linha)
+                for nome, contexto, linha, tipo, etiqueta, valor
+                in struct.iter_unpack(SIMBOLO.format, leitor.secao(n_simbolos * SIMBOLO.size))]
+    declarados = [simbolos[n] for n in leitor.vetor('I', n_declarados)]
+    visiveis = {}
+    for n in leitor.vetor('I', n_visiveis):
+        simbolo = simbolos[n]
+        visiveis[simbolo.nome] = simbolo
+    palavras = leitor.vetor('I', n_escopos)
+    escopos = []
+    i = 0
+    while i < n_escopos:
+        entradas = palavras[i]
+        escopo = []
+        for j in range(i + 1, i + 1 + 2 * entradas, 2):
+            sombreado = palavras[j + 1]
+            escopo.append((textos[palavras[j]], simbolos[sombreado - 1] if sombreado else None))
+        escopos.append(escopo)
+        i += 1 + 2 * entradas
+    if i != n_escopos or not escopos:
+        raise FormatoInvalido("pilha de escopos inconsistente")
+    tabela = SymbolTable.de_estado(visiveis, escopos,
+                                   declarados if opcoes & COM_HISTORICO else None)
+
+    diagnosticos = [Diagnostic(line, col, textos[kind], textos[mensagem], end_line, end_col)
+                    for line, col, end_line, end_col, kind, mensagem
+                    in struct.iter_unpack(DIAGNOSTICO.format,
+                                          leitor.secao(n_diagnosticos * DIAGNOSTICO.size))]
+
+    ast = None
+    if opcoes & COM_AST:
+        ast = _decodificar_ast(leitor.vetor('i', n_ast), textos)
+    if leitor.posicao != len(memoria):
+        raise FormatoInvalido("tamanho do documento não corresponde ao cabeçalho")
+    return CompilationResult(tabela, diagnosticos, ast)
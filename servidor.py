@@ -0,0 +1,407 @@
+"""
+Servidor de compilação: atende pedidos por um socket Unix com processos
+trabalhadores que já têm o compilador carregado.
+
+Iniciar um processo Python por compilação (importar os módulos, carregar as
+tabelas do lexer e do parser) custa mais do que compilar um arquivo típico.
+O servidor carrega as tabelas uma única vez, antes de criar os processos
+trabalhadores (que as herdam por fork, onde disponível), e recebe pedidos
+em JSON, um por linha (NDJSON):
+
+    {"id": 1, "source": "int main() { int x = 1; };"}
+    {"id": 2, "file": "input1.txt", "timeout": 2.5}
+    {"id": 3, "source": "...", "execute": true, "engine": "vm"}
+    {"id": 2, "op": "cancel"}
+    {"id": 4, "op": "status"}
+
+Cada pedido de compilação recebe uma linha de resposta com o mesmo `id`, no
+formato de batch_compiler (file, status, diagnostics, time_ms e, com
+execute, execution). Uma conexão pode ter vários pedidos em andamento, e as
+respostas saem na ordem em que as compilações terminam. Além de 'ok' e
+'error', status pode ser 'timeout', 'cancelled' ou 'invalid' (linha que não
+é um pedido válido; a mensagem fica em 'error'). Um cancelamento não tem
+resposta própria: o pedido cancelado responde 'cancelled', se ainda não
+tiver respondido. Um erro inesperado numa compilação responde 'error',
+com a mensagem em 'error', sem encerrar o trabalhador.
+
+O laço de eventos (asyncio) apenas lê, despacha e escreve; a compilação,
+que usa a CPU, roda nos processos trabalhadores, um pedido por vez em cada.
+Com todos ocupados, o pedido espera numa fila. Cancelar ("op": "cancel" ou
+fechar a conexão) ou esgotar o prazo ("timeout" do pedido, ou --prazo)
+retira da fila um pedido que ainda não começou; um que já está num
+trabalhador só é interrompido encerrando o processo, e o servidor inicia
+outro no lugar dele.
+
+Uso:
+    python servidor.py [--socket compilador.sock] [-j N] [--prazo 10] [--cache-dir DIR]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import stat
+import sys
+import time
+
+import batch_compiler
+from interpreter import MAX_INSTRUCOES, TEMPO_LIMITE
+from sintatic_analyser import Compiler
+
+SOCKET_PADRAO = 'compilador.sock'
+PRAZO_PADRAO = 10.0
+
+# Tamanho máximo de uma linha de pedido (o texto fonte vem nela)
+LIMITE_LINHA = 64 * 1024 * 1024
+
+def _executar_trabalhador(conexao, cache_dir, cache_tamanho):
+    """Laço de um processo trabalhador: compila cada pedido recebido pela conexão"""
+    # O Ctrl+C no terminal chega a todo o grupo; quem encerra os
+    # trabalhadores é o servidor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    batch_compiler.iniciar_trabalhador(cache_dir, cache_tamanho)
+    conexao.send('pronto')
+    while True:
+        try:
+            pedido = conexao.recv()
+        except EOFError:
+            return
+        if pedido is None:
+            return
+        texto, nome, opcoes = pedido
+        try:
+            if texto is None:
+                resposta = batch_compiler.compilar_arquivo(nome, **opcoes)
+            else:
+                resposta = batch_compiler.compilar_texto(texto, nome, **opcoes)
+        except Exception as e:
+            # Um pedido com um erro inesperado recebe uma resposta de erro e
+            # não derruba o trabalhador
+            resposta = {'file': nome, 'status': 'error', 'diagnostics': [],
+                        'error': f"erro interno na compilação: {e!r}"}
+        conexao.send(resposta)
+
+class Trabalhador:
+    """Processo trabalhador e a ponta do servidor na conexão com ele"""
+    __slots__ = ('processo', 'conexao')
+
+    def __init__(self, contexto, cache_dir=None, cache_tamanho=0):
+        self.conexao, remota = contexto.Pipe()
+        self.processo = contexto.Process(target=_executar_trabalhador,
+                                         args=(remota, cache_dir, cache_tamanho), daemon=True)
+        self.processo.start()
+        remota.close()
+
+    async def _receber(self):
+        """Próxima mensagem do trabalhador, sem bloquear o laço de eventos"""
+        laco = asyncio.get_running_loop()
+        pronto = laco.create_future()
+        descritor = self.conexao.fileno()
+        laco.add_reader(descritor, lambda: pronto.done() or pronto.set_result(None))
+        try:
+            await pronto
+        finally:
+            laco.remove_reader(descritor)
+        # EOFError se o processo terminou
+        return self.conexao.recv()
+
+    async def iniciar(self):
+        """Espera o trabalhador terminar de carregar o compilador"""
+        if await self._receber() != 'pronto':
+            raise RuntimeError("o trabalhador não iniciou")
+
+    async def compilar(self, texto, nome, opcoes):
+        self.conexao.send((texto, nome, opcoes))
+        return await self._receber()
+
+    def encerrar(self):
+        """Interrompe o processo, mesmo no meio de uma compilação"""
+        self.processo.kill()
+        self.processo.join()
+        self.conexao.close()
+
+    def fechar(self):
+        """Pede ao processo ocioso que termine"""
+        try:
+            self.conexao.send(None)
+        except OSError:
+            pass
+        self.processo.join(1)
+        if self.processo.is_alive():
+            self.processo.kill()
+            self.processo.join()
+        self.conexao.close()
+
+class PedidoInvalido(Exception):
+    """Pedido com campos ausentes ou inválidos"""
+
+class ServidorCompilacao:
+    """
+    Fila de pedidos de compilação atendida por processos trabalhadores.
+
+    Args:
+        trabalhadores: Número de processos (padrão: número de CPUs)
+        prazo: Prazo padrão de um pedido em segundos, contado desde o seu
+               recebimento; None ou 0 para nenhum
+        cache_dir: Diretório do cache de compilações compartilhado pelos
+                   trabalhadores (padrão: sem cache)
+        cache_tamanho: Entradas do cache mantidas em memória por trabalhador
+        max_instrucoes: Orçamento de instruções de cada execução
+        tempo_limite: Tempo máximo de cada execução em segundos
+    """
+    __slots__ = ('trabalhadores', 'prazo', 'max_instrucoes', 'tempo_limite', 'estatisticas',
+                 '_contexto', '_argumentos', '_livres', '_ativos', '_reinicios')
+
+    def __init__(self, trabalhadores=None, prazo=PRAZO_PADRAO, cache_dir=None, cache_tamanho=0,
+                 max_instrucoes=MAX_INSTRUCOES, tempo_limite=TEMPO_LIMITE):
+        self.trabalhadores = trabalhadores or os.cpu_count() or 1
+        self.prazo = prazo or None
+        self.max_instrucoes = max_instrucoes
+        self.tempo_limite = tempo_limite
+        self.estatisticas = {'requests': 0, 'ok': 0, 'error': 0, 'timeout': 0,
+                             'cancelled': 0, 'invalid': 0, 'restarts': 0}
+        metodos = multiprocessing.get_all_start_methods()
+        self._contexto = multiprocessing.get_context('fork' if 'fork' in metodos else None)
+        self._argumentos = (cache_dir, cache_tamanho)
+        self._livres = None
+        self._ativos = set()
+        self._reinicios = set()
+
+    async def iniciar(self):
+        """Carrega as tabelas e inicia os trabalhadores, esperando que fiquem prontos"""
+        # Construídas antes do fork, as tabelas são herdadas pelos trabalhadores
+        Compiler()
+        self._livres = asyncio.Queue()
+        await asyncio.gather(*(self._novo_trabalhador() for _ in range(self.trabalhadores)))
+
+    async def _novo_trabalhador(self):
+        trabalhador = Trabalhador(self._contexto, *self._argumentos)
+        self._ativos.add(trabalhador)
+        await trabalhador.iniciar()
+        self._livres.put_nowait(trabalhador)
+
+    def _substituir(self, trabalhador):
+        """Encerra um trabalhador e inicia outro em segundo plano"""
+        trabalhador.encerrar()
+        self._ativos.discard(trabalhador)
+        self.estatisticas['restarts'] += 1
+        tarefa = asyncio.ensure_future(self._novo_trabalhador())
+        self._reinicios.add(tarefa)
+        tarefa.add_done_callback(self._reinicios.discard)
+
+    async def _compilar(self, texto, nome, opcoes):
+        trabalhador = await self._livres.get()
+        try:
+            resultado = await trabalhador.compilar(texto, nome, opcoes)
+        except BaseException:
+            # Cancelado ou fora do prazo no meio da compilação, ou o processo
+            # terminou: o trabalhador não pode ser reaproveitado
+            self._substituir(trabalhador)
+            raise
+        self._livres.put_nowait(trabalhador)
+        return resultado
+
+    def _opcoes(self, pedido):
+        """(texto, nome, opções de compilar_texto, prazo) de um pedido de compilação"""
+        texto, caminho = pedido.get('source'), pedido.get('file')
+        if (texto is None) == (caminho is None):
+            raise PedidoInvalido("informe 'source' ou 'file'")
+        if not isinstance(texto if caminho is None else caminho, str):
+            raise PedidoInvalido("'source' e 'file' devem ser strings")
+        prazo = pedido.get('timeout', self.prazo)
+        if prazo is not None and (not isinstance(prazo, (int, float)) or prazo <= 0):
+            raise PedidoInvalido("'timeout' deve ser um número de segundos maior que zero")
+        opcoes = {}
+        if pedido.get('execute'):
+            motor = pedido.get('engine', 'vm')
+            if motor not in batch_compiler.MOTORES:
+                raise PedidoInvalido(f"'engine' deve ser um de {', '.join(sorted(batch_compiler.MOTORES))}")
+            opcoes = {'executar_programa': True, 'max_instrucoes': self.max_instrucoes,
+                      'tempo_limite': self.tempo_limite, 'motor': motor}
+        nome = caminho if caminho is not None else pedido.get('name', '<source>')
+        return texto, nome, opcoes, prazo
+
+    async def compilar(self, pedido):
+        """
+        Atende um pedido de compilação (sem o `id`).
+
+        Returns:
+            Dicionário da resposta; CancelledError se a tarefa for cancelada
+        """
+        inicio = time.perf_counter()
+        estatisticas = self.estatisticas
+        estatisticas['requests'] += 1
+        try:
+            texto, nome, opcoes, prazo = self._opcoes(pedido)
+        except PedidoInvalido as e:
+            estatisticas['invalid'] += 1
+            return {'status': 'invalid', 'error': str(e)}
+        try:
+            resposta = await asyncio.wait_for(self._compilar(texto, nome, opcoes), prazo)
+        except asyncio.TimeoutError:
+            resposta = {'file': nome, 'status': 'timeout', 'diagnostics': [],
+                        'time_ms': round((time.perf_counter() - inicio) * 1000, 3)}
+        except EOFError:
+            resposta = {'file': nome, 'status': 'error', 'diagnostics': [],
+                        'error': "o processo trabalhador terminou durante a compilação"}
+        except asyncio.CancelledError:
+            estatisticas['cancelled'] += 1
+            raise
+        estatisticas[resposta['status']] += 1
+        return resposta
+
+    def estado(self):
+        """Trabalhadores, ocupação e contadores de pedidos"""
+        livres = self._livres.qsize() if self._livres is not None else 0
+        return {'workers': len(self._ativos), 'idle': livres, **self.estatisticas}
+
+    async def atender(self, leitor, escritor):
+        """Atende uma conexão: um pedido por linha, respostas conforme terminam"""
+        tarefas = {}
+        trava = asyncio.Lock()
+        aberta = True
+
+        async def responder(resposta):
+            async with trava:
+                escritor.write(json.dumps(resposta, ensure_ascii=False).encode() + b'\n')
+                await escritor.drain()
+
+        async def atender_pedido(identificador, pedido):
+            try:
+                resposta = await self.compilar(pedido)
+            except asyncio.CancelledError:
+                if not aberta:
+                    return
+                resposta = {'status': 'cancelled'}
+            finally:
+                tarefas.pop(identificador, None)
+            await responder({'id': identificador, **resposta})
+
+        try:
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except (ValueError, ConnectionError):
+                    # Linha maior que LIMITE_LINHA ou conexão interrompida
+                    break
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                try:
+                    pedido = json.loads(linha)
+                    if not isinstance(pedido, dict):
+                        raise ValueError("o pedido deve ser um objeto JSON")
+                    identificador = pedido.get('id')
+                    hash(identificador)
+                except (ValueError, TypeError) as e:
+                    self.estatisticas['invalid'] += 1
+                    await responder({'id': None, 'status': 'invalid', 'error': str(e)})
+                    continue
+                operacao = pedido.get('op', 'compile')
+                if operacao == 'cancel':
+                    tarefa = tarefas.get(identificador)
+                    if tarefa is not None:
+                        tarefa.cancel()
+                elif operacao == 'status':
+                    await responder({'id': identificador, 'status': 'ok', **self.estado()})
+                elif operacao != 'compile':
+                    self.estatisticas['invalid'] += 1
+                    await responder({'id': identificador, 'status': 'invalid',
+                                     'error': f"operação desconhecida: {operacao!r}"})
+                elif identificador in tarefas:
+                    self.estatisticas['invalid'] += 1
+                    await responder({'id': identificador, 'status': 'invalid',
+                                     'error': "já existe um pedido em andamento com esse id"})
+                else:
+                    tarefas[identificador] = asyncio.create_task(atender_pedido(identificador, pedido))
+        finally:
+            aberta = False
+            for tarefa in list(tarefas.values()):
+                tarefa.cancel()
+            escritor.close()
+
+    async def servir(self, caminho=SOCKET_PADRAO):
+        """Atende conexões no socket Unix `caminho` até ser cancelado"""
+        if os.path.exists(caminho) and stat.S_ISSOCK(os.stat(caminho).st_mode):
+            # Socket deixado por um servidor anterior
+            os.unlink(caminho)
+        servidor = await asyncio.start_unix_server(self.atender, caminho, limit=LIMITE_LINHA)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            if os.path.exists(caminho):
+                os.unlink(caminho)
+
+    def fechar(self):
+        """Encerra todos os trabalhadores"""
+        for tarefa in self._reinicios:
+            tarefa.cancel()
+        for trabalhador in list(self._ativos):
+            trabalhador.fechar()
+        self._ativos.clear()
+
+def compilar_remoto(texto, caminho=SOCKET_PADRAO, prazo=None, **campos):
+    """
+    Cliente síncrono mínimo: envia um pedido de compilação a um servidor em
+    execução e espera a resposta.
+
+    Args:
+        texto: Código fonte
+        caminho: Socket do servidor
+        prazo: Prazo do pedido em segundos (padrão: o do servidor)
+        campos: Outros campos do pedido (execute, engine, name)
+
+    Returns:
+        Dicionário da resposta
+    """
+    pedido = {'id': 0, 'source': texto, **campos}
+    if prazo is not None:
+        pedido['timeout'] = prazo
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexao:
+        conexao.connect(caminho)
+        conexao.sendall(json.dumps(pedido).encode() + b'\n')
+        with conexao.makefile('rb') as respostas:
+            return json.loads(respostas.readline())
+
+async def _servir(args):
+    servidor = ServidorCompilacao(args.jobs, args.prazo, args.cache_dir, args.cache_tamanho,
+                                  args.max_instrucoes, args.tempo_limite)
+    laco = asyncio.get_running_loop()
+    tarefa = asyncio.current_task()
+    laco.add_signal_handler(signal.SIGTERM, tarefa.cancel)
+    try:
+        await servidor.iniciar()
+        print(json.dumps({'socket': args.socket, 'workers': servidor.trabalhadores}), file=sys.stderr)
+        await servidor.servir(args.socket)
+    finally:
+        servidor.fechar()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de compilação em um socket Unix.")
+    parser.add_argument('--socket', default=SOCKET_PADRAO,
+                        help=f"caminho do socket Unix (padrão: {SOCKET_PADRAO})")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="número de processos trabalhadores (padrão: número de CPUs)")
+    parser.add_argument('--prazo', type=float, default=PRAZO_PADRAO,
+                        help=f"prazo padrão de cada pedido em segundos; 0 para nenhum (padrão: {PRAZO_PADRAO})")
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help="diretório do cache de compilações compartilhado pelos trabalhadores")
+    parser.add_argument('--cache-tamanho', type=int, default=0,
+                        help="entradas do cache mantidas em memória por trabalhador (padrão: 0)")
+    parser.add_argument('--max-instrucoes', type=int, default=MAX_INSTRUCOES,
+                        help=f"orçamento de instruções de cada execução (padrão: {MAX_INSTRUCOES})")
+    parser.add_argument('--tempo-limite', type=float, default=TEMPO_LIMITE,
+                        help=f"tempo máximo de cada execução em segundos (padrão: {TEMPO_LIMITE})")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_servir(args))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
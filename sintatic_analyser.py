@@ -1,11 +1,27 @@
 from ply import * # type: ignore
-import logging
-
-class ErroSemantico(Exception):
-    """Exceção para erros semânticos durante a análise"""
-    def __init__(self, mensagem):
-        self.mensagem = mensagem
-        super().__init__(self.mensagem)
+import contextlib
+import contextvars
+import copy
+import hashlib
+import re
+import sys
+import threading
+
+from diagnostics import (Diagnosticos, SILENT, ERRORS, NIVEIS,
+                         LEXICO, SINTATICO, imprimir_diagnostico)
+import compile_cache
+import lexer_stream
+from lexer_rapido import LexerBuffer, LexerRapido
+import table_cache
+from posicoes import IndiceLinhas
+from symbol_table import SymbolTable
+from ast_nodes import (Program, Block, Decl, Assign, BinOp, Cond,
+                       While, If, For, Print, Return, Literal, Name)
+
+from semantic import AnalisadorSemantico, TIPOS_LITERAIS
+# Reexportado: ErroSemantico era definido neste módulo antes da análise
+# semântica passar para semantic.py
+from semantic import ErroSemantico  # noqa: F401
 
 class ErroSintatico(Exception):
     """Exceção para erros sintáticos durante a análise"""
@@ -13,144 +29,40 @@ class ErroSintatico(Exception):
         self.mensagem = mensagem
         super().__init__(self.mensagem)
 
-def handle_semantic_error(e):
-    """
-    Função para tratar erros semânticos durante o parsing.
-    
-    Args:
-        e: Exceção do tipo ErroSemantico capturada
-    
-    Raises:
-        SyntaxError: Sempre levanta esta exceção para interromper o parsing
+class Compilacao:
     """
-    # Cria um token de erro com a mensagem
-    error_token = yacc.YaccSymbol()
-    error_token.type = 'ERROR'
-    error_token.value = 'error'
-    error_token.error_message = str(e)
-    #
-    ## Substitui o token atual pelo token de erro
-    p_error(error_token)
-    
-    # Interrompe o parsing
-    raise SyntaxError("Parsing interrompido devido a erro semântico")
-
-def verificar_variavel_redeclarada(nome_var, linha=0):
+    Estado de uma única compilação: os diagnósticos do lexer e do parser e
+    quantos erros de sintaxe o parser encontrou. Cada chamada a
+    Compiler.compile cria uma instância nova, de modo que compilações não
+    compartilham estado entre si.
     """
-    Verifica se uma variável já foi declarada
-    Retorna: True se a verificação passar (variável não declarada)
-             Lança ErroSemantico se a variável já estiver declarada
-    """
-    if nome_var in simbolos:
-        raise ErroSemantico(f"Erro semântico na linha {linha}: variável '{nome_var}' já declarada")
-    return True
+    __slots__ = ('diagnosticos', 'rastreando', 'erros_sintaticos')
 
-def verificar_variavel_usada(nome_var, linha=0):
-    """
-    Verifica se uma variável foi declarada antes de ser usada
-    Retorna: True se a verificação passar (variável está declarada)
-             Lança ErroSemantico se a variável não estiver declarada
-    """
-    if nome_var not in simbolos:
-        raise ErroSemantico(f"Erro semântico na linha {linha}: variável '{nome_var}' usada mas não declarada")
-    return True
+    def __init__(self, diagnosticos=None):
+        self.diagnosticos = diagnosticos if diagnosticos is not None else Diagnosticos()
+        self.erros_sintaticos = 0
+        # Atalho consultado pelas ações antes de montar mensagens de rastreamento
+        self.rastreando = self.diagnosticos.rastreando
 
-def verificar_variavel_inicializada(nome_var, linha=0):
-    """
-    Verifica se uma variável foi inicializada antes de ser usada
-    Retorna: O valor da variável se a verificação passar
-             Lança ErroSemantico se a variável não estiver inicializada
-    """
-    
-    if simbolos[nome_var]['valor'] is None:
-        raise ErroSemantico(f"Erro semântico na linha {linha}: variável '{nome_var}' usada antes de ser inicializada")
-    return
+# Compilação em andamento na thread/tarefa atual (definida por Compiler.compile)
+_compilacao_atual = contextvars.ContextVar('compilacao')
+
+def compilacao_atual():
+    """Retorna o estado da compilação em andamento"""
+    return _compilacao_atual.get()
 
-def verificar_compatibilidade_tipos(tipo_destino, valor, linha=0, modo="atribuicao"):
+@contextlib.contextmanager
+def em_compilacao(diagnosticos):
     """
-    Verifica a compatibilidade entre um tipo de destino e um valor,
-    realizando a conversão apropriada quando possível.
-    
-    Args:
-        tipo_destino: Tipo da variável de destino ('int', 'float', 'char')
-        valor: Valor a ser verificado e convertido
-        linha: Número da linha para mensagens de erro
-        modo: Contexto da verificação ('atribuicao' ou 'operacao')
-    
-    Returns:
-        O valor convertido para o tipo apropriado
-        
-    Raises:
-        ErroSemantico: Se a conversão não for possível
+    Define a compilação em andamento para quem usa o lexer e o parser fora
+    de Compiler.compile (por exemplo, incremental.py): os erros léxicos e
+    sintáticos são registrados em `diagnosticos`.
     """
-    # Determinar o tipo do valor
-    tipo_valor = None
-    valor_convertido = None
-    
-    # Se o valor é um ID, obter seu tipo e valor da tabela de símbolos
-    if isinstance(valor, str) and valor in simbolos:
-        tipo_valor = simbolos[valor]['tipo']
-        valor_original = simbolos[valor]['valor']
-    else:
-        valor_original = valor
-        # Determinar o tipo do literal
-        if isinstance(valor, str): #Verificar essa implementacao
-            if valor.isdigit():
-                tipo_valor = "int"
-            elif '.' in valor and any(c.isdigit() for c in valor):
-                tipo_valor = "float"
-            else:
-                tipo_valor = "char"
-        elif isinstance(valor, int):
-            tipo_valor = "int"
-        elif isinstance(valor, float):
-            tipo_valor = "float"
-        elif isinstance(valor, str) and len(valor) == 1:  # Considerando um único caractere como 'char'
-            tipo_valor = "char"
-        else:
-            if valor.isdigit(): # Verificar essa implementacao
-                tipo_valor = "int"
-            elif '.' in valor and any(c.isdigit() for c in valor):
-                tipo_valor = "float"
-            else:
-                tipo_valor = "char"
-    
-    # Tentar realizar a conversão
+    token = _compilacao_atual.set(Compilacao(diagnosticos))
     try:
-        if tipo_destino == "int":
-            if tipo_valor == "int":
-                valor_convertido = int(valor_original)
-            elif tipo_valor == "float":
-                # Conversão de float para int (com potencial perda de precisão)
-                valor_convertido = int(float(valor_original))
-                if modo == "atribuicao":
-                    print(f"Aviso: Conversão de float para int na linha {linha} (possível perda de precisão)")
-            else:
-                raise ErroSemantico(f"Erro semântico na linha {linha}: não é possível converter '{tipo_valor}' para 'int'")
-        
-        elif tipo_destino == "float":
-            if tipo_valor in ["int", "float"]:
-                valor_convertido = float(valor_original)
-            else:
-                raise ErroSemantico(f"Erro semântico na linha {linha}: não é possível converter '{tipo_valor}' para 'float'")
-        
-        elif tipo_destino == "char":
-            # Implementação simplificada para char
-            valor_convertido = str(valor_original)
-        
-        return valor_convertido
-        
-    except (ValueError, TypeError):
-        raise ErroSemantico(f"Erro semântico na linha {linha}: valor '{valor_original}' incompatível com o tipo '{tipo_destino}'")
-
-contexto = 0
-
-def get_contexto():
-    return contexto
-
-# Tabela de simbolos
-# {ID {valor, tipo, contexto}}
-simbolos = {}
+        yield
+    finally:
+        _compilacao_atual.reset(token)
 
 # Palavras reservadas <palavra>:<TOKEN>
 reserved = {
@@ -162,18 +74,25 @@ reserved = {
     'for': 'FOR',
     'while':'WHILE',
     'main': 'MAIN',
-    'return': 'RETURN'
+    'return': 'RETURN',
+    'printf': 'PRINTF'
 }
 
 # Demais TOKENS
 tokens = [
     'EQUALS', 'PLUS', 'MINUS', 'TIMES', 'DIVIDE', 'POWER',
-    'LPAREN', 'RPAREN', 'LT', 'LE', 'GT', 'GE', 'NE',
+    'LPAREN', 'RPAREN', 'LT', 'LE', 'GT', 'GE', 'NE', 'EQ',
     'COMMA', 'SEMI', 'INTEGER', 'FLOATN', 'STRING',
     'ID', 'SEMICOLON', 'RBRACES', 'LBRACES'
 ] + list(reserved.values())
 
-t_ignore = ' \t\n'
+# Quebras de linha não são ignoradas: t_newline as conta em lexer.lineno
+t_ignore = ' \t'
+
+# Diretivas do pré-processador (#include <stdio.h>) são ignoradas
+def t_PREPROCESSADOR(t):
+    r'\#.*'
+    pass
 
 def t_REM(t):
     r'REM .*'
@@ -201,334 +120,282 @@ t_LE = r'<='
 t_GT = r'>'
 t_GE = r'>='
 t_NE = r'!='
+t_EQ = r'=='
 t_COMMA = r'\,'
 t_SEMI = r';'
-t_INTEGER = r'\d+'
-t_FLOATN = r'((\d*\.\d+)(E[\+-]?\d+)?|([1-9]\d*E[\+-]?\d+))'
-t_STRING = r'\".*?\"'
+
+# Literais já convertidos para o valor Python do seu tipo (int, float, str).
+# Por serem funções, são testados na ordem em que estão definidos: FLOATN
+# precisa vir antes de INTEGER. `tamanho` guarda o comprimento do texto
+# original, usado nos trechos (spans) dos diagnósticos. O lexer rápido
+# (lexer_rapido.py) não chama estas funções: converte com _CONVERSOES.
+_CONVERSOES = {'FLOATN': float, 'INTEGER': int}
+
+def t_FLOATN(t):
+    r'((\d*\.\d+)(E[\+-]?\d+)?|([1-9]\d*E[\+-]?\d+))'
+    t.tamanho = len(t.value)
+    t.value = float(t.value)
+    return t
+
+def t_INTEGER(t):
+    r'\d+'
+    t.tamanho = len(t.value)
+    t.value = int(t.value)
+    return t
+
+# Sequências de escape aceitas em strings, como em C
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '0': '\0', '\\': '\\', '"': '"'}
+_ESCAPE = re.compile(r'\\(.)')
+
+def _substituir_escape(m):
+    return _ESCAPES.get(m.group(1), m.group(1))
+
+def t_STRING(t):
+    r'\"([^"\\\n]|\\.)*\"'
+    t.tamanho = len(t.value)
+    valor = t.value[1:-1]
+    t.value = _ESCAPE.sub(_substituir_escape, valor) if '\\' in valor else valor
+    return t
 
 def t_error(t):
-    print("Illegal character %s" % t.value[0])
+    linha, coluna = _linha_coluna(t.lexer, t.lexpos)
+    compilacao_atual().diagnosticos.erro(LEXICO, "Illegal character %s" % t.value[0],
+                                         linha, coluna, linha, coluna + 1)
     t.lexer.skip(1)
 
 def t_newline(t):
     r'\n+'
     t.lexer.lineno += len(t.value)
 
-# Constroi o analisador léxico
-lexer = lex.lex()
-    
+def _linha_coluna(lexer, lexpos):
+    """
+    Linha e coluna de uma posição da linha atual do lexer: pelo índice de
+    linhas (lexer.linhas, ver posicoes.py) ou, sem índice, pela última
+    quebra de linha antes da posição.
+    """
+    linhas = lexer.linhas
+    if linhas is not None:
+        return lexer.lineno, linhas.coluna(lexer.lineno, lexpos)
+    return lexer.lineno, lexpos - lexer.lexdata.rfind('\n', 0, lexpos)
+
+def _tamanho(token):
+    """Comprimento do texto original do token"""
+    tamanho = getattr(token, 'tamanho', None)
+    return tamanho if tamanho is not None else len(token.value)
+
+# As ações da gramática apenas constroem a AST (ast_nodes); as verificações
+# semânticas são feitas depois, sobre a árvore, em semantic.py.
+
+# Precedência dos operadores aritméticos, da menor para a maior. + e - e
+# depois * e / associam à esquerda; a potência associa à direita
+# (2 ^ 3 ^ 2 é 2 ^ 9). Com ela, `operacao` é uma única produção recursiva
+# por operador, sem conflitos nas tabelas LALR.
+precedence = (
+    ('left', 'PLUS', 'MINUS'),
+    ('left', 'TIMES', 'DIVIDE'),
+    ('right', 'POWER'),
+)
+
+def _posicao(p, n):
+    """Linha e coluna (a partir de 1) do token n da produção"""
+    token = p.slice[n]
+    if hasattr(token, 'coluna'):
+        # Token de um FluxoLexico ou de incremental.py, já com a posição
+        return token.lineno, token.coluna
+    linha = token.lineno
+    return linha, p.lexer.linhas.coluna(linha, token.lexpos)
+
 def p_inicial(p):
     '''inicial : INT MAIN LPAREN RPAREN bloco_principal SEMICOLON'''
-    print("Reconheci INICIAL")
-    print("\n=== Compilação concluída com sucesso ===")
-    print("\nTabela de Símbolos:")
-    for var, info in simbolos.items():
-        print(f"  {var}: {info}")
-    print("\n=== Fim da compilação ===")
+    p[0] = Program(p[5], *_posicao(p, 1))
+    c = compilacao_atual()
+    if c.rastreando:
+        c.diagnosticos.trace("Reconheci INICIAL")
 
 def p_bloco_principal(p):
     '''bloco_principal : LBRACES corpo RBRACES'''
-#    print("Reconheci Bloco Principal")
-    
+    p[0] = Block(p[2], *_posicao(p, 1))
+
 def p_corpo(p):
     '''corpo : comando
              | corpo comando'''
-    print("Reconheci corpo")
-
+    # A lista de comandos é estendida no lugar a cada redução
+    if len(p) == 2:
+        comandos, comando = [], p[1]
+    else:
+        comandos, comando = p[1], p[2]
+    if type(comando) is list:
+        # Declaração de várias variáveis: um Decl para cada uma
+        comandos.extend(comando)
+    else:
+        comandos.append(comando)
+    p[0] = comandos
+    c = compilacao_atual()
+    if c.rastreando:
+        c.diagnosticos.trace("Reconheci comando")
+        c.diagnosticos.trace("Reconheci corpo")
+
+# Cada tipo de comando (declaração, atribuição, while, for, printf, return)
+# produz `comando` diretamente. Uma produção unitária por tipo (comando :
+# declaracoes, ...) custava um estado LALR com uma ação para cada token que
+# pode iniciar o comando seguinte, e uma redução a mais por comando. O if
+# continua um não terminal próprio por causa do `else if`.
 def p_comando(p):
-    '''comando : declaracoes
-               | bloco_while
-               | bloco_if
-               | bloco_for
-               | expressao'''
-    print("Reconheci comando")
+    '''comando : bloco_if'''
+    p[0] = p[1]
 
-def p_expressao(p):
-    '''expressao : atribuicao'''
-#    print("Reconheci bloco expressao")
+def p_impressao(p):
+    '''comando : PRINTF LPAREN STRING RPAREN SEMICOLON
+               | PRINTF LPAREN STRING COMMA argumentos RPAREN SEMICOLON'''
+    argumentos = p[5] if len(p) == 8 else []
+    p[0] = Print(p[3], argumentos, *_posicao(p, 1))
+
+def p_argumentos(p):
+    '''argumentos : operacao
+                  | argumentos COMMA operacao'''
+    if len(p) == 2:
+        p[0] = [p[1]]
+    else:
+        p[1].append(p[3])
+        p[0] = p[1]
+
+def p_retorno(p):
+    '''comando : RETURN operacao SEMICOLON'''
+    p[0] = Return(p[2], *_posicao(p, 1))
 
 def p_declaracoes(p):
-    '''declaracoes : tipos ID SEMICOLON 
-                | tipos declaracoes_linha SEMICOLON
-                | tipos ID EQUALS values SEMICOLON
-                | tipos ID EQUALS ID SEMICOLON
-                | tipos ID EQUALS operacao_aritmetica SEMICOLON'''
-
-    # Armazena o tipo para uso posterior
-    print("Entrou no bloco de declaracoes")
+    '''comando : tipos ID SEMICOLON
+               | tipos declaracoes_linha SEMICOLON
+               | tipos ID EQUALS operacao SEMICOLON'''
     tipo = p[1]
-    
-    # Caso de declaração com múltiplas variáveis (tipos declaracoes_linha SEMICOLON)
-    # Adicionar um try except?
-    if len(p) >= 3 and p[2] is None:
-        try:
-            print(simbolos.keys())
-            print(simbolos.items())
-            for chave, valor in simbolos.items():
-                # Verificando se o atributo em_linha é True
-                if valor.get('em_linha') == True:
-                    # Atualizando o atributo tipo
-                    simbolos[chave]['tipo'] = tipo
-                    print(f"Atualizado tipo da variável '{chave}' para '{tipo}'")
-            print('Declaracao realizada em linha')
-        except ErroSemantico as e:
-            handle_semantic_error(e)
-    # Caso de declaração simples (tipos ID SEMICOLON)
-    elif len(p) >= 3 and p[3] == ";": # Abordagem disfuncional uma vez que isinstance sempre retorna True, ja que todos os termos sao strings - realizar testes
-        try:
-            verificar_variavel_redeclarada(p[2], p.lineno(2))
-            simbolos[p[2]] = {'valor': None, 'tipo': tipo, 'contexto': get_contexto(), 'em_linha': False}
-            print(f"Declarada variável '{p[2]}' do tipo '{tipo}'")
-        except ErroSemantico as e:
-            handle_semantic_error(e)
-    
-    # Caso de declaracao com  inicializacao e operacao aritmetica (tipos ID EQUALS operacao_aritmetica SEMICOLON)
-    elif len(p) >= 5 and p[3] == '=' and p.slice[4].type == 'operacao_aritmetica':
-        try:
-            verificar_variavel_redeclarada(p[2], p.lineno(2))
-            valor = verificar_compatibilidade_tipos(p[1], p[4], p.lineno(4), "declaracao")
-            simbolos[p[2]] = {'valor': valor, 'tipo': tipo, 'contexto': get_contexto(), 'em_linha': False}
-            print(f"Declarada e inicializada variável '{p[2]}' do tipo '{tipo}' com valor '{valor}'")
-        except ErroSemantico as e:
-            handle_semantic_error(e)
-    
-    # Caso de declaração com inicialização (tipos ID EQUALS values SEMICOLON ou tipos ID EQUALS ID SEMICOLON)
-    elif len(p) >= 5 and p[3] == '=':
-        try:
-            verificar_variavel_redeclarada(p[2], p.lineno(2))
-            print(f"p[4]: '{p.slice[4].value}' - '{p.slice[4].type}'")
-            if p.slice[4].type == 'ID':
-                # Implementar funcao para checar compatibilidade entre 'tipo_declarado' e o tipo do literal
-                verificar_variavel_usada(p[4], p.lineno(4))
-                valor = verificar_compatibilidade_tipos(p[1], p[4], p.lineno(4), "declaracao")
-
-            if p.slice[4].type == 'values':
-                # Implementar funcao para checar compatibilidade entre 'tipo_declarado' e o tipo do literal
-                print("Verificando tipo de literal:", p.slice[4].value)
-                valor = verificar_compatibilidade_tipos(p[1], p[4], p.lineno(4), "declaracao")
-                
-            if p.slice[4].type == 'operacao_aritmetica':
-                # Idealmente, checar compatibilidade entre 'tipo_declarado' e o resultado da operação
-                print("Verificando tipo do reseultado da operacao aritmetica:", p.slice[4].value)
-                valor = p[4]
-            
-            simbolos[p[2]] = {'valor': valor, 'tipo': tipo, 'contexto': get_contexto(), 'em_linha': False}
-            print(f"Declarada e inicializada variável '{p[2]}' do tipo '{tipo}' com valor '{valor}'")
-        except ErroSemantico as e:
-           handle_semantic_error(e)
-            
-    print(f"Reconheci Declarações")
+    if p.slice[2].type == 'declaracoes_linha':
+        # Caso de declaração com múltiplas variáveis: lista de Decl
+        p[0] = [Decl(tipo, nome, None, linha, coluna) for nome, linha, coluna in p[2]]
+    elif len(p) == 4:
+        # Caso de declaração simples (tipos ID SEMICOLON)
+        p[0] = Decl(tipo, p[2], None, *_posicao(p, 2))
+    else:
+        # Caso de declaração com inicialização
+        p[0] = Decl(tipo, p[2], p[4], *_posicao(p, 2))
 
 def p_declaracao_linha(p):
-    '''declaracoes_linha : ID COMMA declaracoes_linha
-                        | ID'''
-
-    try:
-        verificar_variavel_redeclarada(p[1], p.lineno(1))
-        simbolos[p[1]] = {'valor': None, 'tipo': None, 'contexto': get_contexto(), 'em_linha': True}
-    except ErroSemantico as e:
-        handle_semantic_error(e)
-
-    p[0] = None
-    
-    print(f"Reconheci Declarações linha - variavel: {p[1]}")
+    '''declaracoes_linha : declaracoes_linha COMMA ID
+                        | ID COMMA ID'''
+    # Acumula (nome, linha, coluna) dos nomes declarados; a recursão à
+    # esquerda permite estender a mesma lista a cada vírgula, sem copiá-la
+    if p.slice[1].type == 'ID':
+        p[0] = [(p[1], *_posicao(p, 1)), (p[3], *_posicao(p, 3))]
+    else:
+        p[1].append((p[3], *_posicao(p, 3)))
+        p[0] = p[1]
+
+    c = compilacao_atual()
+    if c.rastreando:
+        c.diagnosticos.trace("Reconheci Declarações linha - variavel: %s", p[3])
+
+def p_bloco(p):
+    '''bloco : LBRACES corpo RBRACES'''
+    p[0] = Block(p[2], *_posicao(p, 1))
+
+# Recuperação de erros em modo pânico: depois de um erro de sintaxe, o PLY
+# desempilha estados até um que aceite o símbolo `error` e descarta tokens
+# até o `;` que encerra o comando ou o `}` que fecha o bloco, e a análise
+# continua no comando seguinte. Assim uma compilação informa os erros de
+# sintaxe de todo o arquivo; a AST de um programa com erros é descartada.
+def p_comando_erro(p):
+    '''comando : error SEMICOLON'''
+    p[0] = []
+
+def p_bloco_erro(p):
+    '''bloco : LBRACES error RBRACES
+             | LBRACES corpo error RBRACES
+       bloco_principal : LBRACES error RBRACES
+                       | LBRACES corpo error RBRACES'''
+    p[0] = Block(p[2] if len(p) == 5 else [], *_posicao(p, 1))
 
 def p_bloco_while(p):
-    '''bloco_while : WHILE LPAREN condicao RPAREN LBRACES corpo RBRACES'''
-#    print("Reconheci bloco while")
+    '''comando : WHILE LPAREN condicao RPAREN bloco'''
+    p[0] = While(p[3], p[5], *_posicao(p, 1))
 
 def p_bloco_if(p):
-    '''bloco_if : IF LPAREN condicao RPAREN LBRACES corpo RBRACES
-                | IF LPAREN condicao RPAREN LBRACES corpo RBRACES ELSE LBRACES corpo RBRACES
-                | IF LPAREN condicao RPAREN LBRACES corpo RBRACES ELSE bloco_if'''
-#    print("Reconheci bloco if")
+    '''bloco_if : IF LPAREN condicao RPAREN bloco
+                | IF LPAREN condicao RPAREN bloco ELSE bloco
+                | IF LPAREN condicao RPAREN bloco ELSE bloco_if'''
+    senao = p[7] if len(p) == 8 else None
+    p[0] = If(p[3], p[5], senao, *_posicao(p, 1))
 
 def p_bloco_for(p):
-    '''bloco_for : FOR LPAREN condicao_for RPAREN LBRACES corpo RBRACES'''
-#    print("Reconheci bloco bloco_for")
+    '''comando : FOR LPAREN condicao_for RPAREN bloco'''
+    inicio, condicao, passo = p[3]
+    p[0] = For(inicio, condicao, passo, p[5], *_posicao(p, 1))
 
 def p_condicao_for(p):
-    '''condicao_for : tipos ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID PLUS PLUS
-                    | tipos ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID PLUS PLUS
-                    | ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID PLUS PLUS
-                    | ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID PLUS PLUS
-                    | tipos ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID MINUS MINUS
-                    | tipos ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID MINUS MINUS
-                    | ID EQUALS values SEMICOLON ID operadores_comparativos values SEMICOLON ID MINUS MINUS
-                    | ID EQUALS values SEMICOLON ID operadores_comparativos ID SEMICOLON ID MINUS MINUS'''
-#    print("Reconheci bloco condicao_for")
+    '''condicao_for : inicio_for SEMICOLON condicao SEMICOLON passo_for'''
+    # Produz a tupla (inicio, condicao, passo) usada em bloco_for
+    p[0] = (p[1], p[3], p[5])
+
+def p_inicio_for(p):
+    '''inicio_for : tipos ID EQUALS operacao
+                  | ID EQUALS operacao'''
+    if len(p) == 5:
+        # Declaração no cabeçalho: for(int i = ...)
+        p[0] = Decl(p[1], p[2], p[4], *_posicao(p, 2))
+    else:
+        p[0] = Assign(p[1], p[3], *_posicao(p, 1))
+
+def p_passo_for(p):
+    '''passo_for : ID PLUS PLUS
+                 | ID MINUS MINUS'''
+    # i++ e i-- são representados como i = i + 1 e i = i - 1
+    linha, coluna = _posicao(p, 1)
+    variavel = Name(p[1], linha, coluna)
+    incremento = BinOp(p[2], variavel, Literal(1, "int", linha, coluna), linha, coluna)
+    p[0] = Assign(p[1], incremento, linha, coluna)
 
 def p_atribuicao(p):
-    ''' atribuicao : ID EQUALS values SEMICOLON
-                | ID EQUALS ID SEMICOLON
-                | ID EQUALS operacao_aritmetica SEMICOLON'''
-    
-    print("Entrou no bloco de atribuicoes")
-    try:
-        tipo = simbolos[p[1]]['tipo']
-        verificar_variavel_usada(p[1], p.lineno(1))
-        if len(p) >= 4:
-            if p.slice[3].type == 'ID':
-                verificar_variavel_usada(p[3], p.lineno(3))
-                verificar_variavel_inicializada(p[3], p.lineno(3))
-                print("Verificando tipo da variavel:", p.slice[1].value)
-                valor = verificar_compatibilidade_tipos(tipo, p[3], p.lineno(4))
-            if p.slice[3].type == 'values':
-                print("Verificando tipo de literal:", p.slice[3].value)
-                valor = verificar_compatibilidade_tipos(tipo, p[3], p.lineno(4))
-                
-            if p.slice[3].type == 'operacao_aritmetica':
-                print("Verificando tipo do resultado da operacao aritmetica:", p.slice[3].value)
-                valor = verificar_compatibilidade_tipos(tipo, p[3], p.lineno(4))
-
-            simbolos[p[1]]['valor'] = valor
-
-    except ErroSemantico as e:
-        handle_semantic_error(e)
-    print("Reconheci bloco atribuicao", p[1], p[2])
-
-# | tipos ID EQUALS values SEMICOLON
-# | tipos ID EQUALS ID SEMICOLON
-# | tipos ID EQUALS operacao_aritmetica SEMICOLON - adicionar as declaracoes
-
-def p_operacao_aritmetica(p):
-    ''' operacao_aritmetica : ID operadores_aritmeticos ID
-                    | ID operadores_aritmeticos values
-                    | values operadores_aritmeticos ID
-                    | values operadores_aritmeticos values'''
-    print("Entrou no bloco de operacao_aritmetica")
-    try:         
-        if p.slice[1].type == 'ID':
-            verificar_variavel_usada(p[1], p.lineno(1))
-            verificar_variavel_inicializada(p[1], p.lineno(3))
-            val1, tipo1 = simbolos[p[1]]['valor'], simbolos[p[1]]['tipo']
-        else:  # Veio de 'values'
-            val1 = p[1]
-            # Determinar o tipo com base no valor # tipo_de_literal(p[1])  função hipotética
-            print(isinstance(p[1], int), p[1].isdigit())
-            if p[1].isdigit(): #Abordagem desfuncional;
-                tipo1 = "int"
-            elif '.' in p[1] and any(c.isdigit() for c in p[1]):
-                tipo1 = "float"
-            else:
-                tipo1 = "char"  # ou outro tipo adequado
-            print('Tipo de Literal: ', tipo1)
-    
-        # Verificar o segundo operando se for um ID
-        if p.slice[3].type == 'ID':
-            verificar_variavel_usada(p[3], p.lineno(3))
-            verificar_variavel_inicializada(p[3], p.lineno(1))
-            val2, tipo2 = simbolos[p[3]]['valor'], simbolos[p[3]]['tipo']
-        else:  # Veio de 'values'
-            val2 = p[3]
-            # Determinar o tipo com base no valor
-            print(p[3], isinstance(p[3], int), p[3].isdigit())
-            if p[3].isdigit():
-                tipo2 = "int"
-            elif '.' in p[3] and any(c.isdigit() for c in p[3]):
-                tipo2 = "float"
-            else:
-                tipo2 = "char"
-            print('Tipo de Literal: ', tipo2)
+    '''comando : ID EQUALS operacao SEMICOLON'''
+    p[0] = Assign(p[1], p[3], *_posicao(p, 1))
+
+def p_operacao_binaria(p):
+    '''operacao : operacao PLUS operacao
+                | operacao MINUS operacao
+                | operacao TIMES operacao
+                | operacao DIVIDE operacao
+                | operacao POWER operacao'''
+    esquerda = p[1]
+    p[0] = BinOp(p[2], esquerda, p[3], esquerda.line, esquerda.col)
+
+def p_operacao_parenteses(p):
+    '''operacao : LPAREN operacao RPAREN'''
+    p[0] = p[2]
+
+def p_operacao_operando(p):
+    '''operacao : operando'''
+    p[0] = p[1]
 
-        if tipo1 == "float" or tipo2 == "float":
-            tipo_resultado = "float"
-        else:
-            tipo_resultado = "int"
-
-        # Converter os valores para o tipo apropriado
-        val1_convertido = verificar_compatibilidade_tipos(tipo_resultado, val1, p.lineno(1), "operacao")
-        val2_convertido = verificar_compatibilidade_tipos(tipo_resultado, val2, p.lineno(3), "operacao")
-        
-        if tipo_resultado == "int":
-            match p[2]:
-                case '+':
-                    resultado = val1_convertido + val2_convertido
-                case '-':
-                    resultado = val1_convertido - val2_convertido
-                case '*':
-                    resultado = val1_convertido * val2_convertido
-                case '/':
-                    if val2_convertido == 0:
-                        raise ErroSemantico(f"Erro semântico na linha {p.lineno(3)}: divisão por zero")
-                    resultado = val1_convertido // val2_convertido
-        elif tipo_resultado == "float":
-            match p[2]:
-                case '+':
-                    resultado = val1_convertido + val2_convertido
-                case '-':
-                    resultado = val1_convertido - val2_convertido
-                case '*':
-                    resultado = val1_convertido * val2_convertido
-                case '/':
-                    if val2_convertido == 0.0:
-                        raise ErroSemantico(f"Erro semântico na linha {p.lineno(3)}: divisão por zero")
-                    resultado = val1_convertido / val2_convertido
-        
-        p[0] = resultado
-
-        #try:
-        #    resultado = None
-#
-        #    if tipo1 == 'int' and tipo2 == 'int':
-        #        match p[2]:
-        #            case '+':
-        #                resultado = int(val1) + int(val2)
-        #            case '-':
-        #                resultado = int(val1) - int(val2)
-        #            case '*':
-        #                resultado = int(val1) * int(val2)
-        #            case '/':
-        #                resultado = int(val1) / int(val2)
-        #            case '^':
-        #                resultado = int(val1) ** int(val2)
-        #    elif tipo1 == 'float' and tipo2 == 'float':
-        #        match p[2]:
-        #            case '+':
-        #                resultado = float(val1) + float(val2)
-        #            case '-':
-        #                resultado = float(val1) - float(val2)
-        #            case '*':
-        #                resultado = float(val1) * float(val2)
-        #            case '/':
-        #                resultado = float(val1) / float(val2)
-        #            case '^':
-        #                resultado = float(val1) ** float(val2)
-        #    else:
-        #        #Erro caso sejam tipos diferentes que nao podem ser convertidos.
-        #        resultado = 'resultado_operacao_aritmetica_nao_implementada'  # Ou algum valor padrão, se necessário
-#
-        #    p[0] = resultado
-        #except (ValueError, TypeError):
-        #    p[0] = None
-    except ErroSemantico as e:
-        handle_semantic_error(e)
+def p_operando_nome(p):
+    '''operando : ID'''
+    p[0] = Name(p[1], *_posicao(p, 1))
+
+def p_operando_literal(p):
+    '''operando : INTEGER
+                | FLOATN
+                | STRING'''
+    p[0] = Literal(p[1], TIPOS_LITERAIS[type(p[1])], *_posicao(p, 1), _tamanho(p.slice[1]))
 
 def p_condicao(p):
-    '''condicao : values operadores_comparativos values
-            | values operadores_comparativos ID
-            | ID operadores_comparativos values
-            | ID operadores_comparativos ID'''
-#    print("Reconheci bloco condicoes")
+    '''condicao : operacao operadores_comparativos operacao'''
+    esquerda = p[1]
+    p[0] = Cond(p[2], esquerda, p[3], esquerda.line, esquerda.col)
 
 def p_operadores_comparativos(p):
     ''' operadores_comparativos : LT
                             | LE
                             | GT
                             | GE
-                            | NE'''
-#    print("Reconheci bloco operadores comparativos")
-#Implementar token para operador EGUAL THAN ET ==
-
-def p_operadores_aritmeticos(p):
-    ''' operadores_aritmeticos : PLUS 
-                            | MINUS
-                            | TIMES
-                            | DIVIDE
-                            | POWER'''
+                            | NE
+                            | EQ'''
     p[0] = p[1]
-#    print("Reconheci operadores aritmeticos")
 
 def p_tipos(p):
     ''' tipos : INT 
@@ -536,46 +403,377 @@ def p_tipos(p):
             | FLOAT'''
     p[0] = p[1]
 
-def p_values(p):
-    ''' values : INTEGER
-            | STRING
-            | FLOATN'''
-    p[0] = p[1]
-    
 def p_error(p):
-    if hasattr(p, 'error_message'):
-        # Erro semântico personalizado
-        print(p.error_message)
-    elif p:
-        print(f"Erro de sintaxe no token: '{p.value}'")
-        print(f"Tipo do token: {p.type}")
+    # Depois de um erro, o PLY só chama p_error de novo quando três tokens
+    # tiverem sido aceitos: os erros em cascata da recuperação não aparecem
+    c = compilacao_atual()
+    c.erros_sintaticos += 1
+    diagnosticos = c.diagnosticos
+    if p:
+        if hasattr(p, 'coluna'):
+            linha, coluna = p.lineno, p.coluna
+        else:
+            linha, coluna = p.lineno, p.lexer.linhas.coluna(p.lineno, p.lexpos)
+        diagnosticos.erro(SINTATICO, f"Erro de sintaxe no token: '{p.value}' (tipo {p.type})",
+                          linha, coluna, linha, coluna + _tamanho(p))
     else:
-        print("Erro de sintaxe no final do arquivo (EOF)")  
+        diagnosticos.erro(SINTATICO, "Erro de sintaxe no final do arquivo (EOF)")
 
-# Constroi o analisador sintático
-parser = yacc.yacc()
+# Implementações do analisador léxico: 'rapido' (lexer_rapido.LexerRapido,
+# montado a partir das tabelas do PLY), 'ply' (o lexer do próprio PLY) e
+# 'buffer' (lexer_rapido.LexerBuffer: o rápido, com os tokens do texto todo
+# guardados em colunas de inteiros antes do parse)
+LEXERS = ('rapido', 'ply', 'buffer')
+LEXER_PADRAO = 'rapido'
 
-logging.basicConfig(
-    level=logging.INFO,
-    filename="parselog.txt"
-)
+# Analisadores léxico e sintático construídos uma única vez por processo
+_analisadores = None
+_analisadores_lock = threading.Lock()
+
+def _construir_analisadores(diretorio_cache=None):
+    """
+    Constrói (uma única vez) o analisador léxico e o sintático a partir das
+    regras definidas neste módulo, usando as tabelas em cache (table_cache).
+
+    Args:
+        diretorio_cache: Diretório do cache de tabelas; só tem efeito na
+                         primeira construção do processo
+
+    Returns:
+        Tupla (lexers, parser) usada como modelo pelas instâncias de Compiler;
+        lexers associa cada nome de LEXERS ao seu lexer
+    """
+    global _analisadores
+    if _analisadores is None:
+        with _analisadores_lock:
+            if _analisadores is None:
+                modulo = sys.modules[__name__]
+                lexer, parser = table_cache.construir_analisadores(modulo, diretorio_cache)
+                # Índice de linhas do texto atual (posicoes.IndiceLinhas), copiado
+                # pelos clones; definido a cada texto por Compiler.compile
+                lexer.linhas = None
+                rapido = LexerRapido(lexer, reserved, conversoes=_CONVERSOES)
+                _analisadores = {'rapido': rapido, 'ply': lexer,
+                                 'buffer': LexerBuffer.a_partir_de(rapido)}, parser
+    return _analisadores
+
+class CompilationResult:
+    """
+    Resultado de uma compilação.
+
+    Attributes:
+        sucesso: True se nenhum erro léxico, sintático ou semântico ocorreu
+        simbolos: SymbolTable ao final da compilação
+        diagnosticos: Lista de Diagnostic (erros e avisos) na ordem em que ocorreram
+        erros: Apenas os diagnósticos de erro
+        ast: Program construído pelo parser, ou None se houve erro sintático
+    """
+    __slots__ = ('sucesso', 'simbolos', 'diagnosticos', 'erros', 'ast')
 
-# entrada do arquivo
-file = open("input.txt",'r')
-data = file.read()
+    def __init__(self, simbolos, diagnosticos, ast=None):
+        self.simbolos = simbolos
+        self.ast = ast
+        self.diagnosticos = diagnosticos
+        self.erros = [d for d in diagnosticos if d.is_error]
+        self.sucesso = not self.erros
 
-# data = 'int main( );'
+    def __repr__(self):
+        return (f"CompilationResult(sucesso={self.sucesso}, "
+                f"simbolos={len(self.simbolos)}, erros={len(self.erros)})")
 
-# string de teste como entrada do analisador léxico
-#lexer.input(data)
+class Compiler:
+    """
+    Compilador reutilizável.
 
-# Tokenização
-#for tok in lexer:
-#    print(tok)
-#    print(tok.type, tok.value, tok.lineno, tok.lexpos)
+    As tabelas do analisador léxico e sintático são construídas uma única vez
+    e reaproveitadas; cada chamada a compile() usa uma cópia própria do lexer
+    e do parser para construir a AST e uma tabela de símbolos nova na análise
+    semântica. Assim, é possível compilar
+    qualquer número de fontes, inclusive em threads diferentes, sem limpar
+    estado global entre as execuções.
 
-# chama o parser\
-try:
-    parser.parse(data, debug=logging.getLogger())
-except SyntaxError as e:
-    print(f"Compilação interrompida: {e}")
+    Args:
+        nivel: Nível de diagnóstico (SILENT, ERRORS ou TRACE)
+        sink: Função que recebe cada Diagnostic emitido (padrão: print)
+        trace: ParseTrace para rastrear o parser (padrão: desligado, o que
+               mantém o PLY no caminho rápido sem depuração)
+        cache_dir: Diretório do cache de tabelas do lexer e do parser
+                   (padrão: table_cache.diretorio_cache_padrao())
+        lexer: Implementação do analisador léxico, uma de LEXERS (padrão:
+               'rapido'); todas produzem os mesmos tokens
+        perfil: perfil.PerfilCompilacao que mede cada regra do lexer, ação
+                da gramática e passo da análise semântica (padrão:
+                desligado, sem nenhum invólucro instalado)
+    """
+
+    def __init__(self, nivel=SILENT, sink=None, trace=None, cache_dir=None, lexer=LEXER_PADRAO,
+                 perfil=None):
+        if lexer not in LEXERS:
+            raise ValueError(f"lexer desconhecido: {lexer!r} (use um de {', '.join(LEXERS)})")
+        lexers, self._parser = _construir_analisadores(cache_dir)
+        self._lexer = lexers[lexer]
+        self._analisador = AnalisadorSemantico
+        if perfil is not None:
+            # As regras medidas ficam em cópias do lexer do PLY e do parser.
+            # O lexer rápido é montado sobre a cópia sem os atalhos de t_ID,
+            # t_newline e dos literais, para que essas regras sejam chamadas
+            regras = perfil.instrumentar_regras(lexers['ply'])
+            if lexer != 'ply':
+                regras = LexerRapido(regras, reserved, regra_id=None, regra_linha=None)
+            if lexer == 'buffer':
+                regras = LexerBuffer.a_partir_de(regras)
+            self._lexer = perfil.instrumentar_lexer(regras)
+            self._parser = perfil.instrumentar_parser(self._parser)
+            self._analisador = perfil.instrumentar_analisador(AnalisadorSemantico)
+        self.nivel = nivel
+        self.sink = sink
+        self.trace = trace
+        self.perfil = perfil
+
+    def novo_lexer(self):
+        """Cópia própria do analisador léxico, pronta para receber input()"""
+        return self._lexer.clone()
+
+    def novo_parser(self):
+        """Cópia própria do parser; pode ser reutilizada em parses sucessivos"""
+        return copy.copy(self._parser)
+
+    def tokens(self, arquivo, tamanho_bloco=lexer_stream.TAMANHO_BLOCO):
+        """
+        Tokens de um arquivo lido em blocos (ver lexer_stream.FluxoLexico).
+
+        Args:
+            arquivo: Objeto com read(n): arquivo em modo texto ou binário, mmap
+            tamanho_bloco: Quantidade lida por vez
+
+        Returns:
+            FluxoLexico; os erros léxicos vão para a compilação em andamento
+            (ver em_compilacao)
+        """
+        return lexer_stream.FluxoLexico(arquivo, self.novo_lexer(), tamanho_bloco)
+
+    def compile_arquivo(self, arquivo, tamanho_bloco=lexer_stream.TAMANHO_BLOCO, debug=False):
+        """
+        Compila um fonte lido de um arquivo em blocos, sem carregá-lo
+        inteiro: o parser consome os tokens à medida que são produzidos.
+
+        Args:
+            arquivo: Objeto com read(n): arquivo em modo texto ou binário, mmap
+            tamanho_bloco: Quantidade lida por vez
+            debug: Como em compile()
+
+        Returns:
+            CompilationResult, igual ao de compile() sobre o texto do arquivo
+        """
+        return self.compile(None, debug, fluxo=self.tokens(arquivo, tamanho_bloco))
+
+    def compile(self, texto, debug=False, fluxo=None):
+        """
+        Compila um texto fonte.
+
+        Args:
+            texto: Código fonte a ser analisado
+            debug: Logger repassado ao parser do PLY para depuração (opcional);
+                   tem precedência sobre o ParseTrace configurado
+            fluxo: FluxoLexico de onde ler os tokens, no lugar de `texto`
+                   (usado por compile_arquivo)
+
+        Returns:
+            CompilationResult com a AST, a tabela de símbolos e os diagnósticos
+        """
+        rastro = None
+        if not debug and self.trace is not None:
+            rastro = self.trace.novo_rastro()
+            debug = rastro if rastro is not None else False
+
+        compilacao = Compilacao(Diagnosticos(self.nivel, self.sink))
+        token = _compilacao_atual.set(compilacao)
+        parser = copy.copy(self._parser)
+        try:
+            if fluxo is not None:
+                programa = parser.parse(lexer=fluxo, debug=debug)
+            else:
+                lexer = self._lexer.clone()
+                lexer.input(texto)
+                lexer.linhas = IndiceLinhas(texto)
+                programa = parser.parse(lexer=lexer, debug=debug)
+        finally:
+            _compilacao_atual.reset(token)
+
+        diagnosticos = compilacao.diagnosticos
+        if compilacao.erros_sintaticos:
+            # A árvore recuperada não tem os comandos com erro: a análise
+            # semântica só informaria erros em cascata (variáveis cuja
+            # declaração foi descartada)
+            programa = None
+        if programa is not None:
+            simbolos = self._analisador(diagnosticos).analisar(programa)
+        else:
+            simbolos = SymbolTable()
+        resultado = CompilationResult(simbolos, diagnosticos.itens, programa)
+        if rastro is not None:
+            self.trace.gravar(rastro, resultado)
+        return resultado
+
+_compilador_padrao = None
+_cache_padrao = None
+_assinatura = None
+
+# Módulos cujo código, além da gramática, determina o resultado de compile()
+# ou a forma como ele é guardado no cache: a assinatura da gramática cobre só
+# tokens, expressões regulares e produções, não o corpo das ações p_* (que
+# montam a AST e os trechos), os lexers nem o formato binário
+_MODULOS_COMPILACAO = ('semantic', 'ast_nodes', 'symbol_table', 'diagnostics', 'lexer_rapido',
+                       'lexer_stream', 'posicoes', 'serializacao')
+
+def assinatura_compilador():
+    """
+    Assinatura que identifica o resultado das compilações: o hash da
+    gramática (o mesmo das tabelas em cache), o do código deste módulo
+    (ações do parser) e o dos módulos em _MODULOS_COMPILACAO.
+
+    Returns:
+        String hexadecimal
+    """
+    global _assinatura
+    if _assinatura is None:
+        resumo = hashlib.sha256(table_cache.assinatura_gramatica(sys.modules[__name__]).encode())
+        for nome in (__name__,) + _MODULOS_COMPILACAO:
+            with open(sys.modules[nome].__file__, 'rb') as arquivo:
+                resumo.update(arquivo.read())
+        _assinatura = resumo.hexdigest()
+    return _assinatura
+
+def configurar_cache(tamanho=compile_cache.TAMANHO_PADRAO, diretorio=None):
+    """
+    Substitui o cache usado por compile_source.
+
+    Args:
+        tamanho: Máximo de entradas em memória; 0 desliga o nível de memória
+        diretorio: Diretório do nível em disco, compartilhável entre processos
+                   (padrão: sem disco)
+
+    Returns:
+        O CacheCompilacao configurado
+    """
+    global _cache_padrao
+    _cache_padrao = compile_cache.CacheCompilacao(assinatura_compilador(), tamanho, diretorio)
+    return _cache_padrao
+
+def cache_padrao():
+    """CacheCompilacao usado por compile_source (criado na primeira chamada)"""
+    if _cache_padrao is None:
+        configurar_cache()
+    return _cache_padrao
+
+def compile_source(texto):
+    """
+    Compila um texto fonte usando um Compiler compartilhado pelo processo.
+
+    O resultado é procurado antes no cache de compilações (cache_padrao());
+    compilar de novo o mesmo texto devolve o mesmo CompilationResult, que
+    não deve ser modificado.
+
+    Returns:
+        CompilationResult da compilação
+    """
+    global _compilador_padrao
+    if _compilador_padrao is None:
+        _compilador_padrao = Compiler()
+    return cache_padrao().compilar(_compilador_padrao, texto)[0]
+
+@contextlib.contextmanager
+def _abrir_fonte(args):
+    """Arquivo de entrada aberto para leitura, mapeado em memória com --mmap"""
+    if not args.mmap:
+        with open(args.arquivo, 'r') as arquivo:
+            yield arquivo
+        return
+    with open(args.arquivo, 'rb') as arquivo:
+        fonte = lexer_stream.abrir_mmap(arquivo)
+        try:
+            yield fonte
+        finally:
+            if fonte is not arquivo:
+                fonte.close()
+
+def _imprimir_tokens(args, nivel):
+    """Modo --tokens: imprime cada token como JSON, sem análise sintática"""
+    import json
+
+    diagnosticos = Diagnosticos(nivel, imprimir_diagnostico)
+    escrever = sys.stdout.write
+    with _abrir_fonte(args) as fonte, em_compilacao(diagnosticos):
+        for token in Compiler(lexer=args.lexer).tokens(fonte, args.tamanho_bloco):
+            escrever(json.dumps({'type': token.type, 'value': token.value, 'line': token.lineno,
+                                 'col': token.coluna, 'pos': token.lexpos}, ensure_ascii=False))
+            escrever('\n')
+    return 1 if any(d.is_error for d in diagnosticos.itens) else 0
+
+def main(argv=None):
+    """Ponto de entrada: compila o arquivo informado (padrão: input.txt)"""
+    import argparse
+
+    argumentos = argparse.ArgumentParser(description="Analisador léxico e sintático da linguagem C-like.")
+    argumentos.add_argument('arquivo', nargs='?', default="input.txt", help="arquivo fonte (padrão: input.txt)")
+    argumentos.add_argument('--diagnostics', choices=sorted(NIVEIS, key=NIVEIS.get), default='errors',
+                            help="nível de diagnóstico: silent, errors ou trace (padrão: errors)")
+    argumentos.add_argument('--parse-trace', metavar='ARQUIVO', nargs='?', const='parselog.jsonl',
+                            help="grava em JSONL os últimos passos do parser (padrão: parselog.jsonl)")
+    argumentos.add_argument('--trace-steps', type=int, default=200,
+                            help="quantidade de passos do parser mantidos no rastro (padrão: 200)")
+    argumentos.add_argument('--trace-all', action='store_true',
+                            help="grava o rastro mesmo quando a compilação não tem erros")
+    argumentos.add_argument('--tokens', action='store_true',
+                            help="apenas imprime os tokens do arquivo, um objeto JSON por linha")
+    argumentos.add_argument('--mmap', action='store_true',
+                            help="lê o arquivo mapeado em memória (mmap) em vez de read()")
+    argumentos.add_argument('--tamanho-bloco', type=int, default=lexer_stream.TAMANHO_BLOCO,
+                            help=f"tamanho dos blocos lidos do arquivo (padrão: {lexer_stream.TAMANHO_BLOCO})")
+    argumentos.add_argument('--lexer', choices=LEXERS, default=LEXER_PADRAO,
+                            help=f"implementação do analisador léxico (padrão: {LEXER_PADRAO})")
+    argumentos.add_argument('--perfil', action='store_true',
+                            help="mede cada regra do lexer, ação da gramática e passo semântico "
+                                 "e imprime um relatório em stderr")
+    argumentos.add_argument('--perfil-ordem', default='proprio',
+                            choices=('proprio', 'total', 'chamadas', 'buscas'),
+                            help="ordem do relatório do perfil (padrão: proprio)")
+    argumentos.add_argument('--perfil-pilhas', metavar='ARQUIVO',
+                            help="grava as pilhas do perfil no formato collapsed (flamegraph.pl); implica --perfil")
+    args = argumentos.parse_args(argv)
+    nivel = NIVEIS[args.diagnostics]
+
+    if args.tokens:
+        return _imprimir_tokens(args, nivel)
+
+    trace = None
+    if args.parse_trace:
+        from parse_trace import ParseTrace
+        trace = ParseTrace(args.parse_trace, ultimos=args.trace_steps,
+                           somente_erros=not args.trace_all)
+
+    perfil = None
+    if args.perfil or args.perfil_pilhas:
+        from perfil import PerfilCompilacao
+        perfil = PerfilCompilacao()
+
+    # O arquivo é lido em blocos enquanto o parser consome os tokens
+    compilador = Compiler(nivel, imprimir_diagnostico, trace, lexer=args.lexer, perfil=perfil)
+    with _abrir_fonte(args) as fonte:
+        resultado = compilador.compile_arquivo(fonte, args.tamanho_bloco)
+    if trace is not None:
+        trace.fechar()
+    if perfil is not None:
+        print(perfil.relatorio(args.perfil_ordem), file=sys.stderr)
+        if args.perfil_pilhas:
+            perfil.gravar_pilhas(args.perfil_pilhas)
+    if nivel >= ERRORS and resultado.sucesso:
+        print("\n=== Compilação concluída com sucesso ===")
+        print("\nTabela de Símbolos:")
+        for simbolo in resultado.simbolos.declarados():
+            print(f"  {simbolo.nome}: {simbolo}")
+        print("\n=== Fim da compilação ===")
+    return 0 if resultado.sucesso else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Tabela de símbolos com escopos aninhados.
+
+Cada bloco (`{ ... }` de while, if, else e for, além do cabeçalho do for)
+abre um escopo novo. A resolução de nomes é O(1): um único dicionário guarda,
+para cada nome, o símbolo visível no escopo atual. Ao declarar um nome que já
+existe num escopo externo, o símbolo externo é sombreado e guardado na pilha
+de escopos; ao fechar o escopo ele volta a ser visível.
+
+Regras:
+    - Redeclarar um nome no mesmo escopo é erro.
+    - Declarar num escopo interno um nome de um escopo externo o sombreia.
+    - Símbolos declarados num escopo deixam de ser visíveis quando ele fecha.
+"""
+
+class Simbolo:
+    """Entrada da tabela de símbolos"""
+    __slots__ = ('nome', 'tipo', 'valor', 'contexto', 'linha')
+
+    def __init__(self, nome, tipo, valor=None, contexto=0, linha=0):
+        self.nome = nome
+        self.tipo = tipo
+        self.valor = valor
+        self.contexto = contexto
+        self.linha = linha
+
+    def __repr__(self):
+        return (f"{{'valor': {self.valor!r}, 'tipo': {self.tipo!r}, "
+                f"'contexto': {self.contexto}, 'linha': {self.linha}}}")
+
+class SymbolTable:
+    """
+    Tabela de símbolos com pilha de escopos e busca O(1)
+
+    Args:
+        historico: Guarda todos os símbolos declarados para declarados();
+                   o interpretador desliga para que declarações repetidas
+                   num laço não acumulem memória
+    """
+    __slots__ = ('_visiveis', '_escopos', '_declarados')
+
+    def __init__(self, historico=True):
+        # nome -> Simbolo visível no escopo atual
+        self._visiveis = {}
+        # Para cada escopo aberto: lista de (nome, símbolo sombreado ou None)
+        self._escopos = [[]]
+        # Todos os símbolos já declarados, na ordem de declaração
+        self._declarados = [] if historico else None
+
+    @property
+    def profundidade(self):
+        """Profundidade do escopo atual (0 é o escopo do corpo de main)"""
+        return len(self._escopos) - 1
+
+    def abrir_escopo(self):
+        self._escopos.append([])
+
+    def fechar_escopo(self):
+        """Fecha o escopo atual, restaurando os símbolos sombreados"""
+        if len(self._escopos) == 1:
+            raise RuntimeError("não há escopo aberto para fechar")
+        visiveis = self._visiveis
+        for nome, sombreado in reversed(self._escopos.pop()):
+            if sombreado is None:
+                del visiveis[nome]
+            else:
+                visiveis[nome] = sombreado
+
+    def declarado_no_escopo_atual(self, nome):
+        simbolo = self._visiveis.get(nome)
+        return simbolo is not None and simbolo.contexto == len(self._escopos) - 1
+
+    def declarar(self, nome, tipo, valor=None, linha=0):
+        """
+        Declara `nome` no escopo atual.
+
+        Returns:
+            O Simbolo criado
+
+        Raises:
+            KeyError: Se o nome já foi declarado no escopo atual
+        """
+        contexto = len(self._escopos) - 1
+        sombreado = self._visiveis.get(nome)
+        if sombreado is not None and sombreado.contexto == contexto:
+            raise KeyError(nome)
+        simbolo = Simbolo(nome, tipo, valor, contexto, linha)
+        self._escopos[-1].append((nome, sombreado))
+        self._visiveis[nome] = simbolo
+        if self._declarados is not None:
+            self._declarados.append(simbolo)
+        return simbolo
+
+    def buscar(self, nome):
+        """Retorna o símbolo visível com esse nome, ou None"""
+        return self._visiveis.get(nome)
+
+    def __getitem__(self, nome):
+        return self._visiveis[nome]
+
+    def __contains__(self, nome):
+        return nome in self._visiveis
+
+    def __len__(self):
+        return len(self._visiveis)
+
+    def __iter__(self):
+        return iter(self._visiveis)
+
+    def items(self):
+        """Pares (nome, Simbolo) visíveis no escopo atual"""
+        return self._visiveis.items()
+
+    def declarados(self):
+        """
+        Todos os símbolos declarados, inclusive os de escopos já fechados
+        (sem histórico, apenas os visíveis no escopo atual)
+        """
+        if self._declarados is None:
+            return list(self._visiveis.values())
+        return list(self._declarados)
+
+    def estado(self):
+        """
+        Estado interno (visíveis, escopos, declarados), para serialização;
+        as estruturas devolvidas são as da tabela e não devem ser alteradas
+        """
+        return self._visiveis, self._escopos, self._declarados
+
+    @classmethod
+    def de_estado(cls, visiveis, escopos, declarados):
+        """Tabela com o estado devolvido por estado()"""
+        tabela = cls.__new__(cls)
+        tabela._visiveis = visiveis
+        tabela._escopos = escopos
+        tabela._declarados = declarados
+        return tabela
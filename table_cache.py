@@ -0,0 +1,218 @@
+"""
+Cache das tabelas do analisador léxico e do sintático.
+
+As tabelas são gravadas em arquivos pickle cujo nome contém um hash da
+gramática (tokens, expressões regulares do lexer e produções do parser) e
+da versão do PLY:
+
+    lextab_<hash>.pickle    tabela do lexer (o que o PLY grava em lextab.py)
+    parsetab_<hash>.pickle  tabelas LALR do parser (picklefile do yacc)
+
+Ao construir os analisadores, as tabelas são procuradas primeiro no diretório
+`tabelas/` distribuído junto com o código e depois no diretório de cache
+(variável de ambiente COMPILADOR_CACHE_DIR ou ~/.cache/compilador_ply).
+Encontradas, são carregadas diretamente, sem validar as regras do lexer nem
+executar a análise LALR. Caso contrário são geradas e gravadas no diretório
+de cache, se ele puder ser escrito; num container somente leitura os
+analisadores são construídos em memória sem gerar avisos.
+
+Os arquivos são gravados num nome temporário e depois renomeados, de modo que
+processos concorrentes nunca leem uma tabela incompleta.
+
+Para regenerar as tabelas distribuídas após alterar a gramática:
+    python table_cache.py
+"""
+import hashlib
+import os
+import pickle
+import types
+
+from ply import lex, yacc # type: ignore
+
+# Diretório com as tabelas distribuídas junto com o código
+DIRETORIO_EMBUTIDO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tabelas')
+
+# Valor de COMPILADOR_CACHE_DIR que desliga o uso de tabelas em disco
+CACHE_DESLIGADO = 'off'
+
+PROTOCOLO_PICKLE = 4
+
+def diretorio_cache_padrao():
+    """Diretório de cache usado quando nenhum é informado"""
+    diretorio = os.environ.get('COMPILADOR_CACHE_DIR')
+    if diretorio:
+        return diretorio
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'compilador_ply')
+
+def _assinatura_lexer(modulo):
+    """Texto que identifica as regras do lexer definidas no módulo"""
+    partes = [repr(list(modulo.tokens)), repr(getattr(modulo, 'literals', ''))]
+    for nome, valor in vars(modulo).items():
+        if not nome.startswith('t_'):
+            continue
+        if callable(valor):
+            partes.append(f"{nome}:{valor.__doc__}")
+        else:
+            partes.append(f"{nome}={valor}")
+    return '\n'.join(partes)
+
+def assinatura_gramatica(modulo):
+    """
+    Calcula o hash que identifica as tabelas geradas para o módulo.
+
+    Returns:
+        String hexadecimal com 16 caracteres
+    """
+    pinfo = yacc.ParserReflect(vars(modulo), log=yacc.NullLogger())
+    pinfo.get_all()
+    texto = '\n'.join([
+        lex.__tabversion__, yacc.__tabversion__,
+        _assinatura_lexer(modulo), pinfo.signature(),
+    ])
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]
+
+def _procurar(nome, diretorios):
+    """Retorna o caminho de `nome` no primeiro diretório em que existir"""
+    for diretorio in diretorios:
+        caminho = os.path.join(diretorio, nome)
+        if os.path.isfile(caminho):
+            return caminho
+    return None
+
+def _gravavel(diretorio):
+    """Cria o diretório se necessário e informa se é possível escrever nele"""
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+    except OSError:
+        return False
+    return os.access(diretorio, os.W_OK)
+
+def _gravar_atomico(caminho, gravar):
+    """Chama gravar(caminho_temporario) e renomeia o resultado para `caminho`"""
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        gravar(temporario)
+        os.replace(temporario, caminho)
+    except OSError:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
+
+def _tabela_lexer(lexer):
+    """Extrai de um lexer construído os dados que o PLY grava em lextab.py"""
+    tabre = {}
+    for estado, lre in lexer.lexstatere.items():
+        tabre[estado] = [
+            (retext, lex._funcs_to_names(func, renames))
+            for (_, func), retext, renames in zip(lre, lexer.lexstateretext[estado],
+                                                 lexer.lexstaterenames[estado])
+        ]
+    return {
+        '_tabversion': lex.__tabversion__,
+        '_lextokens': set(lexer.lextokens),
+        '_lexreflags': int(lexer.lexreflags),
+        '_lexliterals': lexer.lexliterals,
+        '_lexstateinfo': lexer.lexstateinfo,
+        '_lexstatere': tabre,
+        '_lexstateignore': lexer.lexstateignore,
+        '_lexstateerrorf': {e: f.__name__ if f else None for e, f in lexer.lexstateerrorf.items()},
+        '_lexstateeoff': {e: f.__name__ if f else None for e, f in lexer.lexstateeoff.items()},
+    }
+
+def _gravar_tabela_lexer(lexer, caminho):
+    def gravar(temporario):
+        with open(temporario, 'wb') as arquivo:
+            pickle.dump(_tabela_lexer(lexer), arquivo, PROTOCOLO_PICKLE)
+    _gravar_atomico(caminho, gravar)
+
+def _ler_tabela_lexer(caminho, nome):
+    """Carrega a tabela como um módulo, formato aceito por lex(lextab=...)"""
+    with open(caminho, 'rb') as arquivo:
+        dados = pickle.load(arquivo)
+    modulo = types.ModuleType(nome)
+    modulo.__dict__.update(dados)
+    return modulo
+
+def _construir_lexer(modulo, nome, diretorios, diretorio_cache):
+    caminho = _procurar(nome, diretorios)
+    if caminho is not None:
+        try:
+            lextab = _ler_tabela_lexer(caminho, nome)
+            return lex.lex(module=modulo, optimize=1, lextab=lextab)
+        except (OSError, pickle.UnpicklingError, EOFError, ImportError, KeyError):
+            pass
+    lexer = lex.lex(module=modulo)
+    if diretorio_cache is not None and _gravavel(diretorio_cache):
+        _gravar_tabela_lexer(lexer, os.path.join(diretorio_cache, nome))
+    return lexer
+
+def _construir_parser(modulo, nome, diretorios, diretorio_cache):
+    caminho = _procurar(nome, diretorios)
+    if caminho is not None:
+        try:
+            return yacc.yacc(module=modulo, picklefile=caminho, debug=False,
+                             errorlog=yacc.NullLogger())
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+    if diretorio_cache is not None and _gravavel(diretorio_cache):
+        destino = os.path.join(diretorio_cache, nome)
+        parser = []
+        def gravar(temporario):
+            parser.append(yacc.yacc(module=modulo, picklefile=temporario, debug=False,
+                                    errorlog=yacc.NullLogger()))
+        _gravar_atomico(destino, gravar)
+        if parser:
+            return parser[0]
+    return yacc.yacc(module=modulo, debug=False, write_tables=False,
+                     errorlog=yacc.NullLogger())
+
+def construir_analisadores(modulo, diretorio_cache=None):
+    """
+    Constrói o lexer e o parser do módulo usando as tabelas em cache.
+
+    Args:
+        modulo: Módulo com as regras t_* e p_*
+        diretorio_cache: Diretório onde procurar e gravar tabelas (padrão:
+                         diretorio_cache_padrao()); CACHE_DESLIGADO ignora
+                         qualquer tabela em disco
+
+    Returns:
+        Tupla (lexer, parser)
+    """
+    if diretorio_cache is None:
+        diretorio_cache = diretorio_cache_padrao()
+
+    if diretorio_cache == CACHE_DESLIGADO:
+        return (_construir_lexer(modulo, None, (), None),
+                _construir_parser(modulo, None, (), None))
+
+    chave = assinatura_gramatica(modulo)
+    diretorios = (DIRETORIO_EMBUTIDO, diretorio_cache)
+    lexer = _construir_lexer(modulo, f'lextab_{chave}.pickle', diretorios, diretorio_cache)
+    parser = _construir_parser(modulo, f'parsetab_{chave}.pickle', diretorios, diretorio_cache)
+    return lexer, parser
+
+def regenerar_tabelas_embutidas(modulo, diretorio=DIRETORIO_EMBUTIDO):
+    """
+    Regenera as tabelas distribuídas em `diretorio`, removendo as de
+    versões anteriores da gramática.
+
+    Returns:
+        Lista com os arquivos gerados
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    for nome in os.listdir(diretorio):
+        if nome.startswith(('lextab_', 'parsetab_')) and nome.endswith('.pickle'):
+            os.remove(os.path.join(diretorio, nome))
+    chave = assinatura_gramatica(modulo)
+    nomes = (f'lextab_{chave}.pickle', f'parsetab_{chave}.pickle')
+    _construir_lexer(modulo, nomes[0], (), diretorio)
+    _construir_parser(modulo, nomes[1], (), diretorio)
+    return [os.path.join(diretorio, nome) for nome in nomes]
+
+if __name__ == "__main__":
+    import sintatic_analyser
+    for caminho in regenerar_tabelas_embutidas(sintatic_analyser):
+        print(caminho)
@@ -0,0 +1,165 @@
+"""
+Ida e volta de CompilationResult pelo formato binário de serializacao.py.
+
+Uso:
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+import os
+import struct
+import sys
+import unittest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import ast_nodes
+import serializacao
+from diagnostics import Diagnostic, AVISO
+from serializacao import FormatoInvalido, codificar, decodificar
+from sintatic_analyser import CompilationResult, Compiler
+from symbol_table import SymbolTable
+
+def despejo(valor):
+    """Valor com todos os atributos dos nós, para comparar ASTs por completo"""
+    if isinstance(valor, ast_nodes.No):
+        return (type(valor).__name__, valor.line, valor.col,
+                *(despejo(getattr(valor, atributo)) for atributo in type(valor).__slots__))
+    if isinstance(valor, list):
+        return [despejo(item) for item in valor]
+    return type(valor).__name__, valor
+
+def tabela(simbolos):
+    visiveis, escopos, declarados = simbolos.estado()
+    return (repr(list(visiveis.items())), repr(escopos),
+            None if declarados is None else repr(declarados), simbolos.profundidade)
+
+class TestIdaEVolta(unittest.TestCase):
+    compilador = Compiler()
+
+    def ida_e_volta(self, resultado):
+        dados = codificar(resultado)
+        copia = decodificar(dados)
+        self.assertEqual(copia.diagnosticos, resultado.diagnosticos)
+        self.assertEqual(copia.sucesso, resultado.sucesso)
+        self.assertEqual(tabela(copia.simbolos), tabela(resultado.simbolos))
+        self.assertEqual(despejo(copia.ast), despejo(resultado.ast))
+        self.assertEqual(codificar(copia), dados)
+        return copia
+
+    def test_arquivos_de_entrada(self):
+        for nome in sorted(os.listdir(RAIZ)):
+            if nome.startswith('input') and nome.endswith('.txt'):
+                with self.subTest(nome), open(os.path.join(RAIZ, nome)) as arquivo:
+                    self.ida_e_volta(self.compilador.compile(arquivo.read()))
+
+    def test_erro_sintatico_sem_ast(self):
+        resultado = self.compilador.compile('int main() { x = 1 };')
+        self.assertIsNone(resultado.ast)
+        copia = self.ida_e_volta(resultado)
+        self.assertFalse(copia.sucesso)
+        self.assertIsNone(copia.ast)
+
+    def test_texto_vazio(self):
+        self.ida_e_volta(self.compilador.compile(''))
+
+    def test_erros_semanticos(self):
+        resultado = self.compilador.compile(
+            'int main(){ int x = y; float f = 1.5; x = f; while (z < 3) { x = 2; } };')
+        self.assertFalse(resultado.sucesso)
+        self.assertIsNotNone(resultado.ast)
+        self.ida_e_volta(resultado)
+
+    def test_inteiros_grandes(self):
+        resultado = self.compilador.compile(
+            'int main(){ int a = 2 ^ 200; int b = 0 - 2 ^ 63; int c = 99999999999999999999999; };')
+        self.assertTrue(resultado.sucesso)
+        copia = self.ida_e_volta(resultado)
+        self.assertEqual(copia.simbolos['a'].valor, 2 ** 200)
+        self.assertEqual(copia.simbolos['b'].valor, -2 ** 63)
+        self.assertEqual(copia.simbolos['c'].valor, 99999999999999999999999)
+
+    def test_textos_nao_ascii_e_escapes(self):
+        resultado = self.compilador.compile(
+            'int main(){ int a = 1; printf("olá\\n\\t\\"☃\\" %d", a); char c = "ç"; };')
+        copia = self.ida_e_volta(resultado)
+        self.assertEqual(copia.simbolos['c'].valor, 'ç')
+
+    def test_tabela_sem_historico(self):
+        for historico in (True, False):
+            with self.subTest(historico=historico):
+                simbolos = SymbolTable(historico)
+                simbolos.declarar('a', 'int', 2 ** 80, 1)
+                simbolos.declarar('f', 'float', float('-inf'), 2)
+                simbolos.abrir_escopo()
+                simbolos.declarar('a', 'float', -0.0, 3)
+                simbolos.declarar('c', 'char', 'ç\x00"', 4)
+                simbolos.abrir_escopo()
+                simbolos.declarar('b', 'int', True, 5)
+                diagnosticos = [Diagnostic(7, 1, AVISO, "aviso ☃", 7, 9)]
+                copia = self.ida_e_volta(CompilationResult(simbolos, diagnosticos))
+                self.assertEqual(copia.simbolos.profundidade, 2)
+                self.assertEqual(len(copia.simbolos.declarados()), 5 if historico else 4)
+                copia.simbolos.fechar_escopo()
+                copia.simbolos.fechar_escopo()
+                self.assertEqual(copia.simbolos['a'].valor, 2 ** 80)
+
+    def test_valor_nao_serializavel(self):
+        simbolos = SymbolTable()
+        simbolos.declarar('x', 'int', [1], 1)
+        with self.assertRaises(ValueError):
+            codificar(CompilationResult(simbolos, []))
+
+class TestDocumentoInvalido(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        resultado = Compiler().compile(
+            'int main(){ int x = 2 ^ 100; float f = 1.5; printf("%d ç", x); '
+            'for (int i = 0; i < 3; i = i + 1) { x = x + i; } y = 1; };')
+        cls.dados = codificar(resultado)
+
+    def test_documento_truncado(self):
+        for corte in range(len(self.dados)):
+            with self.subTest(corte=corte), self.assertRaises(FormatoInvalido):
+                decodificar(self.dados[:corte])
+
+    def test_bytes_sobrando(self):
+        with self.assertRaises(FormatoInvalido):
+            decodificar(self.dados + bytes(8))
+
+    def test_magico(self):
+        with self.assertRaises(FormatoInvalido):
+            decodificar(b'XRES' + self.dados[4:])
+
+    def test_versao_diferente(self):
+        dados = bytearray(self.dados)
+        struct.pack_into('<H', dados, 4, serializacao.VERSAO + 1)
+        with self.assertRaisesRegex(FormatoInvalido, "versão"):
+            decodificar(bytes(dados))
+
+    def test_soma_de_verificacao(self):
+        campos = list(serializacao.CABECALHO.unpack_from(self.dados))
+        campos[-1] ^= 1
+        dados = serializacao.CABECALHO.pack(*campos) + self.dados[serializacao.CABECALHO.size:]
+        with self.assertRaisesRegex(FormatoInvalido, "soma de verificação"):
+            decodificar(dados)
+
+    def test_contagem_do_cabecalho(self):
+        campos = list(serializacao.CABECALHO.unpack_from(self.dados))
+        for indice in range(3, len(campos) - 1):
+            with self.subTest(campo=indice):
+                alterados = campos.copy()
+                alterados[indice] += 1
+                dados = serializacao.CABECALHO.pack(*alterados) + self.dados[serializacao.CABECALHO.size:]
+                with self.assertRaises(FormatoInvalido):
+                    decodificar(dados)
+
+    def test_bytes_corrompidos(self):
+        for posicao in range(len(self.dados)):
+            dados = bytearray(self.dados)
+            dados[posicao] ^= 0x40
+            with self.subTest(posicao=posicao), self.assertRaises(FormatoInvalido):
+                decodificar(bytes(dados))
+
+if __name__ == "__main__":
+    unittest.main()
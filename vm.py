@@ -0,0 +1,277 @@
+"""
+Máquina virtual de pilha que executa o bytecode gerado por bytecode.py.
+
+As variáveis ficam num vetor indexado pelo slot resolvido na compilação, e
+o laço de despacho lê as instruções diretamente do array('i'). O resultado
+é um ResultadoExecucao, o mesmo do interpretador da AST.
+
+O orçamento de instruções conta as instruções de bytecode executadas. Para
+não pagar um contador por instrução, a contagem é feita por bloco básico:
+a cada salto (tomado ou não) soma-se o tamanho do trecho percorrido desde o
+salto anterior, e só então os limites são verificados. O relógio é
+consultado apenas a cada INTERVALO_RELOGIO instruções.
+
+Uso:
+    python vm.py input6.txt [--max-instrucoes N] [--tempo-limite S]
+"""
+import sys
+import time
+
+from bytecode import (LOAD_CONST, LOAD, LOAD_CHECKED, STORE, CLEAR, TO_FLOAT, TO_INT, TO_STR,
+                      ADD, SUB, MUL, DIV_INT, DIV_FLOAT, POW_INT, POW_FLOAT, JUMP,
+                      JUMP_IF_NOT_LT, JUMP_IF_NOT_LE, JUMP_IF_NOT_GT, JUMP_IF_NOT_GE,
+                      JUMP_IF_NOT_NE, JUMP_IF_NOT_EQ, PRINT, RETURN, HALT,
+                      ADD_CONST, SUB_CONST, MUL_CONST, ADD_LOAD, SUB_LOAD, MUL_LOAD, compilar)
+from diagnostics import Diagnostic, EXECUCAO
+from interpreter import (MAX_INSTRUCOES, TEMPO_LIMITE, INTERVALO_RELOGIO, ErroExecucao,
+                         ResultadoExecucao, formatar_printf)
+from semantic import ErroSemantico, ErroPotencia, calcular_potencia
+
+class MaquinaVirtual:
+    """
+    Executa um Codigo.
+
+    Args:
+        max_instrucoes: Orçamento de instruções de bytecode (None para ilimitado)
+        tempo_limite: Tempo máximo de execução em segundos (None para ilimitado)
+        eco: Função chamada com cada texto impresso por printf
+    """
+    __slots__ = ('max_instrucoes', 'tempo_limite', 'eco')
+
+    def __init__(self, max_instrucoes=MAX_INSTRUCOES, tempo_limite=TEMPO_LIMITE, eco=None):
+        self.max_instrucoes = max_instrucoes
+        self.tempo_limite = tempo_limite
+        self.eco = eco
+
+    def executar(self, codigo):
+        """
+        Executa o código.
+
+        Returns:
+            ResultadoExecucao
+        """
+        slots = [None] * codigo.quantidade_slots
+        saida = []
+        contagem = [0]
+        inicio = time.perf_counter()
+        retorno = 0
+        erro = None
+        try:
+            retorno = self._despachar(codigo, slots, saida, contagem, inicio)
+        except ErroExecucao as e:
+            erro = Diagnostic(e.linha, e.coluna, EXECUCAO, e.mensagem)
+        tempo = time.perf_counter() - inicio
+        variaveis = {nome: slots[slot] for nome, slot in codigo.variaveis}
+        return ResultadoExecucao(variaveis, ''.join(saida), retorno, contagem[0], tempo, erro)
+
+    def _despachar(self, codigo, slots, saida, contagem, inicio):
+        """Laço de despacho; retorna o valor de `return` (0 se não houver)"""
+        ops = codigo.instrucoes
+        constantes = codigo.constantes
+        eco = self.eco
+        max_instrucoes = self.max_instrucoes if self.max_instrucoes is not None else float('inf')
+        prazo = inicio + self.tempo_limite if self.tempo_limite is not None else None
+
+        pilha = []
+        empilhar = pilha.append
+        desempilhar = pilha.pop
+        pc = 0
+        # Início do bloco básico atual e instruções executadas antes dele
+        bloco = 0
+        executadas = 0
+        proxima_verificacao = INTERVALO_RELOGIO
+
+        try:
+            while True:
+                op = ops[pc]
+                if op == LOAD:
+                    empilhar(slots[ops[pc + 1]])
+                    pc += 2
+                elif op == LOAD_CONST:
+                    empilhar(constantes[ops[pc + 1]])
+                    pc += 2
+                elif op == STORE:
+                    slots[ops[pc + 1]] = desempilhar()
+                    pc += 2
+                elif op == ADD_CONST:
+                    pilha[-1] += constantes[ops[pc + 1]]
+                    pc += 2
+                elif op == ADD_LOAD:
+                    pilha[-1] += slots[ops[pc + 1]]
+                    pc += 2
+                elif op >= JUMP and op <= JUMP_IF_NOT_EQ:
+                    if op == JUMP:
+                        destino = ops[pc + 1]
+                    else:
+                        b = desempilhar()
+                        a = desempilhar()
+                        if op == JUMP_IF_NOT_LT:
+                            condicao = a < b
+                        elif op == JUMP_IF_NOT_LE:
+                            condicao = a <= b
+                        elif op == JUMP_IF_NOT_GT:
+                            condicao = a > b
+                        elif op == JUMP_IF_NOT_GE:
+                            condicao = a >= b
+                        elif op == JUMP_IF_NOT_NE:
+                            condicao = a != b
+                        else:
+                            condicao = a == b
+                        destino = pc + 2 if condicao else ops[pc + 1]
+                    # Fim de um bloco básico: contabiliza e verifica os limites
+                    executadas += ((pc - bloco) >> 1) + 1
+                    bloco = pc + 2
+                    if executadas >= proxima_verificacao or executadas > max_instrucoes:
+                        if executadas > max_instrucoes:
+                            self._excedido(codigo, pc, f"limite de {self.max_instrucoes} instruções excedido")
+                        if prazo is not None and time.perf_counter() > prazo:
+                            self._excedido(codigo, pc, f"tempo limite de {self.tempo_limite} s excedido")
+                        proxima_verificacao = executadas + INTERVALO_RELOGIO
+                    pc = bloco = destino
+                elif op == SUB_CONST:
+                    pilha[-1] -= constantes[ops[pc + 1]]
+                    pc += 2
+                elif op == ADD:
+                    b = desempilhar()
+                    pilha[-1] += b
+                    pc += 2
+                elif op == SUB:
+                    b = desempilhar()
+                    pilha[-1] -= b
+                    pc += 2
+                elif op == MUL:
+                    b = desempilhar()
+                    pilha[-1] *= b
+                    pc += 2
+                elif op == SUB_LOAD:
+                    pilha[-1] -= slots[ops[pc + 1]]
+                    pc += 2
+                elif op == MUL_CONST:
+                    pilha[-1] *= constantes[ops[pc + 1]]
+                    pc += 2
+                elif op == MUL_LOAD:
+                    pilha[-1] *= slots[ops[pc + 1]]
+                    pc += 2
+                elif op == LOAD_CHECKED:
+                    valor = slots[ops[pc + 1]]
+                    if valor is None:
+                        self._nao_inicializada(codigo, pc)
+                    empilhar(valor)
+                    pc += 2
+                elif op == TO_FLOAT:
+                    pilha[-1] = float(pilha[-1])
+                    pc += 2
+                elif op == TO_INT:
+                    pilha[-1] = int(pilha[-1])
+                    pc += 2
+                elif op == DIV_INT or op == DIV_FLOAT:
+                    b = desempilhar()
+                    if b == 0:
+                        linha, coluna = codigo.posicao(pc)
+                        raise ErroExecucao(f"Erro de execução na linha {linha}: divisão por zero", linha, coluna)
+                    if op == DIV_INT:
+                        pilha[-1] //= b
+                    else:
+                        pilha[-1] /= b
+                    pc += 2
+                elif op == CLEAR:
+                    slots[ops[pc + 1]] = None
+                    pc += 2
+                elif op == PRINT:
+                    formato, quantidade = constantes[ops[pc + 1]]
+                    if quantidade:
+                        valores = pilha[-quantidade:]
+                        del pilha[-quantidade:]
+                    else:
+                        valores = ()
+                    linha, coluna = codigo.posicao(pc)
+                    texto = formatar_printf(formato, valores, linha, coluna)
+                    saida.append(texto)
+                    if eco is not None:
+                        eco(texto)
+                    pc += 2
+                elif op == TO_STR:
+                    pilha[-1] = str(pilha[-1])
+                    pc += 2
+                elif op == POW_INT:
+                    b = desempilhar()
+                    pilha[-1] = calcular_potencia(pilha[-1], b, "int")
+                    pc += 2
+                elif op == POW_FLOAT:
+                    b = desempilhar()
+                    pilha[-1] = calcular_potencia(pilha[-1], b, "float")
+                    pc += 2
+                elif op == RETURN:
+                    return desempilhar()
+                elif op == HALT:
+                    return 0
+                else:
+                    raise ErroExecucao(f"Erro de execução: instrução inválida {op} em {pc}")
+        except TypeError:
+            # Ex.: comparação entre char e número
+            linha, coluna = codigo.posicao(pc)
+            raise ErroExecucao(f"Erro de execução na linha {linha}: operação entre tipos incompatíveis",
+                               linha, coluna)
+        except OverflowError:
+            linha, coluna = codigo.posicao(pc)
+            raise ErroExecucao(f"Erro de execução na linha {linha}: resultado fora do intervalo",
+                               linha, coluna)
+        except ErroPotencia as e:
+            linha, coluna = codigo.posicao(pc)
+            raise ErroExecucao(f"Erro de execução na linha {linha}: {e}", linha, coluna) from None
+        finally:
+            # Instruções do bloco básico em andamento, até a atual inclusive
+            contagem[0] = executadas + ((pc - bloco) >> 1) + 1
+
+    def _excedido(self, codigo, pc, motivo):
+        linha, coluna = codigo.posicao(pc)
+        raise ErroExecucao(f"Erro de execução na linha {linha}: {motivo}", linha, coluna)
+
+    def _nao_inicializada(self, codigo, pc):
+        linha, coluna = codigo.posicao(pc)
+        slot = codigo.instrucoes[pc + 1]
+        nome = next((n for n, s in codigo.variaveis if s == slot), f"#{slot}")
+        raise ErroExecucao(
+            f"Erro de execução na linha {linha}: variável '{nome}' usada antes de ser inicializada",
+            linha, coluna)
+
+def executar(codigo, max_instrucoes=MAX_INSTRUCOES, tempo_limite=TEMPO_LIMITE, eco=None):
+    """Executa um Codigo (ou a AST de um programa, compilada antes) na máquina virtual"""
+    if not hasattr(codigo, 'instrucoes'):
+        try:
+            codigo = compilar(codigo)
+        except ErroSemantico as e:
+            return ResultadoExecucao.nao_executado(e)
+    return MaquinaVirtual(max_instrucoes, tempo_limite, eco).executar(codigo)
+
+def main(argv=None):
+    """Compila e executa um arquivo fonte na máquina virtual"""
+    import argparse
+    from diagnostics import ERRORS
+    from sintatic_analyser import Compiler
+
+    argumentos = argparse.ArgumentParser(description="Executa um programa na máquina virtual de bytecode.")
+    argumentos.add_argument('arquivo', nargs='?', default="input.txt", help="arquivo fonte (padrão: input.txt)")
+    argumentos.add_argument('--max-instrucoes', type=int, default=MAX_INSTRUCOES,
+                            help=f"orçamento de instruções (padrão: {MAX_INSTRUCOES})")
+    argumentos.add_argument('--tempo-limite', type=float, default=TEMPO_LIMITE,
+                            help=f"tempo máximo de execução em segundos (padrão: {TEMPO_LIMITE})")
+    args = argumentos.parse_args(argv)
+
+    with open(args.arquivo, 'r') as arquivo:
+        compilacao = Compiler(ERRORS).compile(arquivo.read())
+    if not compilacao.sucesso:
+        return 1
+    resultado = executar(compilacao.ast, args.max_instrucoes, args.tempo_limite, sys.stdout.write)
+    if resultado.erro is not None:
+        print(resultado.erro.message, file=sys.stderr)
+    print("\n=== Estado final ===")
+    for nome, valor in resultado.variaveis.items():
+        print(f"  {nome}: {valor!r}")
+    print(f"\n{resultado.instrucoes} instruções em {resultado.tempo * 1000:.3f} ms")
+    if not resultado.sucesso:
+        return 1
+    return resultado.retorno if isinstance(resultado.retorno, int) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())